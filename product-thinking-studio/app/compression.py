@@ -0,0 +1,144 @@
+"""
+Response compression
+gzip is always available; brotli is used when the Brotli package is
+installed. Output is deterministic so every worker produces the same bytes
+(and so the same ETags) for the same body. Streamed bodies are compressed
+chunk by chunk, each chunk flushed so the client can decode it on arrival.
+"""
+import gzip
+import os
+import threading
+import zlib
+from typing import Dict, Iterable, Iterator
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is always available
+    brotli = None
+
+
+# Bodies smaller than this are sent uncompressed (default of COMPRESS_MIN_BYTES;
+# read it through compression_min_bytes())
+MIN_COMPRESS_BYTES = 512
+
+# Content codings this process can produce, best first
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+# Level -> (gzip compresslevel, brotli quality)
+# fast: bodies compressed on every request; default: cached bodies; best: bodies compressed once per process
+LEVELS = {
+    "fast": (6, 5),
+    "default": (9, 9),
+    "best": (9, 11),
+}
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+
+def is_compressible(mimetype: str) -> bool:
+    """Text formats worth compressing (not PDFs, images or already-compressed data)"""
+    return bool(mimetype) and (mimetype.startswith("text/") or mimetype in COMPRESSIBLE_TYPES)
+
+
+def compress(body: bytes, encoding: str, level: str = "default") -> bytes:
+    """
+    Encode body as "br" or "gzip"
+
+    Args:
+        body: Bytes to compress
+        encoding: Content coding from ENCODINGS
+        level: "fast", "default" or "best" (see LEVELS)
+    """
+    gzip_level, brotli_quality = LEVELS[level]
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    # mtime=0 keeps the bytes (and so the ETag) identical across workers
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+
+def compress_stream(chunks: Iterable[bytes], encoding: str, level: str = "fast") -> Iterator[bytes]:
+    """
+    Compress a streamed body chunk by chunk
+
+    Every input chunk is flushed, so each one reaches the client as soon as it
+    is produced (e.g. server-sent events) at some cost in ratio.
+    """
+    gzip_level, brotli_quality = LEVELS[level]
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=brotli_quality)
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            output = compressor.process(chunk) + compressor.flush()
+            if output:
+                yield output
+        yield compressor.finish()
+    else:
+        compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip container
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            output = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            if output:
+                yield output
+        yield compressor.flush()
+
+
+class CompressionStats:
+    """Per-endpoint counts of compressed responses and bytes saved, for this worker"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, Dict] = {}
+        self._skipped: Dict[str, int] = {}
+
+    def record(self, endpoint: str, encoding: str, original_bytes: int, compressed_bytes: int):
+        """Count a compressed response; original_bytes is 0 for streams (size unknown up front)"""
+        with self._lock:
+            entry = self._endpoints.setdefault(endpoint or "unknown", {
+                "responses": 0, "streamed": 0, "original_bytes": 0, "compressed_bytes": 0, "encodings": {}
+            })
+            entry["responses"] += 1
+            entry["encodings"][encoding] = entry["encodings"].get(encoding, 0) + 1
+            if original_bytes:
+                entry["original_bytes"] += original_bytes
+                entry["compressed_bytes"] += compressed_bytes
+            else:
+                entry["streamed"] += 1
+
+    def skip(self, reason: str):
+        """Count a compressible response sent as is ("small" or "not_accepted")"""
+        with self._lock:
+            self._skipped[reason] = self._skipped.get(reason, 0) + 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            endpoints = {}
+            for endpoint, entry in self._endpoints.items():
+                original, compressed = entry["original_bytes"], entry["compressed_bytes"]
+                endpoints[endpoint] = dict(
+                    entry,
+                    encodings=dict(entry["encodings"]),
+                    ratio=round(compressed / original, 3) if original else None,
+                    saved_bytes=original - compressed,
+                )
+            return {
+                "min_bytes": compression_min_bytes(),
+                "encodings": list(ENCODINGS),
+                "endpoints": endpoints,
+                "skipped": dict(self._skipped),
+            }
+
+
+def compression_min_bytes() -> int:
+    """Size threshold below which no body is compressed (COMPRESS_MIN_BYTES), shared by every compressing path"""
+    return int(os.getenv("COMPRESS_MIN_BYTES", str(MIN_COMPRESS_BYTES)))
+
+
+# Shared counters for the process
+compression_stats = CompressionStats()
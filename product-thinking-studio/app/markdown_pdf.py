@@ -0,0 +1,292 @@
+"""
+Markdown to ReportLab flowables
+Single-pass compiler for LLM report markdown: headings, nested lists, tables,
+fenced code, block quotes, rules and inline bold/italic/code/links. Patterns
+are compiled once at import and each line is classified by one regex match.
+"""
+import re
+from html import escape
+from typing import Dict, List, Optional
+
+from reportlab.lib import colors
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import Paragraph, Preformatted, Spacer, Table, TableStyle
+from reportlab.platypus.flowables import HRFlowable
+
+from pdf_fonts import font_markup
+
+
+# One alternative per block type; the first group that matches names the token
+BLOCK_PATTERN = re.compile(r"""
+    (?P<fence>```|~~~)
+  | (?P<rule>(?:-[ \t]*){3,}|(?:\*[ \t]*){3,}|(?:_[ \t]*){3,})$
+  | (?P<heading>\#{1,6})[ \t]+(?P<heading_text>.*?)[ \t#]*$
+  | (?P<item_marker>[-*+]|\d{1,3}[.)])[ \t]+(?P<item_text>.*)$
+  | >[ \t]?(?P<quote>.*)$
+  | (?P<table>\|.*\|)[ \t]*$
+""", re.VERBOSE)
+
+TABLE_SEPARATOR_PATTERN = re.compile(r'^\|?[ \t]*:?-{3,}:?[ \t]*(?:\|[ \t]*:?-{3,}:?[ \t]*)*\|?[ \t]*$')
+
+INLINE_PATTERN = re.compile(r"""
+    `(?P<code>[^`]+)`
+  | \*\*\*(?P<bold_italic>[^*]+?)\*\*\*
+  | \*\*(?P<bold>.+?)\*\*
+  | __(?P<bold_underscore>.+?)__
+  | (?<![\w*])\*(?P<italic>[^*\s](?:[^*]*[^*\s])?)\*(?![\w*])
+  | (?<![\w_])_(?P<italic_underscore>[^_\s](?:[^_]*[^_\s])?)_(?![\w_])
+  | \[(?P<link_text>[^\]]+)\]\((?P<link_url>https?://[^)\s]+)\)
+""", re.VERBOSE)
+
+BULLET_GLYPHS = ('•', '–')
+LIST_INDENT = 18
+CODE_LINE_LENGTH = 90
+
+DEFAULT_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#eef2ff')),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e1e8ed')),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('LEFTPADDING', (0, 0), (-1, -1), 6),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+    ('TOPPADDING', (0, 0), (-1, -1), 4),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+])
+
+# Roles that can be left out of a style map, and the role used instead
+ROLE_FALLBACKS = {
+    'h1': 'h2',
+    'h3': 'h2',
+    'bullet': 'body',
+    'label': 'body',
+    'highlight': 'body',
+    'warning': 'highlight',
+    'quote': 'highlight',
+    'table_header': 'table_cell',
+    'table_cell': 'body',
+}
+
+
+class PendingParagraph:
+    """Paragraph markup and style, parsed only when the build reaches it"""
+
+    __slots__ = ('text', 'style')
+
+    def __init__(self, text: str, style: ParagraphStyle):
+        self.text = text
+        self.style = style
+
+    def getKeepWithNext(self):
+        return getattr(self.style, 'keepWithNext', 0)
+
+    def build(self) -> Paragraph:
+        return Paragraph(self.text, self.style)
+
+
+class PendingTable:
+    """Table cell markup, built into a Table only when the build reaches it"""
+
+    __slots__ = ('compiler', 'rows')
+
+    def __init__(self, compiler: "MarkdownCompiler", rows: List[List[str]]):
+        self.compiler = compiler
+        self.rows = rows
+
+    def getKeepWithNext(self):
+        return 0
+
+    def build(self) -> Table:
+        return self.compiler.build_table(self.rows)
+
+
+PENDING_TYPES = (PendingParagraph, PendingTable)
+
+
+def _render_inline(match) -> str:
+    kind = match.lastgroup
+    if kind == 'code':
+        return f'<font face="Courier">{match.group(kind)}</font>'
+    if kind == 'link_url':
+        url = match.group('link_url').replace('"', '&quot;')
+        return f'<a href="{url}" color="blue">{inline_markup(match.group("link_text"), escaped=True)}</a>'
+    text = inline_markup(match.group(kind), escaped=True)
+    if kind == 'bold_italic':
+        return f'<b><i>{text}</i></b>'
+    if kind.startswith('bold'):
+        return f'<b>{text}</b>'
+    return f'<i>{text}</i>'
+
+
+def inline_markup(text: str, escaped: bool = False) -> str:
+    """Convert inline markdown to ReportLab paragraph markup, escaping everything else"""
+    if not escaped:
+        text = font_markup(escape(text, quote=False))
+    if '*' not in text and '_' not in text and '`' not in text and '[' not in text:
+        return text
+    return INLINE_PATTERN.sub(_render_inline, text)
+
+
+class MarkdownCompiler:
+    """
+    Compiles markdown into a list of flowables using a fixed set of styles
+
+    Build one per style set (e.g. at import) and reuse it; derived styles for
+    nested list levels are cached on the instance.
+    """
+
+    def __init__(self, styles: Dict[str, ParagraphStyle], lazy: bool = False,
+                 width: float = 7 * inch, table_style: TableStyle = DEFAULT_TABLE_STYLE,
+                 section_marker: str = '', callouts: Optional[Dict[str, tuple]] = None,
+                 blank_space: float = 0.1 * inch, section_space: float = 0.15 * inch):
+        """
+        Args:
+            styles: Role -> style. 'body', 'h2' and 'code' are required; see ROLE_FALLBACKS for the rest
+            lazy: Emit PendingParagraph/PendingTable entries instead of parsed flowables; the
+                document template must build them (see pdf_report.ReportDocTemplate)
+            width: Available frame width, used to size table columns
+            table_style: Style applied to markdown tables
+            section_marker: Prefix for H1/H2 titles that do not start with an emoji or symbol
+            callouts: Role -> words; paragraphs with bold text that contain one get that role's style
+                (lowercase words match in any case, others match exactly)
+            blank_space: Height of the gap left for blank lines
+            section_space: Extra space before H1/H2 headings
+        """
+        self.styles = dict(styles)
+        for role in ROLE_FALLBACKS:
+            fallback = role
+            while fallback not in self.styles:
+                fallback = ROLE_FALLBACKS[fallback]
+            self.styles[role] = self.styles[fallback]
+        self.lazy = lazy
+        self.width = width
+        self.table_style = table_style
+        self.section_marker = section_marker
+        self.callouts = callouts or {}
+        self.blank_space = blank_space
+        self.section_space = section_space
+        self._list_styles: Dict[int, ParagraphStyle] = {}
+
+    def _list_style(self, level: int) -> ParagraphStyle:
+        style = self._list_styles.get(level)
+        if style is None:
+            base = self.styles['bullet']
+            style = ParagraphStyle(
+                f'{base.name}Level{level}',
+                parent=base,
+                leftIndent=base.leftIndent + level * LIST_INDENT,
+                bulletIndent=base.bulletIndent + level * LIST_INDENT,
+            )
+            self._list_styles[level] = style
+        return style
+
+    def _text_role(self, line: str) -> str:
+        """Body, label or callout role for a plain text line"""
+        if '**' not in line:
+            return 'body'
+        if line.startswith('**') and line.endswith('**') and line.count('**') == 2:
+            return 'label'
+        lowered = line.lower()
+        for role, words in self.callouts.items():
+            if any(word in (lowered if word.islower() else line) for word in words):
+                return role
+        return 'body'
+
+    def build_table(self, rows: List[List[str]]) -> Table:
+        """Table from rows of cell markup; the first row is the header"""
+        header_style = self.styles['table_header']
+        cell_style = self.styles['table_cell']
+        columns = max(len(row) for row in rows)
+        cells = [
+            [Paragraph(value, header_style if row_index == 0 else cell_style) for value in row]
+            + [''] * (columns - len(row))
+            for row_index, row in enumerate(rows)
+        ]
+        table = Table(cells, colWidths=[self.width / columns] * columns, repeatRows=1, hAlign='LEFT')
+        table.setStyle(self.table_style)
+        return table
+
+    def compile(self, text: str) -> List:
+        """
+        Convert markdown text to flowables in one pass over its lines
+
+        Args:
+            text: Markdown source
+
+        Returns:
+            List of flowables in document order
+        """
+        elements = []
+        append = elements.append
+        paragraph = PendingParagraph if self.lazy else Paragraph
+        styles = self.styles
+        lines = text.split('\n')
+        count = len(lines)
+        previous_blank = False
+        index = 0
+
+        while index < count:
+            raw = lines[index]
+            line = raw.strip()
+            index += 1
+
+            if not line:
+                if not previous_blank:
+                    append(Spacer(1, self.blank_space))
+                previous_blank = True
+                continue
+            previous_blank = False
+
+            match = BLOCK_PATTERN.match(line)
+            kind = match.lastgroup if match else None
+
+            if kind == 'fence':
+                fence = match.group('fence')
+                code_lines = []
+                while index < count and not lines[index].strip().startswith(fence):
+                    code_lines.append(lines[index].rstrip())
+                    index += 1
+                index += 1  # closing fence
+                append(Preformatted('\n'.join(code_lines), styles['code'], maxLineLength=CODE_LINE_LENGTH))
+
+            elif kind == 'rule':
+                append(HRFlowable(width='100%', thickness=0.5, color=colors.HexColor('#e1e8ed'),
+                                  spaceBefore=4, spaceAfter=8))
+
+            elif kind == 'heading_text':
+                level = len(match.group('heading'))
+                # lstrip: a leading emoji no font has is dropped, leaving its space
+                title = inline_markup(match.group('heading_text')).lstrip()
+                if level <= 2:
+                    if self.section_marker and title[:1].isalnum():
+                        title = font_markup(self.section_marker) + title
+                    if self.section_space:
+                        append(Spacer(1, self.section_space))
+                    append(paragraph(title, styles['h1' if level == 1 else 'h2']))
+                else:
+                    append(paragraph(title, styles['h3']))
+
+            elif kind == 'item_text':
+                marker = match.group('item_marker')
+                indent = len(raw) - len(raw.lstrip(' \t'))
+                level = min(raw[:indent].expandtabs(4).count(' ') // 2, 4)
+                label = marker.rstrip('.)') + '.' if marker[0].isdigit() else BULLET_GLYPHS[min(level, 1)]
+                append(paragraph(f'{label} {inline_markup(match.group("item_text"))}', self._list_style(level)))
+
+            elif kind == 'quote':
+                append(paragraph(inline_markup(match.group('quote')), styles['quote']))
+
+            elif kind == 'table' and index < count and TABLE_SEPARATOR_PATTERN.match(lines[index].strip()):
+                rows = [line]
+                index += 1  # separator
+                while index < count and lines[index].strip().startswith('|'):
+                    rows.append(lines[index].strip())
+                    index += 1
+                cells = [[inline_markup(value.strip()) for value in row.strip('|').split('|')] for row in rows]
+                append(PendingTable(self, cells) if self.lazy else self.build_table(cells))
+
+            else:
+                role = self._text_role(line)
+                text = inline_markup(line[2:-2] if role == 'label' else line)
+                append(paragraph(text, styles[role]))
+
+        return elements
@@ -0,0 +1,135 @@
+"""
+Prometheus metrics
+Latency histograms and counters for the hot paths: HTTP routes, LLM calls,
+website scrapes, PDF renders, caches and response compression. When
+PROMETHEUS_MULTIPROC_DIR is set (gunicorn.conf.py sets it), every process
+writes its samples to memory-mapped files in that directory and /metrics
+merges them, so a scrape covers all workers rather than the one that
+answered it. prometheus_client is optional; without it every metric is a
+no-op and /metrics is not served.
+"""
+import contextlib
+import os
+from typing import Tuple
+
+try:
+    import prometheus_client
+    from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, multiprocess
+except ImportError:  # optional; metrics become no-ops
+    prometheus_client = None
+
+
+NAMESPACE = "playground"
+
+METRICS_ENABLED = prometheus_client is not None
+
+# Seconds; routes range from cached pages (ms) to full reports (minutes)
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+LLM_BUCKETS = (0.5, 1, 2, 3, 5, 10, 20, 30, 45, 60, 90, 120, 180, 300)
+TTFT_BUCKETS = (0.1, 0.25, 0.5, 0.75, 1, 1.5, 2, 3, 5, 10, 20)
+SCRAPE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30, 60)
+PDF_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60)
+PDF_SIZE_BUCKETS = (10_000, 25_000, 50_000, 100_000, 250_000, 500_000, 1_000_000, 2_500_000, 5_000_000)
+
+
+class _NoopMetric:
+    """Stands in for every metric type when prometheus_client is not installed"""
+
+    def labels(self, *args, **kwargs) -> "_NoopMetric":
+        return self
+
+    def observe(self, value: float):
+        pass
+
+    def inc(self, amount: float = 1):
+        pass
+
+    def dec(self, amount: float = 1):
+        pass
+
+    def set(self, value: float):
+        pass
+
+    def time(self):
+        return contextlib.nullcontext()
+
+
+def multiprocess_dir() -> str:
+    """Directory shared by the workers' metric files ("" = single process)"""
+    return os.getenv("PROMETHEUS_MULTIPROC_DIR", "")
+
+
+def _histogram(name: str, documentation: str, labels: Tuple[str, ...], buckets: Tuple[float, ...]):
+    if prometheus_client is None:
+        return _NoopMetric()
+    return Histogram(name, documentation, labels, namespace=NAMESPACE, buckets=buckets)
+
+
+def _counter(name: str, documentation: str, labels: Tuple[str, ...]):
+    if prometheus_client is None:
+        return _NoopMetric()
+    return Counter(name, documentation, labels, namespace=NAMESPACE)
+
+
+def _gauge(name: str, documentation: str):
+    if prometheus_client is None:
+        return _NoopMetric()
+    # livesum: add up the processes that are still running
+    return Gauge(name, documentation, namespace=NAMESPACE, multiprocess_mode="livesum")
+
+
+HTTP_LATENCY = _histogram(
+    "http_request_duration_seconds", "Time to build a response, by route pattern",
+    ("method", "route", "status"), HTTP_BUCKETS)
+HTTP_IN_FLIGHT = _gauge("http_requests_in_flight", "Requests being handled")
+
+LLM_LATENCY = _histogram(
+    "llm_request_duration_seconds", "Chat completion latency including the fallback model",
+    ("endpoint", "model", "outcome"), LLM_BUCKETS)
+LLM_TIME_TO_FIRST_TOKEN = _histogram(
+    "llm_time_to_first_token_seconds", "Time to the first streamed content token (LLM_STREAM=1 only)",
+    ("endpoint", "model"), TTFT_BUCKETS)
+LLM_TOKENS = _counter("llm_tokens_total", "Tokens used, by kind (prompt, completion)",
+                      ("endpoint", "model", "kind"))
+
+SCRAPE_PHASE = _histogram(
+    "scrape_phase_duration_seconds", "Website scrape time by phase (launch, navigate, extract)",
+    ("phase",), SCRAPE_BUCKETS)
+
+PDF_RENDER = _histogram(
+    "pdf_render_duration_seconds", "PDF render time on a cache miss, including the wait for a render process",
+    ("kind",), PDF_BUCKETS)
+PDF_SIZE = _histogram("pdf_size_bytes", "Size of rendered PDFs", ("kind",), PDF_SIZE_BUCKETS)
+PDF_QUEUE_DEPTH = _gauge("pdf_render_queue_depth", "PDF renders queued or running")
+
+CACHE_REQUESTS = _counter("cache_requests_total", "Cache lookups by cache and result (hit, miss)",
+                          ("cache", "result"))
+
+COMPRESSION_BYTES = _counter(
+    "response_compression_bytes_total", "Bytes of compressed responses before and after compression",
+    ("stage",))
+
+
+def cache_lookup(cache: str, hit: bool):
+    """Count one lookup in a named cache"""
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def render_latest() -> Tuple[bytes, str]:
+    """
+    Text exposition for /metrics
+
+    Returns:
+        (body, content type)
+
+    Raises:
+        RuntimeError: If prometheus_client is not installed
+    """
+    if prometheus_client is None:
+        raise RuntimeError("prometheus_client is not installed")
+    if multiprocess_dir():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+    return prometheus_client.generate_latest(registry), CONTENT_TYPE_LATEST
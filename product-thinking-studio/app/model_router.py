@@ -0,0 +1,150 @@
+"""
+Model routing
+Chooses a fast or large model per call from the endpoint, input size,
+requested depth and user tier, with a fallback model for overload/timeouts
+"""
+import json
+import os
+from typing import Dict, Optional
+
+
+FAST = "fast"
+HEAVY = "heavy"
+AUTO = "auto"
+
+# Default tier per endpoint. "auto" picks by input size.
+DEFAULT_POLICIES: Dict[str, str] = {
+    "kpi": AUTO,
+    "challenge": AUTO,
+    "walkthrough": AUTO,
+    "framing": AUTO,
+    "dashboard": AUTO,
+    "retrospective": AUTO,
+    "confidence": HEAVY,
+    "defense": HEAVY,
+    "website": HEAVY,
+}
+
+
+class RoutingDecision:
+    """The model chosen for one call and why"""
+
+    def __init__(self, endpoint: str, model: str, fallback_model: Optional[str], reason: str, input_tokens: int):
+        self.endpoint = endpoint
+        self.model = model
+        self.fallback_model = fallback_model
+        self.reason = reason
+        self.input_tokens = input_tokens
+
+
+class ModelRouter:
+    """
+    Routing policy between a fast model and a large model
+
+    With routing disabled every call uses the default model and there is no
+    fallback unless one is configured explicitly (OPENAI_FALLBACK_MODEL).
+    """
+
+    def __init__(self, default_model: str, fast_model: str, enabled: bool = False,
+                 fallback_model: Optional[str] = None, fast_max_input_tokens: int = 800,
+                 policies: Optional[Dict[str, str]] = None, premium_users: Optional[set] = None):
+        """
+        Args:
+            default_model: Large model used for heavy analyses (and when routing is off)
+            fast_model: Cheaper, lower latency model for short inputs
+            enabled: Whether to route between the two models at all
+            fallback_model: Model to retry with on timeout/overload (None = the other tier
+                when routing is enabled, no fallback when it is not)
+            fast_max_input_tokens: Largest user input an "auto" endpoint sends to the fast model
+            policies: Endpoint -> "fast", "heavy" or "auto"
+            premium_users: User ids that always get the large model. These must come from a
+                trusted source (the proxy-appended client address), never from a request header
+        """
+        self.default_model = default_model
+        self.fast_model = fast_model
+        self.enabled = enabled
+        self.fallback_model = fallback_model
+        self.fast_max_input_tokens = fast_max_input_tokens
+        self.policies = dict(DEFAULT_POLICIES)
+        self.policies.update(policies or {})
+        self.premium_users = premium_users or set()
+
+    @classmethod
+    def from_env(cls, default_model: str) -> "ModelRouter":
+        """Build a router from the MODEL_ROUTING* and OPENAI_*_MODEL environment variables"""
+        policies = {}
+        raw = os.getenv("MODEL_ROUTING_POLICIES", "").strip()
+        if raw:
+            try:
+                policies = {key: str(value) for key, value in json.loads(raw).items()}
+            except (ValueError, AttributeError) as e:
+                print(f"Ignoring invalid MODEL_ROUTING_POLICIES: {str(e)}")
+
+        premium = {user.strip() for user in os.getenv("PREMIUM_USERS", "").split(",") if user.strip()}
+
+        return cls(
+            default_model=default_model,
+            fast_model=os.getenv("OPENAI_FAST_MODEL", "gpt-4o-mini"),
+            enabled=os.getenv("MODEL_ROUTING", "off").lower() in ("on", "true", "1"),
+            fallback_model=os.getenv("OPENAI_FALLBACK_MODEL") or None,
+            fast_max_input_tokens=int(os.getenv("FAST_MODEL_MAX_INPUT_TOKENS", "800")),
+            policies=policies,
+            premium_users=premium,
+        )
+
+    def _fallback_for(self, model: str) -> Optional[str]:
+        if self.fallback_model:
+            return self.fallback_model if self.fallback_model != model else None
+        if not self.enabled:
+            return None
+        other = self.fast_model if model == self.default_model else self.default_model
+        return other if other != model else None
+
+    def route(self, endpoint: str, input_tokens: int, depth: Optional[str] = None,
+              user_id: Optional[str] = None) -> RoutingDecision:
+        """
+        Pick the model for a call
+
+        Args:
+            endpoint: Logical endpoint name
+            input_tokens: Size of the user-supplied input in tokens
+            depth: Requested depth ("quick", "standard" or "deep")
+            user_id: Trusted caller identity, checked against the premium tier
+
+        Returns:
+            RoutingDecision with the primary model, fallback model and reason
+        """
+        if not self.enabled:
+            tier, reason = HEAVY, "routing disabled"
+        elif user_id and user_id in self.premium_users:
+            tier, reason = HEAVY, "premium user"
+        elif depth == "deep":
+            tier, reason = HEAVY, "deep analysis requested"
+        elif depth == "quick":
+            tier, reason = FAST, "quick analysis requested"
+        else:
+            policy = self.policies.get(endpoint, AUTO)
+            if policy in (FAST, HEAVY):
+                tier, reason = policy, f"endpoint policy {policy}"
+            elif input_tokens <= self.fast_max_input_tokens:
+                tier, reason = FAST, f"input {input_tokens} <= {self.fast_max_input_tokens} tokens"
+            else:
+                tier, reason = HEAVY, f"input {input_tokens} > {self.fast_max_input_tokens} tokens"
+
+        model = self.fast_model if tier == FAST else self.default_model
+        return RoutingDecision(endpoint, model, self._fallback_for(model), reason, input_tokens)
+
+
+def log_routing(decision: RoutingDecision, entry: Dict, fallback_used: bool = False):
+    """Print one structured line per routed call (model, reason, latency and token stats)"""
+    print("ROUTING " + json.dumps({
+        "endpoint": decision.endpoint,
+        "model": entry.get("model"),
+        "routed_model": decision.model,
+        "reason": decision.reason,
+        "fallback_used": fallback_used,
+        "input_tokens_estimate": decision.input_tokens,
+        "prompt_tokens": entry.get("prompt_tokens"),
+        "completion_tokens": entry.get("completion_tokens"),
+        "latency_ms": entry.get("latency_ms"),
+    }))
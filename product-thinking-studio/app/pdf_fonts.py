@@ -0,0 +1,160 @@
+"""
+PDF fonts
+Report text stays in the built-in Helvetica family, which needs no embedding.
+Characters outside its encoding (e.g. "▸", "⚠", "✓") are set in a registered
+TrueType symbol font that ReportLab embeds as a subset of just the glyphs
+used. Characters that no registered font has, such as most emoji, are
+dropped rather than drawn as empty boxes.
+"""
+import os
+import re
+import struct
+import threading
+from typing import Dict, Optional
+
+from reportlab.lib.fonts import addMapping
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+
+
+SYMBOL_FONT = 'ReportSymbols'
+SYMBOL_FONT_BOLD = 'ReportSymbols-Bold'
+
+# Used when PDF_SYMBOL_FONT is not set. A bold face (PDF_SYMBOL_FONT_BOLD) is only loaded
+# on request: each parsed face costs a few MB per process, and symbols rarely need bold.
+SYMBOL_FONT_PATHS = (
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
+    '/usr/share/fonts/dejavu/DejaVuSans.ttf',
+    '/usr/share/fonts/TTF/DejaVuSans.ttf',
+    '/Library/Fonts/Arial Unicode.ttf',
+)
+
+# Joiners, variation selectors and skin tone modifiers only change how an emoji is drawn
+INVISIBLE = re.compile('[\u200b-\u200d\ufe0e\ufe0f\U0001f3fb-\U0001f3ff]')
+NON_ASCII = re.compile(r'[^\x00-\x7f]+')
+
+# name table records kept in embedded subsets (family, style, unique id, full name, version, PostScript name);
+# the copyright and license text is most of the table and is repeated in every subset
+SUBSET_NAME_IDS = (1, 2, 3, 4, 5, 6)
+
+KEEP, SYMBOL, DROP = 0, 1, 2
+
+
+def _trimmed_name_table(table: bytes) -> bytes:
+    """Copy of a TrueType name table with only the SUBSET_NAME_IDS records"""
+    _, count, storage = struct.unpack('>HHH', table[:6])
+    records = []
+    strings = b''
+    for index in range(count):
+        platform, encoding, language, name_id, length, offset = struct.unpack(
+            '>6H', table[6 + 12 * index:18 + 12 * index])
+        if name_id in SUBSET_NAME_IDS:
+            records.append((platform, encoding, language, name_id, length, len(strings)))
+            strings += table[storage + offset:storage + offset + length]
+    header = struct.pack('>HHH', 0, len(records), 6 + 12 * len(records))
+    return header + b''.join(struct.pack('>6H', *record) for record in records) + strings
+
+
+def _load_subsetting_font(name: str, path: str) -> TTFont:
+    """
+    TrueType font whose embedded subsets carry only the glyphs used
+
+    asciiReadable=False stops ReportLab from reserving the first subset for
+    all of ASCII (which Helvetica already covers here).
+    """
+    font = TTFont(name, path, asciiReadable=False)
+    get_table = font.face.get_table
+    name_table = _trimmed_name_table(get_table('name'))
+    font.face.get_table = lambda tag: name_table if tag == 'name' else get_table(tag)
+    return font
+
+
+def _register_symbol_font() -> Optional[TTFont]:
+    """Register the first symbol font found; None leaves only Helvetica's own characters"""
+    configured = os.getenv('PDF_SYMBOL_FONT')
+    for path in ([configured] if configured else []) + list(SYMBOL_FONT_PATHS):
+        if not os.path.exists(path):
+            continue
+        try:
+            font = _load_subsetting_font(SYMBOL_FONT, path)
+            pdfmetrics.registerFont(font)
+            bold_name = SYMBOL_FONT
+            bold = os.getenv('PDF_SYMBOL_FONT_BOLD')
+            if bold and os.path.exists(bold):
+                pdfmetrics.registerFont(_load_subsetting_font(SYMBOL_FONT_BOLD, bold))
+                bold_name = SYMBOL_FONT_BOLD
+            # <b> inside a symbol run picks the bold face (or the regular one); there is no italic
+            addMapping(SYMBOL_FONT, 0, 0, SYMBOL_FONT)
+            addMapping(SYMBOL_FONT, 1, 0, bold_name)
+            addMapping(SYMBOL_FONT, 0, 1, SYMBOL_FONT)
+            addMapping(SYMBOL_FONT, 1, 1, bold_name)
+            return font
+        except Exception as e:
+            print(f"Could not load PDF symbol font {path}: {str(e)}")
+    return None
+
+
+_symbol_font: Optional[TTFont] = None
+_symbol_font_loaded = False
+_symbol_font_lock = threading.Lock()
+
+
+def get_symbol_font() -> Optional[TTFont]:
+    """The registered symbol font, loaded the first time a character needs it"""
+    global _symbol_font, _symbol_font_loaded
+    if not _symbol_font_loaded:
+        with _symbol_font_lock:
+            if not _symbol_font_loaded:
+                _symbol_font = _register_symbol_font()
+                _symbol_font_loaded = True
+    return _symbol_font
+
+
+# Character -> KEEP, SYMBOL or DROP; filled in as characters are first seen
+_handling: Dict[str, int] = {}
+
+
+def _classify(char: str) -> int:
+    handling = _handling.get(char)
+    if handling is None:
+        try:
+            char.encode('cp1252')  # Helvetica's WinAnsi encoding
+            handling = KEEP
+        except UnicodeEncodeError:
+            symbol_font = get_symbol_font()
+            if symbol_font is not None and ord(char) in symbol_font.face.charToGlyph:
+                handling = SYMBOL
+            else:
+                handling = DROP
+        _handling[char] = handling
+    return handling
+
+
+def _font_run(match) -> str:
+    parts = []
+    in_symbols = False
+    for char in INVISIBLE.sub('', match.group(0)):
+        handling = _classify(char)
+        if handling == DROP:
+            continue
+        if (handling == SYMBOL) != in_symbols:
+            parts.append(f'<font name="{SYMBOL_FONT}">' if not in_symbols else '</font>')
+            in_symbols = not in_symbols
+        parts.append(char)
+    if in_symbols:
+        parts.append('</font>')
+    return ''.join(parts)
+
+
+def font_markup(markup: str) -> str:
+    """Paragraph markup with symbol-font runs for the characters Helvetica lacks"""
+    if markup.isascii():
+        return markup
+    return NON_ASCII.sub(_font_run, markup)
+
+
+def plain_text(text: str) -> str:
+    """Text for canvas strings and table cells (one font): unsupported characters removed"""
+    if text.isascii():
+        return text
+    return ''.join(char for char in INVISIBLE.sub('', text) if _classify(char) == KEEP).strip()
@@ -0,0 +1,149 @@
+"""
+Portfolio PDF
+Combines several analyses into one report with a table of contents. Each
+section is rendered as its own PDF (so sections can render in parallel and
+be cached like single reports), then merged between a pre-rendered cover and
+closing page, with page numbers stamped across the combined document.
+"""
+from datetime import datetime
+from io import BytesIO
+from typing import List, Tuple
+
+from pypdf import PdfReader, PdfWriter
+from reportlab.lib.enums import TA_LEFT
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.pdfgen import canvas
+from reportlab.platypus import Paragraph, Spacer, Table, TableStyle
+
+from markdown_pdf import inline_markup
+from pdf_fonts import font_markup
+from pdf_report import (
+    COVER_SUBTITLE, COVER_TITLE, HIGHLIGHT, MUTED, PANEL, PRIMARY, RULE, SUBSECTION_HEADER, TEXT,
+    ReportDocTemplate, build_analysis, build_closing,
+)
+
+
+SECTION_TITLE = ParagraphStyle(
+    'PortfolioSectionTitle',
+    parent=COVER_TITLE,
+    fontSize=24,
+    leading=30,
+    spaceAfter=16,
+    alignment=TA_LEFT
+)
+
+CONTENTS_TABLE_STYLE = TableStyle([
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 12),
+    ('TEXTCOLOR', (0, 0), (0, -1), TEXT),
+    ('TEXTCOLOR', (1, 0), (1, -1), PRIMARY),
+    ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+    ('LINEBELOW', (0, 0), (-1, -1), 0.5, RULE),
+    ('TOPPADDING', (0, 0), (-1, -1), 8),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ('BACKGROUND', (0, 0), (-1, 0), PANEL),
+])
+
+
+def render_cover_pdf(output):
+    """Static portfolio cover page (rendered once and reused)"""
+    doc = ReportDocTemplate(output, title="Product Portfolio Report", author="Product Playground")
+    doc.build([
+        Spacer(1, 2.5*inch),
+        Paragraph(font_markup("🚀 Product Playground"), COVER_TITLE),
+        Paragraph("Strategic Portfolio Report", COVER_SUBTITLE),
+    ])
+
+
+def render_closing_pdf(output):
+    """Static thank-you page (rendered once and reused)"""
+    doc = ReportDocTemplate(output, first_template='closing', author="Product Playground")
+    doc.build(build_closing())
+
+
+def render_section_pdf(title: str, analysis_text: str, output):
+    """One analysis as content pages with header and footer rules; numbered after merging"""
+    doc = ReportDocTemplate(output, first_template='content', title=title, author="Product Playground")
+    elements = [Paragraph(inline_markup(title), SECTION_TITLE)]
+    elements.extend(build_analysis(analysis_text))
+    doc.build(elements, canvasmaker=canvas.Canvas)
+
+
+def render_contents_pdf(entries: List[Tuple[str, int]], context: str, timestamp: datetime) -> bytes:
+    """Table of contents page(s): section titles with their first page number"""
+    buffer = BytesIO()
+    doc = ReportDocTemplate(buffer, author="Product Playground")
+    rows = [['Section', 'Page']] + [[title, str(page)] for title, page in entries]
+    contents = Table(rows, colWidths=[5.5*inch, 1*inch])
+    contents.setStyle(CONTENTS_TABLE_STYLE)
+    elements = [
+        Paragraph("Contents", SECTION_TITLE),
+        Paragraph(f"Generated {timestamp.strftime('%B %d, %Y at %I:%M %p')}", SUBSECTION_HEADER),
+        Spacer(1, 0.2*inch),
+        contents,
+    ]
+    if context:
+        elements.append(Spacer(1, 0.4*inch))
+        elements.append(Paragraph(font_markup("📋 Analysis Context"), SUBSECTION_HEADER))
+        elements.append(Paragraph(inline_markup(context), HIGHLIGHT))
+    doc.build(elements)
+    return buffer.getvalue()
+
+
+def render_page_numbers_pdf(total: int) -> bytes:
+    """Transparent pages carrying only "Page n of total", to stamp onto content pages"""
+    buffer = BytesIO()
+    numbers = canvas.Canvas(buffer, pagesize=letter)
+    for page_num in range(1, total + 1):
+        numbers.setFont('Helvetica', 9)
+        numbers.setFillColor(MUTED)
+        numbers.drawRightString(letter[0] - 0.75*inch, 0.5*inch, f"Page {page_num} of {total}")
+        numbers.showPage()
+    numbers.save()
+    return buffer.getvalue()
+
+
+def merge_portfolio(cover_path: str, closing_path: str, sections: List[Tuple[str, str]],
+                    context: str, timestamp: datetime, output):
+    """
+    Merge rendered sections into one report
+
+    Args:
+        cover_path: Pre-rendered cover page
+        closing_path: Pre-rendered closing page
+        sections: (title, section PDF path or bytes) in report order
+        context: Optional user context shown on the contents page
+        timestamp: Report time shown on the contents page
+        output: Binary file-like object to write to
+    """
+    readers = [(title, PdfReader(BytesIO(source) if isinstance(source, bytes) else source))
+               for title, source in sections]
+
+    entries = []
+    page = 1
+    for title, reader in readers:
+        entries.append((title, page))
+        page += len(reader.pages)
+    total = page - 1
+
+    writer = PdfWriter()
+    writer.append(cover_path)
+    writer.append(BytesIO(render_contents_pdf(entries, context, timestamp)))
+
+    numbers = PdfReader(BytesIO(render_page_numbers_pdf(total)))
+    first_content_page = len(writer.pages)
+    for (title, reader), (_, start) in zip(readers, entries):
+        writer.append(reader)
+        writer.add_outline_item(title, first_content_page + start - 1)
+    for index in range(total):
+        page = writer.pages[first_content_page + index]
+        page.merge_page(numbers.pages[index])
+        page.compress_content_streams()  # merge_page leaves the combined stream uncompressed
+
+    writer.append(closing_path)
+    writer.add_metadata({'/Title': 'Product Portfolio Report', '/Author': 'Product Playground'})
+    # Each part brings its own copy of the fonts, graphics states and symbol subsets
+    writer.compress_identical_objects()
+    writer.write(output)
@@ -0,0 +1,451 @@
+"""
+PDF report renderer
+Styles, table styles and the page canvas are built once at import;
+render_analysis_pdf() only allocates per-document state. Cover, content
+and closing pages use separate page templates so each page is decorated
+as it is laid out.
+"""
+from datetime import datetime
+from io import BytesIO
+from typing import List, Optional
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY, TA_LEFT
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.pdfgen import canvas
+from reportlab.platypus import (
+    BaseDocTemplate, Frame, NextPageTemplate, PageTemplate, Paragraph, Spacer, PageBreak, Table, TableStyle
+)
+
+from markdown_pdf import PENDING_TYPES, MarkdownCompiler, inline_markup
+from pdf_fonts import font_markup, plain_text
+
+
+# === COLORS ===
+PRIMARY = colors.HexColor('#6366f1')
+SECONDARY = colors.HexColor('#8b5cf6')
+TEXT = colors.HexColor('#2c3e50')
+MUTED = colors.HexColor('#7f8c8d')
+RULE = colors.HexColor('#e1e8ed')
+PANEL = colors.HexColor('#f8f9fa')
+
+# === PARAGRAPH STYLES ===
+_base_styles = getSampleStyleSheet()
+
+COVER_TITLE = ParagraphStyle(
+    'CoverTitle',
+    parent=_base_styles['Heading1'],
+    fontSize=36,
+    textColor=PRIMARY,
+    spaceAfter=20,
+    alignment=TA_CENTER,
+    fontName='Helvetica-Bold',
+    leading=42
+)
+
+COVER_SUBTITLE = ParagraphStyle(
+    'CoverSubtitle',
+    parent=_base_styles['Normal'],
+    fontSize=16,
+    textColor=MUTED,
+    spaceAfter=40,
+    alignment=TA_CENTER,
+    fontName='Helvetica',
+    leading=20
+)
+
+# Section header (H2)
+SECTION_HEADER = ParagraphStyle(
+    'SectionHeader',
+    parent=_base_styles['Heading2'],
+    fontSize=18,
+    textColor=PRIMARY,
+    spaceBefore=24,
+    spaceAfter=12,
+    fontName='Helvetica-Bold',
+    borderWidth=0,
+    borderColor=PRIMARY,
+    borderPadding=8,
+    backColor=PANEL,
+    leftIndent=10,
+    leading=22
+)
+
+# Subsection header (H3)
+SUBSECTION_HEADER = ParagraphStyle(
+    'SubsectionHeader',
+    parent=_base_styles['Heading3'],
+    fontSize=14,
+    textColor=SECONDARY,
+    spaceBefore=16,
+    spaceAfter=8,
+    fontName='Helvetica-Bold',
+    leftIndent=5,
+    leading=18
+)
+
+BODY = ParagraphStyle(
+    'CustomBody',
+    parent=_base_styles['BodyText'],
+    fontSize=11,
+    textColor=TEXT,
+    spaceAfter=10,
+    alignment=TA_JUSTIFY,
+    fontName='Helvetica',
+    leading=16,
+    leftIndent=0,
+    rightIndent=0
+)
+
+BULLET = ParagraphStyle(
+    'BulletPoint',
+    parent=BODY,
+    fontSize=10,
+    leftIndent=20,
+    bulletIndent=10,
+    spaceAfter=6,
+    leading=14
+)
+
+# Key insight box
+HIGHLIGHT = ParagraphStyle(
+    'Highlight',
+    parent=BODY,
+    fontSize=11,
+    backColor=colors.HexColor('#f0f4ff'),
+    borderWidth=1,
+    borderColor=PRIMARY,
+    borderPadding=10,
+    borderRadius=5,
+    leftIndent=10,
+    rightIndent=10,
+    spaceBefore=10,
+    spaceAfter=10
+)
+
+# Risk/warning box
+WARNING = ParagraphStyle(
+    'Warning',
+    parent=BODY,
+    fontSize=10,
+    backColor=colors.HexColor('#fff4e6'),
+    borderWidth=1,
+    borderColor=colors.HexColor('#f39c12'),
+    borderPadding=10,
+    leftIndent=10,
+    rightIndent=10,
+    spaceBefore=8,
+    spaceAfter=8
+)
+
+# Bold standalone lines
+LABEL = ParagraphStyle(
+    'Label',
+    parent=BODY,
+    fontSize=11,
+    textColor=PRIMARY,
+    fontName='Helvetica-Bold',
+    spaceBefore=8,
+    spaceAfter=4
+)
+
+CODE = ParagraphStyle(
+    'Code',
+    parent=_base_styles['Code'],
+    fontSize=9,
+    leading=12,
+    textColor=TEXT,
+    backColor=PANEL,
+    borderColor=RULE,
+    borderWidth=0.5,
+    borderPadding=6,
+    leftIndent=6,
+    rightIndent=6,
+    spaceBefore=6,
+    spaceAfter=10
+)
+
+TABLE_CELL = ParagraphStyle(
+    'TableCell',
+    parent=BODY,
+    fontSize=9,
+    leading=12,
+    spaceAfter=0,
+    alignment=TA_LEFT
+)
+
+TABLE_HEADER = ParagraphStyle(
+    'TableHeader',
+    parent=TABLE_CELL,
+    textColor=PRIMARY,
+    fontName='Helvetica-Bold'
+)
+
+FOOTER_TITLE = ParagraphStyle(
+    'FooterTitle',
+    parent=COVER_TITLE,
+    fontSize=24,
+    textColor=PRIMARY,
+    alignment=TA_CENTER
+)
+
+FOOTER_TEXT = ParagraphStyle(
+    'FooterText',
+    parent=BODY,
+    fontSize=11,
+    alignment=TA_CENTER,
+    textColor=MUTED
+)
+
+# === TABLE STYLES ===
+COVER_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, -1), PANEL),
+    ('TEXTCOLOR', (0, 0), (0, -1), PRIMARY),
+    ('TEXTCOLOR', (1, 0), (1, -1), TEXT),
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 11),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('LEFTPADDING', (0, 0), (-1, -1), 12),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 12),
+    ('TOPPADDING', (0, 0), (-1, -1), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
+    ('GRID', (0, 0), (-1, -1), 1, RULE),
+])
+
+FOOTER_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, -1), PANEL),
+    ('TEXTCOLOR', (0, 0), (-1, -1), TEXT),
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('LEFTPADDING', (0, 0), (-1, -1), 12),
+    ('TOPPADDING', (0, 0), (-1, -1), 8),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ('GRID', (0, 0), (-1, -1), 0.5, RULE),
+])
+
+ANALYSIS_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f0f4ff')),
+    ('GRID', (0, 0), (-1, -1), 0.5, RULE),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('LEFTPADDING', (0, 0), (-1, -1), 6),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+    ('TOPPADDING', (0, 0), (-1, -1), 5),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
+])
+
+FOOTER_INFO = [
+    ['🌐 Product Playground', 'AI-Powered PM Intelligence'],
+    ['💡 Features', 'Challenge Analysis • KPI Diagnostics • Product Teardown'],
+    ['🚀 Powered by', 'OpenAI GPT-4o'],
+]
+
+CLOSING_MESSAGE = (
+    "This analysis was generated using advanced AI to provide strategic product insights.<br/>"
+    "For best results, combine these insights with your domain expertise and market knowledge."
+)
+
+# === MARKDOWN ===
+WARNING_WORDS = ('risk', 'warning', 'concern', 'threat', 'danger')
+HIGHLIGHT_WORDS = ('Confidence:', 'Overall', 'Key:', 'Critical:')
+
+
+class NumberedCanvas(canvas.Canvas):
+    """
+    Canvas that writes "Page n of total" without keeping pages in memory
+
+    Each numbered page draws a small named form; the forms are only defined in
+    save(), once the total is known. Pages are written out as soon as they end
+    instead of being snapshotted and replayed at the end of the build.
+    """
+
+    def __init__(self, *args, **kwargs):
+        canvas.Canvas.__init__(self, *args, **kwargs)
+        self.numbered_pages = 0
+
+    def draw_page_number(self):
+        """Reference the page-number form for the current page"""
+        self.numbered_pages += 1
+        self.doForm(f"pageNumber{self.numbered_pages}")
+
+    def save(self):
+        """Define the page-number forms now that the page count is final"""
+        for page_num in range(1, self.numbered_pages + 1):
+            self.beginForm(f"pageNumber{page_num}")
+            self.setFont('Helvetica', 9)
+            self.setFillColor(MUTED)
+            self.drawRightString(letter[0] - 0.75*inch, 0.5*inch, f"Page {page_num} of {self.numbered_pages}")
+            self.endForm()
+        canvas.Canvas.save(self)
+
+
+def decorate_content_page(canv, doc):
+    """Header, footer rule and page number for every page between the cover and the closing page"""
+    canv.saveState()
+
+    # Header line
+    canv.setStrokeColor(RULE)
+    canv.setLineWidth(1)
+    canv.line(0.75*inch, letter[1] - 0.6*inch, letter[0] - 0.75*inch, letter[1] - 0.6*inch)
+
+    # Header text
+    canv.setFont('Helvetica-Bold', 10)
+    canv.setFillColor(PRIMARY)
+    canv.drawString(0.75*inch, letter[1] - 0.5*inch, "Product Playground")
+
+    # Footer line
+    canv.line(0.75*inch, 0.65*inch, letter[0] - 0.75*inch, 0.65*inch)
+
+    # Plain canvases (portfolio sections) are numbered after merging
+    if hasattr(canv, 'draw_page_number'):
+        canv.draw_page_number()
+    canv.restoreState()
+
+
+class ReportDocTemplate(BaseDocTemplate):
+    """
+    Letter-size report with cover, content and closing page templates
+
+    Paragraphs and tables queued as PendingParagraph/PendingTable are built
+    just before layout, so parsed text is only held for the page being built.
+    """
+
+    def __init__(self, output, first_template: str = 'cover', **kwargs):
+        BaseDocTemplate.__init__(
+            self,
+            output,
+            pagesize=letter,
+            rightMargin=0.75*inch,
+            leftMargin=0.75*inch,
+            topMargin=1*inch,
+            bottomMargin=0.85*inch,
+            **kwargs
+        )
+        frame = Frame(self.leftMargin, self.bottomMargin, self.width, self.height, id='normal')
+        self.addPageTemplates([
+            PageTemplate(id='cover', frames=[frame]),
+            PageTemplate(id='content', frames=[frame], onPage=decorate_content_page),
+            PageTemplate(id='closing', frames=[frame]),
+        ])
+        self._firstPageTemplateIndex = [template.id for template in self.pageTemplates].index(first_template)
+
+    def filterFlowables(self, flowables):
+        """Build the next pending flowable (and any it must be kept with)"""
+        index = 0
+        while index < len(flowables) and isinstance(flowables[index], PENDING_TYPES):
+            pending = flowables[index]
+            flowables[index] = pending.build()
+            if not pending.getKeepWithNext():
+                break
+            index += 1
+
+
+# Analysis markdown compiler; paragraphs are parsed lazily by ReportDocTemplate
+ANALYSIS_MARKDOWN = MarkdownCompiler(
+    {
+        'h2': SECTION_HEADER,
+        'h3': SUBSECTION_HEADER,
+        'body': BODY,
+        'bullet': BULLET,
+        'label': LABEL,
+        'highlight': HIGHLIGHT,
+        'warning': WARNING,
+        'code': CODE,
+        'table_header': TABLE_HEADER,
+        'table_cell': TABLE_CELL,
+    },
+    lazy=True,
+    width=letter[0] - 1.5*inch - 12,
+    table_style=ANALYSIS_TABLE_STYLE,
+    section_marker='▸ ',
+    callouts={'warning': WARNING_WORDS, 'highlight': HIGHLIGHT_WORDS},
+)
+
+
+def build_cover(context: str, timestamp: datetime) -> List:
+    """Cover page flowables"""
+    elements = [
+        Spacer(1, 2*inch),
+        Paragraph(font_markup("🚀 Product Playground"), COVER_TITLE),
+        Paragraph("AI-Powered Strategic Analysis Report", COVER_SUBTITLE),
+    ]
+
+    cover_info_data = [
+        ['Report Type:', 'Product & Market Analysis'],
+        ['Generated:', timestamp.strftime('%B %d, %Y')],
+        ['Time:', timestamp.strftime('%I:%M %p')],
+        ['Powered by:', 'GPT-4o Advanced Analysis']
+    ]
+    cover_table = Table(cover_info_data, colWidths=[2*inch, 3.5*inch])
+    cover_table.setStyle(COVER_TABLE_STYLE)
+    elements.append(cover_table)
+    elements.append(Spacer(1, 1*inch))
+
+    # Context box if provided
+    if context:
+        elements.append(Paragraph(font_markup("📋 Analysis Context"), SUBSECTION_HEADER))
+        elements.append(Paragraph(inline_markup(context), HIGHLIGHT))
+
+    elements.append(NextPageTemplate('content'))
+    elements.append(PageBreak())
+    return elements
+
+
+def build_analysis(analysis_text: str) -> List:
+    """
+    Convert the markdown analysis into flowables
+
+    Text blocks and tables are left pending; build them with ReportDocTemplate.
+    """
+    return ANALYSIS_MARKDOWN.compile(analysis_text)
+
+
+def build_closing() -> List:
+    """Thank-you page flowables"""
+    # Plain table cells are drawn in one font, so characters Helvetica lacks are removed
+    footer_table = Table([[plain_text(cell) for cell in row] for row in FOOTER_INFO], colWidths=[2.5*inch, 3.5*inch])
+    footer_table.setStyle(FOOTER_TABLE_STYLE)
+    return [
+        Spacer(1, 2*inch),
+        Paragraph("Thank you for using Product Playground", FOOTER_TITLE),
+        Spacer(1, 0.3*inch),
+        Paragraph(CLOSING_MESSAGE, FOOTER_TEXT),
+        Spacer(1, 1*inch),
+        footer_table,
+    ]
+
+
+def render_analysis_pdf(analysis_text: str, context: str = "", timestamp: Optional[datetime] = None,
+                        output=None) -> Optional[bytes]:
+    """
+    Render an analysis as a branded PDF report
+
+    Args:
+        analysis_text: Markdown analysis from the engine
+        context: Optional user context shown on the cover
+        timestamp: Report time (defaults to now)
+        output: Optional binary file-like object to write to
+
+    Returns:
+        PDF bytes, or None when written to output
+    """
+    timestamp = timestamp or datetime.now()
+    buffer = output if output is not None else BytesIO()
+
+    doc = ReportDocTemplate(buffer, title="Product Analysis Report", author="Product Playground")
+
+    elements = build_cover(context, timestamp)
+    elements.extend(build_analysis(analysis_text))
+    elements.extend([NextPageTemplate('closing'), PageBreak()])
+    elements.extend(build_closing())
+    doc.build(elements, canvasmaker=NumberedCanvas)
+
+    if output is not None:
+        return None
+    return buffer.getvalue()
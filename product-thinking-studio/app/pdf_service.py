@@ -0,0 +1,501 @@
+"""
+Background PDF rendering and PDF cache
+Renders reports in a small process pool (ReportLab is CPU-bound and would
+otherwise hold the GIL in the request thread) straight into an on-disk cache
+keyed by a hash of their content and the template version. Web workers stream
+cache hits from disk and fresh renders from the bytes the render process returns
+(never by reopening a cache file another worker may have evicted). ReportLab and
+pypdf are imported on first render rather than at startup.
+"""
+import atexit
+import hashlib
+import importlib
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures import wait as wait_futures
+from datetime import datetime
+from io import BytesIO
+from typing import BinaryIO, Callable, Dict, List, Optional, Tuple
+
+from metrics import PDF_QUEUE_DEPTH, PDF_RENDER, PDF_SIZE, cache_lookup
+
+
+
+# Bump when the PDF layout (pdf_report, pdf_portfolio, pdf_fonts) changes so cached PDFs are not reused
+TEMPLATE_VERSION = "5"
+
+MAX_PORTFOLIO_SECTIONS = 12
+
+# Seconds a portfolio may take in total (sections, cover and merge); below gunicorn's
+# 120 s worker timeout so the request fails with a 503 instead of the worker being killed
+PORTFOLIO_TIMEOUT = float(os.getenv("PDF_PORTFOLIO_TIMEOUT", "90"))
+
+# Portfolio section titles per analysis type (the endpoint names used by the engine)
+SECTION_TITLES = {
+    "challenge": "Product Challenge Analysis",
+    "kpi": "KPI Diagnostics",
+    "website": "Website Teardown",
+    "walkthrough": "Product Walkthrough",
+    "framing": "Decision Framing",
+    "dashboard": "Dashboard Review",
+    "confidence": "Confidence Check",
+    "defense": "Decision Defense",
+    "retrospective": "Decision Retrospective",
+}
+
+
+class PDFQueueFullError(Exception):
+    """Raised when the render queue is full and the request should be retried later"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        super().__init__(f"PDF export is busy ({limit} reports queued). Please try again in a few seconds.")
+
+
+class PDFTimeoutError(Exception):
+    """Raised when a report could not be rendered within its deadline"""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        super().__init__(f"PDF export took longer than {seconds:g} seconds. Please try again in a moment.")
+
+
+def pdf_cache_key(analysis_text: str, context: str = "", kind: str = "report") -> str:
+    """
+    Content hash of a PDF: template version, kind, context and analysis text
+
+    The kind ("report", "section" or "portfolio") is a part of its own, so a report
+    can never share a cache file or an in-flight render with a portfolio section.
+    """
+    digest = hashlib.sha256()
+    for part in (TEMPLATE_VERSION, kind, context or "", analysis_text or ""):
+        encoded = part.encode("utf-8")
+        digest.update(len(encoded).to_bytes(8, "big"))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+class PDFCache:
+    """
+    Content-addressed cache of rendered PDFs on disk, bounded by total size
+
+    Files are written under a temporary name and renamed into place, so one
+    directory can be shared by all gunicorn workers. The least recently used
+    files (by modification time, refreshed on every hit) are evicted.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 64 * 1024 * 1024):
+        """
+        Args:
+            directory: Cache directory (created if missing)
+            max_bytes: Total size of cached PDFs before the oldest are evicted (0 = no reuse)
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls) -> "PDFCache":
+        """Build a cache from PDF_CACHE_DIR and PDF_CACHE_MAX_MB"""
+        return cls(
+            directory=os.getenv("PDF_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "product-playground-pdf"),
+            max_bytes=int(float(os.getenv("PDF_CACHE_MAX_MB", "64")) * 1024 * 1024),
+        )
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pdf")
+
+    def static_path(self, name: str) -> str:
+        """Path for a shared page (e.g. the portfolio cover); never evicted"""
+        return os.path.join(self.directory, f"{name}-v{TEMPLATE_VERSION}.static")
+
+    def open(self, key: str) -> Optional[BinaryIO]:
+        """Open a cached PDF for reading, or None on a miss"""
+        if self.max_bytes > 0:
+            try:
+                pdf_file = open(self.path(key), "rb")
+                os.utime(pdf_file.fileno())
+                with self._lock:
+                    self.hits += 1
+                return pdf_file
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def _files(self) -> List[Tuple[float, int, str]]:
+        files = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(".pdf"):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+        return files
+
+    def evict(self, keep: Optional[str] = None):
+        """Delete the least recently used PDFs until the cache fits in max_bytes"""
+        keep_path = self.path(keep) if keep else None
+        files = sorted(self._files())
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= self.max_bytes:
+                break
+            if path == keep_path:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            with self._lock:
+                self.evictions += 1
+
+    def stats(self) -> Dict:
+        files = self._files()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(files),
+                "size_bytes": sum(size for _, size, _ in files),
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+    def clear(self):
+        for _, _, path in self._files():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def write_pdf(path: str, render: Callable, *args) -> str:
+    """Run render(*args, output=file) into path atomically (runs in the render process)"""
+    partial = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(partial, "wb") as output:
+            render(*args, output=output)
+        os.replace(partial, path)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+    return path
+
+
+def render_pdf_bytes(path: str, render: Callable, *args) -> bytes:
+    """
+    Render into memory, store the PDF at path and return it (runs in the render process)
+
+    The caller keeps the bytes, so another request evicting the file from the
+    cache cannot remove it before the caller has used it.
+    """
+    buffer = BytesIO()
+    render(*args, output=buffer)
+    pdf = buffer.getvalue()
+    write_pdf(path, lambda output: output.write(pdf))
+    return pdf
+
+
+def load_renderers() -> bool:
+    """Import the renderers and load the symbol font (runs in the render process)"""
+    importlib.import_module("pdf_portfolio")  # also imports pdf_report and markdown_pdf
+    from pdf_fonts import get_symbol_font
+    get_symbol_font()
+    return True
+
+
+class PDFRenderPool:
+    """
+    Process pool for PDF rendering with a bounded queue
+
+    The pool is started on first use, so a preloaded gunicorn master never
+    owns worker processes. Concurrent requests for the same report share one
+    render. With workers=0 reports are rendered in the calling thread.
+    """
+
+    def __init__(self, workers: int = 1, max_queue: int = 4, timeout: float = 60.0):
+        """
+        Args:
+            workers: Render processes (0 = render inline)
+            max_queue: Renders allowed to wait for a free process before new ones are rejected
+            timeout: Seconds to wait for a render
+        """
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        # Re-entrant: a future that is already done runs its callback inside submit()
+        self._lock = threading.RLock()
+        self._slots = threading.BoundedSemaphore(max(workers, 1) + max_queue)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._in_flight: Dict[str, Future] = {}
+
+    @classmethod
+    def from_env(cls) -> "PDFRenderPool":
+        """Build a pool from PDF_RENDER_WORKERS, PDF_RENDER_QUEUE and PDF_RENDER_TIMEOUT"""
+        return cls(
+            workers=int(os.getenv("PDF_RENDER_WORKERS", "1")),
+            max_queue=int(os.getenv("PDF_RENDER_QUEUE", "4")),
+            timeout=float(os.getenv("PDF_RENDER_TIMEOUT", "60")),
+        )
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Start the pool on first use. Caller holds the lock."""
+        if self._executor is None:
+            # spawn: forking a threaded server process can copy held locks into the child
+            self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    def submit(self, key: str, function: Callable, *args, block: bool = False,
+               timeout: Optional[float] = None) -> Future:
+        """
+        Queue function(*args), joining an identical job (same key) that is already queued
+
+        Args:
+            key: Identity of the job's result
+            function: Picklable module-level function
+            block: Wait for a free slot instead of failing at once
+            timeout: Longest wait for a slot when blocking (default: the pool timeout)
+
+        Raises:
+            PDFQueueFullError: If no render slot is free
+        """
+        if self.workers <= 0:
+            future = Future()
+            try:
+                future.set_result(function(*args))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        with self._lock:
+            future = self._in_flight.get(key)
+        if future is not None:
+            return future
+
+        # Wait for a slot outside the lock; finishing jobs need the lock to free theirs
+        wait = (self.timeout if timeout is None else timeout) if block else None
+        if not self._slots.acquire(blocking=block, timeout=wait):
+            raise PDFQueueFullError(max(self.workers, 1) + self.max_queue)
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self._slots.release()
+                return future
+            try:
+                future = self._get_executor().submit(function, *args)
+            except BrokenProcessPool:
+                # A render process died; start a fresh pool for this and later jobs
+                self._executor = None
+                future = self._get_executor().submit(function, *args)
+            except Exception:
+                self._slots.release()
+                raise
+            self._in_flight[key] = future
+            PDF_QUEUE_DEPTH.inc()
+            future.add_done_callback(lambda done, key=key: self._finished(key, done))
+        return future
+
+    def run(self, key: str, function: Callable, *args, block: bool = False):
+        """submit() and wait for the result"""
+        return self.submit(key, function, *args, block=block).result(timeout=self.timeout)
+
+    def render(self, key: str, path: str, analysis_text: str, context: str, timestamp: datetime) -> bytes:
+        """Render a single-analysis report into the cache at path and return the PDF"""
+        from pdf_report import render_analysis_pdf
+        return self.run(key, render_pdf_bytes, path, render_analysis_pdf, analysis_text, context, timestamp)
+
+    def warm_up(self):
+        """Start the render processes and load the renderers in them ahead of the first PDF"""
+        futures = [self.submit(f"warm-up-{index}", load_renderers, block=True)
+                   for index in range(max(self.workers, 1))]
+        for future in futures:
+            future.result(timeout=self.timeout)
+
+    def _finished(self, key: str, future: Future):
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+                PDF_QUEUE_DEPTH.dec()
+        self._slots.release()
+
+    def queue_depth(self) -> int:
+        """Renders currently running or waiting"""
+        with self._lock:
+            return len(self._in_flight)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def get_pdf(analysis_text: str, context: str = "",
+            timestamp: Optional[datetime] = None) -> Tuple[str, BinaryIO, bool]:
+    """
+    Cached PDF for an analysis, rendering it in the pool on a miss
+
+    The cover shows the time of the first render; repeat downloads of the same
+    analysis return that same file.
+
+    Returns:
+        (cache key, PDF file object for the caller to stream and close (the cache file on a hit,
+        an in-memory copy of a fresh render), whether it came from the cache)
+
+    Raises:
+        PDFQueueFullError: If the render queue is full
+        PDFTimeoutError: If the render takes longer than the pool timeout
+    """
+    key = pdf_cache_key(analysis_text, context)
+    pdf_file = pdf_cache.open(key)
+    cache_lookup("pdf", pdf_file is not None)
+    if pdf_file is not None:
+        return key, pdf_file, True
+
+    started = time.perf_counter()
+    try:
+        pdf = render_pool.render(key, pdf_cache.path(key), analysis_text, context, timestamp or datetime.now())
+    except FutureTimeoutError:
+        raise PDFTimeoutError(render_pool.timeout)
+    # Served from memory: any worker's eviction may already have removed the cache file
+    pdf_file = BytesIO(pdf)
+    _record_render("report", started, pdf_file)
+    pdf_cache.evict(keep=key)
+    return key, pdf_file, False
+
+
+def pdf_size(pdf_file: BinaryIO) -> int:
+    """Size of a PDF returned by get_pdf/get_portfolio_pdf: an open cache file or an in-memory render"""
+    if isinstance(pdf_file, BytesIO):
+        return pdf_file.getbuffer().nbytes
+    return os.fstat(pdf_file.fileno()).st_size
+
+
+def _record_render(kind: str, started: float, pdf_file: BinaryIO):
+    PDF_RENDER.labels(kind).observe(time.perf_counter() - started)
+    PDF_SIZE.labels(kind).observe(pdf_size(pdf_file))
+
+
+def section_title(analysis_type: Optional[str], title: Optional[str] = None) -> str:
+    """Display title for a portfolio section: explicit title, known type, or the type itself"""
+    if title and title.strip():
+        return title.strip()
+    analysis_type = (analysis_type or "analysis").strip()
+    return SECTION_TITLES.get(analysis_type, analysis_type.replace("_", " ").replace("-", " ").title())
+
+
+def section_cache_key(title: str, analysis_text: str) -> str:
+    """Content hash of one portfolio section (rendered and cached on its own)"""
+    return pdf_cache_key(analysis_text, title, kind="section")
+
+
+def portfolio_cache_key(sections: List[Tuple[str, str]], context: str = "") -> str:
+    """Content hash of a portfolio: its (title, analysis) sections in order and the context"""
+    section_keys = "\n".join(section_cache_key(title, analysis_text) for title, analysis_text in sections)
+    return pdf_cache_key(section_keys, context, kind="portfolio")
+
+
+def _static_page(name: str, render: Callable, timeout: float) -> str:
+    path = pdf_cache.static_path(name)
+    if not os.path.exists(path):
+        render_pool.submit(name, write_pdf, path, render, block=True, timeout=timeout).result(timeout=timeout)
+    return path
+
+
+def get_portfolio_pdf(sections: List[Tuple[str, str]], context: str = "",
+                      timestamp: Optional[datetime] = None) -> Tuple[str, BinaryIO, bool]:
+    """
+    Cached combined report for several analyses
+
+    Missing sections are rendered in parallel in the pool (and cached on their
+    own, so later portfolios reuse them), then merged behind the shared cover.
+    Sections are merged from bytes held by this request, not from the cache
+    files, which a concurrent eviction may delete.
+
+    Args:
+        sections: (title, analysis markdown) in report order
+
+    Returns:
+        (cache key, PDF file object for the caller to stream and close (the cache file on a hit,
+        an in-memory copy of a fresh render), whether it came from the cache)
+
+    Raises:
+        PDFQueueFullError: If the render queue is full
+        PDFTimeoutError: If the portfolio is not ready within PORTFOLIO_TIMEOUT seconds
+    """
+    key = portfolio_cache_key(sections, context)
+    pdf_file = pdf_cache.open(key)
+    cache_lookup("portfolio", pdf_file is not None)
+    if pdf_file is not None:
+        return key, pdf_file, True
+
+    started = time.perf_counter()
+    deadline = time.monotonic() + PORTFOLIO_TIMEOUT
+
+    def remaining() -> float:
+        left = deadline - time.monotonic()
+        if left <= 0:
+            raise PDFTimeoutError(PORTFOLIO_TIMEOUT)
+        return left
+
+    from pdf_portfolio import merge_portfolio, render_closing_pdf, render_cover_pdf, render_section_pdf
+    try:
+        cover_path = _static_page("portfolio-cover", render_cover_pdf, remaining())
+        closing_path = _static_page("portfolio-closing", render_closing_pdf, remaining())
+
+        parts = []
+        for title, analysis_text in sections:
+            section_key = section_cache_key(title, analysis_text)
+            section_file = pdf_cache.open(section_key)
+            cache_lookup("portfolio_section", section_file is not None)
+            if section_file is not None:
+                with section_file:
+                    parts.append((title, section_file.read()))
+            else:
+                parts.append((title, render_pool.submit(
+                    section_key, render_pdf_bytes, pdf_cache.path(section_key), render_section_pdf,
+                    title, analysis_text, block=True, timeout=remaining())))
+        futures = [part for _, part in parts if isinstance(part, Future)]
+        _, not_done = wait_futures(futures, timeout=remaining())
+        if not_done:
+            raise PDFTimeoutError(PORTFOLIO_TIMEOUT)
+        parts = [(title, part.result() if isinstance(part, Future) else part) for title, part in parts]
+
+        pdf = render_pool.submit(key, render_pdf_bytes, pdf_cache.path(key), merge_portfolio, cover_path,
+                                 closing_path, parts, context, timestamp or datetime.now(),
+                                 block=True, timeout=remaining()).result(timeout=remaining())
+    except FutureTimeoutError:
+        raise PDFTimeoutError(PORTFOLIO_TIMEOUT)
+    pdf_file = BytesIO(pdf)
+    _record_render("portfolio", started, pdf_file)
+    pdf_cache.evict(keep=key)
+    return key, pdf_file, False
+
+
+def warm_up_renderers():
+    """Start the shared render pool and load the renderers ahead of the first PDF"""
+    render_pool.warm_up()
+
+
+# Shared cache and pool for the process
+pdf_cache = PDFCache.from_env()
+render_pool = PDFRenderPool.from_env()
+atexit.register(render_pool.shutdown)
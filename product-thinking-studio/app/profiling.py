@@ -0,0 +1,354 @@
+"""
+Profiling
+Admin-only tools for looking inside a running worker without a redeploy:
+a sampling profiler for the next N seconds, automatic capture of requests
+slower than a threshold, and tracemalloc snapshots of the top allocators.
+Profiles are written as folded stacks ("frame;frame;frame count" per line),
+which flamegraph.pl, inferno and speedscope read directly.
+
+Sampling is wall-clock: a thread blocked on the LLM API or a lock shows up
+in the stacks it is blocked in, which is usually where a slow request's
+time went.
+"""
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from werkzeug.security import safe_join
+
+
+# Seconds between samples
+DEFAULT_INTERVAL = 0.01
+
+# Longest on-demand profile, so a forgotten request cannot sample forever
+MAX_PROFILE_SECONDS = 300
+
+# Frames kept per stack (deeper frames are dropped from the root end)
+MAX_STACK_DEPTH = 128
+
+PROFILE_EXTENSIONS = (".folded", ".txt")
+
+
+def short_path(filename: str) -> str:
+    """Last two path components, e.g. app/prompt.py"""
+    return "/".join(filename.replace(os.sep, "/").rsplit("/", 2)[-2:])
+
+
+def frame_name(code, lineno: int) -> str:
+    """function (package/module.py:line); no semicolons, which separate frames"""
+    return f"{code.co_name} ({short_path(code.co_filename)}:{lineno})".replace(";", ":")
+
+
+def collapse(frame) -> str:
+    """A thread's stack, root first, as one folded line"""
+    names = []
+    while frame is not None and len(names) < MAX_STACK_DEPTH:
+        names.append(frame_name(frame.f_code, frame.f_lineno))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def format_folded(stacks: Counter) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in sorted(stacks.items()) if stack)
+
+
+class ProfileStore:
+    """Directory of profile files, oldest removed beyond max_files"""
+
+    def __init__(self, directory: str, max_files: int = 100):
+        self.directory = directory
+        self.max_files = max_files
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ProfileStore":
+        """Build from PROFILE_DIR and PROFILE_MAX_FILES"""
+        return cls(
+            directory=os.getenv("PROFILE_DIR") or os.path.join(tempfile.gettempdir(), "product-playground-profiles"),
+            max_files=int(os.getenv("PROFILE_MAX_FILES", "100")),
+        )
+
+    def write(self, kind: str, text: str, label: str = "", extension: str = ".folded") -> str:
+        """
+        Save a profile
+
+        Args:
+            kind: "cpu", "slow" or "memory"
+            text: File contents
+            label: Extra name part (e.g. the route and duration of a slow request)
+
+        Returns:
+            The file name (relative to the directory)
+        """
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        label = re.sub(r"[^A-Za-z0-9_.-]+", "_", label).strip("_")
+        name = "-".join(part for part in (kind, stamp, str(os.getpid()), label) if part) + extension
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(os.path.join(self.directory, name), "w", encoding="utf-8") as profile_file:
+                profile_file.write(text)
+            self._prune()
+        return name
+
+    def _prune(self):
+        files = self.list()
+        for entry in files[self.max_files:]:
+            try:
+                os.remove(os.path.join(self.directory, entry["name"]))
+            except FileNotFoundError:
+                pass
+
+    def list(self) -> List[Dict]:
+        """Profile files, newest first"""
+        try:
+            names = [name for name in os.listdir(self.directory) if name.endswith(PROFILE_EXTENSIONS)]
+        except FileNotFoundError:
+            return []
+        entries = []
+        for name in names:
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            entries.append({"name": name, "size_bytes": stat.st_size,
+                            "modified": datetime.fromtimestamp(stat.st_mtime).isoformat()})
+        return sorted(entries, key=lambda entry: entry["modified"], reverse=True)
+
+    def path(self, name: str) -> Optional[str]:
+        """Full path of a profile file, or None if it does not exist"""
+        path = safe_join(self.directory, name)
+        if path is None or not name.endswith(PROFILE_EXTENSIONS) or not os.path.isfile(path):
+            return None
+        return path
+
+
+class SamplingProfiler:
+    """Samples every thread in this process for a fixed time, one profile at a time"""
+
+    def __init__(self, store: ProfileStore):
+        self.store = store
+        self._lock = threading.Lock()
+        self.running: Optional[Dict] = None
+
+    def start(self, seconds: float, interval: float = DEFAULT_INTERVAL, block: bool = False) -> Dict:
+        """
+        Profile this worker for the next seconds
+
+        Args:
+            seconds: Duration (capped at MAX_PROFILE_SECONDS)
+            interval: Seconds between samples
+            block: Return when the profile has been written instead of at once
+
+        Returns:
+            {file, pid, seconds, interval_ms} (plus samples when block=True)
+
+        Raises:
+            RuntimeError: If a profile is already running in this worker
+        """
+        seconds = min(max(float(seconds), 0.1), MAX_PROFILE_SECONDS)
+        interval = max(float(interval), 0.001)
+        with self._lock:
+            if self.running is not None:
+                raise RuntimeError(f"A profile is already running until {self.running['ends_at']}")
+            self.running = {"pid": os.getpid(), "seconds": seconds, "interval_ms": round(interval * 1000, 1),
+                            "ends_at": datetime.fromtimestamp(time.time() + seconds).isoformat()}
+        result = dict(self.running)
+        if block:
+            result.update(self._run(seconds, interval))
+        else:
+            threading.Thread(target=self._run, args=(seconds, interval), name="profiler", daemon=True).start()
+        return result
+
+    def _run(self, seconds: float, interval: float) -> Dict:
+        stacks: Counter = Counter()
+        samples = 0
+        own = threading.get_ident()
+        try:
+            deadline = time.perf_counter() + seconds
+            while time.perf_counter() < deadline:
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+                for ident, frame in sys._current_frames().items():
+                    if ident != own:
+                        stacks[f"{names.get(ident, ident)};{collapse(frame)}"] += 1
+                samples += 1
+                time.sleep(interval)
+            name = self.store.write("cpu", format_folded(stacks), f"{seconds:g}s")
+            return {"file": name, "samples": samples}
+        finally:
+            with self._lock:
+                self.running = None
+
+
+class SlowRequestProfiler:
+    """
+    Samples request threads while they run and keeps the profile of requests slower than a threshold
+
+    Every in-flight request is sampled (the cost is one sys._current_frames()
+    per interval while requests are running); fast requests' samples are
+    discarded when they finish.
+    """
+
+    def __init__(self, store: ProfileStore, threshold_ms: float = 0, interval: float = DEFAULT_INTERVAL):
+        """
+        Args:
+            store: Where slow request profiles are written
+            threshold_ms: Keep profiles of requests at least this slow (0 = off)
+            interval: Seconds between samples
+        """
+        self.store = store
+        self.threshold_ms = threshold_ms
+        self.interval = interval
+        self.captured = 0
+        self._active: Dict[int, Counter] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pid: Optional[int] = None
+
+    @classmethod
+    def from_env(cls, store: ProfileStore) -> "SlowRequestProfiler":
+        """Build from PROFILE_SLOW_MS and PROFILE_INTERVAL_MS"""
+        return cls(store, threshold_ms=float(os.getenv("PROFILE_SLOW_MS", "0")),
+                   interval=float(os.getenv("PROFILE_INTERVAL_MS", str(DEFAULT_INTERVAL * 1000))) / 1000)
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold_ms > 0
+
+    def begin(self) -> Optional[int]:
+        """Start sampling the calling request thread; returns a token for end(), None when off"""
+        if not self.enabled:
+            return None
+        self._ensure_thread()
+        ident = threading.get_ident()
+        with self._lock:
+            self._active[ident] = Counter()
+        self._wake.set()
+        return ident
+
+    def end(self, token: Optional[int], duration_ms: float, name: str, trace_id: str = "") -> Optional[str]:
+        """
+        Stop sampling the request and write its profile if it was slow
+
+        Returns:
+            The profile file name, or None
+        """
+        if token is None:
+            return None
+        with self._lock:
+            stacks = self._active.pop(token, None)
+        if not stacks or duration_ms < self.threshold_ms:
+            return None
+        self.captured += 1
+        # Folded files have no room for comments, so the request is described in the file name
+        return self.store.write("slow", format_folded(stacks), f"{name}-{duration_ms:.0f}ms-{trace_id}")
+
+    def _ensure_thread(self):
+        # Started on first use in each process: a thread started in the gunicorn
+        # master would not survive the fork into the workers
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                threading.Thread(target=self._run, name="slow-request-profiler", daemon=True).start()
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            with self._lock:
+                if not self._active:
+                    self._wake.clear()
+                    continue
+                idents = list(self._active)
+            frames = sys._current_frames()
+            stacks = {ident: collapse(frames[ident]) for ident in idents if ident in frames}
+            with self._lock:
+                for ident, stack in stacks.items():
+                    if ident in self._active:
+                        self._active[ident][stack] += 1
+            time.sleep(self.interval)
+
+    def status(self) -> Dict:
+        return {"threshold_ms": self.threshold_ms, "interval_ms": round(self.interval * 1000, 1),
+                "in_flight": len(self._active), "captured": self.captured}
+
+
+class MemoryProfiler:
+    """tracemalloc snapshots: top allocating lines, growth since the last snapshot, and a folded allocation profile"""
+
+    def __init__(self, store: ProfileStore):
+        self.store = store
+        self._previous: Optional[tracemalloc.Snapshot] = None
+        self._lock = threading.Lock()
+
+    def start(self, frames: int = 25) -> Dict:
+        """Start tracing allocations (slows allocation-heavy code while on)"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        return self.status()
+
+    def stop(self) -> Dict:
+        with self._lock:
+            tracemalloc.stop()
+            self._previous = None
+        return self.status()
+
+    def status(self) -> Dict:
+        current, peak = tracemalloc.get_traced_memory()
+        return {"tracing": tracemalloc.is_tracing(), "frames": tracemalloc.get_traceback_limit(),
+                "traced_kb": round(current / 1024, 1), "peak_kb": round(peak / 1024, 1), "pid": os.getpid()}
+
+    def snapshot(self, top: int = 25) -> Dict:
+        """
+        Snapshot live allocations
+
+        Returns:
+            {file, top (by line), growth (since the previous snapshot, if any), traced_kb, ...}
+
+        Raises:
+            RuntimeError: If tracing has not been started
+        """
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is not tracing; start it first")
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ))
+
+        def describe(stat) -> Dict:
+            frame = stat.traceback[-1]
+            entry = {"location": f"{frame.filename}:{frame.lineno}", "size_kb": round(stat.size / 1024, 1),
+                     "count": stat.count}
+            if hasattr(stat, "size_diff"):
+                entry["size_diff_kb"] = round(stat.size_diff / 1024, 1)
+            return entry
+
+        stacks: Counter = Counter()
+        for stat in snapshot.statistics("traceback"):
+            # Tracebacks run oldest frame first, i.e. root first as in the folded format
+            # (tracemalloc frames carry no function names)
+            stacks[";".join(f"{short_path(frame.filename)}:{frame.lineno}".replace(";", ":")
+                            for frame in stat.traceback)] += stat.size
+
+        with self._lock:
+            previous, self._previous = self._previous, snapshot
+        result = dict(self.status(), top=[describe(stat) for stat in snapshot.statistics("lineno")[:top]])
+        if previous is not None:
+            result["growth"] = [describe(stat) for stat in snapshot.compare_to(previous, "lineno")[:top]]
+        result["file"] = self.store.write("memory", format_folded(stacks), "bytes")
+        return result
+
+
+# Shared profilers for the process
+profile_store = ProfileStore.from_env()
+sampling_profiler = SamplingProfiler(profile_store)
+slow_request_profiler = SlowRequestProfiler.from_env(profile_store)
+memory_profiler = MemoryProfiler(profile_store)
@@ -3,13 +3,109 @@ ALL LOGIC LIVES HERE
 Product Thinking Engine - Core business logic and AI interaction
 """
 import os
-from openai import OpenAI
+import threading
+import time
+import httpx
+from openai import DefaultHttpxClient, OpenAI, APITimeoutError, APIConnectionError, RateLimitError, InternalServerError
+from openai.types.chat import ChatCompletion, ChatCompletionMessage
+from openai.types.chat.chat_completion import Choice
 from typing import Dict, List, Optional
 from dotenv import load_dotenv
+from token_accounting import ledger, BudgetExceededError
+from prompt_budget import PromptSection, fit_sections, get_token_counter
+from model_router import ModelRouter, log_routing
+from metrics import LLM_LATENCY, LLM_TIME_TO_FIRST_TOKEN, LLM_TOKENS
+from tracing import add_span, span
+from sectioned_generation import (
+    SECTION_GROUPS,
+    sectioned_endpoints_from_env,
+    split_prompt,
+    section_max_tokens,
+    run_parallel,
+    join_sections
+)
+
+# Floor for trimmed user inputs so no field disappears entirely
+MIN_INPUT_TOKENS = 100
+
+# Errors that trigger a retry on the fallback model (timeouts and overload)
+FALLBACK_ERRORS = (APITimeoutError, APIConnectionError, RateLimitError, InternalServerError)
 
 # Load environment variables
 load_dotenv()
 
+_http_client: Optional[httpx.Client] = None
+_http_client_lock = threading.Lock()
+
+
+def get_http_client() -> httpx.Client:
+    """
+    Connection pool shared by every engine in this process
+
+    Engines are created per request; sharing one pool lets them reuse open
+    TLS connections to the API. Created on first use, after any fork.
+    """
+    global _http_client
+    if _http_client is None:
+        with _http_client_lock:
+            if _http_client is None:
+                # Idle connections kept open (OPENAI_KEEPALIVE_CONNECTIONS) scale with the sizing
+                # profile; the hard limit stays high so parallel sections never wait for the pool
+                _http_client = DefaultHttpxClient(limits=httpx.Limits(
+                    max_connections=100,
+                    max_keepalive_connections=int(os.getenv("OPENAI_KEEPALIVE_CONNECTIONS", "20")),
+                    keepalive_expiry=float(os.getenv("OPENAI_KEEPALIVE_SECONDS", "120"))
+                ))
+    return _http_client
+
+
+def create_client(timeout: float) -> OpenAI:
+    """OpenAI client on the shared connection pool"""
+    return OpenAI(
+        api_key=os.getenv("OPENAI_API_KEY"),
+        base_url=os.getenv("OPENAI_BASE_URL") or None,
+        timeout=timeout,
+        http_client=get_http_client()
+    )
+
+
+def open_llm_connection():
+    """Open a pooled connection to the API ahead of the first analysis (lists models; uses no tokens)"""
+    create_client(timeout=10.0).with_options(max_retries=0).models.list()
+
+
+def collect_stream(stream, on_first_token=None) -> ChatCompletion:
+    """
+    Reassemble a streamed chat completion into a non-streamed response
+
+    Args:
+        stream: Chunks from chat.completions.create(stream=True, stream_options={"include_usage": True})
+        on_first_token: Called once, when the first content arrives
+
+    Returns:
+        A ChatCompletion with the joined content, finish reason and usage
+    """
+    parts = []
+    response_id, created, model, finish_reason, usage = "", 0, "", None, None
+    for chunk in stream:
+        response_id, created, model = chunk.id, chunk.created, chunk.model
+        usage = chunk.usage or usage
+        for choice in chunk.choices:
+            if choice.delta.content:
+                if not parts and on_first_token is not None:
+                    on_first_token()
+                parts.append(choice.delta.content)
+            finish_reason = choice.finish_reason or finish_reason
+    message = ChatCompletionMessage(role="assistant", content="".join(parts))
+    return ChatCompletion(
+        id=response_id,
+        object="chat.completion",
+        created=created,
+        model=model,
+        choices=[Choice(index=0, message=message, finish_reason=finish_reason or "stop")],
+        usage=usage,
+    )
+
 
 class ProductThinkingEngine:
     """
@@ -17,16 +113,199 @@ class ProductThinkingEngine:
     Handles all business logic, AI interactions, and data processing
     """
     
-    def __init__(self):
-        """Initialize the Product Thinking Engine"""
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    def __init__(self, user_id: Optional[str] = None, depth: Optional[str] = None):
+        """
+        Initialize the Product Thinking Engine
+        
+        Args:
+            user_id: Identity of the caller, used for token accounting, budgets and model tier
+            depth: Requested analysis depth ("quick", "standard" or "deep"), used for model routing
+        """
+        self.user_id = user_id
+        self.depth = depth
+        self.client = create_client(timeout=float(os.getenv("OPENAI_TIMEOUT", "120")))
         
         # Get model from environment, default to gpt-4o for best results
         self.model = os.getenv("OPENAI_MODEL", "gpt-4o")
+        self.router = ModelRouter.from_env(self.model)
         
         # Get response quality settings
         self.temperature = float(os.getenv("TEMPERATURE", "0.7"))
         self.max_tokens = int(os.getenv("MAX_TOKENS", "4000"))
+        
+        # Input token budgets (0 disables trimming)
+        self.input_token_budget = int(os.getenv("PROMPT_INPUT_TOKEN_BUDGET", "6000"))
+        self.scraped_token_budget = int(os.getenv("SCRAPED_CONTENT_TOKEN_BUDGET", "2000"))
+        
+        # Sections trimmed while building the most recent prompt
+        self.last_trim_report = []
+        
+        # Size of the user-supplied input after trimming, used for model routing
+        self.user_input_tokens = None
+        
+        # Endpoints whose reports are generated as parallel sections
+        self.sectioned_endpoints = sectioned_endpoints_from_env()
+    
+    def _fit_inputs(self, endpoint: str, data: Dict, priorities: Dict[str, int]) -> Dict:
+        """
+        Trim free-text user inputs so they fit the input token budget
+        
+        Args:
+            endpoint: Logical endpoint name, used in the trim log
+            data: User input dictionary
+            priorities: Field name -> priority; higher priority fields are trimmed last
+            
+        Returns:
+            Copy of data with oversized text fields trimmed
+        """
+        sections = [
+            PromptSection(name, data[name], priority, MIN_INPUT_TOKENS)
+            for name, priority in priorities.items()
+            if isinstance(data.get(name), str)
+        ]
+        with span("prompt.fit", endpoint=endpoint):
+            texts, report = fit_sections(sections, self.input_token_budget)
+            
+            counter = get_token_counter()
+            self.user_input_tokens = sum(counter.count(text) for text in texts.values())
+        self.last_trim_report = report
+        if report:
+            print(f"Trimmed {endpoint} inputs to fit {self.input_token_budget} tokens: {report}")
+        
+        fitted = dict(data)
+        fitted.update(texts)
+        return fitted
+    
+    def _complete(self, endpoint: str, messages: List[Dict], max_tokens: int, **params):
+        """
+        Run a chat completion with budget enforcement and token accounting
+        
+        Args:
+            endpoint: Logical endpoint name used for accounting (e.g. "defense")
+            messages: Chat messages to send
+            max_tokens: Completion token cap for this endpoint
+            **params: Extra sampling parameters passed through to the API
+            
+        Returns:
+            The raw chat completion response
+        
+        Raises:
+            BudgetExceededError: If the user or endpoint is over its daily budget
+        """
+        input_tokens = self.user_input_tokens
+        if input_tokens is None:
+            counter = get_token_counter()
+            input_tokens = sum(counter.count(message["content"]) for message in messages)
+        # Hold the worst case against the budget until the real usage is recorded
+        reservation = ledger.check_budget(endpoint, self.user_id, input_tokens + max_tokens)
+        decision = self.router.route(endpoint, input_tokens, self.depth, self.user_id)
+        
+        model = decision.model
+        fallback_used = False
+        started = time.perf_counter()
+        with span("llm.call", endpoint=endpoint, model=model, max_tokens=max_tokens) as call:
+            try:
+                try:
+                    response = self._create(endpoint, model, messages, max_tokens, **params)
+                except FALLBACK_ERRORS as e:
+                    if not decision.fallback_model:
+                        raise
+                    print(f"{model} failed for {endpoint} ({type(e).__name__}), falling back to {decision.fallback_model}")
+                    model = decision.fallback_model
+                    fallback_used = True
+                    response = self._create(endpoint, model, messages, max_tokens, **params)
+            except Exception:
+                ledger.release(reservation)
+                LLM_LATENCY.labels(endpoint, model, "error").observe(time.perf_counter() - started)
+                raise
+            latency_ms = (time.perf_counter() - started) * 1000
+            
+            entry = ledger.record_response(
+                endpoint, self.user_id, model, response, latency_ms, reservation,
+                routing_reason=decision.reason, fallback_used=fallback_used
+            )
+            call.set(model=model, fallback_used=fallback_used, prompt_tokens=entry["prompt_tokens"],
+                     completion_tokens=entry["completion_tokens"], finish_reason=str(response.choices[0].finish_reason))
+        log_routing(decision, entry, fallback_used)
+        LLM_LATENCY.labels(endpoint, model, "fallback" if fallback_used else "ok").observe(latency_ms / 1000)
+        for kind in ("prompt_tokens", "completion_tokens", "cached_tokens"):
+            if entry[kind]:
+                LLM_TOKENS.labels(endpoint, model, kind[:-len("_tokens")]).inc(entry[kind])
+        return response
+    
+    def _create(self, endpoint: str, model: str, messages: List[Dict], max_tokens: int, **params):
+        """
+        One chat completion request
+
+        With LLM_STREAM=1 the completion is streamed (and reassembled into the
+        usual response object) so the time to the first token can be recorded.
+        """
+        if os.getenv("LLM_STREAM", "0") != "1":
+            with span("llm.request", model=model):
+                return self.client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    **params
+                )
+        started = time.perf_counter()
+        started_ns = time.time_ns()
+        first_token_ns = []
+        
+        def first_token():
+            LLM_TIME_TO_FIRST_TOKEN.labels(endpoint, model).observe(time.perf_counter() - started)
+            first_token_ns.append(time.time_ns())
+        
+        stream = self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            max_tokens=max_tokens,
+            stream=True,
+            stream_options={"include_usage": True},
+            **params
+        )
+        response = collect_stream(stream, first_token)
+        # Spans: waiting for the first token, then generating the rest
+        if first_token_ns:
+            add_span("llm.first_token", started_ns, first_token_ns[0], model=model)
+            add_span("llm.generate", first_token_ns[0], time.time_ns(), model=model)
+        return response
+    
+    def _complete_report(self, endpoint: str, messages: List[Dict], max_tokens: int, **params) -> List:
+        """
+        Generate a report, in parallel sections when enabled for the endpoint
+        
+        The user prompt is split into section groups that share the same input
+        context; each group is generated concurrently and the responses are
+        returned in report order. Falls back to a single call when the endpoint
+        is not sectioned or its headings cannot be found.
+        
+        Args:
+            endpoint: Logical endpoint name (see SECTION_GROUPS)
+            messages: System message(s) followed by the user prompt
+            max_tokens: Completion token cap for the whole report
+            **params: Extra sampling parameters passed through to the API
+            
+        Returns:
+            List of chat completion responses in report order
+        """
+        if endpoint in self.sectioned_endpoints:
+            prompts = split_prompt(messages[-1]["content"], SECTION_GROUPS[endpoint])
+            if prompts:
+                part_max_tokens = section_max_tokens(max_tokens, len(prompts))
+                tasks = [
+                    lambda part=part: self._complete(
+                        endpoint,
+                        messages[:-1] + [{"role": "user", "content": part}],
+                        part_max_tokens,
+                        **params
+                    )
+                    for part in prompts
+                ]
+                return run_parallel(tasks)
+            print(f"Section headings not found in {endpoint} prompt, generating in one call")
+        
+        return [self._complete(endpoint, messages, max_tokens, **params)]
     
     def analyze_kpis(self, kpi_data: Dict) -> str:
         """
@@ -38,10 +317,12 @@ class ProductThinkingEngine:
         Returns:
             Diagnostic analysis of the KPIs
         """
-        prompt = self.build_kpi_analysis_prompt(kpi_data)
+        kpi_data = self._fit_inputs("kpi", kpi_data, {"recent_changes": 1})
+        with span("prompt.build", endpoint="kpi"):
+            prompt = self.build_kpi_analysis_prompt(kpi_data)
         
-        response = self.client.chat.completions.create(
-            model=self.model,
+        response = self._complete(
+            "kpi",
             messages=[
                 {
                     "role": "system",
@@ -450,11 +731,13 @@ Remember: The user has done their own thinking. Your job is to:
             Formatted analysis response
         """
         # Build the prompt
-        prompt = self.build_prompt(user_context)
+        user_context = self._fit_inputs("challenge", {"context": user_context}, {"context": 1})["context"]
+        with span("prompt.build", endpoint="challenge"):
+            prompt = self.build_prompt(user_context)
         
         # Call OpenAI API with optimized settings
-        response = self.client.chat.completions.create(
-            model=self.model,
+        response = self._complete(
+            "challenge",
             messages=[
                 {
                     "role": "system",
@@ -502,10 +785,17 @@ You help PMs navigate complex decisions with clarity, avoiding false certainty w
         Returns:
             Strategic analysis tailored for walkthrough mode
         """
-        prompt = self.build_walkthrough_prompt(user_context, walkthrough_data)
+        fitted = self._fit_inputs(
+            "walkthrough",
+            dict(walkthrough_data, context=user_context),
+            {"decision": 6, "targetUser": 5, "success": 4, "constraints": 3, "causes": 2, "context": 1}
+        )
+        user_context = fitted.pop("context")
+        with span("prompt.build", endpoint="walkthrough"):
+            prompt = self.build_walkthrough_prompt(user_context, fitted)
         
-        response = self.client.chat.completions.create(
-            model=self.model,
+        response = self._complete(
+            "walkthrough",
             messages=[
                 {
                     "role": "system",
@@ -668,27 +958,24 @@ Structure your response to support learning and critical thinking."""
         Returns:
             Comprehensive product teardown analysis
         """
-        import httpx
-        
-        # Try to scrape the website for actual content
+        # Try to scrape the website for actual content (Playwright loads only here)
         scraped_data = None
         try:
-            from app.web_scraper import scrape_website_sync
+            from web_scraper import scrape_website_sync
             print(f"Scraping website: {website_url}")
-            scraped_data = scrape_website_sync(website_url)
+            with span("scrape", url=website_url):
+                scraped_data = scrape_website_sync(website_url)
             print(f"Successfully scraped: {scraped_data.get('title', 'Unknown')}")
         except Exception as scrape_error:
             print(f"Web scraping failed (continuing without): {str(scrape_error)}")
             # Continue without scraped data
         
-        prompt = self.build_website_teardown_prompt(website_url, additional_context, scraped_data)
+        with span("prompt.build", endpoint="website"):
+            prompt = self.build_website_teardown_prompt(website_url, additional_context, scraped_data)
         
         try:
-            # Create custom HTTP client with extended timeout
-            http_client = httpx.Client(timeout=120.0)
-            
-            response = self.client.chat.completions.create(
-                model=self.model,
+            responses = self._complete_report(
+                "website",
                 messages=[
                     {
                         "role": "system",
@@ -713,20 +1000,22 @@ Be thorough yet concise. Every insight must be unique and valuable."""
                 frequency_penalty=0.3
             )
             
-            if not response or not response.choices:
+            if not responses or not all(response and response.choices for response in responses):
                 raise Exception("Empty response from AI service")
             
-            content = response.choices[0].message.content
+            content = join_sections([response.choices[0].message.content for response in responses])
             
             if not content or len(content.strip()) < 100:
                 raise Exception("Generated analysis was too short or empty")
             
             # Check if response was truncated
-            if response.choices[0].finish_reason == "length":
+            if any(response.choices[0].finish_reason == "length" for response in responses):
                 content += "\n\n---\n**Note**: Analysis reached token limit. Key insights captured above."
             
             return content
             
+        except BudgetExceededError:
+            raise
         except Exception as e:
             error_msg = str(e)
             print(f"ERROR in analyze_website: {error_msg}")
@@ -742,6 +1031,40 @@ Be thorough yet concise. Every insight must be unique and valuable."""
             else:
                 raise Exception(f"Analysis failed: {error_msg}")
     
+    def _fit_scraped_data(self, scraped_data: dict) -> Dict[str, str]:
+        """
+        Format scraped website data and trim it to the scraped content budget
+        
+        Page identity and headings are kept longest; the raw page text is trimmed first.
+        Trimmed sections are appended to last_trim_report.
+        
+        Args:
+            scraped_data: Scraped website data from Playwright
+            
+        Returns:
+            Dictionary of prompt-ready text per scraped section
+        """
+        sections = [
+            PromptSection("title", scraped_data.get('title', 'N/A'), 9, 20),
+            PromptSection("meta_description", scraped_data.get('meta_description', 'N/A'), 8, 40),
+            PromptSection("headings", self._format_headings(scraped_data.get('headings', {})), 7, 60),
+            PromptSection("pricing", self._format_pricing(scraped_data.get('pricing_signals', {})), 6, 40),
+            PromptSection("features", self._format_list(scraped_data.get('features_mentioned', [])), 5, 60),
+            PromptSection("call_to_actions", ', '.join(scraped_data.get('call_to_actions', [])), 4, 30),
+            PromptSection("navigation", ', '.join(scraped_data.get('navigation', [])), 3, 30),
+            PromptSection("social_proof", self._format_social_proof(scraped_data.get('social_proof', {})), 3, 20),
+            PromptSection("technology", self._format_tech_stack(scraped_data.get('technology_stack', {})), 2, 20),
+            PromptSection("structure", self._format_structure(scraped_data.get('page_structure', {})), 2, 20),
+            PromptSection("main_content", scraped_data.get('main_content', ''), 1, 0),
+        ]
+        texts, report = fit_sections(sections, self.scraped_token_budget)
+        
+        if report:
+            print(f"Trimmed scraped data to fit {self.scraped_token_budget} tokens: {report}")
+            self.last_trim_report = self.last_trim_report + report
+        
+        return {name: text or "N/A" for name, text in texts.items()}
+    
     def build_website_teardown_prompt(self, website_url: str, additional_context: str, scraped_data: dict = None) -> str:
         """
         Build the prompt for website teardown analysis
@@ -754,43 +1077,50 @@ Be thorough yet concise. Every insight must be unique and valuable."""
         Returns:
             Formatted prompt string
         """
+        additional_context = self._fit_inputs(
+            "website", {"additional_context": additional_context}, {"additional_context": 1}
+        )["additional_context"]
         context_section = f"\n\n**Additional Context:**\n{additional_context}" if additional_context else ""
         
         # Build scraped data section if available
         scraped_section = ""
         if scraped_data:
+            scraped = self._fit_scraped_data(scraped_data)
+            # Route on everything the model has to read, the scraped page included
+            counter = get_token_counter()
+            self.user_input_tokens += sum(counter.count(text) for text in scraped.values())
             scraped_section = f"""
 
 **Scraped Website Data:**
 
-**Page Title:** {scraped_data.get('title', 'N/A')}
+**Page Title:** {scraped['title']}
 
-**Meta Description:** {scraped_data.get('meta_description', 'N/A')}
+**Meta Description:** {scraped['meta_description']}
 
 **Main Headings:**
-{self._format_headings(scraped_data.get('headings', {}))}
+{scraped['headings']}
 
-**Navigation Menu:** {', '.join(scraped_data.get('navigation', [])[:15])}
+**Navigation Menu:** {scraped['navigation']}
 
-**Call-to-Actions:** {', '.join(scraped_data.get('call_to_actions', [])[:10])}
+**Call-to-Actions:** {scraped['call_to_actions']}
 
 **Pricing Information:**
-{self._format_pricing(scraped_data.get('pricing_signals', {}))}
+{scraped['pricing']}
 
 **Key Features Mentioned:**
-{self._format_list(scraped_data.get('features_mentioned', [])[:10])}
+{scraped['features']}
 
 **Technology Stack:**
-{self._format_tech_stack(scraped_data.get('technology_stack', {}))}
+{scraped['technology']}
 
 **Page Structure:**
-{self._format_structure(scraped_data.get('page_structure', {}))}
+{scraped['structure']}
 
 **Social Proof:**
-{self._format_social_proof(scraped_data.get('social_proof', {}))}
+{scraped['social_proof']}
 
 **Main Content Preview:**
-{scraped_data.get('main_content', '')[:1000]}...
+{scraped['main_content']}
 """
         
         return f"""You are conducting a high-stakes product and market teardown for a strategic decision-maker who needs deep, actionable insights.
@@ -1203,6 +1533,8 @@ Examples:
         Returns:
             Clarified decision frame analysis
         """
+        framing_data = self._fit_inputs("framing", framing_data, {"decision": 6, "options": 5, "constraints": 4, "unknowns": 3, "success": 2, "stakeholders": 1})
+        
         prompt = f"""You are a decision architecture expert helping to clarify what decision is actually being made.
 
 **User's Decision Statement:**
@@ -1398,8 +1730,8 @@ Look beneath the surface to identify the deeper strategic question:
 **Remember:** The goal is clarity and rigor before analysis, not recommendations. Help them understand what they're actually deciding with the depth expected in a senior-level strategic brief.
 """
         
-        response = self.client.chat.completions.create(
-            model=self.model,
+        response = self._complete(
+            "framing",
             messages=[
                 {"role": "system", "content": "You are a senior product strategy advisor and decision framing expert. Provide executive-level analysis with the depth and rigor expected in Fortune 500 strategic planning."},
                 {"role": "user", "content": prompt}
@@ -1420,6 +1752,8 @@ Look beneath the surface to identify the deeper strategic question:
         Returns:
             Dashboard signal analysis
         """
+        dashboard_data = self._fit_inputs("dashboard", dashboard_data, {"problem": 3, "data": 2, "context": 1})
+        
         prompt = f"""You are a product diagnostics expert. Your job is to help understand what signals suggest is going wrong and form competing hypotheses.
 
 **What Appears to be Going Wrong:**
@@ -1656,8 +1990,8 @@ Generate 4-6 distinct explanations, ranked by likelihood:
 **Remember:** The goal is to illuminate possibilities and structure thinking, not claim certainty. Good diagnostics expand the hypothesis space before narrowing it.
 """
         
-        response = self.client.chat.completions.create(
-            model=self.model,
+        response = self._complete(
+            "dashboard",
             messages=[
                 {"role": "system", "content": "You are a senior product analytics and diagnostics expert. Provide rigorous, hypothesis-driven analysis that helps product leaders make evidence-based decisions."},
                 {"role": "user", "content": prompt}
@@ -1678,6 +2012,8 @@ Generate 4-6 distinct explanations, ranked by likelihood:
         Returns:
             Confidence assessment
         """
+        confidence_data = self._fit_inputs("confidence", confidence_data, {"decision": 4, "evidence": 3, "gaps": 2, "timeline": 1})
+        
         prompt = f"""You are a decision confidence assessor. Your job is to qualitatively evaluate whether there's enough signal to act.
 
 **Decision Being Considered:**
@@ -1980,8 +2316,8 @@ The central question is whether **[specific key uncertainty]** is acceptable giv
 **Remember:** Confidence assessment is about helping leaders understand what they're betting on, not providing algorithmic certainty. The goal is informed judgment, not false precision.
 """
         
-        response = self.client.chat.completions.create(
-            model=self.model,
+        response = self._complete(
+            "confidence",
             messages=[
                 {"role": "system", "content": "You are a senior product strategy advisor specializing in decision confidence assessment. Help leaders understand the strength of their evidence and make informed risk-adjusted decisions."},
                 {"role": "user", "content": prompt}
@@ -2002,6 +2338,8 @@ The central question is whether **[specific key uncertainty]** is acceptable giv
         Returns:
             Executive-friendly defense brief
         """
+        defense_data = self._fit_inputs("defense", defense_data, {"decision": 5, "rationale": 4, "risks": 3, "tradeoffs": 2, "audience": 1})
+        
         prompt = f"""You are an executive communication expert. Create a clear, compelling brief to defend a decision to stakeholders.
 
 **Decision Made:**
@@ -2088,8 +2426,8 @@ Bullet points you can use when discussing this decision:
 **Tone:** Confident but not overconfident. Acknowledge uncertainty. Show you've thought through objections. Make it clear this was a deliberate, reasoned choice—not impulsive.
 """
         
-        response = self.client.chat.completions.create(
-            model=self.model,
+        responses = self._complete_report(
+            "defense",
             messages=[
                 {"role": "system", "content": "You are a senior executive communications specialist. Create decision defense briefs at Fortune 500 caliber - comprehensive, rigorous, and designed for C-level stakeholder communication."},
                 {"role": "user", "content": prompt}
@@ -2098,7 +2436,7 @@ Bullet points you can use when discussing this decision:
             max_tokens=7000
         )
         
-        return response.choices[0].message.content
+        return join_sections([response.choices[0].message.content for response in responses])
 
     def analyze_retrospective(self, retro_data: Dict) -> str:
         """
@@ -2110,6 +2448,8 @@ Bullet points you can use when discussing this decision:
         Returns:
             Retrospective analysis and learnings
         """
+        retro_data = self._fit_inputs("retrospective", retro_data, {"decision": 5, "actual": 4, "expected": 3, "assumptions": 2, "differently": 1})
+        
         prompt = f"""You are a decision learning expert. Help extract learnings from a past decision—focus on learning, not blame.
 
 **Original Decision:**
@@ -2211,8 +2551,8 @@ With perfect hindsight, what's the ONE thing you'd change that would have had th
 **CRITICAL:** Frame everything as learning, not blame. Use "we" language. Focus on process improvement and pattern recognition. The goal is to improve future decision-making, not relitigate the past.
 """
         
-        response = self.client.chat.completions.create(
-            model=self.model,
+        response = self._complete(
+            "retrospective",
             messages=[
                 {"role": "system", "content": "You are a senior organizational learning expert. Extract deep insights from past decisions with the rigor expected in high-performing product organizations. Focus on patterns, systemic issues, and actionable improvements."},
                 {"role": "user", "content": prompt}
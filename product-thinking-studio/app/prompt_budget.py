@@ -0,0 +1,207 @@
+"""
+Prompt token budgeting
+Offline token counting and priority-based trimming of prompt sections
+"""
+import hashlib
+import os
+import re
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+
+# Appended to any section that had to be cut
+TRIM_MARKER = " …[trimmed]"
+
+_PIECE_PATTERN = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+# Where tiktoken downloads each encoding from; its local copy is named after the URL's SHA-1
+_ENCODING_URLS = {
+    name: f"https://openaipublic.blob.core.windows.net/encodings/{name}.tiktoken"
+    for name in ("o200k_base", "cl100k_base", "p50k_base", "r50k_base")
+}
+
+
+class TokenCounter:
+    """
+    Counts and truncates text in model tokens without any network access
+
+    Uses a locally cached tiktoken encoding when one is available and falls back
+    to a deterministic word-piece estimate otherwise. The estimate errs on the
+    high side (about four characters per token for words, one token per symbol)
+    so budgets computed with it are conservative.
+    """
+
+    def __init__(self, encoding=None):
+        """
+        Args:
+            encoding: Optional tiktoken-compatible encoding (encode/decode); None uses the estimate
+        """
+        self.encoding = encoding
+        self.name = getattr(encoding, "name", "heuristic") if encoding is not None else "heuristic"
+
+    @staticmethod
+    def _piece_cost(piece: str) -> int:
+        return max(1, (len(piece) + 3) // 4)
+
+    def count(self, text: str) -> int:
+        """Number of tokens in text"""
+        if not text:
+            return 0
+        if self.encoding is not None:
+            return len(self.encoding.encode(text))
+        return sum(self._piece_cost(match.group(0)) for match in _PIECE_PATTERN.finditer(text))
+
+    def truncate(self, text: str, max_tokens: int, marker: str = TRIM_MARKER) -> str:
+        """
+        Cut text so that it (plus the trim marker) fits in max_tokens
+
+        Returns:
+            The original text if it already fits, a truncated copy ending in the marker,
+            or an empty string if not even the marker fits
+        """
+        if self.count(text) <= max_tokens:
+            return text
+
+        available = max_tokens - self.count(marker)
+        if available <= 0:
+            return ""
+
+        if self.encoding is not None:
+            kept = self.encoding.decode(self.encoding.encode(text)[:available])
+        else:
+            used = 0
+            cut = 0
+            for match in _PIECE_PATTERN.finditer(text):
+                cost = self._piece_cost(match.group(0))
+                if used + cost > available:
+                    break
+                used += cost
+                cut = match.end()
+            kept = text[:cut]
+
+        return kept.rstrip() + marker
+
+
+def tiktoken_cache_file(encoding_name: str) -> Optional[str]:
+    """
+    Path of tiktoken's local copy of an encoding, or None if loading it would download it
+
+    Follows tiktoken's own lookup: TIKTOKEN_CACHE_DIR, then DATA_GYM_CACHE_DIR, then
+    <tmp>/data-gym-cache (an empty directory setting disables the cache).
+    """
+    url = _ENCODING_URLS.get(encoding_name)
+    if "TIKTOKEN_CACHE_DIR" in os.environ:
+        cache_dir = os.environ["TIKTOKEN_CACHE_DIR"]
+    elif "DATA_GYM_CACHE_DIR" in os.environ:
+        cache_dir = os.environ["DATA_GYM_CACHE_DIR"]
+    else:
+        cache_dir = os.path.join(tempfile.gettempdir(), "data-gym-cache")
+    if not url or not cache_dir:
+        return None
+    path = os.path.join(cache_dir, hashlib.sha1(url.encode()).hexdigest())
+    return path if os.path.isfile(path) else None
+
+
+def _load_default_counter() -> TokenCounter:
+    """
+    Pick the tokenizer from PROMPT_TOKENIZER ("auto", "heuristic" or a tiktoken encoding name)
+
+    "auto" only uses tiktoken when the encoding is already on disk: tiktoken would
+    otherwise download it inside the first request that counts tokens.
+    """
+    choice = os.getenv("PROMPT_TOKENIZER", "auto").strip()
+    if choice == "heuristic":
+        return TokenCounter()
+
+    encoding_name = "o200k_base" if choice == "auto" else choice
+    if choice == "auto" and tiktoken_cache_file(encoding_name) is None:
+        return TokenCounter()
+    try:
+        import tiktoken
+        return TokenCounter(tiktoken.get_encoding(encoding_name))
+    except Exception as e:
+        # tiktoken missing, or an explicitly named encoding could not be loaded
+        if choice != "auto":
+            print(f"Tokenizer '{encoding_name}' unavailable, using estimate: {str(e)}")
+        return TokenCounter()
+
+
+_default_counter: Optional[TokenCounter] = None
+
+
+def get_token_counter() -> TokenCounter:
+    """Shared token counter for the process (loaded on first use)"""
+    global _default_counter
+    if _default_counter is None:
+        _default_counter = _load_default_counter()
+    return _default_counter
+
+
+class PromptSection:
+    """A named piece of prompt input that may be trimmed to fit a budget"""
+
+    def __init__(self, name: str, text: str, priority: int = 0, min_tokens: int = 0):
+        """
+        Args:
+            name: Section identifier, used in the trim report
+            text: Section content
+            priority: Higher priority sections are trimmed last
+            min_tokens: Never trim below this many tokens (0 allows dropping the section)
+        """
+        self.name = name
+        self.text = text or ""
+        self.priority = priority
+        self.min_tokens = min_tokens
+
+
+def fit_sections(sections: List[PromptSection], budget: int,
+                 counter: Optional[TokenCounter] = None) -> Tuple[Dict[str, str], List[Dict]]:
+    """
+    Trim sections so their combined size fits within a token budget
+
+    Sections are trimmed in order of ascending priority; among equal priorities the
+    later section is trimmed first. Each section is only cut as far as needed and
+    never below its min_tokens, so the result can still exceed the budget when
+    every section is at its floor.
+
+    Args:
+        sections: Prompt sections in prompt order
+        budget: Target total tokens (0 or less disables trimming)
+        counter: Token counter to use; defaults to the shared counter
+
+    Returns:
+        Tuple of (section name -> text, trim report). The report lists one entry per
+        trimmed section with its original and kept token counts.
+    """
+    counter = counter or get_token_counter()
+    texts = {section.name: section.text for section in sections}
+    counts = {section.name: counter.count(section.text) for section in sections}
+    total = sum(counts.values())
+
+    report = []
+    if budget <= 0 or total <= budget:
+        return texts, report
+
+    trim_order = sorted(enumerate(sections), key=lambda item: (item[1].priority, -item[0]))
+    for _, section in trim_order:
+        overflow = total - budget
+        if overflow <= 0:
+            break
+
+        original = counts[section.name]
+        target = max(section.min_tokens, original - overflow)
+        if target >= original:
+            continue
+
+        trimmed = counter.truncate(section.text, target)
+        kept = counter.count(trimmed)
+        texts[section.name] = trimmed
+        total -= original - kept
+        report.append({
+            "section": section.name,
+            "original_tokens": original,
+            "kept_tokens": kept,
+            "dropped": kept == 0,
+        })
+
+    return texts, report
@@ -0,0 +1,263 @@
+"""
+HTML and Markdown report export
+Cheap alternatives to the PDF report: a self-contained, printable HTML page
+(markdown2 plus a Jinja template compiled once, on first use, styles inlined)
+and the raw markdown. Rendered exports are kept in a small in-memory cache
+along with their gzip/brotli encodings, so repeat downloads are a dictionary
+lookup.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from jinja2 import Environment
+from markupsafe import Markup
+
+from compression import ENCODINGS, compress, compression_min_bytes
+from metrics import cache_lookup
+
+
+# Bump when the HTML template or markdown layout changes so cached exports are replaced
+EXPORT_TEMPLATE_VERSION = "1"
+
+MARKDOWN_EXTRAS = ["tables", "fenced-code-blocks", "strike", "cuddled-lists", "code-friendly"]
+
+HTML_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<meta name="generator" content="Product Playground">
+<title>{{ title }}</title>
+<style>
+@page { size: letter; margin: 0.75in; }
+* { box-sizing: border-box; }
+body { margin: 0; background: #f8f9fa; color: #2c3e50; font: 16px/1.6 -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, Helvetica, Arial, sans-serif; }
+main { max-width: 820px; margin: 2.5rem auto; padding: 2.5rem 3rem; background: #fff; border: 1px solid #e1e8ed; border-radius: 12px; }
+header { border-bottom: 2px solid #6366f1; padding-bottom: 1rem; margin-bottom: 1.5rem; }
+header h1 { margin: 0; color: #6366f1; font-size: 2rem; }
+header p { margin: 0.25rem 0 0; color: #7f8c8d; font-size: 0.9rem; }
+.context { background: #f0f4ff; border-left: 4px solid #6366f1; padding: 0.75rem 1rem; margin-bottom: 1.5rem; white-space: pre-wrap; }
+.context strong { display: block; color: #6366f1; }
+h1, h2 { color: #6366f1; margin: 1.75rem 0 0.5rem; line-height: 1.3; }
+h3, h4 { color: #8b5cf6; margin: 1.25rem 0 0.4rem; }
+blockquote { margin: 1rem 0; padding: 0.5rem 1rem; background: #f0f4ff; border-left: 4px solid #6366f1; }
+table { border-collapse: collapse; width: 100%; margin: 1rem 0; font-size: 0.92rem; }
+th, td { border: 1px solid #e1e8ed; padding: 0.4rem 0.6rem; text-align: left; vertical-align: top; }
+th { background: #f0f4ff; }
+code, pre { font-family: "SFMono-Regular", Consolas, Menlo, monospace; font-size: 0.88rem; background: #f8f9fa; }
+pre { padding: 0.75rem 1rem; overflow-x: auto; border: 1px solid #e1e8ed; border-radius: 6px; }
+hr { border: 0; border-top: 1px solid #e1e8ed; margin: 1.5rem 0; }
+footer { margin-top: 2.5rem; padding-top: 1rem; border-top: 1px solid #e1e8ed; color: #7f8c8d; font-size: 0.85rem; text-align: center; }
+@media print {
+  body { background: #fff; }
+  main { margin: 0; padding: 0; border: 0; max-width: none; }
+  h1, h2, h3, h4 { break-after: avoid; }
+  table, pre, blockquote { break-inside: avoid; }
+}
+</style>
+</head>
+<body>
+<main>
+<header>
+<h1>🚀 Product Playground</h1>
+<p>Strategic Analysis Report &middot; Generated {{ generated }}</p>
+</header>
+{% if context %}
+<section class="context"><strong>📋 Analysis Context</strong>{{ context }}</section>
+{% endif %}
+<article>
+{{ analysis }}
+</article>
+<footer>Generated by Product Playground &middot; AI-assisted product thinking</footer>
+</main>
+</body>
+</html>
+"""
+
+_html_template = None
+
+# markdown2.Markdown keeps per-document state, so each thread gets its own converter
+_converters = threading.local()
+
+
+def _get_html_template():
+    """Compile the page template on first use; autoescape covers the title and context"""
+    global _html_template
+    if _html_template is None:
+        environment = Environment(autoescape=True, trim_blocks=True, lstrip_blocks=True)
+        _html_template = environment.from_string(HTML_TEMPLATE)
+    return _html_template
+
+
+def _markdown_to_html(text: str) -> str:
+    converter = getattr(_converters, "markdown", None)
+    if converter is None:
+        import markdown2
+        # safe_mode escapes raw HTML in model output instead of passing it through
+        converter = markdown2.Markdown(extras=MARKDOWN_EXTRAS, safe_mode="escape")
+        _converters.markdown = converter
+    return converter.convert(text)
+
+
+def render_html(analysis_text: str, context: str = "", timestamp: Optional[datetime] = None) -> str:
+    """Analysis as a standalone HTML page (no external assets, prints cleanly)"""
+    timestamp = timestamp or datetime.now()
+    return _get_html_template().render(
+        title=f"Product Analysis Report - {timestamp.strftime('%B %d, %Y')}",
+        generated=timestamp.strftime('%B %d, %Y at %I:%M %p'),
+        context=(context or "").strip(),
+        analysis=Markup(_markdown_to_html(analysis_text or "")),
+    )
+
+
+def render_markdown(analysis_text: str, context: str = "", timestamp: Optional[datetime] = None) -> str:
+    """Analysis as a markdown document with a short title block"""
+    timestamp = timestamp or datetime.now()
+    parts = [
+        "# Product Analysis Report",
+        f"*Generated {timestamp.strftime('%B %d, %Y at %I:%M %p')} by Product Playground*",
+    ]
+    context = (context or "").strip()
+    if context:
+        quoted = "\n".join(f"> {line}" if line else ">" for line in context.splitlines())
+        parts.append(f"## Analysis Context\n\n{quoted}")
+    parts.append("---")
+    parts.append((analysis_text or "").strip())
+    return "\n\n".join(parts) + "\n"
+
+
+# Format -> (renderer, mimetype, file extension)
+EXPORT_FORMATS = {
+    "html": (render_html, "text/html", "html"),
+    "markdown": (render_markdown, "text/markdown", "md"),
+}
+
+
+def export_cache_key(export_format: str, analysis_text: str, context: str = "") -> str:
+    """Content hash of an export: template version, format, context and analysis text"""
+    digest = hashlib.sha256()
+    for part in (EXPORT_TEMPLATE_VERSION, export_format, context or "", analysis_text or ""):
+        encoded = part.encode("utf-8")
+        digest.update(len(encoded).to_bytes(8, "big"))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+class ExportCache:
+    """
+    In-memory LRU of rendered exports, bounded by total size
+
+    Each entry holds the UTF-8 body and any compressed encodings made for it;
+    an encoding is compressed the first time a client asks for it.
+    """
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024):
+        """
+        Args:
+            max_bytes: Total size of cached bodies and encodings (0 = no caching)
+        """
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Dict[str, bytes]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls) -> "ExportCache":
+        """Build a cache from EXPORT_CACHE_MAX_MB"""
+        return cls(max_bytes=int(float(os.getenv("EXPORT_CACHE_MAX_MB", "16")) * 1024 * 1024))
+
+    @property
+    def encodings(self) -> Tuple[str, ...]:
+        """Content codings this process can produce, best first"""
+        return ENCODINGS
+
+    def _store(self, key: str, entry: Dict[str, bytes]):
+        """Add an entry, or the encodings it has that the cached one lacks. Caller holds the lock."""
+        current = self._entries.get(key)
+        if current is None:
+            self._entries[key] = entry
+            self._size += sum(len(body) for body in entry.values())
+        else:
+            for encoding, body in entry.items():
+                if encoding not in current:
+                    current[encoding] = body
+                    self._size += len(body)
+            self._entries.move_to_end(key)
+        while self._size > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= sum(len(body) for body in evicted.values())
+            self.evictions += 1
+
+    def get(self, key: str, render, encoding: str = "identity") -> Tuple[bytes, str, bool]:
+        """
+        Cached body for key in the requested encoding, calling render() on a miss
+
+        Args:
+            key: Export cache key
+            render: Zero-argument callable returning the export text
+            encoding: "br", "gzip" or "identity"; small bodies are always sent as identity
+
+        Returns:
+            (body bytes, encoding actually used, whether the export came from the cache)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        cached = entry is not None
+        body = entry["identity"] if cached else render().encode("utf-8")
+
+        if encoding not in self.encodings or len(body) < compression_min_bytes():
+            encoding = "identity"
+        encoded = entry.get(encoding) if cached else None
+        if encoded is None:
+            encoded = body if encoding == "identity" else compress(body, encoding)
+            if self.max_bytes > 0:
+                with self._lock:
+                    self._store(key, {"identity": body, encoding: encoded})
+        return encoded, encoding, cached
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "size_bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+def get_export(export_format: str, analysis_text: str, context: str = "", encoding: str = "identity",
+               timestamp: Optional[datetime] = None) -> Tuple[str, bytes, str, bool]:
+    """
+    Cached HTML or markdown export of an analysis
+
+    As with PDFs, the generated time is that of the first render; repeat
+    downloads of the same analysis return the same bytes.
+
+    Returns:
+        (cache key, body bytes, content encoding of the body, whether it came from the cache)
+    """
+    render = EXPORT_FORMATS[export_format][0]
+    key = export_cache_key(export_format, analysis_text, context)
+    body, encoding, cached = export_cache.get(key, lambda: render(analysis_text, context, timestamp), encoding)
+    cache_lookup("export", cached)
+    return key, body, encoding, cached
+
+
+# Shared export cache for the process
+export_cache = ExportCache.from_env()
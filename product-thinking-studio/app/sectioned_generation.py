@@ -0,0 +1,124 @@
+"""
+Parallel sectioned generation
+Splits a long report prompt into independent section groups, generates them
+concurrently from the shared context and reassembles them in template order
+"""
+import contextvars
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Set
+
+from tracing import add_span
+
+
+# Section groups per endpoint, in report order. Each inner list holds the
+# "## " headings (prefix match) that are generated together in one call.
+SECTION_GROUPS: Dict[str, List[List[str]]] = {
+    "defense": [
+        ["## 📋 Executive Summary", "## 🎯 Decision Statement", "## 💡 Why This Decision"],
+        ["## ⚖️ Tradeoffs Evaluated", "## 🚨 Risks & Mitigation"],
+        ["## ✅ Success Metrics", "## 🛡️ Addressing Likely Objections"],
+        ["## 📅 Next Steps & Timeline", "## 💬 Talking Points"],
+    ],
+    "website": [
+        ["## Product Overview & Intent", "## Target Customer Segments"],
+        ["## Customer Jobs & Pain Points", "## Market & Category Analysis"],
+        ["## Value Proposition Assessment", "## Business & Monetization Signals"],
+        ["## Scalability & Growth Potential"],
+        ["## Product & Strategic Risks"],
+        ["## Opportunity Areas for PM Focus", "## Key PM Questions to Investigate"],
+    ],
+}
+
+PART_INSTRUCTIONS = """You are writing PART {part} of {total} of this document. The other parts are written separately and will be combined in order.
+
+Write ONLY the sections below, in this order, using exactly these headings. Do not add an introduction, a conclusion or any other section.
+
+"""
+
+
+def sectioned_endpoints_from_env() -> Set[str]:
+    """Endpoints listed in SECTIONED_ENDPOINTS (comma separated) that have section groups"""
+    raw = os.getenv("SECTIONED_ENDPOINTS", "")
+    requested = {name.strip() for name in raw.split(",") if name.strip()}
+    unknown = requested - set(SECTION_GROUPS)
+    if unknown:
+        print(f"Sectioned generation not available for: {', '.join(sorted(unknown))}")
+    return requested & set(SECTION_GROUPS)
+
+
+def split_prompt(prompt: str, groups: List[List[str]]) -> Optional[List[str]]:
+    """
+    Split a report prompt into one prompt per section group
+
+    The shared context (everything before the first section heading) and the
+    closing guidance (after the final "---" separator) are repeated in every
+    part. Headings are searched from the end of the prompt so user-supplied
+    text containing the same heading cannot shift the split points.
+
+    Args:
+        prompt: The full single-call prompt
+        groups: Section heading groups in template order
+
+    Returns:
+        List of per-group prompts, or None if any heading is missing
+    """
+    headings = [heading for group in groups for heading in group]
+    positions = []
+    search_end = len(prompt)
+    for heading in reversed(headings):
+        position = prompt.rfind("\n" + heading, 0, search_end)
+        if position < 0:
+            return None
+        positions.append(position + 1)
+        search_end = position
+    positions.reverse()
+
+    header = prompt[:positions[0]]
+    tail = prompt[positions[-1]:]
+    footer_at = tail.rfind("\n---\n")
+    footer = tail[footer_at:] if footer_at >= 0 else ""
+    sections_end = positions[-1] + footer_at if footer_at >= 0 else len(prompt)
+
+    bounds = positions + [sections_end]
+    prompts = []
+    index = 0
+    for part, group in enumerate(groups, start=1):
+        body = prompt[bounds[index]:bounds[index + len(group)]]
+        index += len(group)
+        instructions = PART_INSTRUCTIONS.format(part=part, total=len(groups))
+        prompts.append(header + instructions + body.rstrip() + "\n" + footer)
+    return prompts
+
+
+def section_max_tokens(max_tokens: int, parts: int) -> int:
+    """Completion cap for one part: an even share with 50% headroom, never above the full cap"""
+    return min(max_tokens, math.ceil(max_tokens * 1.5 / parts))
+
+
+def run_parallel(tasks: List[Callable], max_workers: Optional[int] = None) -> List:
+    """
+    Run callables concurrently and return their results in task order
+
+    Raises:
+        The exception of the earliest failing task, once all tasks have finished
+    """
+    if len(tasks) == 1:
+        return [tasks[0]()]
+    submitted_ns = time.time_ns()
+
+    def traced(task: Callable):
+        # Runs in a copy of the caller's context, so its spans join the request's trace
+        add_span("queue.wait", submitted_ns, time.time_ns())
+        return task()
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(tasks)) as pool:
+        futures = [pool.submit(contextvars.copy_context().run, traced, task) for task in tasks]
+        return [future.result() for future in futures]
+
+
+def join_sections(contents: List[str]) -> str:
+    """Combine generated parts in order"""
+    return "\n\n".join(content.strip() for content in contents if content and content.strip())
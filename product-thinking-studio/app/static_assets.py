@@ -0,0 +1,145 @@
+"""
+Static assets
+CSS and JS under static/ are served from content-hashed URLs
+(/assets/css/app.<hash>.css) that browsers may cache for a year, so each
+file is downloaded once per deploy. Files are read, hashed and compressed
+(gzip, plus brotli if installed) once per process. Pages rendered from
+templates that take no request data are kept the same way and revalidated
+with their ETag, so a repeat visit is a 304.
+"""
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+from werkzeug.security import safe_join
+
+from compression import ENCODINGS, compress, compression_min_bytes
+
+
+# Only these file types get fingerprinted URLs
+ASSET_EXTENSIONS = (".css", ".js")
+
+URL_PREFIX = "/assets"
+
+# Cache-Control for fingerprinted URLs: the content behind a URL never changes
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+# Cache-Control for pages and stale fingerprints: keep a copy, but check the ETag every time
+REVALIDATE = "no-cache"
+
+# name.<16 hex digits>.ext
+FINGERPRINTED = re.compile(r"^(?P<stem>.+)\.(?P<digest>[0-9a-f]{16})(?P<ext>\.[a-z0-9]+)$")
+
+
+class Asset:
+    """A response body with its precompressed encodings and content hash"""
+
+    def __init__(self, body: bytes, mimetype: str):
+        self.body = body
+        self.mimetype = mimetype
+        self.digest = hashlib.sha256(body).hexdigest()[:16]
+        self._encoded: Dict[str, bytes] = {"identity": body}
+        if len(body) >= compression_min_bytes():
+            for encoding in ENCODINGS:
+                self._encoded[encoding] = compress(body, encoding, level="best")
+
+    @property
+    def encodings(self) -> Tuple[str, ...]:
+        """Compressed encodings available, best first"""
+        return tuple(encoding for encoding in ENCODINGS if encoding in self._encoded)
+
+    def encoded(self, encoding: str) -> Tuple[bytes, str]:
+        """(body, encoding actually used) for a requested encoding"""
+        if encoding not in self._encoded:
+            encoding = "identity"
+        return self._encoded[encoding], encoding
+
+    def etag(self, encoding: str) -> str:
+        return self.digest if encoding == "identity" else f"{self.digest}-{encoding}"
+
+
+class AssetStore:
+    """
+    Fingerprinted static files and cached pages for one process
+
+    With reload=True (debug), files are re-read when they change and pages
+    are rendered on every request.
+    """
+
+    def __init__(self, static_folder: str, reload: bool = False):
+        """
+        Args:
+            static_folder: Directory holding the assets (Flask's static folder)
+            reload: Pick up edited files and templates without a restart
+        """
+        self.static_folder = static_folder
+        self.reload = reload
+        self._files: Dict[str, Tuple[float, Asset]] = {}
+        self._pages: Dict[str, Asset] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> Asset:
+        """
+        Asset for a path relative to the static folder
+
+        Raises:
+            FileNotFoundError: If the file does not exist, is outside the folder or is not an asset type
+        """
+        path = safe_join(self.static_folder, name)
+        if path is None or not name.endswith(ASSET_EXTENSIONS):
+            raise FileNotFoundError(name)
+        cached = self._files.get(name)
+        if cached is not None and not self.reload:
+            return cached[1]
+        modified = os.stat(path).st_mtime
+        if cached is not None and cached[0] == modified:
+            return cached[1]
+        with open(path, "rb") as asset_file:
+            mimetype = mimetypes.guess_type(name)[0] or "application/octet-stream"
+            asset = Asset(asset_file.read(), mimetype)
+        with self._lock:
+            self._files[name] = (modified, asset)
+        return asset
+
+    def url(self, name: str) -> str:
+        """Fingerprinted URL for a static file, e.g. css/app.css -> /assets/css/app.<hash>.css"""
+        stem, ext = os.path.splitext(name)
+        return f"{URL_PREFIX}/{stem}.{self.get(name).digest}{ext}"
+
+    def lookup(self, filename: str) -> Tuple[Optional[Asset], bool]:
+        """
+        Asset for a fingerprinted filename
+
+        Returns:
+            (asset or None if there is no such file, whether the fingerprint is the current one)
+        """
+        match = FINGERPRINTED.match(filename)
+        if match is None:
+            return None, False
+        try:
+            asset = self.get(match.group("stem") + match.group("ext"))
+        except (FileNotFoundError, NotADirectoryError):
+            return None, False
+        return asset, asset.digest == match.group("digest")
+
+    def page(self, name: str, render: Callable[[], str]) -> Asset:
+        """Rendered HTML page, calling render() once per process (every time with reload)"""
+        page = self._pages.get(name)
+        if page is None or self.reload:
+            page = Asset(render().encode("utf-8"), "text/html")
+            with self._lock:
+                self._pages[name] = page
+        return page
+
+    def load_all(self) -> int:
+        """Read and compress every asset ahead of the first request; returns the number loaded"""
+        count = 0
+        for directory, _, filenames in os.walk(self.static_folder):
+            for filename in filenames:
+                if filename.endswith(ASSET_EXTENSIONS):
+                    self.get(os.path.relpath(os.path.join(directory, filename), self.static_folder).replace(os.sep, "/"))
+                    count += 1
+        return count
@@ -0,0 +1,363 @@
+"""
+Token accounting and daily budget enforcement
+Records usage for every LLM call and caps spend per user and per endpoint
+"""
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+
+ANONYMOUS_USER = "anonymous"
+
+# How many days of counters to keep for the admin view
+RETENTION_DAYS = 7
+
+# Reservations older than this are ignored, so a worker killed mid-call
+# (timeout, max_requests recycling) cannot hold budget forever
+RESERVATION_TTL_SECONDS = 15 * 60
+
+COUNTER_FIELDS = ("calls", "prompt_tokens", "completion_tokens", "cached_tokens",
+                  "total_tokens", "latency_ms_total", "latency_ms_max")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS usage (
+    day TEXT NOT NULL,
+    grp TEXT NOT NULL,
+    key TEXT NOT NULL,
+    calls INTEGER NOT NULL DEFAULT 0,
+    prompt_tokens INTEGER NOT NULL DEFAULT 0,
+    completion_tokens INTEGER NOT NULL DEFAULT 0,
+    cached_tokens INTEGER NOT NULL DEFAULT 0,
+    total_tokens INTEGER NOT NULL DEFAULT 0,
+    latency_ms_total REAL NOT NULL DEFAULT 0,
+    latency_ms_max REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, grp, key)
+);
+CREATE TABLE IF NOT EXISTS reservations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    day TEXT NOT NULL,
+    endpoint TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    tokens INTEGER NOT NULL,
+    created REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS recent (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    entry TEXT NOT NULL
+);
+"""
+
+
+class BudgetExceededError(Exception):
+    """Raised when a user or endpoint has used up its daily token budget"""
+
+    def __init__(self, scope: str, key: str, used: int, budget: int):
+        self.scope = scope
+        self.key = key
+        self.used = used
+        self.budget = budget
+        super().__init__(
+            f"Daily token budget exceeded for {scope} '{key}' ({used:,} of {budget:,} tokens used). "
+            "Please try again tomorrow."
+        )
+
+
+def _today() -> str:
+    """Current UTC day, used as the budget window key"""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+def _empty_bucket() -> Dict:
+    return {
+        "calls": 0,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "cached_tokens": 0,
+        "total_tokens": 0,
+        "latency_ms_total": 0.0,
+        "latency_ms_max": 0.0,
+    }
+
+
+def _summarize(bucket: Dict) -> Dict:
+    """Add derived fields (average latency) to a counter bucket"""
+    summary = dict(bucket)
+    calls = bucket["calls"]
+    summary["latency_ms_avg"] = round(bucket["latency_ms_total"] / calls, 1) if calls else 0.0
+    summary["latency_ms_total"] = round(bucket["latency_ms_total"], 1)
+    summary["latency_ms_max"] = round(bucket["latency_ms_max"], 1)
+    return summary
+
+
+class TokenLedger:
+    """
+    Ledger of token usage shared by every worker on the host
+
+    Counters are kept per UTC day, split by endpoint, user and model, in a SQLite
+    file (TOKEN_LEDGER_PATH) so budgets hold across gunicorn workers and survive
+    worker recycling. check_budget reserves the estimated tokens of a call in the
+    same transaction as the check, so parallel calls cannot all slip under a
+    budget; record() swaps the reservation for the real usage. The default path
+    ":memory:" keeps a private ledger, which is what the tests use.
+    """
+
+    def __init__(self, user_daily_budget: int = 0, endpoint_daily_budget: int = 0,
+                 endpoint_budgets: Optional[Dict[str, int]] = None, recent_limit: int = 200,
+                 path: str = ":memory:"):
+        """
+        Args:
+            user_daily_budget: Max tokens per user per day (0 = unlimited)
+            endpoint_daily_budget: Default max tokens per endpoint per day (0 = unlimited)
+            endpoint_budgets: Per-endpoint overrides of endpoint_daily_budget
+            recent_limit: Number of individual call records kept for inspection
+            path: SQLite file shared by the workers (":memory:" = private to this ledger)
+        """
+        self.user_daily_budget = user_daily_budget
+        self.endpoint_daily_budget = endpoint_daily_budget
+        self.endpoint_budgets = endpoint_budgets or {}
+        self.recent_limit = recent_limit
+        self.path = path
+
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+    @classmethod
+    def from_env(cls) -> "TokenLedger":
+        """Build a ledger from the DAILY_TOKEN_BUDGET_* and TOKEN_LEDGER_PATH environment variables"""
+        overrides = {}
+        raw = os.getenv("DAILY_TOKEN_BUDGET_ENDPOINTS", "").strip()
+        if raw:
+            try:
+                overrides = {key: int(value) for key, value in json.loads(raw).items()}
+            except (ValueError, AttributeError) as e:
+                print(f"Ignoring invalid DAILY_TOKEN_BUDGET_ENDPOINTS: {str(e)}")
+
+        return cls(
+            user_daily_budget=int(os.getenv("DAILY_TOKEN_BUDGET_PER_USER", "0")),
+            endpoint_daily_budget=int(os.getenv("DAILY_TOKEN_BUDGET_PER_ENDPOINT", "0")),
+            endpoint_budgets=overrides,
+            path=os.getenv("TOKEN_LEDGER_PATH")
+            or os.path.join(tempfile.gettempdir(), "product-playground-tokens.sqlite3"),
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database once per process (never reuse a connection across fork). Caller holds the lock."""
+        if self._connection is None or self._pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None,
+                                         check_same_thread=False)
+            connection.row_factory = sqlite3.Row
+            if self.path != ":memory:":
+                connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(SCHEMA)
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    @contextmanager
+    def _transaction(self):
+        """Run statements in one write transaction, locked against other threads and workers"""
+        with self._lock:
+            connection = self._connect()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    def endpoint_budget(self, endpoint: str) -> int:
+        """Daily budget that applies to an endpoint (0 = unlimited)"""
+        return self.endpoint_budgets.get(endpoint, self.endpoint_daily_budget)
+
+    def check_budget(self, endpoint: str, user_id: Optional[str] = None,
+                     estimated_tokens: int = 0) -> Optional[int]:
+        """
+        Verify that neither the user nor the endpoint is over budget, and reserve the call
+
+        Tokens reserved by calls still in flight count as used, so concurrent calls
+        (e.g. parallel report sections) see each other before any of them finishes.
+
+        Args:
+            endpoint: Logical endpoint name (e.g. "defense")
+            user_id: Caller identity; anonymous callers share one budget
+            estimated_tokens: Upper bound of tokens the call will use, held until record()
+
+        Returns:
+            Reservation id to pass to record() or release(), or None if nothing was reserved
+
+        Raises:
+            BudgetExceededError: If a daily budget has been used up
+        """
+        user_id = user_id or ANONYMOUS_USER
+        day = _today()
+        endpoint_budget = self.endpoint_budget(endpoint)
+        with self._transaction() as db:
+            stale_before = time.time() - RESERVATION_TTL_SECONDS
+            db.execute("DELETE FROM reservations WHERE created < ?", (stale_before,))
+
+            endpoint_used = self._used(db, day, "endpoints", endpoint, "endpoint")
+            if endpoint_budget and endpoint_used >= endpoint_budget:
+                raise BudgetExceededError("endpoint", endpoint, endpoint_used, endpoint_budget)
+            user_used = self._used(db, day, "users", user_id, "user_id")
+            if self.user_daily_budget and user_used >= self.user_daily_budget:
+                raise BudgetExceededError("user", user_id, user_used, self.user_daily_budget)
+
+            if estimated_tokens <= 0:
+                return None
+            cursor = db.execute(
+                "INSERT INTO reservations (day, endpoint, user_id, tokens, created) VALUES (?, ?, ?, ?, ?)",
+                (day, endpoint, user_id, estimated_tokens, time.time())
+            )
+            return cursor.lastrowid
+
+    @staticmethod
+    def _used(db: sqlite3.Connection, day: str, group: str, key: str, column: str) -> int:
+        """Tokens recorded plus tokens reserved by calls in flight"""
+        recorded = db.execute("SELECT total_tokens FROM usage WHERE day = ? AND grp = ? AND key = ?",
+                              (day, group, key)).fetchone()
+        reserved = db.execute(f"SELECT COALESCE(SUM(tokens), 0) FROM reservations WHERE day = ? AND {column} = ?",
+                              (day, key)).fetchone()[0]
+        return (recorded["total_tokens"] if recorded else 0) + reserved
+
+    def release(self, reservation: Optional[int]):
+        """Drop a reservation for a call that failed before it used any tokens"""
+        if reservation is None:
+            return
+        with self._transaction() as db:
+            db.execute("DELETE FROM reservations WHERE id = ?", (reservation,))
+
+    def record(self, endpoint: str, user_id: Optional[str], model: str, prompt_tokens: int = 0,
+               completion_tokens: int = 0, cached_tokens: int = 0, latency_ms: float = 0.0,
+               reservation: Optional[int] = None, **details) -> Dict:
+        """
+        Record a completed LLM call
+
+        Args:
+            reservation: Id returned by check_budget, replaced by the actual usage
+            **details: Extra fields stored on the call record (e.g. routing reason)
+
+        Returns:
+            The stored call record
+        """
+        user_id = user_id or ANONYMOUS_USER
+        day = _today()
+        entry = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "endpoint": endpoint,
+            "user_id": user_id,
+            "model": model,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "cached_tokens": cached_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "latency_ms": round(latency_ms, 1),
+        }
+        entry.update(details)
+
+        with self._transaction() as db:
+            for group, key in (("endpoints", endpoint), ("users", user_id), ("models", model)):
+                db.execute(
+                    """
+                    INSERT INTO usage (day, grp, key, calls, prompt_tokens, completion_tokens,
+                                       cached_tokens, total_tokens, latency_ms_total, latency_ms_max)
+                    VALUES (?, ?, ?, 1, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (day, grp, key) DO UPDATE SET
+                        calls = calls + 1,
+                        prompt_tokens = prompt_tokens + excluded.prompt_tokens,
+                        completion_tokens = completion_tokens + excluded.completion_tokens,
+                        cached_tokens = cached_tokens + excluded.cached_tokens,
+                        total_tokens = total_tokens + excluded.total_tokens,
+                        latency_ms_total = latency_ms_total + excluded.latency_ms_total,
+                        latency_ms_max = MAX(latency_ms_max, excluded.latency_ms_max)
+                    """,
+                    (day, group, key, prompt_tokens, completion_tokens, cached_tokens,
+                     prompt_tokens + completion_tokens, latency_ms, latency_ms)
+                )
+            if reservation is not None:
+                db.execute("DELETE FROM reservations WHERE id = ?", (reservation,))
+            db.execute(
+                "DELETE FROM usage WHERE day NOT IN "
+                "(SELECT DISTINCT day FROM usage ORDER BY day DESC LIMIT ?)",
+                (RETENTION_DAYS,)
+            )
+
+            cursor = db.execute("INSERT INTO recent (entry) VALUES (?)", (json.dumps(entry, default=str),))
+            db.execute("DELETE FROM recent WHERE id <= ?", (cursor.lastrowid - self.recent_limit,))
+
+        return entry
+
+    def record_response(self, endpoint: str, user_id: Optional[str], model: str,
+                        response, latency_ms: float, reservation: Optional[int] = None,
+                        **details) -> Dict:
+        """Record usage from an OpenAI chat completion response"""
+        usage = getattr(response, "usage", None)
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        token_details = getattr(usage, "prompt_tokens_details", None)
+        cached_tokens = getattr(token_details, "cached_tokens", 0) or 0
+        return self.record(endpoint, user_id, model, prompt_tokens, completion_tokens,
+                           cached_tokens, latency_ms, reservation, **details)
+
+    def aggregates(self, day: Optional[str] = None) -> Dict:
+        """
+        Summarize usage for a day (defaults to today), across all workers
+
+        Returns:
+            Dictionary with per-endpoint, per-user and per-model totals, budgets and recent calls
+        """
+        day = day or _today()
+        with self._lock:
+            db = self._connect()
+            rows = db.execute("SELECT * FROM usage WHERE day = ?", (day,)).fetchall()
+            days = [row["day"] for row in db.execute("SELECT DISTINCT day FROM usage ORDER BY day")]
+            recent = [json.loads(row["entry"])
+                      for row in db.execute("SELECT entry FROM (SELECT id, entry FROM recent "
+                                            "ORDER BY id DESC LIMIT 20) ORDER BY id")]
+
+        counters = {"endpoints": {}, "users": {}, "models": {}}
+        for row in rows:
+            counters[row["grp"]][row["key"]] = {field: row[field] for field in COUNTER_FIELDS}
+        endpoints = {key: _summarize(bucket) for key, bucket in counters["endpoints"].items()}
+        users = {key: _summarize(bucket) for key, bucket in counters["users"].items()}
+        models = {key: _summarize(bucket) for key, bucket in counters["models"].items()}
+
+        for key, summary in endpoints.items():
+            summary["daily_budget"] = self.endpoint_budget(key)
+        for summary in users.values():
+            summary["daily_budget"] = self.user_daily_budget
+
+        totals = _empty_bucket()
+        for bucket in counters["endpoints"].values():
+            for field in ("calls", "prompt_tokens", "completion_tokens", "cached_tokens",
+                          "total_tokens", "latency_ms_total"):
+                totals[field] += bucket[field]
+            totals["latency_ms_max"] = max(totals["latency_ms_max"], bucket["latency_ms_max"])
+
+        return {
+            "day": day,
+            "available_days": days,
+            "totals": _summarize(totals),
+            "endpoints": endpoints,
+            "users": users,
+            "models": models,
+            "recent_calls": recent,
+        }
+
+    def reset(self):
+        """Clear all counters and reservations"""
+        with self._transaction() as db:
+            db.execute("DELETE FROM usage")
+            db.execute("DELETE FROM reservations")
+            db.execute("DELETE FROM recent")
+
+
+# Shared ledger for the process (backed by the file every worker on the host uses)
+ledger = TokenLedger.from_env()
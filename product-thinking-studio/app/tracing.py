@@ -0,0 +1,327 @@
+"""
+Request tracing
+Lightweight spans showing where a request's time goes: request parsing,
+scrape phases, prompt building, LLM calls and response serialization. Each
+traced request gets a trace id (returned in the X-Trace-Id header) and its
+spans are exported when it finishes, as JSON lines (TRACE_EXPORT=jsonl) or
+as OTLP/HTTP JSON to a collector (TRACE_EXPORT=otlp). Spans follow the
+current trace through contextvars, so threads started with
+contextvars.copy_context() join it; with no active trace they do nothing.
+"""
+import contextvars
+import json
+import os
+import queue
+import re
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+
+SERVICE_NAME = "product-playground"
+
+# W3C trace context header: version-traceid-parentid-flags
+TRACEPARENT = re.compile(r"^[0-9a-f]{2}-(?P<trace_id>[0-9a-f]{32})-(?P<parent_id>[0-9a-f]{16})-[0-9a-f]{2}$")
+
+# OTLP span kinds
+KIND_INTERNAL = 1
+KIND_SERVER = 2
+
+_current: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """A timed operation within a trace"""
+
+    __slots__ = ("trace", "span_id", "parent_id", "name", "kind", "start_ns", "end_ns",
+                 "attributes", "error", "_token")
+
+    def __init__(self, trace: "Trace", name: str, parent_id: Optional[str] = None,
+                 kind: int = KIND_INTERNAL, start_ns: Optional[int] = None, **attributes):
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = start_ns or time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes
+        self.error: Optional[str] = None
+        self._token = None
+
+    @property
+    def trace_id(self) -> str:
+        return self.trace.trace_id
+
+    def set(self, **attributes):
+        """Add attributes (e.g. model, token counts) to the span"""
+        self.attributes.update(attributes)
+
+    def end(self, end_ns: Optional[int] = None):
+        self.end_ns = end_ns or time.time_ns()
+        self.trace.add(self)
+
+    def to_dict(self) -> Dict:
+        """JSON lines record"""
+        record = {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "name": self.name,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "status": "error" if self.error else "ok",
+            "pid": os.getpid(),
+        }
+        if self.error:
+            record["error"] = self.error
+        return record
+
+    def to_otlp(self) -> Dict:
+        """OTLP/JSON span"""
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class _NoopSpan:
+    """Yielded by span() when no trace is active"""
+
+    def set(self, **attributes):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    """The finished spans of one request"""
+
+    def __init__(self, trace_id: Optional[str] = None):
+        self.trace_id = trace_id or os.urandom(16).hex()
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def add(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+
+def _otlp_value(value) -> Dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def current_span() -> Optional[Span]:
+    """The innermost open span in this context, if a trace is active"""
+    return _current.get()
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Time a block as a child of the current span
+
+    Usage:
+        with span("prompt.build", endpoint="website") as current:
+            ...
+            current.set(prompt_chars=len(prompt))
+
+    Exceptions are recorded on the span and re-raised.
+    """
+    parent = _current.get()
+    if parent is None:
+        yield NOOP_SPAN
+        return
+    child = Span(parent.trace, name, parent_id=parent.span_id, **attributes)
+    token = _current.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.error = f"{type(e).__name__}: {str(e)}"
+        raise
+    finally:
+        _current.reset(token)
+        child.end()
+
+
+def add_span(name: str, start_ns: int, end_ns: int, **attributes):
+    """Record an already finished child of the current span (e.g. a wait measured elsewhere)"""
+    parent = _current.get()
+    if parent is not None:
+        Span(parent.trace, name, parent_id=parent.span_id, start_ns=start_ns, **attributes).end(end_ns)
+
+
+@contextmanager
+def attach(parent: Optional[Span]):
+    """Continue a trace in a thread or event loop that did not inherit its context"""
+    token = _current.set(parent)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+class JsonLinesExporter:
+    """Appends one JSON object per span to a file, a trace at a time"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]):
+        # One write per trace so lines from concurrent workers do not interleave
+        lines = "".join(json.dumps(span.to_dict(), default=str) + "\n" for span in spans)
+        with self._lock, open(self.path, "a", encoding="utf-8") as trace_file:
+            trace_file.write(lines)
+
+
+class OTLPExporter:
+    """
+    Posts spans as OTLP/HTTP JSON from a background thread
+
+    Requests never wait on the collector: finished traces are queued and
+    dropped (and counted) when the queue is full.
+    """
+
+    def __init__(self, endpoint: str, max_queue: int = 1000, batch_size: int = 64, timeout: float = 2.0):
+        """
+        Args:
+            endpoint: Collector URL, e.g. http://127.0.0.1:4318/v1/traces
+            max_queue: Traces held while the collector is slow or down
+            batch_size: Traces sent per request
+            timeout: Seconds per request to the collector
+        """
+        self.endpoint = endpoint
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.dropped = 0
+        self.failures = 0
+        self._queue: "queue.Queue[List[Span]]" = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+
+    def export(self, spans: List[Span]):
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            self.dropped += 1
+
+    def _ensure_thread(self):
+        # Started on first use in each process: a thread started in the gunicorn
+        # master would not survive the fork into the workers
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                threading.Thread(target=self._run, name="otlp-exporter", daemon=True).start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.send([span for spans in batch for span in spans])
+            except Exception as e:
+                self.failures += 1
+                if self.failures == 1:
+                    print(f"Trace export to {self.endpoint} failed: {type(e).__name__}: {str(e)}")
+
+    def send(self, spans: List[Span]):
+        payload = {"resourceSpans": [{
+            "resource": {"attributes": [
+                {"key": "service.name", "value": {"stringValue": SERVICE_NAME}},
+                {"key": "process.pid", "value": {"intValue": str(os.getpid())}},
+            ]},
+            "scopeSpans": [{"scope": {"name": SERVICE_NAME}, "spans": [span.to_otlp() for span in spans]}],
+        }]}
+        request = urllib.request.Request(self.endpoint, data=json.dumps(payload, default=str).encode("utf-8"),
+                                         headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class Tracer:
+    """Starts a trace per request and hands its spans to the exporter when it ends"""
+
+    def __init__(self, exporter=None):
+        """
+        Args:
+            exporter: JsonLinesExporter, OTLPExporter or None (tracing off)
+        """
+        self.exporter = exporter
+
+    @classmethod
+    def from_env(cls) -> "Tracer":
+        """Build from TRACE_EXPORT (none|jsonl|otlp), TRACE_FILE and TRACE_OTLP_ENDPOINT"""
+        kind = os.getenv("TRACE_EXPORT", "none").strip().lower()
+        if kind == "jsonl":
+            return cls(JsonLinesExporter(os.getenv("TRACE_FILE", "traces.jsonl")))
+        if kind == "otlp":
+            return cls(OTLPExporter(os.getenv("TRACE_OTLP_ENDPOINT", "http://127.0.0.1:4318/v1/traces")))
+        return cls(None)
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def start(self, name: str, traceparent: Optional[str] = None, **attributes) -> Optional[Span]:
+        """
+        Open the root span of a trace and make it current
+
+        Args:
+            name: Root span name (e.g. "POST /analyze-website")
+            traceparent: Incoming W3C traceparent header, to join the caller's trace
+
+        Returns:
+            The root span, or None when tracing is off
+        """
+        if not self.enabled:
+            return None
+        match = TRACEPARENT.match(traceparent or "")
+        trace = Trace(match.group("trace_id") if match else None)
+        root = Span(trace, name, parent_id=match.group("parent_id") if match else None,
+                    kind=KIND_SERVER, **attributes)
+        root._token = _current.set(root)
+        return root
+
+    def finish(self, root: Optional[Span], error: Optional[BaseException] = None):
+        """End the root span, leave its context and export the trace"""
+        if root is None:
+            return
+        if error is not None:
+            root.error = f"{type(error).__name__}: {str(error)}"
+        try:
+            _current.reset(root._token)
+        except (ValueError, RuntimeError):  # finished in another context (e.g. after a streamed response)
+            _current.set(None)
+        root.end()
+        try:
+            self.exporter.export(root.trace.spans)
+        except Exception as e:
+            print(f"Trace export failed: {type(e).__name__}: {str(e)}")
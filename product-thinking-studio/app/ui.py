@@ -386,15 +386,16 @@ def render_response(response: str, context: str = ""):
     }
 
 
+@st.cache_data(show_spinner=False, max_entries=32)
 def generate_pdf(analysis_text: str, context: str = "") -> bytes:
-    """Generate PDF from analysis"""
+    """Generate PDF from analysis (memoized on the analysis and context, shared by all sessions)"""
     from reportlab.lib.pagesizes import letter
     from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
     from reportlab.lib.units import inch
     from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
     from reportlab.lib.enums import TA_CENTER
     from io import BytesIO
-    import markdown2
+    from markdown_pdf import MarkdownCompiler, inline_markup
     
     buffer = BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=letter,
@@ -421,37 +422,62 @@ def generate_pdf(analysis_text: str, context: str = "") -> bytes:
     # Context if provided
     if context:
         elements.append(Paragraph("Product Challenge:", styles['Heading3']))
-        elements.append(Paragraph(context, styles['BodyText']))
+        elements.append(Paragraph(inline_markup(context), styles['BodyText']))
         elements.append(Spacer(1, 0.2*inch))
     
     # Analysis
     elements.append(Paragraph("Analysis:", styles['Heading3']))
     
-    # Convert markdown to HTML and then to PDF
-    html_content = markdown2.markdown(analysis_text)
-    
-    # Split by paragraphs and add them
-    for paragraph in html_content.split('\n'):
-        if paragraph.strip():
-            try:
-                elements.append(Paragraph(paragraph, styles['BodyText']))
-                elements.append(Spacer(1, 0.1*inch))
-            except:
-                pass
+    # Convert markdown to flowables
+    list_style = ParagraphStyle('ListItem', parent=styles['BodyText'], leftIndent=20, bulletIndent=10)
+    compiler = MarkdownCompiler(
+        {
+            'h2': styles['Heading2'],
+            'h3': styles['Heading3'],
+            'body': styles['BodyText'],
+            'bullet': list_style,
+            'code': styles['Code'],
+        },
+        width=doc.width,
+    )
+    elements.extend(compiler.compile(analysis_text))
     
     doc.build(elements)
     buffer.seek(0)
     return buffer.getvalue()
 
 
+def request_pdf(ready_key: str):
+    """Button callback: mark the PDF as wanted (runs before the rerun it triggers)"""
+    st.session_state[ready_key] = True
+
+
 def render_pdf_download_button(context: str = "", response: str = "", timestamp: str = ""):
-    """Render PDF download button"""
+    """
+    Render PDF download button
+
+    The PDF is only built once the user asks for it, so ordinary reruns
+    (every widget interaction) do not touch ReportLab; after that the
+    memoized bytes are reused.
+    """
     if not response:
         return
     
-    pdf_bytes = generate_pdf(response, context)
-    
+    ready_key = f"pdf_ready_{timestamp}"
     st.markdown('<div class="content-section">', unsafe_allow_html=True)
+    if not st.session_state.get(ready_key):
+        st.button(
+            "📄 Prepare PDF Report",
+            on_click=request_pdf,
+            args=(ready_key,),
+            use_container_width=True,
+            key=f"pdf_prepare_{timestamp}"
+        )
+        st.markdown('</div>', unsafe_allow_html=True)
+        return
+    
+    with st.spinner("Preparing PDF..."):
+        pdf_bytes = generate_pdf(response, context)
     st.download_button(
         label="📥 Download Analysis as PDF",
         data=pdf_bytes,
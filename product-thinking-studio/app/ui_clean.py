@@ -10,9 +10,11 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak,
 from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_JUSTIFY
 from reportlab.lib import colors
 from reportlab.pdfgen import canvas
-import re
 import io
 
+from markdown_pdf import MarkdownCompiler, inline_markup
+from pdf_fonts import font_markup
+
 
 def apply_custom_css():
     """Apply custom CSS for professional styling with animations"""
@@ -803,8 +805,9 @@ def render_response(response_text, user_context=""):
     }
 
 
+@st.cache_data(show_spinner=False, max_entries=32)
 def generate_pdf(context, response, timestamp):
-    """Generate a professional PDF report of the analysis"""
+    """Generate a professional PDF report of the analysis (memoized on its arguments)"""
     buffer = io.BytesIO()
     
     # Create PDF document
@@ -884,13 +887,13 @@ def generate_pdf(context, response, timestamp):
     )
     
     # Add header
-    story.append(Paragraph("🚀 Product Thinking Studio", title_style))
+    story.append(Paragraph(font_markup("🚀 Product Thinking Studio"), title_style))
     story.append(Paragraph(f"Strategic Analysis Report · Generated on {timestamp}", subtitle_style))
     story.append(Spacer(1, 0.3*inch))
     
     # Add context section
     story.append(Paragraph("Product Challenge", heading_style))
-    story.append(Paragraph(context.replace('\n', '<br/>'), context_style))
+    story.append(Paragraph(inline_markup(context).replace('\n', '<br/>'), context_style))
     story.append(Spacer(1, 0.2*inch))
     
     # Add horizontal line
@@ -898,64 +901,45 @@ def generate_pdf(context, response, timestamp):
     story.append(Spacer(1, 0.2*inch))
     
     # Parse and add response content
-    lines = response.split('\n')
-    for line in lines:
-        line = line.strip()
-        if not line:
-            story.append(Spacer(1, 0.1*inch))
-            continue
-        
-        # Handle headers (##)
-        if line.startswith('## '):
-            header_text = line.replace('##', '').strip()
-            story.append(Spacer(1, 0.15*inch))
-            story.append(Paragraph(header_text, heading_style))
-        
-        # Handle sub-headers (###)
-        elif line.startswith('### '):
-            subheader_text = line.replace('###', '').strip()
-            sub_style = ParagraphStyle(
-                'SubHeading',
-                parent=heading_style,
-                fontSize=13,
-                textColor=colors.HexColor('#334155')
-            )
-            story.append(Paragraph(subheader_text, sub_style))
-        
-        # Handle bold (**text**)
-        elif line.startswith('**') and line.endswith('**'):
-            bold_text = line.replace('**', '').strip()
-            bold_style = ParagraphStyle(
-                'BoldText',
-                parent=body_style,
-                fontName='Helvetica-Bold',
-                textColor=colors.HexColor('#1e293b')
-            )
-            story.append(Paragraph(bold_text, bold_style))
-        
-        # Handle list items (-)
-        elif line.startswith('- '):
-            list_text = '• ' + line[2:].strip()
-            list_style = ParagraphStyle(
-                'ListItem',
-                parent=body_style,
-                leftIndent=20,
-                bulletIndent=10
-            )
-            story.append(Paragraph(list_text, list_style))
-        
-        # Handle horizontal rules
-        elif line.startswith('---'):
-            story.append(Spacer(1, 0.1*inch))
-            story.append(Paragraph("<hr/>", body_style))
-            story.append(Spacer(1, 0.1*inch))
-        
-        # Regular paragraph
-        else:
-            # Clean up markdown formatting
-            clean_line = line.replace('**', '<b>').replace('**', '</b>')
-            clean_line = clean_line.replace('*', '<i>').replace('*', '</i>')
-            story.append(Paragraph(clean_line, body_style))
+    sub_style = ParagraphStyle(
+        'SubHeading',
+        parent=heading_style,
+        fontSize=13,
+        textColor=colors.HexColor('#334155')
+    )
+    bold_style = ParagraphStyle(
+        'BoldText',
+        parent=body_style,
+        fontName='Helvetica-Bold',
+        textColor=colors.HexColor('#1e293b')
+    )
+    list_style = ParagraphStyle(
+        'ListItem',
+        parent=body_style,
+        leftIndent=20,
+        bulletIndent=10
+    )
+    code_style = ParagraphStyle(
+        'CodeBlock',
+        parent=styles['Code'],
+        fontSize=9,
+        leading=12,
+        backColor=colors.HexColor('#f8fafc'),
+        spaceAfter=12
+    )
+    compiler = MarkdownCompiler(
+        {
+            'h2': heading_style,
+            'h3': sub_style,
+            'body': body_style,
+            'bullet': list_style,
+            'label': bold_style,
+            'quote': context_style,
+            'code': code_style,
+        },
+        width=doc.width
+    )
+    story.extend(compiler.compile(response))
     
     # Add footer
     story.append(Spacer(1, 0.5*inch))
@@ -980,14 +964,32 @@ def generate_pdf(context, response, timestamp):
     return pdf_data
 
 
+def request_pdf(ready_key):
+    """Button callback: mark the PDF as wanted (runs before the rerun it triggers)"""
+    st.session_state[ready_key] = True
+
+
 def render_pdf_download_button(context, response, timestamp):
-    """Render the premium PDF download button"""
+    """Render the premium PDF download button, building the PDF only once it is asked for"""
     if context and response:
-        pdf_data = generate_pdf(context, response, timestamp)
+        ready_key = f"pdf_ready_{timestamp}"
+        col1, col2, col3 = st.columns([1, 2, 1])
+        if not st.session_state.get(ready_key):
+            with col2:
+                st.button(
+                    "📄 Prepare PDF Report",
+                    on_click=request_pdf,
+                    args=(ready_key,),
+                    use_container_width=True,
+                    key=f"pdf_prepare_{timestamp}"
+                )
+            return
+        
+        with st.spinner("Preparing PDF..."):
+            pdf_data = generate_pdf(context, response, timestamp)
         
         filename = f"product_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
         
-        col1, col2, col3 = st.columns([1, 2, 1])
         with col2:
             st.download_button(
                 label="📥 Download Analysis as PDF",
@@ -0,0 +1,124 @@
+"""
+Worker warm-up
+Does the slow first-use work (heavy imports, template compilation, the LLM
+connection, render processes, a browser) once per worker process, before or
+while it takes traffic, and records how each step went so /health/ready can
+tell a warm worker from a cold one.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+
+# Used when WARMUP_STEPS is not set; steps that are not configured (e.g. the
+# browser pool) skip themselves
+DEFAULT_STEPS = "imports,templates,llm,pdf,browser"
+
+SKIPPED = "skipped"
+
+
+class Warmup:
+    """
+    Named warm-up steps, run once per process in registration order
+
+    A step that raises is recorded as failed and the remaining steps still
+    run; the process is ready once every enabled step has finished. A step
+    may return SKIPPED when it has nothing to do in this configuration.
+    """
+
+    def __init__(self, enabled: Optional[str] = None):
+        """
+        Args:
+            enabled: Comma separated step names to run ("none" = no warm-up; None = DEFAULT_STEPS)
+        """
+        names = DEFAULT_STEPS if enabled is None else enabled
+        self.enabled = [] if names.strip().lower() == "none" else [
+            name.strip() for name in names.split(",") if name.strip()
+        ]
+        self._steps: "OrderedDict[str, Callable]" = OrderedDict()
+        self._results: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._started = False
+        self.started_at: Optional[float] = None
+        self.duration_ms: Optional[float] = None
+
+    @classmethod
+    def from_env(cls) -> "Warmup":
+        """Build from WARMUP_STEPS"""
+        return cls(enabled=os.getenv("WARMUP_STEPS"))
+
+    def step(self, name: str):
+        """Decorator registering a warm-up step under name"""
+        def register(function: Callable) -> Callable:
+            self._steps[name] = function
+            return function
+        return register
+
+    def start(self, block: bool = False) -> bool:
+        """
+        Run the warm-up once for this process
+
+        Args:
+            block: Run in the calling thread and return when done, instead of in a background thread
+
+        Returns:
+            True if this call started it
+        """
+        with self._lock:
+            if self._started:
+                return False
+            self._started = True
+            self.started_at = time.time()
+        if block:
+            self._run()
+        else:
+            threading.Thread(target=self._run, name="warmup", daemon=True).start()
+        return True
+
+    def _run(self):
+        started = time.perf_counter()
+        for name, function in self._steps.items():
+            if name not in self.enabled:
+                continue
+            step_started = time.perf_counter()
+            result = {"status": "ok"}
+            try:
+                if function() == SKIPPED:
+                    result["status"] = SKIPPED
+            except Exception as e:
+                result = {"status": "failed", "error": f"{type(e).__name__}: {str(e)}"}
+            result["ms"] = round((time.perf_counter() - step_started) * 1000, 1)
+            with self._lock:
+                self._results[name] = result
+        self.duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        self._done.set()
+
+        summary = ", ".join(f"{name} {result['ms']:.0f} ms" if result["status"] == "ok"
+                            else f"{name} {result['status']}" for name, result in self._results.items())
+        print(f"Warm-up finished in {self.duration_ms:.0f} ms (pid {os.getpid()}): {summary or 'nothing to do'}")
+
+    @property
+    def ready(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until warm-up has finished; False on timeout"""
+        return self._done.wait(timeout)
+
+    def status(self) -> Dict:
+        """Readiness and per-step results for /health/ready"""
+        with self._lock:
+            steps = {name: dict(result) for name, result in self._results.items()}
+        for name in self.enabled:
+            if name in self._steps and name not in steps:
+                steps[name] = {"status": "pending"}
+        return {
+            "ready": self.ready,
+            "state": "ready" if self.ready else ("warming" if self._started else "pending"),
+            "pid": os.getpid(),
+            "duration_ms": self.duration_ms,
+            "steps": steps,
+        }
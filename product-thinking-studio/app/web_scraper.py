@@ -3,31 +3,57 @@ Web scraping module using Playwright for dynamic content extraction
 """
 
 import asyncio
+import atexit
+import os
+import threading
+from contextlib import contextmanager
 from playwright.async_api import async_playwright
 from bs4 import BeautifulSoup
 import json
 from typing import Dict, Optional
 
+from metrics import SCRAPE_PHASE
+from tracing import attach, current_span, span
+
+# Browser context settings for every scrape
+CONTEXT_OPTIONS = {
+    'viewport': {'width': 1920, 'height': 1080},
+    'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+@contextmanager
+def phase(name: str):
+    """Time a scrape phase for /metrics and the request trace"""
+    with SCRAPE_PHASE.labels(name).time(), span(f'scrape.{name}'):
+        yield
+
 class WebScraper:
     """Advanced web scraper using Playwright for JS-heavy sites"""
     
-    def __init__(self):
-        self.browser = None
+    def __init__(self, browser=None):
+        """
+        Args:
+            browser: Running browser to scrape with (e.g. from the browser pool); it is
+                left open on close(). None launches a browser for this scraper.
+        """
+        self.playwright = None
+        self.browser = browser
+        self.owns_browser = browser is None
         self.context = None
         
     async def initialize(self):
         """Initialize Playwright browser"""
-        self.playwright = await async_playwright().start()
-        self.browser = await self.playwright.chromium.launch(headless=True)
-        self.context = await self.browser.new_context(
-            viewport={'width': 1920, 'height': 1080},
-            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        )
+        if self.browser is None:
+            self.playwright = await async_playwright().start()
+            self.browser = await self.playwright.chromium.launch(headless=True)
+        self.context = await self.browser.new_context(**CONTEXT_OPTIONS)
         
     async def close(self):
         """Clean up resources"""
         if self.context:
             await self.context.close()
+        if not self.owns_browser:
+            return
         if self.browser:
             await self.browser.close()
         if self.playwright:
@@ -44,30 +70,34 @@ class WebScraper:
             Dictionary containing scraped data
         """
         try:
-            if not self.browser:
-                await self.initialize()
+            # Phases: launch (browser and/or context), navigate, extract
+            if not self.context:
+                with phase('launch'):
+                    await self.initialize()
                 
             page = await self.context.new_page()
             
             # Navigate and wait for content
-            await page.goto(url, wait_until='networkidle', timeout=30000)
+            with phase('navigate'):
+                await page.goto(url, wait_until='networkidle', timeout=30000)
             
             # Extract comprehensive page data
-            data = {
-                'url': url,
-                'title': await page.title(),
-                'meta_description': await self._get_meta_description(page),
-                'headings': await self._get_headings(page),
-                'main_content': await self._get_main_content(page),
-                'navigation': await self._get_navigation(page),
-                'call_to_actions': await self._get_ctas(page),
-                'pricing_signals': await self._get_pricing_info(page),
-                'features_mentioned': await self._get_features(page),
-                'technology_stack': await self._detect_technology(page),
-                'page_structure': await self._analyze_structure(page),
-                'social_proof': await self._get_social_proof(page),
-                'contact_info': await self._get_contact_info(page)
-            }
+            with phase('extract'):
+                data = {
+                    'url': url,
+                    'title': await page.title(),
+                    'meta_description': await self._extract('meta_description', self._get_meta_description, page),
+                    'headings': await self._extract('headings', self._get_headings, page),
+                    'main_content': await self._extract('main_content', self._get_main_content, page),
+                    'navigation': await self._extract('navigation', self._get_navigation, page),
+                    'call_to_actions': await self._extract('call_to_actions', self._get_ctas, page),
+                    'pricing_signals': await self._extract('pricing_signals', self._get_pricing_info, page),
+                    'features_mentioned': await self._extract('features_mentioned', self._get_features, page),
+                    'technology_stack': await self._extract('technology_stack', self._detect_technology, page),
+                    'page_structure': await self._extract('page_structure', self._analyze_structure, page),
+                    'social_proof': await self._extract('social_proof', self._get_social_proof, page),
+                    'contact_info': await self._extract('contact_info', self._get_contact_info, page)
+                }
             
             await page.close()
             return data
@@ -76,6 +106,11 @@ class WebScraper:
             print(f"Error scraping {url}: {str(e)}")
             raise
             
+    async def _extract(self, name: str, extractor, page):
+        """Run one extractor under its own span"""
+        with span(f'scrape.extract.{name}'):
+            return await extractor(page)
+    
     async def _get_meta_description(self, page) -> str:
         """Extract meta description"""
         try:
@@ -320,8 +355,99 @@ class WebScraper:
         return contact
 
 
+class BrowserPool:
+    """
+    One Chromium per worker process, kept running between scrapes
+
+    Launching Chromium takes a second or more, so with the pool enabled
+    (SCRAPER_BROWSER_POOL=1) it is launched once, by the warm-up or the first
+    scrape, and each scrape gets a fresh context on it. Playwright objects
+    belong to the event loop that created them, so the browser lives on a
+    dedicated loop thread. Off by default: an idle Chromium holds well over
+    100 MB per worker.
+    """
+
+    def __init__(self, enabled: bool = False, timeout: float = 60.0):
+        """
+        Args:
+            enabled: Keep a browser running (False = launch one per scrape)
+            timeout: Seconds to wait for a launch or a scrape
+        """
+        self.enabled = enabled
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._playwright = None
+        self._browser = None
+
+    @classmethod
+    def from_env(cls) -> "BrowserPool":
+        """Build a pool from SCRAPER_BROWSER_POOL and SCRAPER_TIMEOUT"""
+        return cls(
+            enabled=os.getenv('SCRAPER_BROWSER_POOL', '0') == '1',
+            timeout=float(os.getenv('SCRAPER_TIMEOUT', '60'))
+        )
+
+    def _call(self, coroutine):
+        """Run a coroutine on the pool's loop and wait for its result"""
+        future = asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+        try:
+            return future.result(timeout=self.timeout)
+        except Exception:
+            future.cancel()
+            raise
+
+    async def _launch(self):
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(headless=True)
+
+    def start(self):
+        """Start the loop thread and launch the browser, or relaunch it if it has crashed"""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name='browser-pool', daemon=True).start()
+            if self._browser is None or not self._browser.is_connected():
+                self._call(self._launch())
+
+    async def _scrape(self, url: str, parent=None) -> Dict:
+        # The loop thread does not share the caller's context, so the trace is passed in
+        with attach(parent):
+            scraper = WebScraper(browser=self._browser)
+            try:
+                return await scraper.scrape_website(url)
+            finally:
+                await scraper.close()
+
+    def scrape(self, url: str) -> Dict:
+        """Scrape url in a new context on the pooled browser"""
+        self.start()
+        return self._call(self._scrape(url, current_span()))
+
+    def close(self):
+        async def stop():
+            if self._browser:
+                await self._browser.close()
+            if self._playwright:
+                await self._playwright.stop()
+
+        with self._lock:
+            if self._loop is None:
+                return
+            try:
+                self._call(stop())
+            except Exception as e:
+                print(f"Error closing pooled browser: {str(e)}")
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop = self._browser = self._playwright = None
+
+
 def scrape_website_sync(url: str) -> Dict:
     """Synchronous wrapper for async scraping"""
+    if browser_pool.enabled:
+        return browser_pool.scrape(url)
+
     async def run():
         scraper = WebScraper()
         try:
@@ -331,3 +457,8 @@ def scrape_website_sync(url: str) -> Dict:
             await scraper.close()
     
     return asyncio.run(run())
+
+
+# Shared browser for the process (used only when SCRAPER_BROWSER_POOL=1)
+browser_pool = BrowserPool.from_env()
+atexit.register(browser_pool.close)
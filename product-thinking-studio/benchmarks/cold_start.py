@@ -0,0 +1,164 @@
+"""
+Cold start benchmark
+Starts a fresh server process and measures how long it takes to answer
+/health (or /health/ready, once the worker has warmed up), then how long the
+first PDF download takes (the first request that needs ReportLab). Also prints
+an -X importtime profile of flask_app.
+
+Usage:
+    python benchmarks/cold_start.py                            # Flask development server
+    python benchmarks/cold_start.py --server gunicorn          # gunicorn with gunicorn.conf.py
+    python benchmarks/cold_start.py --probe /health/ready      # time until warm-up has finished
+    python benchmarks/cold_start.py --root /path/to/checkout   # measure another tree (e.g. a baseline worktree)
+    python benchmarks/cold_start.py --importtime --top 25      # import profile only
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVE_SNIPPET = (
+    "import sys; sys.path.insert(0, '.'); import flask_app; "
+    "flask_app.app.run(host='127.0.0.1', port={port}, debug=False, use_reloader=False, threaded=True)"
+)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def server_env() -> dict:
+    env = dict(os.environ)
+    env.setdefault('OPENAI_API_KEY', 'benchmark')
+    env['PYTHONUNBUFFERED'] = '1'
+    return env
+
+
+def start_server(kind: str, root: str, port: int) -> subprocess.Popen:
+    if kind == 'gunicorn':
+        command = ['gunicorn', '--config', 'gunicorn.conf.py', '--bind', f'127.0.0.1:{port}', 'flask_app:app']
+    else:
+        command = [sys.executable, '-c', SERVE_SNIPPET.format(port=port)]
+    return subprocess.Popen(command, cwd=root, env=server_env(),
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_for_health(port: int, process: subprocess.Popen, probe: str, timeout: float) -> None:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with status {process.returncode} before {probe} answered")
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{port}{probe}', timeout=1) as response:
+                if response.status == 200:
+                    return
+        except (urllib.error.URLError, ConnectionError, socket.timeout):
+            pass
+        time.sleep(0.005)
+    raise RuntimeError(f"{probe} did not answer 200 within {timeout}s")
+
+
+def post_pdf(port: int, run: int) -> float:
+    """Time one uncached PDF download"""
+    body = json.dumps({
+        'analysis': f"## Summary\n\nCold start run {run} at {time.time()}\n\n- First point\n- Second point",
+        'context': 'Cold start benchmark',
+    }).encode()
+    request = urllib.request.Request(f'http://127.0.0.1:{port}/download-pdf', data=body,
+                                     headers={'Content-Type': 'application/json'})
+    started = time.perf_counter()
+    with urllib.request.urlopen(request, timeout=120) as response:
+        response.read()
+    return time.perf_counter() - started
+
+
+def measure_once(kind: str, root: str, run: int, probe: str, settle: float, timeout: float) -> dict:
+    port = free_port()
+    started = time.perf_counter()
+    process = start_server(kind, root, port)
+    try:
+        wait_for_health(port, process, probe, timeout)
+        health = time.perf_counter() - started
+        time.sleep(settle)
+        first_pdf = post_pdf(port, run)
+        second_pdf = post_pdf(port, run + 1000)
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    return {
+        'health_ms': round(health * 1000, 1),
+        'first_pdf_ms': round(first_pdf * 1000, 1),
+        'second_pdf_ms': round(second_pdf * 1000, 1),
+    }
+
+
+def import_profile(root: str, top: int) -> None:
+    """Print the slowest imports (cumulative) from python -X importtime"""
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', "import sys; sys.path.insert(0, '.'); import flask_app"],
+        cwd=root, env=server_env(), capture_output=True, text=True, check=False,
+    )
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        # "import time:   self_us |  cumulative_us | <indent>module"
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        rows.append((int(cumulative_us), int(self_us), depth, name.strip()))
+
+    total = next((cumulative for cumulative, _, _, name in rows if name == 'flask_app'), None)
+    if total is None:
+        raise RuntimeError(f"import flask_app failed:\n{completed.stderr[-2000:]}")
+    print(f"import flask_app: {total / 1000:.1f} ms cumulative\n")
+    print(f"{'cumulative ms':>14} {'self ms':>8}  module")
+    for cumulative, self_time, depth, name in sorted(rows, reverse=True)[:top]:
+        print(f"{cumulative / 1000:>14.1f} {self_time / 1000:>8.1f}  {'  ' * depth}{name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold start benchmark")
+    parser.add_argument('--server', choices=['flask', 'gunicorn'], default='flask')
+    parser.add_argument('--root', default=ROOT, help='project directory containing flask_app.py')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--probe', default='/health', help='path polled until it returns 200')
+    parser.add_argument('--settle', type=float, default=0.0,
+                        help='seconds to wait after the probe before the first PDF request')
+    parser.add_argument('--timeout', type=float, default=60.0)
+    parser.add_argument('--importtime', action='store_true', help='only print the import profile')
+    parser.add_argument('--top', type=int, default=20)
+    args = parser.parse_args()
+
+    root = os.path.abspath(args.root)
+    import_profile(root, args.top)
+    if args.importtime:
+        return
+
+    print(f"\n{args.server} server in {root}, {args.repeats} cold starts")
+    print(f"{'run':>4} {'probe ms':>11} {'first PDF ms':>13} {'second PDF ms':>14}")
+    results = []
+    for run in range(args.repeats):
+        result = measure_once(args.server, root, run, args.probe, args.settle, args.timeout)
+        results.append(result)
+        print(f"{run + 1:>4} {result['health_ms']:>11} {result['first_pdf_ms']:>13} {result['second_pdf_ms']:>14}")
+    print(f"{'med':>4} {statistics.median(r['health_ms'] for r in results):>11} "
+          f"{statistics.median(r['first_pdf_ms'] for r in results):>13} "
+          f"{statistics.median(r['second_pdf_ms'] for r in results):>14}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,356 @@
+"""
+Startup and memory footprint benchmark
+Measures each deployment entry point: gunicorn on flask_app:app, Streamlit on
+app/app.py and the Docker image. For each one it reports:
+- the cold start time until the health check first answers 200
+- the steady-state RSS of every process once warm-up is done
+- the RSS after N operations (analyses, website scrapes and PDF downloads
+  against the fake LLM), with checkpoints along the way
+
+The growth across the checkpoints shows leaks and bloat. It also shows
+whether the max_requests = 1000 worker recycling in gunicorn.conf.py is
+needed to stay under the memory cap. Recycling is switched off during the
+run so that it cannot hide growth.
+
+Usage:
+    python benchmarks/footprint.py                                   # gunicorn, 500 operations
+    python benchmarks/footprint.py --target flask --operations 2000  # Flask dev server (one process)
+    python benchmarks/footprint.py --target gunicorn --workers 2 --mix pdf=1   # PDFs only: which operation grows?
+    python benchmarks/footprint.py --target streamlit                # cold start and idle RSS only
+    python benchmarks/footprint.py --target docker --build           # build the image, run it under --memory-cap-mb
+    python benchmarks/footprint.py --target gunicorn streamlit docker --output footprint.json
+
+Streamlit runs app/app.py only once a browser session connects over its websocket,
+so for Streamlit this measures the server alone and skips the operations.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cold_start import SERVE_SNIPPET, free_port, server_env, wait_for_health
+from load_test import PayloadFactory, process_tree, rss_mb, start_fake_llm, stop
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Operation kind -> endpoints it picks from
+OPERATIONS = {
+    'analysis': ['analyze', 'analyze-walkthrough', 'analyze-kpi', 'analyze-framing', 'analyze-dashboard',
+                 'analyze-confidence', 'analyze-defense', 'analyze-retrospective'],
+    'scrape': ['analyze-website'],
+    'pdf': ['download-pdf', 'download-portfolio-pdf'],
+}
+DEFAULT_MIX = {'analysis': 5, 'scrape': 2, 'pdf': 3}
+
+HEALTH_PROBES = {'flask': '/health', 'gunicorn': '/health', 'docker': '/health', 'streamlit': '/_stcore/health'}
+ROLES = {'flask': ['server', 'helper'], 'streamlit': ['server', 'helper'],
+         'gunicorn': ['master', 'worker', 'helper'], 'docker': ['master', 'worker', 'helper']}
+CONTAINER_PORT = 8080
+
+
+class Target:
+    """A running deployment entry point: its process, URL and how to read its memory"""
+
+    def __init__(self, kind: str, args, llm_port: Optional[int], log_path: str):
+        self.kind = kind
+        self.port = free_port()
+        self.container = f'footprint-{os.getpid()}-{self.port}' if kind == 'docker' else None
+        env = server_env()
+        env.update(OPENAI_API_KEY='footprint', PORT=str(self.port))
+        if llm_port:
+            host = 'host.docker.internal' if kind == 'docker' else '127.0.0.1'
+            env['OPENAI_BASE_URL'] = f'http://{host}:{llm_port}/v1'
+        if args.workers:
+            env['WEB_CONCURRENCY'] = str(args.workers)
+        if args.threads:
+            env['GUNICORN_THREADS'] = str(args.threads)
+
+        if kind == 'gunicorn':
+            # The command line overrides gunicorn.conf.py: no recycling while measuring
+            command = ['gunicorn', '--config', 'gunicorn.conf.py', '--bind', f'127.0.0.1:{self.port}',
+                       '--max-requests', '0', 'flask_app:app']
+        elif kind == 'flask':
+            command = [sys.executable, '-c', SERVE_SNIPPET.format(port=self.port)]
+        elif kind == 'streamlit':
+            command = [sys.executable, '-m', 'streamlit', 'run', 'app/app.py', '--server.port', str(self.port),
+                       '--server.address', '127.0.0.1', '--server.headless', 'true',
+                       '--browser.gatherUsageStats', 'false']
+        else:
+            command = ['docker', 'run', '--rm', '--name', self.container, '-p', f'127.0.0.1:{self.port}:{CONTAINER_PORT}',
+                       '--memory', f'{args.memory_cap_mb}m', '--add-host', 'host.docker.internal:host-gateway',
+                       '-e', f'PORT={CONTAINER_PORT}', '-e', 'OPENAI_API_KEY=footprint',
+                       '-e', 'GUNICORN_CMD_ARGS=--max-requests=0']
+            for variable in ('OPENAI_BASE_URL', 'WEB_CONCURRENCY', 'GUNICORN_THREADS'):
+                if variable in env:
+                    command += ['-e', f'{variable}={env[variable]}']
+            command.append(args.image)
+        self.started = time.perf_counter()
+        with open(log_path, 'ab') as log_file:
+            self.process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=log_file, stderr=subprocess.STDOUT)
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self.port}'
+
+    def processes(self) -> List[Dict]:
+        """[{pid, role, rss_mb}] for the server and everything it started"""
+        roles = ROLES[self.kind]
+        if self.kind == 'docker':
+            tree = self._container_tree()
+        else:
+            tree = {pid: (depth, rss_mb(pid)) for pid, depth in process_tree(self.process.pid).items()}
+        rows = [{'pid': pid, 'role': roles[min(depth, len(roles) - 1)], 'rss_mb': round(rss, 1)}
+                for pid, (depth, rss) in tree.items() if rss is not None]
+        return sorted(rows, key=lambda row: (roles.index(row['role']), row['pid']))
+
+    def _container_tree(self) -> Dict[int, tuple]:
+        """pid -> (depth, rss MB) from docker top; the container's first process is depth 0"""
+        completed = subprocess.run(['docker', 'top', self.container, '-eo', 'pid,ppid,rss'],
+                                   capture_output=True, text=True, check=False)
+        rows = [line.split() for line in completed.stdout.splitlines()[1:]]
+        rows = [(int(pid), int(ppid), int(rss) / 1024) for pid, ppid, rss in rows if pid.isdigit()]
+        pids = {pid for pid, _, _ in rows}
+        depth = {pid: 0 for pid, ppid, _ in rows if ppid not in pids}
+        while len(depth) < len(rows):
+            added = {pid: depth[ppid] + 1 for pid, ppid, _ in rows if pid not in depth and ppid in depth}
+            if not added:
+                break
+            depth.update(added)
+        return {pid: (depth.get(pid, 0), rss) for pid, _, rss in rows}
+
+    def stop(self):
+        if self.container:
+            subprocess.run(['docker', 'stop', '-t', '30', self.container], capture_output=True, check=False)
+        stop(self.process)
+
+
+def total_mb(processes: List[Dict]) -> float:
+    return round(sum(row['rss_mb'] for row in processes), 1)
+
+
+def run_operations(target: Target, count: int, mix: Dict[str, float], args) -> List[Dict]:
+    """Send count operations, recording the RSS of every process at each checkpoint"""
+    rng = random.Random(args.seed)
+    payloads = PayloadFactory(args.seed, args.repeat_ratio, f'{target.url}/')
+    kinds, weights = list(mix), list(mix.values())
+    step = max(1, count // args.checkpoints)
+    checkpoints, done, errors = [], 0, 0
+    with httpx.Client(base_url=target.url, timeout=args.timeout) as client, \
+            ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        while done < count:
+            batch = []
+            for _ in range(min(step, count - done)):
+                endpoint = rng.choice(OPERATIONS[rng.choices(kinds, weights)[0]])
+                batch.append((endpoint, payloads.build(endpoint)))
+            statuses = executor.map(lambda item: post(client, *item), batch)
+            errors += sum(status != 200 for status in statuses)
+            done += len(batch)
+            processes = target.processes()
+            checkpoints.append({'operations': done, 'errors': errors, 'total_rss_mb': total_mb(processes),
+                                'processes': processes})
+            print(f"  {done:>6} operations  {total_mb(processes):>8} MB  "
+                  + '  '.join(f"{row['role']} {row['pid']}: {row['rss_mb']}" for row in processes)
+                  + (f"  ({errors} errors)" if errors else ''))
+    return checkpoints
+
+
+def post(client: httpx.Client, endpoint: str, payload: Dict) -> int:
+    try:
+        return client.post(f'/{endpoint}', json=payload).status_code
+    except httpx.HTTPError:
+        return 0
+
+
+def growth(checkpoints: List[Dict]) -> Dict:
+    """Least squares slope of total RSS over operations, leaving out the first checkpoint (first-use imports)"""
+    points = [(point['operations'], point['total_rss_mb']) for point in checkpoints[1:]]
+    if len(points) < 2:
+        return {'mb_per_1000_ops': 0.0, 'r2': 0.0}
+    xs, ys = zip(*points)
+    mean_x, mean_y = statistics.fmean(xs), statistics.fmean(ys)
+    sxx = sum((x - mean_x) ** 2 for x in xs)
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in points)
+    slope = sxy / sxx if sxx else 0.0
+    ss_total = sum((y - mean_y) ** 2 for y in ys)
+    ss_residual = sum((y - (mean_y + slope * (x - mean_x))) ** 2 for x, y in points)
+    return {'mb_per_1000_ops': round(slope * 1000, 2), 'r2': round(1 - ss_residual / ss_total, 3) if ss_total else 0.0}
+
+
+def recycling_verdict(final_mb: float, mb_per_1000_ops: float, workers: int, cap_mb: float,
+                      max_requests: int) -> Dict:
+    """
+    Whether max_requests recycling is needed to stay under the memory cap
+
+    Requests spread evenly over the workers, so each worker grows by about
+    mb_per_1000_ops for every 1000 requests it serves (max_requests counts per worker).
+    """
+    if mb_per_1000_ops <= 0:
+        return {'requests_per_worker_to_cap': None,
+                'verdict': f"RSS is flat: max_requests={max_requests} is not needed for memory"}
+    if final_mb >= cap_mb:
+        return {'requests_per_worker_to_cap': 0,
+                'verdict': f"Already at or over the {cap_mb:g} MB cap before any growth; reduce workers or pools"}
+    to_cap = int((cap_mb - final_mb) / (mb_per_1000_ops * workers) * 1000)
+    if to_cap >= 10 * max_requests:
+        verdict = f"Grows slowly: the cap is ~{to_cap} requests per worker away; max_requests={max_requests} " \
+                  f"is not needed for memory (it could be raised to {to_cap // 2})"
+    elif to_cap >= 2 * max_requests:
+        verdict = f"max_requests={max_requests} keeps a safe margin (cap reached after ~{to_cap} requests per worker)"
+    else:
+        verdict = f"max_requests={max_requests} is too high: the cap is reached after ~{to_cap} requests per worker; " \
+                  f"use max_requests={max(1, to_cap // 2)}"
+    return {'requests_per_worker_to_cap': to_cap, 'verdict': verdict}
+
+
+def measure(kind: str, args, mix: Dict[str, float], llm_port: Optional[int]) -> Dict:
+    log_path = os.path.join(tempfile.gettempdir(), f'footprint-{kind}.log')
+    probe = HEALTH_PROBES[kind]
+    starts = []
+    for run in range(args.starts):
+        target = Target(kind, args, llm_port, log_path)
+        try:
+            try:
+                wait_for_health(target.port, target.process, probe, args.startup_timeout)
+            except RuntimeError as e:
+                raise RuntimeError(f"{kind}: {e} (log: {log_path})")
+            starts.append(round((time.perf_counter() - target.started) * 1000, 1))
+            print(f"{kind}: {probe} answered after {starts[-1]} ms")
+            if run < args.starts - 1:
+                continue
+            time.sleep(args.settle)  # warm-up threads, pools and browsers
+            idle = target.processes()
+            print(f"{kind}: steady state {total_mb(idle)} MB  "
+                  + '  '.join(f"{row['role']} {row['pid']}: {row['rss_mb']}" for row in idle))
+            checkpoints = []
+            if kind != 'streamlit' and args.operations:
+                checkpoints = run_operations(target, args.operations, mix, args)
+        finally:
+            target.stop()
+
+    workers = sum(row['role'] in ('worker', 'server') for row in idle) or 1
+    result = {
+        'target': kind,
+        'cold_start_ms': starts,
+        'cold_start_median_ms': statistics.median(starts),
+        'steady_processes': idle,
+        'steady_total_mb': total_mb(idle),
+        'checkpoints': checkpoints,
+    }
+    if checkpoints:
+        final = checkpoints[-1]
+        result['final_total_mb'] = final['total_rss_mb']
+        result['growth'] = growth(checkpoints)
+        result['recycling'] = recycling_verdict(final['total_rss_mb'], result['growth']['mb_per_1000_ops'],
+                                                workers, args.memory_cap_mb, args.max_requests)
+        before = {row['pid'] for row in idle if row['role'] == 'worker'}
+        after = {row['pid'] for row in final['processes'] if row['role'] == 'worker'}
+        if before - after:
+            result['restarted_workers'] = sorted(before - after)  # crashed, timed out or OOM killed
+    if kind == 'docker':
+        completed = subprocess.run(['docker', 'image', 'inspect', '--format', '{{.Size}}', args.image],
+                                   capture_output=True, text=True, check=False)
+        if completed.stdout.strip().isdigit():
+            result['image_mb'] = round(int(completed.stdout) / 1024 / 1024, 1)
+    return result
+
+
+def print_report(results: List[Dict], args):
+    print(f"\n{'target':<10} {'cold start ms':>13} {'steady MB':>10} {'after N MB':>11} {'MB/1000 ops':>12} {'r2':>6}")
+    for result in results:
+        growth_info = result.get('growth', {})
+        print(f"{result['target']:<10} {result['cold_start_median_ms']:>13} {result['steady_total_mb']:>10} "
+              f"{result.get('final_total_mb', '-'):>11} {growth_info.get('mb_per_1000_ops', '-'):>12} "
+              f"{growth_info.get('r2', '-'):>6}")
+    print(f"\nMemory cap {args.memory_cap_mb} MB, gunicorn max_requests={args.max_requests}:")
+    for result in results:
+        notes = []
+        if 'recycling' in result:
+            notes.append(result['recycling']['verdict'])
+        if result.get('restarted_workers'):
+            notes.append(f"workers {result['restarted_workers']} disappeared during the run")
+        if 'image_mb' in result:
+            notes.append(f"image {result['image_mb']} MB")
+        if result['steady_total_mb'] > args.memory_cap_mb:
+            notes.append("steady state is already over the cap")
+        print(f"  {result['target']}: " + ('; '.join(notes) or 'no operations run'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup and memory footprint benchmark")
+    parser.add_argument('--target', nargs='+', choices=list(HEALTH_PROBES), default=['gunicorn'])
+    parser.add_argument('--starts', type=int, default=3, help='cold starts per target (median reported)')
+    parser.add_argument('--operations', type=int, default=500, help='operations after the last cold start')
+    parser.add_argument('--mix', help='analysis=W,scrape=W,pdf=W (default: 5:2:3)')
+    parser.add_argument('--checkpoints', type=int, default=10, help='RSS samples during the operations')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--repeat-ratio', type=float, default=0.3,
+                        help='share of PDFs that repeat an earlier analysis (cache hits)')
+    parser.add_argument('--workers', type=int, help='WEB_CONCURRENCY for gunicorn and docker')
+    parser.add_argument('--threads', type=int, help='GUNICORN_THREADS for gunicorn and docker')
+    parser.add_argument('--settle', type=float, default=5.0, help='seconds after the health check before measuring')
+    parser.add_argument('--memory-cap-mb', type=float, default=512.0, help='memory limit (docker --memory)')
+    parser.add_argument('--max-requests', type=int, default=1000, help='recycling setting to evaluate')
+    parser.add_argument('--image', default='product-playground:footprint', help='docker image to run')
+    parser.add_argument('--build', action='store_true', help='docker build the image first')
+    parser.add_argument('--timeout', type=float, default=300.0, help='per operation timeout in seconds')
+    parser.add_argument('--startup-timeout', type=float, default=180.0)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--output', help='write results as JSON')
+    parser.add_argument('--llm-ttft-ms', type=float, default=50.0)
+    parser.add_argument('--llm-tokens-per-sec', type=float, default=2000.0)
+    parser.add_argument('--llm-max-tokens', type=int, default=600)
+    parser.add_argument('--llm-error-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    mix = DEFAULT_MIX if not args.mix else {
+        name.strip(): float(weight or 1) for name, _, weight in (part.partition('=') for part in args.mix.split(','))
+    }
+    if args.starts < 1:
+        parser.error('--starts must be at least 1')
+    if set(mix) - set(OPERATIONS):
+        parser.error(f"--mix takes {', '.join(OPERATIONS)}")
+    missing = {
+        'gunicorn': shutil.which('gunicorn') is None,
+        'streamlit': importlib.util.find_spec('streamlit') is None,
+        'docker': shutil.which('docker') is None,
+    }
+    unavailable = [kind for kind in args.target if missing.get(kind)]
+    if unavailable:
+        parser.error(f"not installed here: {', '.join(unavailable)}")
+    if 'docker' in args.target and args.build:
+        subprocess.run(['docker', 'build', '-t', args.image, '.'], cwd=ROOT, check=True)
+
+    llm_port = free_port()
+    # Containers reach the fake LLM through the host gateway, so it must listen beyond loopback
+    llm = start_fake_llm(llm_port, args, host='0.0.0.0' if 'docker' in args.target else '127.0.0.1')
+    results = []
+    try:
+        wait_for_health(llm_port, llm, '/v1/models', args.startup_timeout)
+        for kind in args.target:
+            results.append(measure(kind, args, mix, llm_port))
+    finally:
+        stop(llm)
+
+    print_report(results, args)
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump({'args': vars(args), 'mix': mix, 'results': results}, output_file, indent=2)
+        print(f"Saved {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,505 @@
+"""
+API load test
+Replays a weighted mix of the API endpoints with realistic payloads against
+a local server backed by the fake LLM (fake_openai_server.py) and reports
+requests per second, latency percentiles, error rates and the memory of
+each server process. --sweep repeats the run for several gunicorn
+worker/thread settings to choose the values for gunicorn.conf.py.
+
+Usage:
+    python benchmarks/load_test.py                                  # Flask dev server, 16 users for 60 s
+    python benchmarks/load_test.py --server gunicorn --users 32 --duration 120
+    python benchmarks/load_test.py --rate 8                         # open loop: 8 requests/s arriving at random
+    python benchmarks/load_test.py --mix analyze=3,download-pdf=1   # only these endpoints, 3:1
+    python benchmarks/load_test.py --sweep workers=1,2,4 threads=4,8 --output sweep.json
+    python benchmarks/load_test.py --url http://127.0.0.1:10000     # a server that is already running (no memory figures)
+
+The fake LLM defaults (--llm-ttft-ms, --llm-tokens-per-sec, --llm-max-tokens)
+keep an analysis to a couple of seconds; raise them to match the real API.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cold_start import SERVE_SNIPPET, free_port, server_env, wait_for_health
+from pdf_render import make_analysis
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Endpoint -> relative weight; analyses dominate and roughly one in three is downloaded as a PDF
+DEFAULT_MIX = {
+    'analyze': 18,
+    'analyze-walkthrough': 8,
+    'analyze-kpi': 8,
+    'analyze-website': 5,
+    'analyze-framing': 7,
+    'analyze-dashboard': 7,
+    'analyze-confidence': 6,
+    'analyze-defense': 7,
+    'analyze-retrospective': 4,
+    'download-pdf': 22,
+    'download-portfolio-pdf': 8,
+}
+
+CHALLENGES = [
+    "Our B2B invoicing tool saw week-1 activation drop from 42% to 31% after we moved bank linking "
+    "into onboarding. Sales says prospects love the new flow; support tickets about bank errors doubled.",
+    "A consumer meditation app wants to add a social feed. DAU is flat at 180k, paid conversion is 3.1% "
+    "and the team has one quarter before the next funding conversation.",
+    "We run a marketplace for home cleaners. Repeat bookings fell 12% in two months while new customer "
+    "acquisition grew; cleaners complain about last-minute cancellations.",
+    "Our developer API platform is considering usage-based pricing instead of seats. 60% of revenue "
+    "comes from 40 accounts and self-serve signups are growing 8% month over month.",
+    "A grocery delivery startup must decide whether to launch in a second city or deepen coverage in "
+    "the first, where delivery times average 48 minutes against a 30-minute promise.",
+]
+
+DECISIONS = [
+    "Move bank linking out of onboarding and make it the first task on the dashboard",
+    "Launch a social feed behind a feature flag for 10% of new users",
+    "Introduce a cancellation fee for customers and a reliability bonus for cleaners",
+    "Switch new self-serve customers to usage-based pricing from next month",
+    "Delay the second-city launch by two quarters and fix delivery times first",
+]
+
+AUDIENCES = ["Executive team", "Engineering leads", "Board", "Sales leadership"]
+
+
+class PayloadFactory:
+    """Request bodies for each endpoint; some analyses repeat so PDF and export caches see hits"""
+
+    def __init__(self, seed: int, repeat_ratio: float, site_url: str, pool_size: int = 8):
+        self.rng = random.Random(seed)
+        self.repeat_ratio = repeat_ratio
+        self.site_url = site_url
+        self.pool = [make_analysis(4 + index % 5, seed=index) for index in range(pool_size)]
+        self.fresh = itertools.count(1000)
+
+    def analysis(self) -> str:
+        if self.rng.random() < self.repeat_ratio:
+            return self.rng.choice(self.pool)
+        return make_analysis(self.rng.randint(3, 8), seed=next(self.fresh))
+
+    def build(self, endpoint: str) -> Dict:
+        rng = self.rng
+        challenge, decision = rng.choice(CHALLENGES), rng.choice(DECISIONS)
+        depth = rng.choice(['quick', 'standard', 'standard', 'deep'])
+        if endpoint == 'analyze':
+            return {'context': challenge, 'depth': depth}
+        if endpoint == 'analyze-walkthrough':
+            return {'context': challenge, 'depth': depth, 'walkthrough_data': {
+                'targetUser': 'Operations managers at 20-200 person companies',
+                'decision': decision,
+                'constraints': 'Two engineers, one quarter, no pricing changes',
+                'causes': 'Extra onboarding step; bank connection errors',
+                'success': 'Week-1 activation back above 40%',
+            }}
+        if endpoint == 'analyze-kpi':
+            mau = rng.randint(20_000, 2_000_000)
+            return {'dau': int(mau * rng.uniform(0.1, 0.5)), 'mau': mau, 'avg_session_time': round(rng.uniform(2, 25), 1),
+                    'conversion_rate': round(rng.uniform(0.5, 8), 2), 'churn_rate': round(rng.uniform(1, 12), 2),
+                    'retention_rate': round(rng.uniform(20, 80), 1), 'nps_score': rng.randint(-20, 70),
+                    'revenue_per_user': round(rng.uniform(0.5, 60), 2), 'recent_changes': challenge}
+        if endpoint == 'analyze-website':
+            # The server's own landing page, so scraping stays local
+            return {'website_url': self.site_url, 'additional_context': challenge[:200]}
+        if endpoint == 'analyze-framing':
+            return {'decision': decision, 'options': 'Ship now; ship behind a flag; do nothing',
+                    'constraints': 'One quarter', 'stakeholders': 'Sales, support, finance',
+                    'success': 'Activation +8 points', 'unknowns': 'Impact on enterprise deals'}
+        if endpoint == 'analyze-dashboard':
+            return {'problem': challenge, 'context': 'Series A, 40 people',
+                    'data': 'Activation 31% (was 42%), tickets +100%, NPS 28'}
+        if endpoint == 'analyze-confidence':
+            return {'decision': decision, 'evidence': '12 customer interviews; funnel data for 8 weeks',
+                    'gaps': 'No data on enterprise accounts', 'timeline': 'Decide by end of month'}
+        if endpoint == 'analyze-defense':
+            return {'decision': decision, 'audience': rng.choice(AUDIENCES),
+                    'rationale': 'Fastest path to recovering activation', 'tradeoffs': 'Delays bank-feed roadmap',
+                    'risks': 'Sales demos rely on the current flow'}
+        if endpoint == 'analyze-retrospective':
+            return {'decision': decision, 'expected': 'Activation +10 points', 'actual': 'Activation +4 points',
+                    'assumptions': 'Bank linking was the main blocker', 'differently': 'Run a holdout group'}
+        if endpoint in ('download-pdf', 'download-html', 'download-markdown'):
+            return {'analysis': self.analysis(), 'context': challenge[:160]}
+        if endpoint == 'download-portfolio-pdf':
+            return {'context': challenge[:160], 'analyses': [
+                {'type': rng.choice(['challenge', 'defense', 'framing', 'kpi']), 'analysis': self.analysis()}
+                for _ in range(rng.randint(2, 4))
+            ]}
+        raise ValueError(f"No payload for endpoint {endpoint}")
+
+
+def parse_mix(text: Optional[str]) -> Dict[str, float]:
+    if not text:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        mix[name.strip().lstrip('/')] = float(weight or 1)
+    return mix
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of sorted values"""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, int(round(fraction * len(values) + 0.5)) - 1))]
+
+
+class Recorder:
+    """Outcome of every request in a run"""
+
+    def __init__(self):
+        self.attempts: Counter = Counter()
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, Counter] = defaultdict(Counter)
+        self.started = time.perf_counter()
+        self.finished = self.started
+
+    def record(self, endpoint: str, seconds: Optional[float], error: Optional[str]):
+        """seconds is None for requests that were never sent"""
+        self.attempts[endpoint] += 1
+        if seconds is not None:
+            self.latencies[endpoint].append(seconds)
+        if error:
+            self.errors[endpoint][error] += 1
+        self.finished = time.perf_counter()
+
+    def summary(self) -> Dict:
+        elapsed = max(self.finished - self.started, 1e-9)
+        endpoints = {}
+        everything = []
+        for endpoint in sorted(self.attempts):
+            latencies = sorted(self.latencies[endpoint])
+            everything.extend(latencies)
+            endpoints[endpoint] = self._stats(self.attempts[endpoint], latencies,
+                                              sum(self.errors[endpoint].values()), elapsed)
+            endpoints[endpoint]['errors_by_kind'] = dict(self.errors[endpoint])
+        total_errors = sum(sum(counter.values()) for counter in self.errors.values())
+        total = self._stats(sum(self.attempts.values()), sorted(everything), total_errors, elapsed)
+        return {'elapsed_s': round(elapsed, 1), 'total': total, 'endpoints': endpoints}
+
+    @staticmethod
+    def _stats(requests: int, latencies: List[float], errors: int, elapsed: float) -> Dict:
+        """Throughput counts completed requests; percentiles cover every request that got a response or failed"""
+        return {
+            'requests': requests,
+            'errors': errors,
+            'error_rate': round(errors / requests, 4) if requests else 0.0,
+            'rps': round(len(latencies) / elapsed, 2),
+            **{f'p{int(fraction * 100)}_ms': round(percentile(latencies, fraction) * 1000, 1)
+               for fraction in (0.5, 0.9, 0.95, 0.99)},
+            'max_ms': round(latencies[-1] * 1000, 1) if latencies else 0.0,
+        }
+
+
+async def send(client: httpx.AsyncClient, recorder: Recorder, endpoint: str, payload: Dict):
+    started = time.perf_counter()
+    error = None
+    try:
+        response = await client.post(f'/{endpoint}', json=payload)
+        await response.aread()
+        if response.status_code != 200:
+            error = f'HTTP {response.status_code}'
+    except httpx.HTTPError as e:
+        error = type(e).__name__
+    recorder.record(endpoint, time.perf_counter() - started, error)
+
+
+async def run_load(base_url: str, mix: Dict[str, float], payloads: PayloadFactory, duration: float,
+                   users: int, rate: Optional[float], timeout: float, seed: int) -> Recorder:
+    """
+    Send requests for duration seconds, then wait for those in flight
+
+    Closed loop (default): users each send one request after another.
+    Open loop (rate): requests arrive at random at rate per second however
+    slow the server gets, at most users in flight (the rest count as "client overload").
+    """
+    rng = random.Random(seed)
+    endpoints, weights = list(mix), list(mix.values())
+    recorder = Recorder()
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        if rate:
+            in_flight = set()
+            while time.perf_counter() < deadline:
+                await asyncio.sleep(rng.expovariate(rate))
+                endpoint = rng.choices(endpoints, weights)[0]
+                if len(in_flight) >= users:
+                    recorder.record(endpoint, None, 'client overload')
+                    continue
+                task = asyncio.ensure_future(send(client, recorder, endpoint, payloads.build(endpoint)))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            if in_flight:
+                await asyncio.wait(in_flight)
+        else:
+            async def user():
+                while time.perf_counter() < deadline:
+                    endpoint = rng.choices(endpoints, weights)[0]
+                    await send(client, recorder, endpoint, payloads.build(endpoint))
+            await asyncio.gather(*(user() for _ in range(users)))
+    return recorder
+
+
+def process_tree(pid: int) -> Dict[int, int]:
+    """pid -> depth below pid (0 = pid itself) for a process and its descendants, from /proc"""
+    parents = {}
+    for entry in os.listdir('/proc'):
+        if entry.isdigit():
+            try:
+                with open(f'/proc/{entry}/stat') as stat_file:
+                    # "pid (comm) state ppid ..."; comm may contain spaces
+                    parents[int(entry)] = int(stat_file.read().rsplit(')', 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+    tree, frontier = {pid: 0}, [pid]
+    while frontier:
+        parent = frontier.pop()
+        for child, child_parent in parents.items():
+            if child_parent == parent and child not in tree:
+                tree[child] = tree[parent] + 1
+                frontier.append(child)
+    return tree
+
+
+def rss_mb(pid: int) -> Optional[float]:
+    try:
+        with open(f'/proc/{pid}/status') as status_file:
+            for line in status_file:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+async def sample_memory(pid: int, roles: List[str], peaks: Dict[int, Dict], stop: asyncio.Event, interval: float = 1.0):
+    """Track current and peak RSS of the server's processes until stop is set"""
+    while True:
+        for child, depth in process_tree(pid).items():
+            rss = rss_mb(child)
+            if rss is None:
+                continue
+            entry = peaks.setdefault(child, {'pid': child, 'role': roles[min(depth, len(roles) - 1)],
+                                             'peak_rss_mb': 0.0})
+            entry['rss_mb'] = round(rss, 1)
+            entry['peak_rss_mb'] = round(max(entry['peak_rss_mb'], rss), 1)
+        if stop.is_set():
+            return
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+def start_fake_llm(port: int, args, host: str = '127.0.0.1') -> subprocess.Popen:
+    command = [sys.executable, 'fake_openai_server.py', '--host', host, '--port', str(port),
+               '--ttft-ms', str(args.llm_ttft_ms),
+               '--tokens-per-sec', str(args.llm_tokens_per_sec), '--max-output-tokens', str(args.llm_max_tokens),
+               '--error-rate', str(args.llm_error_rate), '--seed', str(args.seed)]
+    return subprocess.Popen(command, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def start_app(kind: str, port: int, llm_port: int, settings: Dict, log_path: str) -> subprocess.Popen:
+    env = server_env()
+    env.update(OPENAI_BASE_URL=f'http://127.0.0.1:{llm_port}/v1', OPENAI_API_KEY='load-test', PORT=str(port))
+    for key, variable in (('workers', 'WEB_CONCURRENCY'), ('threads', 'GUNICORN_THREADS'),
+                          ('worker_class', 'GUNICORN_WORKER_CLASS'), ('profile', 'SIZING_PROFILE')):
+        if key in settings:
+            env[variable] = str(settings[key])
+    if kind == 'gunicorn':
+        command = ['gunicorn', '--config', 'gunicorn.conf.py', '--bind', f'127.0.0.1:{port}', 'flask_app:app']
+    else:
+        command = [sys.executable, '-c', SERVE_SNIPPET.format(port=port)]
+    with open(log_path, 'ab') as log_file:
+        return subprocess.Popen(command, cwd=ROOT, env=env, stdout=log_file, stderr=subprocess.STDOUT)
+
+
+def stop(process: Optional[subprocess.Popen]):
+    if process is None or process.poll() is not None:
+        return
+    process.terminate()
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def run_once(args, mix: Dict[str, float], settings: Dict, llm_port: Optional[int]) -> Dict:
+    """One load run; starts (and stops) the app server unless --url was given"""
+    server, base_url = None, args.url
+    log_path = os.path.join(tempfile.gettempdir(), 'load-test-server.log')
+    if not base_url:
+        port = free_port()
+        base_url = f'http://127.0.0.1:{port}'
+        server = start_app(args.server, port, llm_port, settings, log_path)
+    try:
+        if server is not None:
+            try:
+                wait_for_health(port, server, '/health', args.startup_timeout)
+            except RuntimeError as e:
+                raise RuntimeError(f"{e} (server log: {log_path})")
+            time.sleep(args.settle)  # let every worker finish its warm-up
+        payloads = PayloadFactory(args.seed, args.repeat_ratio, f'{base_url}/')
+        roles = ['master', 'worker', 'helper'] if args.server == 'gunicorn' else ['server', 'helper']
+        peaks: Dict[int, Dict] = {}
+
+        async def main():
+            done = asyncio.Event()
+            sampler = asyncio.ensure_future(sample_memory(server.pid, roles, peaks, done)) if server else None
+            recorder = await run_load(base_url, mix, payloads, args.duration, args.users, args.rate,
+                                      args.timeout, args.seed)
+            if sampler:
+                done.set()
+                await sampler
+            return recorder
+
+        summary = asyncio.run(main()).summary()
+        processes = sorted(peaks.values(), key=lambda entry: (roles.index(entry['role']), entry['pid']))
+        summary['settings'] = settings
+        summary['processes'] = processes
+        summary['total_rss_mb'] = round(sum(entry['rss_mb'] for entry in processes), 1)
+        summary['peak_total_rss_mb'] = round(sum(entry['peak_rss_mb'] for entry in processes), 1)
+        return summary
+    finally:
+        stop(server)
+
+
+def print_summary(summary: Dict):
+    header = f"{'endpoint':<24} {'requests':>8} {'errors':>7} {'rps':>7} {'p50 ms':>8} {'p90 ms':>8} " \
+             f"{'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+    print(header)
+    print('-' * len(header))
+    rows = list(summary['endpoints'].items()) + [('TOTAL', summary['total'])]
+    for endpoint, stats in rows:
+        print(f"{endpoint:<24} {stats['requests']:>8} {stats['errors']:>7} {stats['rps']:>7} "
+              f"{stats['p50_ms']:>8} {stats['p90_ms']:>8} {stats['p95_ms']:>8} {stats['p99_ms']:>8} {stats['max_ms']:>8}")
+    errors = {f"{endpoint}: {kind}": count for endpoint, stats in summary['endpoints'].items()
+              for kind, count in stats['errors_by_kind'].items()}
+    if errors:
+        print("\nerrors:")
+        for kind, count in sorted(errors.items(), key=lambda item: -item[1]):
+            print(f"  {count:>6}  {kind}")
+    if summary['processes']:
+        print(f"\n{'pid':>8} {'role':<8} {'rss MB':>8} {'peak MB':>8}")
+        for entry in summary['processes']:
+            print(f"{entry['pid']:>8} {entry['role']:<8} {entry['rss_mb']:>8} {entry['peak_rss_mb']:>8}")
+        print(f"{'':>8} {'total':<8} {summary['total_rss_mb']:>8} {summary['peak_total_rss_mb']:>8}")
+
+
+def parse_sweep(items: List[str]) -> List[Dict]:
+    """["workers=1,2", "threads=4,8"] -> every combination as settings dicts"""
+    axes = []
+    for item in items:
+        key, _, values = item.partition('=')
+        axes.append([(key, int(value) if value.isdigit() else value) for value in values.split(',') if value])
+    return [dict(combination) for combination in itertools.product(*axes)]
+
+
+def best_settings(results: List[Dict], max_error_rate: float, p95_slo_ms: Optional[float]) -> Optional[Dict]:
+    """Highest throughput within the error (and p95) limits; less memory breaks ties"""
+    eligible = [result for result in results if result['total']['error_rate'] <= max_error_rate
+                and (p95_slo_ms is None or result['total']['p95_ms'] <= p95_slo_ms)]
+    if not eligible:
+        return None
+    return max(eligible, key=lambda result: (result['total']['rps'], -result['peak_total_rss_mb']))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API load test with a fake LLM backend")
+    parser.add_argument('--server', choices=['flask', 'gunicorn'], default='flask')
+    parser.add_argument('--url', help='load an already running server instead of starting one')
+    parser.add_argument('--mix', help='endpoint=weight,... (default: all analysis and PDF endpoints)')
+    parser.add_argument('--duration', type=float, default=60.0, help='seconds of load per run')
+    parser.add_argument('--users', type=int, default=16, help='concurrent users (open loop: max in flight)')
+    parser.add_argument('--rate', type=float, help='open loop arrival rate in requests/s')
+    parser.add_argument('--repeat-ratio', type=float, default=0.3,
+                        help='share of downloads that repeat an earlier analysis (cache hits)')
+    parser.add_argument('--timeout', type=float, default=300.0, help='per request timeout in seconds')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--settle', type=float, default=3.0, help='seconds between /health and the first request')
+    parser.add_argument('--startup-timeout', type=float, default=120.0)
+    parser.add_argument('--sweep', nargs='+', metavar='KEY=V1,V2',
+                        help='gunicorn settings to try: workers=, threads=, worker_class=, profile=')
+    parser.add_argument('--max-error-rate', type=float, default=0.01, help='sweep: highest acceptable error rate')
+    parser.add_argument('--p95-slo-ms', type=float, help='sweep: highest acceptable p95 latency')
+    parser.add_argument('--output', help='write results as JSON')
+    parser.add_argument('--llm-ttft-ms', type=float, default=300.0)
+    parser.add_argument('--llm-tokens-per-sec', type=float, default=400.0)
+    parser.add_argument('--llm-max-tokens', type=int, default=600)
+    parser.add_argument('--llm-error-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    if args.sweep and args.url:
+        parser.error('--sweep starts its own servers; drop --url')
+    if args.sweep:
+        args.server = 'gunicorn'
+    if args.server == 'gunicorn' and not args.url and not shutil.which('gunicorn'):
+        parser.error('gunicorn is not installed (pip install -r requirements.txt)')
+    mix = parse_mix(args.mix)
+    unknown = set(mix) - set(DEFAULT_MIX) - {'download-html', 'download-markdown'}
+    if unknown:
+        parser.error(f"unknown endpoints in --mix: {', '.join(sorted(unknown))}")
+
+    llm, llm_port = None, None
+    if not args.url:
+        llm_port = free_port()
+        llm = start_fake_llm(llm_port, args)
+        wait_for_health(llm_port, llm, '/v1/models', args.startup_timeout)
+    mode = f"{args.rate}/s open loop (max {args.users} in flight)" if args.rate else f"{args.users} users"
+    print(f"{len(mix)} endpoints, {mode}, {args.duration:g} s per run; fake LLM TTFT {args.llm_ttft_ms:g} ms, "
+          f"{args.llm_tokens_per_sec:g} tok/s, {args.llm_max_tokens} max tokens\n")
+
+    results = []
+    try:
+        for settings in parse_sweep(args.sweep) if args.sweep else [{}]:
+            if settings:
+                print(f"=== {' '.join(f'{key}={value}' for key, value in settings.items())}")
+            summary = run_once(args, mix, settings, llm_port)
+            results.append(summary)
+            print_summary(summary)
+            print()
+    finally:
+        stop(llm)
+
+    if args.sweep:
+        print(f"{'settings':<40} {'rps':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7} {'peak MB':>8}")
+        for result in sorted(results, key=lambda result: -result['total']['rps']):
+            total = result['total']
+            label = ' '.join(f'{key}={value}' for key, value in result['settings'].items())
+            print(f"{label:<40} {total['rps']:>7} {total['p50_ms']:>8} {total['p95_ms']:>8} {total['p99_ms']:>8} "
+                  f"{total['error_rate']:>7.1%} {result['peak_total_rss_mb']:>8}")
+        best = best_settings(results, args.max_error_rate, args.p95_slo_ms)
+        if best is None:
+            print("\nNo setting met the error rate / p95 limits")
+        else:
+            variables = {'workers': 'WEB_CONCURRENCY', 'threads': 'GUNICORN_THREADS',
+                         'worker_class': 'GUNICORN_WORKER_CLASS', 'profile': 'SIZING_PROFILE'}
+            print("\nBest: " + ' '.join(f"{variables[key]}={value}" for key, value in best['settings'].items()))
+
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump({'args': vars(args), 'mix': mix, 'results': results}, output_file, indent=2)
+        print(f"Saved {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Markdown compiler throughput benchmark
+Measures lines per second for converting large LLM-style reports into
+flowables, with and without ReportLab paragraph parsing.
+
+Usage:
+    python benchmarks/markdown_compile.py
+    python benchmarks/markdown_compile.py --sections 50 200 800 --repeats 5
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pdf_render import make_analysis
+from reportlab.platypus import Paragraph
+
+from markdown_pdf import MarkdownCompiler, PendingParagraph
+from pdf_report import ANALYSIS_MARKDOWN
+
+
+def best_time(function, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Markdown compiler throughput benchmark")
+    parser.add_argument('--sections', type=int, nargs='+', default=[50, 200, 800])
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    # Same styles, but building real Paragraphs (what the Streamlit paths do)
+    parsing = MarkdownCompiler(ANALYSIS_MARKDOWN.styles, width=ANALYSIS_MARKDOWN.width,
+                               table_style=ANALYSIS_MARKDOWN.table_style, section_marker='▸ ',
+                               callouts=ANALYSIS_MARKDOWN.callouts)
+
+    print(f"{'sections':>8} {'lines':>7} {'compile lines/s':>16} {'+ parse lines/s':>16} {'flowables':>10}")
+    for sections in args.sections:
+        text = make_analysis(sections)
+        lines = text.count('\n') + 1
+        elements = ANALYSIS_MARKDOWN.compile(text)
+        assert any(isinstance(element, PendingParagraph) for element in elements)
+
+        compile_seconds = best_time(lambda: ANALYSIS_MARKDOWN.compile(text), args.repeats)
+        parse_seconds = best_time(lambda: parsing.compile(text), max(1, args.repeats // 2))
+        assert any(isinstance(element, Paragraph) for element in parsing.compile(text))
+
+        print(f"{sections:>8} {lines:>7} {lines / compile_seconds:>16,.0f} {lines / parse_seconds:>16,.0f} "
+              f"{len(elements):>10}")
+
+
+if __name__ == '__main__':
+    main()
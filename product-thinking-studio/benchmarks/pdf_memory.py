@@ -0,0 +1,64 @@
+"""
+PDF export memory benchmark
+Measures peak traced allocations while rendering reports of 25 to 200 pages,
+to check that memory stays roughly flat as reports grow.
+
+Usage:
+    python benchmarks/pdf_memory.py                    # render into memory (BytesIO)
+    python benchmarks/pdf_memory.py --to-file          # render into a temporary file
+    python benchmarks/pdf_memory.py --via-flask        # go through POST /download-pdf (works on older trees too)
+"""
+import argparse
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pdf_render import count_pages, make_analysis, make_renderer, sections_for_pages
+
+
+def make_file_renderer():
+    """Return a function analysis_text -> page count that writes the PDF to a temp file"""
+    from pdf_report import render_analysis_pdf
+
+    def render(analysis_text):
+        with tempfile.TemporaryFile() as output:
+            render_analysis_pdf(analysis_text, 'Benchmark run', output=output)
+            output.seek(0)
+            return count_pages(output.read())
+    return render
+
+
+def peak_kb(render, analysis_text: str):
+    """Peak traced allocations (KB) for one render, plus the render result"""
+    tracemalloc.start()
+    result = render(analysis_text)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return round(peak / 1024, 1), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF export memory benchmark")
+    parser.add_argument('--via-flask', action='store_true', help='render through POST /download-pdf')
+    parser.add_argument('--to-file', action='store_true', help='render into a temporary file instead of memory')
+    parser.add_argument('--pages', type=int, nargs='+', default=[25, 50, 100, 200])
+    args = parser.parse_args()
+
+    render = make_renderer(args.via_flask)
+    per_section = sections_for_pages(render, 100) / 100
+    measured = make_file_renderer() if args.to_file else render
+    measured(make_analysis(2))  # warm caches and lazy imports
+
+    print(f"{'target':>6} {'pages':>6} {'peak alloc KB':>14} {'KB per page':>12}")
+    for target in args.pages:
+        analysis_text = make_analysis(max(1, round(target * per_section)))
+        peak, result = peak_kb(measured, analysis_text)
+        pages = result if isinstance(result, int) else count_pages(result)
+        print(f"{target:>6} {pages:>6} {peak:>14} {peak / max(pages, 1):>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
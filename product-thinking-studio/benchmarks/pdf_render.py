@@ -0,0 +1,111 @@
+"""
+PDF render benchmark
+Measures CPU time and peak traced allocations per PDF for reports of
+roughly 5, 20 and 100 pages.
+
+Usage:
+    python benchmarks/pdf_render.py                 # call the renderer directly
+    python benchmarks/pdf_render.py --via-flask     # go through POST /download-pdf (works on older trees too)
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'app'))
+
+from fake_openai_server import build_report
+
+
+PAGE_PATTERN = re.compile(rb'/Type /Page\b(?!s)')
+HEADINGS = [
+    "## 🎯 Executive Summary", "## Target Customer Segments", "## ⚠️ Risks & Mitigation",
+    "## 📊 Success Metrics", "## Opportunity Areas for PM Focus", "## ✅ Next Steps",
+]
+
+
+def make_analysis(sections: int, seed: int = 42) -> str:
+    """Deterministic LLM-style markdown with the given number of sections"""
+    prompt = "\n".join(HEADINGS[index % len(HEADINGS)] for index in range(sections))
+    return build_report(prompt, random.Random(seed))
+
+
+def count_pages(pdf_bytes: bytes) -> int:
+    return len(PAGE_PATTERN.findall(pdf_bytes))
+
+
+def make_renderer(via_flask: bool):
+    """Return a function analysis_text -> pdf bytes"""
+    if via_flask:
+        os.environ.setdefault('OPENAI_API_KEY', 'benchmark')
+        # Render every request in this process so repeats are measured, not served from cache
+        os.environ.setdefault('PDF_CACHE_MAX_MB', '0')
+        os.environ.setdefault('PDF_RENDER_WORKERS', '0')
+        import flask_app
+        client = flask_app.app.test_client()
+
+        def render(analysis_text):
+            response = client.post('/download-pdf', json={'analysis': analysis_text, 'context': 'Benchmark run'})
+            assert response.status_code == 200, response.get_data(as_text=True)[:200]
+            return response.get_data()
+        return render
+
+    from pdf_report import render_analysis_pdf
+    return lambda analysis_text: render_analysis_pdf(analysis_text, 'Benchmark run')
+
+
+def sections_for_pages(render, target_pages: int) -> int:
+    """Estimate how many sections produce roughly target_pages pages"""
+    probe = 10
+    pages = count_pages(render(make_analysis(probe))) - 2  # cover and closing page
+    per_section = max(pages, 1) / probe
+    return max(1, round(target_pages / per_section))
+
+
+def measure(render, analysis_text: str, repeats: int) -> dict:
+    render(analysis_text)  # warm caches and lazy imports
+
+    cpu_times = []
+    for _ in range(repeats):
+        started = time.process_time()
+        pdf_bytes = render(analysis_text)
+        cpu_times.append(time.process_time() - started)
+
+    tracemalloc.start()
+    render(analysis_text)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'pages': count_pages(pdf_bytes),
+        'cpu_ms': round(min(cpu_times) * 1000, 1),
+        'cpu_ms_mean': round(sum(cpu_times) / len(cpu_times) * 1000, 1),
+        'peak_alloc_kb': round(peak / 1024, 1),
+        'size_kb': round(len(pdf_bytes) / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF render benchmark")
+    parser.add_argument('--via-flask', action='store_true', help='render through POST /download-pdf')
+    parser.add_argument('--pages', type=int, nargs='+', default=[5, 20, 100])
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    render = make_renderer(args.via_flask)
+    print(f"{'target':>6} {'pages':>6} {'cpu ms (min)':>13} {'cpu ms (mean)':>14} {'peak alloc KB':>14} {'size KB':>8}")
+    for target in args.pages:
+        analysis_text = make_analysis(sections_for_pages(render, target))
+        repeats = max(1, args.repeats if target <= 20 else args.repeats // 2)
+        result = measure(render, analysis_text, repeats)
+        print(f"{target:>6} {result['pages']:>6} {result['cpu_ms']:>13} {result['cpu_ms_mean']:>14} "
+              f"{result['peak_alloc_kb']:>14} {result['size_kb']:>8}")
+
+
+if __name__ == '__main__':
+    main()
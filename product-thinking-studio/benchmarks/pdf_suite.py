@@ -0,0 +1,231 @@
+"""
+PDF render benchmark suite and regression gate
+Renders a fixed corpus of LLM-style reports (short, long, list-heavy,
+table-heavy) with the report renderer directly, each case in a fresh
+process, and records pages per second, peak RSS and output size. Results are
+saved as JSON; pass an earlier results file to flag regressions.
+
+Usage:
+    python benchmarks/pdf_suite.py --output before.json
+    python benchmarks/pdf_suite.py --baseline before.json --output after.json
+    python benchmarks/pdf_suite.py --cases short list_heavy --repeats 5 --threshold 0.25
+
+Exits with status 1 when any metric regresses by more than the threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pdf_render import count_pages, make_analysis
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Metric -> True if bigger is better; compared against the baseline
+GATED_METRICS = {
+    'pages_per_sec': True,
+    'peak_rss_mb': False,
+    'size_kb': False,
+}
+
+
+def list_heavy(seed: int = 7) -> str:
+    """Nested bullet and numbered lists with short bold labels, as models write for plans"""
+    rng = random.Random(seed)
+    verbs = ["Validate", "Instrument", "Interview", "Prototype", "Measure", "Ship", "Segment", "Prioritize"]
+    nouns = ["onboarding", "pricing page", "activation", "retention cohort", "checkout", "search", "alerts"]
+    parts = []
+    for section in range(30):
+        parts.append(f"## Workstream {section + 1}: {rng.choice(nouns).title()}")
+        items = []
+        for item in range(8):
+            items.append(f"{item + 1}. **{rng.choice(verbs)} {rng.choice(nouns)}:** "
+                         f"owner PM, due week {rng.randint(1, 12)}")
+            for _ in range(3):
+                items.append(f"   - {rng.choice(verbs)} the {rng.choice(nouns)} with *{rng.randint(5, 40)}* users")
+                items.append(f"      - Signal: `{rng.choice(nouns).replace(' ', '_')}_rate` above {rng.randint(10, 60)}%")
+        parts.append("\n".join(items))
+    return "\n\n".join(parts)
+
+
+def table_heavy(seed: int = 11) -> str:
+    """Metric tables with several columns, as models write for KPI diagnostics"""
+    rng = random.Random(seed)
+    metrics = ["DAU", "WAU", "Activation", "D7 retention", "Conversion", "ARPU", "Churn", "NPS", "Tickets"]
+    parts = []
+    for section in range(25):
+        parts.append(f"## 📊 Cohort {section + 1} Metrics")
+        parts.append("Week over week movement by segment, with the likely driver for each change.")
+        rows = ["| Metric | Baseline | Current | Change | Segment | Likely driver |",
+                "|---|---:|---:|---:|---|---|"]
+        for metric in rng.sample(metrics, 8):
+            baseline = rng.randint(100, 9000)
+            current = int(baseline * rng.uniform(0.7, 1.3))
+            rows.append(f"| {metric} | {baseline:,} | {current:,} | {(current - baseline) / baseline:+.1%} | "
+                        f"{rng.choice(['New', 'Returning', 'Enterprise', 'SMB'])} | "
+                        f"**{rng.choice(['Seasonality', 'Pricing change', 'Bug', 'Campaign'])}** in week "
+                        f"{rng.randint(1, 8)} |")
+        parts.append("\n".join(rows))
+        parts.append(f"**Confidence:** {rng.choice(['Low', 'Medium', 'High'])}")
+    return "\n\n".join(parts)
+
+
+# Case name -> (builder, context); builders are deterministic
+CORPUS = {
+    'short': (lambda: make_analysis(3), "Should we add a free tier?"),
+    'medium': (lambda: make_analysis(24), "Q3 activation drop across self-serve signups"),
+    'long': (lambda: make_analysis(120), "Annual portfolio review"),
+    'list_heavy': (list_heavy, "Launch plan for the new onboarding flow"),
+    'table_heavy': (table_heavy, "Weekly KPI diagnostics"),
+}
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far"""
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def run_case(name: str, repeats: int) -> dict:
+    """Render one corpus case in this process and return its measurements"""
+    sys.path.insert(0, os.path.join(ROOT, 'app'))
+    from pdf_report import render_analysis_pdf
+
+    builder, context = CORPUS[name]
+    analysis_text = builder()
+    timestamp = datetime(2026, 1, 1, 9, 0)  # fixed so output size is comparable across runs
+    rss_before = peak_rss_mb()
+
+    wall_times, cpu_times = [], []
+    for _ in range(repeats):
+        wall_started, cpu_started = time.perf_counter(), time.process_time()
+        pdf_bytes = render_analysis_pdf(analysis_text, context, timestamp)
+        wall_times.append(time.perf_counter() - wall_started)
+        cpu_times.append(time.process_time() - cpu_started)
+
+    pages = count_pages(pdf_bytes)
+    return {
+        'lines': analysis_text.count('\n') + 1,
+        'pages': pages,
+        'wall_ms': round(min(wall_times) * 1000, 1),
+        'cpu_ms': round(min(cpu_times) * 1000, 1),
+        'pages_per_sec': round(pages / min(wall_times), 1),
+        'peak_rss_mb': peak_rss_mb(),
+        'import_rss_mb': rss_before,
+        'size_kb': round(len(pdf_bytes) / 1024, 1),
+    }
+
+
+def measure_case(name: str, repeats: int) -> dict:
+    """Run one case in a fresh interpreter so peak RSS is not shared between cases"""
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--run-case', name, '--repeats', str(repeats)],
+        capture_output=True, text=True, check=False,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"case {name} failed:\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True, check=False).stdout.strip()
+    except OSError:
+        commit = ''
+    sys.path.insert(0, os.path.join(ROOT, 'app'))
+    import reportlab
+    from pdf_service import TEMPLATE_VERSION
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit or None,
+        'python': platform.python_version(),
+        'reportlab': reportlab.Version,
+        'template_version': TEMPLATE_VERSION,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    Metrics that got worse than the baseline by more than threshold
+
+    Args:
+        results: Current {'cases': {name: metrics}}
+        baseline: Earlier results in the same format
+        threshold: Allowed relative change (0.1 = 10%)
+
+    Returns:
+        List of (case, metric, baseline value, current value, relative change)
+    """
+    regressions = []
+    for name, current in results['cases'].items():
+        previous = baseline.get('cases', {}).get(name)
+        if not previous:
+            continue
+        for metric, higher_is_better in GATED_METRICS.items():
+            before, after = previous.get(metric), current.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            worse = -change if higher_is_better else change
+            if worse > threshold:
+                regressions.append((name, metric, before, after, change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF render benchmark suite")
+    parser.add_argument('--cases', nargs='+', choices=sorted(CORPUS), default=list(CORPUS))
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--output', help='write results as JSON to this path')
+    parser.add_argument('--baseline', help='earlier results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.15, help='allowed relative regression (default 0.15)')
+    parser.add_argument('--run-case', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_case:
+        print(json.dumps(run_case(args.run_case, max(1, args.repeats))))
+        return 0
+
+    results = {'environment': environment(), 'repeats': args.repeats, 'cases': {}}
+    print(f"{'case':<12} {'lines':>6} {'pages':>6} {'wall ms':>9} {'pages/s':>8} {'peak RSS MB':>12} {'size KB':>8}")
+    for name in args.cases:
+        result = measure_case(name, args.repeats)
+        results['cases'][name] = result
+        print(f"{name:<12} {result['lines']:>6} {result['pages']:>6} {result['wall_ms']:>9} "
+              f"{result['pages_per_sec']:>8} {result['peak_rss_mb']:>12} {result['size_kb']:>8}")
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(results, output, indent=2)
+        print(f"\nSaved results to {args.output}")
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline) as baseline_file:
+        baseline = json.load(baseline_file)
+    regressions = compare(results, baseline, args.threshold)
+    print(f"\nCompared with {args.baseline} (commit {baseline.get('environment', {}).get('commit')}), "
+          f"threshold {args.threshold:.0%}")
+    if not regressions:
+        print("No regressions")
+        return 0
+    for name, metric, before, after, change in regressions:
+        print(f"REGRESSION {name}.{metric}: {before} -> {after} ({change:+.1%})")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
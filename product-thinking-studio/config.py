@@ -1,15 +1,25 @@
 """
 Production configuration for Product Playground
+Flask settings per environment, and sizing profiles that set the gunicorn
+worker topology and the pool and cache sizes for the machine we run on.
 """
+import math
 import os
 
+from dotenv import load_dotenv
+
+# Before anything below reads the environment, so .env values count as set
+load_dotenv()
+
 class ProductionConfig:
     """Production environment configuration"""
     
     # Flask settings
     DEBUG = False
     TESTING = False
-    SECRET_KEY = os.getenv('SECRET_KEY', os.urandom(24).hex())
+    # gunicorn.conf.py sets one for all workers when it is missing; the random
+    # fallback is only safe for a single process (flask run, tests)
+    SECRET_KEY = os.getenv('SECRET_KEY') or os.urandom(24).hex()
     
     # API Keys
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
@@ -24,7 +34,8 @@ class ProductionConfig:
     CORS_ORIGINS = os.getenv('CORS_ORIGINS', '*').split(',')
     
     # Performance settings
-    SEND_FILE_MAX_AGE_DEFAULT = 31536000  # 1 year for static files
+    # Unversioned files (robots.txt, sitemap.xml, /static/...); fingerprinted /assets/ URLs are cached for a year
+    SEND_FILE_MAX_AGE_DEFAULT = 3600
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max request size
     
     # Rate limiting
@@ -83,6 +94,193 @@ config = {
 }
 
 def get_config():
-    """Get configuration based on FLASK_ENV"""
-    env = os.getenv('FLASK_ENV', 'development')
+    """Get configuration based on FLASK_ENV (production unless set: containers do not set it)"""
+    env = os.getenv('FLASK_ENV', 'production')
     return config.get(env, config['default'])
+
+
+# Sizing profiles. workers and threads are per gunicorn instance; "auto" workers
+# scale with CPUs, capped by what fits in memory at worker_mb each. Pool and cache
+# sizes are per worker and are applied as environment defaults (see apply_sizing),
+# so any variable that is already set wins.
+SIZING_PROFILES = {
+    # Render free tier and other 512 MB boxes
+    'small': {
+        'workers': 1,
+        'threads': 2,
+        'worker_class': 'gthread',
+        'worker_mb': 200,
+        'env': {
+            'PDF_RENDER_WORKERS': 1,
+            'PDF_RENDER_QUEUE': 4,
+            'PDF_CACHE_MAX_MB': 64,
+            'EXPORT_CACHE_MAX_MB': 16,
+            'OPENAI_KEEPALIVE_CONNECTIONS': 4,
+            'SCRAPER_BROWSER_POOL': 0,
+        },
+    },
+    # 1-4 GB, a few CPUs
+    'standard': {
+        'workers': 'auto',
+        'threads': 4,
+        'worker_class': 'gthread',
+        'worker_mb': 250,
+        'env': {
+            'PDF_RENDER_WORKERS': 1,
+            'PDF_RENDER_QUEUE': 8,
+            'PDF_CACHE_MAX_MB': 256,
+            'EXPORT_CACHE_MAX_MB': 32,
+            'OPENAI_KEEPALIVE_CONNECTIONS': 8,
+            'SCRAPER_BROWSER_POOL': 0,
+        },
+    },
+    # 4 GB and up: more threads per worker (analyses mostly wait on the LLM) and a warm browser
+    'large': {
+        'workers': 'auto',
+        'threads': 8,
+        'worker_class': 'gthread',
+        'worker_mb': 450,
+        'env': {
+            'PDF_RENDER_WORKERS': 2,
+            'PDF_RENDER_QUEUE': 16,
+            'PDF_CACHE_MAX_MB': 1024,
+            'EXPORT_CACHE_MAX_MB': 64,
+            'OPENAI_KEEPALIVE_CONNECTIONS': 16,
+            'SCRAPER_BROWSER_POOL': 1,
+        },
+    },
+}
+
+# Memory kept free for the master process, render processes' peaks and the OS
+RESERVED_MB = 256
+
+# Worker classes gunicorn understands; the async ones need their package installed
+WORKER_CLASSES = ('sync', 'gthread', 'gevent', 'eventlet')
+
+
+def _read_first_line(path):
+    try:
+        with open(path) as f:
+            return f.readline().strip()
+    except OSError:
+        return None
+
+
+def detect_cpus():
+    """CPUs available to this process, honouring affinity and cgroup CPU quotas"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    quota = _read_first_line('/sys/fs/cgroup/cpu.max')  # cgroup v2: "<quota> <period>" or "max <period>"
+    if quota and not quota.startswith('max'):
+        limit, period = quota.split()
+        cpus = min(cpus, max(1, math.ceil(int(limit) / int(period))))
+    else:
+        limit = _read_first_line('/sys/fs/cgroup/cpu/cpu.cfs_quota_us')  # cgroup v1
+        period = _read_first_line('/sys/fs/cgroup/cpu/cpu.cfs_period_us')
+        if limit and period and int(limit) > 0:
+            cpus = min(cpus, max(1, math.ceil(int(limit) / int(period))))
+    return cpus
+
+
+def detect_memory_mb():
+    """Memory available to this process in MB: the cgroup limit if there is one, else physical memory"""
+    memory = None
+    try:
+        memory = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (ValueError, OSError, AttributeError):
+        pass
+    for path in ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        limit = _read_first_line(path)
+        if limit and limit.isdigit():
+            # cgroup v1 reports a huge number when there is no limit
+            memory = int(limit) if memory is None else min(memory, int(limit))
+            break
+    return memory // (1024 * 1024) if memory else None
+
+
+def detect_profile(cpus, memory_mb):
+    """Profile for the detected machine"""
+    if memory_mb is None or memory_mb < 1024:
+        return 'small'
+    if memory_mb < 4096 or cpus < 4:
+        return 'standard'
+    return 'large'
+
+
+def resolve_sizing(cpus=None, memory_mb=None):
+    """
+    Effective sizing for this instance
+
+    SIZING_PROFILE picks small, standard or large ("auto", the default, picks
+    from CPUs and memory). WEB_CONCURRENCY (or GUNICORN_WORKERS),
+    GUNICORN_THREADS and GUNICORN_WORKER_CLASS override the profile.
+
+    Args:
+        cpus: Override CPU detection
+        memory_mb: Override memory detection
+
+    Returns:
+        Dict with profile, cpus, memory_mb, workers, threads, worker_class and env (pool/cache defaults)
+    """
+    cpus = cpus or detect_cpus()
+    memory_mb = memory_mb if memory_mb is not None else detect_memory_mb()
+    name = os.getenv('SIZING_PROFILE', 'auto').strip().lower()
+    if name not in SIZING_PROFILES:
+        if name != 'auto':
+            print(f"Unknown SIZING_PROFILE {name!r}; detecting one instead")
+        name = detect_profile(cpus, memory_mb)
+    profile = SIZING_PROFILES[name]
+
+    workers = profile['workers']
+    if workers == 'auto':
+        workers = max(2, min(cpus, 8)) if name == 'standard' else max(4, min(2 * cpus, 16))
+        if memory_mb:
+            workers = min(workers, max(1, (memory_mb - RESERVED_MB) // profile['worker_mb']))
+    workers = int(os.getenv('WEB_CONCURRENCY') or os.getenv('GUNICORN_WORKERS') or workers)
+    threads = int(os.getenv('GUNICORN_THREADS') or profile['threads'])
+
+    worker_class = os.getenv('GUNICORN_WORKER_CLASS') or profile['worker_class']
+    if worker_class not in WORKER_CLASSES:
+        print(f"Unknown GUNICORN_WORKER_CLASS {worker_class!r}; using gthread")
+        worker_class = 'gthread'
+    if worker_class in ('gevent', 'eventlet'):
+        try:
+            __import__(worker_class)
+        except ImportError:
+            print(f"{worker_class} is not installed; using gthread")
+            worker_class = 'gthread'
+    if worker_class == 'sync' and threads > 1:
+        worker_class = 'gthread'  # what gunicorn does anyway; stated so logs match
+
+    return {
+        'profile': name,
+        'cpus': cpus,
+        'memory_mb': memory_mb,
+        'workers': max(1, workers),
+        'threads': max(1, threads),
+        'worker_class': worker_class,
+        'env': {key: str(value) for key, value in profile['env'].items()},
+    }
+
+
+def apply_sizing(sizing=None, environ=None):
+    """
+    Set the profile's pool and cache sizes as environment defaults
+
+    Must run before the modules that read them at import (pdf_service,
+    report_export, web_scraper). Variables that are already set are kept.
+
+    Args:
+        sizing: Sizing to apply (default: resolve_sizing())
+        environ: Mapping to set the defaults in (default: os.environ)
+
+    Returns:
+        The sizing that was applied
+    """
+    sizing = sizing or resolve_sizing()
+    environ = os.environ if environ is None else environ
+    for key, value in sizing['env'].items():
+        environ.setdefault(key, value)
+    return sizing
@@ -0,0 +1,246 @@
+"""
+Fake OpenAI-compatible server for offline load testing
+Serves /v1/chat/completions (plain and streaming) with canned report markdown
+and configurable latency, throughput and error injection.
+
+Usage:
+    python fake_openai_server.py --port 8001 --ttft-ms 400 --tokens-per-sec 60
+    OPENAI_BASE_URL=http://127.0.0.1:8001/v1 OPENAI_API_KEY=fake gunicorn flask_app:app
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+
+from flask import Flask, Response, jsonify, request
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from prompt_budget import TokenCounter
+
+
+DEFAULT_SECTIONS = [
+    "## 🎯 Executive Summary",
+    "## 🔍 Key Findings",
+    "## ⚠️ Risks & Mitigation",
+    "## 📊 Success Metrics",
+    "## ✅ Recommended Next Steps",
+]
+
+PARAGRAPHS = [
+    "The available signals point to a focused opportunity rather than a broad repositioning. "
+    "The strongest evidence comes from usage patterns, while pricing and retention data remain thin.",
+    "Second-order effects matter here: a faster launch improves learning velocity but increases support load "
+    "and can erode trust if onboarding quality drops.",
+    "Stakeholders are likely to push back on timing more than on direction, so the brief should anchor on "
+    "reversibility and on the checkpoints that would trigger a change of course.",
+    "Confidence is moderate. The core assumption about user demand is supported by qualitative feedback "
+    "but has not been validated with a controlled experiment.",
+]
+
+BULLETS = [
+    "**Primary driver:** activation drop-off in the first session",
+    "**Leading indicator:** week-one retention for new cohorts",
+    "**Risk:** engineering capacity is shared with the platform migration",
+    "**Mitigation:** stage the rollout behind a feature flag",
+    "**Open question:** does the enterprise segment value this enough to pay for it?",
+    "**Owner:** product lead, with weekly review in the staff meeting",
+]
+
+TABLE = """| Option | Pros | Cons | Decision |
+|--------|------|------|----------|
+| Ship now | Faster learning | Higher support load | ✓ Selected |
+| Delay a quarter | More polish | Competitive lag | ✗ Rejected |"""
+
+_HEADING_PATTERN = re.compile(r"^(##\s+.+?)\s*$", re.MULTILINE)
+
+
+class FakeLLMConfig:
+    """Latency, throughput and failure settings for the fake server"""
+
+    def __init__(self, ttft_ms: float = 300.0, tokens_per_sec: float = 80.0, error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, max_output_tokens: int = 1500, seed: int = None):
+        self.ttft_ms = ttft_ms
+        self.tokens_per_sec = tokens_per_sec
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.max_output_tokens = max_output_tokens
+        self.seed = seed
+
+    @classmethod
+    def from_env(cls) -> "FakeLLMConfig":
+        seed = os.getenv("FAKE_LLM_SEED")
+        return cls(
+            ttft_ms=float(os.getenv("FAKE_LLM_TTFT_MS", "300")),
+            tokens_per_sec=float(os.getenv("FAKE_LLM_TOKENS_PER_SEC", "80")),
+            error_rate=float(os.getenv("FAKE_LLM_ERROR_RATE", "0")),
+            rate_limit_rate=float(os.getenv("FAKE_LLM_RATE_LIMIT_RATE", "0")),
+            max_output_tokens=int(os.getenv("FAKE_LLM_MAX_OUTPUT_TOKENS", "1500")),
+            seed=int(seed) if seed else None,
+        )
+
+
+def build_report(prompt: str, rng: random.Random) -> str:
+    """Canned markdown report using the section headings requested in the prompt"""
+    headings = _HEADING_PATTERN.findall(prompt) or DEFAULT_SECTIONS
+    parts = []
+    for index, heading in enumerate(headings):
+        parts.append(heading)
+        parts.extend(rng.sample(PARAGRAPHS, 2))
+        parts.append("### What the evidence shows")
+        parts.append("\n".join(f"- {bullet}" for bullet in rng.sample(BULLETS, 4)))
+        if index % 3 == 1:
+            parts.append(TABLE)
+        parts.append("\n".join(f"{number}. {step}" for number, step in enumerate(rng.sample(BULLETS, 3), start=1)))
+        parts.append(f"**Confidence:** {rng.choice(['Low', 'Medium', 'High'])}")
+    return "\n\n".join(parts)
+
+
+def split_tokens(text: str) -> list:
+    """Split text into stream chunks of roughly one token (a word plus its whitespace)"""
+    return re.findall(r"\S+\s*|\s+", text)
+
+
+def create_app(config: FakeLLMConfig = None) -> Flask:
+    """Build the fake OpenAI API application"""
+    config = config or FakeLLMConfig.from_env()
+    fake = Flask(__name__)
+    counter = TokenCounter()
+    rng = random.Random(config.seed)
+    lock = threading.Lock()
+    stats = {"requests": 0, "errors": 0, "rate_limited": 0, "completion_tokens": 0}
+
+    def draw():
+        with lock:
+            return rng.random(), rng.randrange(1 << 30)
+
+    def bump(key: str, amount: int = 1):
+        with lock:
+            stats[key] += amount
+
+    def error_response(status: int, message: str, error_type: str):
+        response = jsonify({"error": {"message": message, "type": error_type, "code": None}})
+        response.status_code = status
+        if status == 429:
+            response.headers["Retry-After"] = "1"
+        return response
+
+    @fake.route('/v1/models')
+    def models():
+        return jsonify({"object": "list", "data": [{"id": "fake-model", "object": "model", "owned_by": "local"}]})
+
+    @fake.route('/stats')
+    def show_stats():
+        return jsonify(stats)
+
+    @fake.route('/v1/chat/completions', methods=['POST'])
+    def chat_completions():
+        body = request.get_json(silent=True) or {}
+        bump("requests")
+
+        roll, seed = draw()
+        if roll < config.rate_limit_rate:
+            bump("rate_limited")
+            return error_response(429, "Rate limit reached (injected by fake server)", "rate_limit_error")
+        if roll < config.rate_limit_rate + config.error_rate:
+            bump("errors")
+            return error_response(500, "Internal server error (injected by fake server)", "server_error")
+
+        model = body.get("model", "fake-model")
+        messages = body.get("messages", [])
+        prompt_text = "\n".join(str(message.get("content", "")) for message in messages)
+        prompt_tokens = counter.count(prompt_text)
+
+        limit = min(int(body.get("max_tokens") or config.max_output_tokens), config.max_output_tokens)
+        tokens = split_tokens(build_report(messages[-1].get("content", "") if messages else "", random.Random(seed)))
+        finish_reason = "length" if len(tokens) > limit else "stop"
+        tokens = tokens[:limit]
+        bump("completion_tokens", len(tokens))
+
+        completion_id = f"chatcmpl-fake-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": len(tokens),
+            "total_tokens": prompt_tokens + len(tokens),
+            "prompt_tokens_details": {"cached_tokens": 0},
+        }
+        token_delay = 1.0 / config.tokens_per_sec if config.tokens_per_sec > 0 else 0.0
+
+        if not body.get("stream"):
+            time.sleep(config.ttft_ms / 1000 + len(tokens) * token_delay)
+            return jsonify({
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "".join(tokens)},
+                    "finish_reason": finish_reason,
+                }],
+                "usage": usage,
+            })
+
+        include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+
+        def chunk(delta: dict, reason=None) -> str:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": reason}],
+            }
+            return f"data: {json.dumps(payload)}\n\n"
+
+        def generate():
+            time.sleep(config.ttft_ms / 1000)
+            yield chunk({"role": "assistant", "content": ""})
+            started = time.perf_counter()
+            for index, token in enumerate(tokens):
+                # Pace against the start time so per-chunk overhead does not accumulate
+                wait = started + index * token_delay - time.perf_counter()
+                if wait > 0:
+                    time.sleep(wait)
+                yield chunk({"content": token})
+            yield chunk({}, finish_reason)
+            if include_usage:
+                payload = {"id": completion_id, "object": "chat.completion.chunk", "created": created,
+                           "model": model, "choices": [], "usage": usage}
+                yield f"data: {json.dumps(payload)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return Response(generate(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+    return fake
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake OpenAI-compatible server for load testing")
+    defaults = FakeLLMConfig.from_env()
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=int(os.getenv('FAKE_LLM_PORT', '8001')))
+    parser.add_argument('--ttft-ms', type=float, default=defaults.ttft_ms, help='time to first token')
+    parser.add_argument('--tokens-per-sec', type=float, default=defaults.tokens_per_sec, help='generation speed')
+    parser.add_argument('--error-rate', type=float, default=defaults.error_rate, help='fraction of 500 responses')
+    parser.add_argument('--rate-limit-rate', type=float, default=defaults.rate_limit_rate, help='fraction of 429 responses')
+    parser.add_argument('--max-output-tokens', type=int, default=defaults.max_output_tokens)
+    parser.add_argument('--seed', type=int, default=defaults.seed, help='seed for reproducible runs')
+    args = parser.parse_args()
+
+    config = FakeLLMConfig(args.ttft_ms, args.tokens_per_sec, args.error_rate, args.rate_limit_rate,
+                           args.max_output_tokens, args.seed)
+    print(f"Fake OpenAI server on http://{args.host}:{args.port}/v1 "
+          f"(TTFT {config.ttft_ms:.0f} ms, {config.tokens_per_sec:.0f} tok/s, "
+          f"{config.error_rate:.0%} errors, {config.rate_limit_rate:.0%} 429s)")
+    create_app(config).run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == '__main__':
+    main()
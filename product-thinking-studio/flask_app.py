@@ -2,33 +2,199 @@
 Product Playground - Flask Application
 Optimized for PythonAnywhere deployment
 """
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, render_template, request, jsonify, send_file, g
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.middleware.proxy_fix import ProxyFix
 import sys
 import os
+import time
 
 # Add app directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
 
-from prompt import ProductThinkingEngine
+# The sizing profile's pool and cache sizes become environment defaults before the
+# modules below read them (under gunicorn, gunicorn.conf.py has done this already)
+from config import apply_sizing, get_config
+sizing = apply_sizing()
+
+# Only light modules are imported here so /health answers quickly after a cold
+# start; the LLM client (prompt -> openai), ReportLab and pypdf load on first use
+# or in the background warm-up below.
+from token_accounting import ledger, BudgetExceededError
 import os
+import hmac
+import importlib
 from dotenv import load_dotenv
-from io import BytesIO
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch, cm
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak, Table, TableStyle, KeepTogether
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT, TA_JUSTIFY
-from reportlab.lib import colors
-from reportlab.pdfgen import canvas
-import markdown2
-import re
+from pdf_service import (
+    get_pdf, get_portfolio_pdf, pdf_cache_key, pdf_size, portfolio_cache_key, section_title,
+    MAX_PORTFOLIO_SECTIONS, PDFQueueFullError, PDFTimeoutError, warm_up_renderers
+)
+from warmup import SKIPPED, Warmup
+from static_assets import AssetStore, IMMUTABLE, REVALIDATE
+from compression import (
+    ENCODINGS, compress, compress_stream, compression_min_bytes, compression_stats, is_compressible
+)
+from tracing import Tracer, span
+from profiling import memory_profiler, profile_store, sampling_profiler, slow_request_profiler
+from metrics import COMPRESSION_BYTES, HTTP_IN_FLIGHT, HTTP_LATENCY, METRICS_ENABLED, render_latest
+from report_export import EXPORT_FORMATS, export_cache, export_cache_key, get_export
 from datetime import datetime
 import traceback
 
 load_dotenv()
 
+class TracedJSONProvider(DefaultJSONProvider):
+    """Flask's JSON handling with request parsing and response serialization traced"""
+
+    def loads(self, s, **kwargs):
+        with span('request.parse', bytes=len(s)):
+            return super().loads(s, **kwargs)
+
+    def dumps(self, obj, **kwargs):
+        with span('response.serialize'):
+            return super().dumps(obj, **kwargs)
+
 app = Flask(__name__)
-app.secret_key = os.getenv('SECRET_KEY', 'your-secret-key-change-in-production')
+app.config.from_object(get_config())
+# Client addresses (token budgets, premium tier) come from X-Forwarded-For, but only
+# the TRUSTED_PROXY_HOPS entries appended by our own proxies are believed; anything
+# a client prepends to the header is ignored
+app.wsgi_app = ProxyFix(app.wsgi_app, x_for=int(os.getenv('TRUSTED_PROXY_HOPS', '1')))
+app.json = TracedJSONProvider(app)
+
+# Per-request spans (TRACE_EXPORT=jsonl|otlp; off by default); the trace id is sent as X-Trace-Id
+tracer = Tracer.from_env()
+
+# Fingerprinted CSS/JS and cached pages; templates link assets with asset_url('css/app.css')
+assets = AssetStore(app.static_folder, reload=app.debug)
+app.add_template_global(assets.url, 'asset_url')
+
+# Per-worker warm-up (see gunicorn.conf.py post_worker_init); /health/ready reports it
+warmup = Warmup.from_env()
+
+# Modules loaded lazily (see above) and templates compiled on first render
+WARMUP_MODULES = ('prompt', 'pdf_portfolio', 'markdown2')
+WARMUP_TEMPLATES = ('landing.html', 'index.html')
+
+@warmup.step('imports')
+def warm_imports():
+    failed = []
+    for name in WARMUP_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            failed.append(f"{name} ({str(e)})")
+    if failed:
+        raise ImportError(', '.join(failed))
+
+@warmup.step('templates')
+def warm_templates():
+    assets.load_all()
+    with app.test_request_context('/'):
+        for template in WARMUP_TEMPLATES:
+            page_asset(template)
+
+@warmup.step('llm')
+def warm_llm_connection():
+    if not os.getenv('OPENAI_API_KEY'):
+        return SKIPPED
+    from prompt import open_llm_connection
+    open_llm_connection()
+
+@warmup.step('pdf')
+def warm_pdf_renderers():
+    warm_up_renderers()
+
+@warmup.step('browser')
+def warm_browser():
+    # Checked here so Playwright is not imported unless the pool is enabled
+    if os.getenv('SCRAPER_BROWSER_POOL', '0') != '1':
+        return SKIPPED
+    from web_scraper import browser_pool
+    browser_pool.start()
+
+@app.before_request
+def begin_warmup():
+    # Under gunicorn warm-up starts in post_worker_init; this covers other servers.
+    # Never at import: with preload_app the gunicorn master imports this module,
+    # and a thread running there would not survive fork.
+    warmup.start()
+
+def request_route():
+    """The matched route pattern rather than the path, so metric labels and span names stay bounded"""
+    return request.url_rule.rule if request.url_rule else 'unmatched'
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    HTTP_IN_FLIGHT.inc()
+    # Samples this request's thread while PROFILE_SLOW_MS is set (see /admin/profile/slow)
+    g.profile_token = slow_request_profiler.begin()
+
+@app.before_request
+def start_trace():
+    route = request_route()
+    g.trace = tracer.start(f"{request.method} {route}", traceparent=request.headers.get('traceparent'),
+                           **{'http.method': request.method, 'http.route': route})
+
+# Registered before compress_response so that it runs after it (after_request
+# functions run in reverse order) and the recorded time includes compression
+@app.after_request
+def record_request_metrics(response):
+    started = g.get('request_started')
+    if started is not None:
+        HTTP_LATENCY.labels(request.method, request_route(), str(response.status_code)).observe(
+            time.perf_counter() - started)
+    root = g.get('trace')
+    if root is not None:
+        root.set(**{'http.status_code': response.status_code})
+        response.headers['X-Trace-Id'] = root.trace_id
+    return response
+
+@app.teardown_request
+def finish_request(error):
+    started = g.pop('request_started', None)
+    if started is not None:
+        HTTP_IN_FLIGHT.dec()
+        root = g.get('trace')
+        slow_request_profiler.end(g.pop('profile_token', None), (time.perf_counter() - started) * 1000,
+                                  f"{request.method} {request_route()}", root.trace_id if root else '')
+    tracer.finish(g.pop('trace', None), error)
+
+@app.after_request
+def compress_response(response):
+    """Compress text and JSON responses (e.g. analyses) above COMPRESS_MIN_BYTES in the client's preferred encoding"""
+    # send_file responses (PDFs), bodies that are already encoded and empty statuses are left alone
+    if (response.direct_passthrough or 'Content-Encoding' in response.headers
+            or response.status_code < 200 or response.status_code in (204, 304)
+            or request.method == 'HEAD' or not is_compressible(response.mimetype)):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = request.accept_encodings.best_match(ENCODINGS, default='identity')
+    if encoding == 'identity':
+        compression_stats.skip('not_accepted')
+        return response
+
+    if response.is_streamed:
+        response.response = compress_stream(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+        compression_stats.record(request.endpoint, encoding, 0, 0)
+    else:
+        body = response.get_data()
+        if len(body) < compression_min_bytes():
+            compression_stats.skip('small')
+            return response
+        with span('response.compress', encoding=encoding, bytes=len(body)):
+            compressed = compress(body, encoding, level='fast')
+        response.set_data(compressed)
+        compression_stats.record(request.endpoint, encoding, len(body), len(compressed))
+        COMPRESSION_BYTES.labels('original').inc(len(body))
+        COMPRESSION_BYTES.labels('compressed').inc(len(compressed))
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f"{etag}-{encoding}", weak=weak)
+    return response
 
 # Global error handler for all unhandled exceptions
 @app.errorhandler(Exception)
@@ -50,15 +216,93 @@ def method_not_allowed(e):
     """Handle method not allowed with JSON"""
     return jsonify({'error': 'Method not allowed'}), 405
 
+def get_client_id():
+    """Identify the caller for token budgets: the address seen by the trusted proxy (see ProxyFix above)"""
+    return request.remote_addr or 'anonymous'
+
+def create_engine(data):
+    """Create an engine for the current caller with the requested analysis depth"""
+    from prompt import ProductThinkingEngine
+    depth = data.get('depth') if isinstance(data, dict) else None
+    return ProductThinkingEngine(user_id=get_client_id(), depth=depth)
+
+def pdf_download(pdf_file, key, cached, download_name):
+    """Send a PDF (cache file or fresh in-memory render) as an attachment with its content hash as the ETag"""
+    response = send_file(
+        pdf_file,
+        as_attachment=True,
+        download_name=download_name,
+        mimetype='application/pdf',
+        etag=key
+    )
+    response.content_length = pdf_size(pdf_file)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.headers['X-PDF-Cache'] = 'hit' if cached else 'miss'
+    return response
+
+def asset_response(asset, cache_control):
+    """Serve a precompressed asset in the best encoding the client accepts, answering 304 on a matching ETag"""
+    encoding = request.accept_encodings.best_match(asset.encodings, default='identity')
+    body, encoding = asset.encoded(encoding)
+    response = app.response_class(body, mimetype=asset.mimetype)
+    response.set_etag(asset.etag(encoding))
+    response.headers['Cache-Control'] = cache_control
+    response.headers['Vary'] = 'Accept-Encoding'
+    if encoding != 'identity':
+        response.headers['Content-Encoding'] = encoding
+    return response.make_conditional(request)
+
+def page_asset(template):
+    """A template that takes no request data, rendered once per process"""
+    return assets.page(template, lambda: render_template(template))
+
+def is_metrics_request():
+    """Check a bearer token against METRICS_TOKEN; the admin token is also accepted"""
+    metrics_token = os.getenv('METRICS_TOKEN', '')
+    supplied = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+    return (bool(metrics_token) and hmac.compare_digest(supplied, metrics_token)) or is_admin_request()
+
+def metrics_denied():
+    """Error response unless the caller may read /metrics
+
+    Fails closed like the admin endpoints: with neither METRICS_TOKEN nor
+    ADMIN_TOKEN set the endpoint does not exist, unless METRICS_PUBLIC=1 opts in
+    (for a scraper on a private network).
+    """
+    if not METRICS_ENABLED:
+        return jsonify({'error': 'Endpoint not found'}), 404
+    if os.getenv('METRICS_PUBLIC', '0') == '1':
+        return None
+    if not os.getenv('METRICS_TOKEN') and not os.getenv('ADMIN_TOKEN'):
+        return jsonify({'error': 'Endpoint not found'}), 404
+    if not is_metrics_request():
+        return jsonify({'error': 'Forbidden'}), 403
+    return None
+
+def is_admin_request():
+    """Check the X-Admin-Token header against ADMIN_TOKEN"""
+    admin_token = os.getenv('ADMIN_TOKEN', '')
+    supplied = request.headers.get('X-Admin-Token', '')
+    return bool(admin_token) and hmac.compare_digest(supplied, admin_token)
+
 @app.route('/')
 def index():
     """Render landing page"""
-    return render_template('landing.html')
+    return asset_response(page_asset('landing.html'), REVALIDATE)
 
 @app.route('/app')
 def app_page():
     """Render main application page"""
-    return render_template('index.html')
+    return asset_response(page_asset('index.html'), REVALIDATE)
+
+@app.route('/assets/<path:filename>')
+def static_asset(filename):
+    """Fingerprinted CSS/JS, cacheable for a year"""
+    asset, current = assets.lookup(filename)
+    if asset is None:
+        return jsonify({'error': 'Endpoint not found'}), 404
+    # An old fingerprint (from a page cached before a deploy) gets today's file, revalidated each time
+    return asset_response(asset, IMMUTABLE if current else REVALIDATE)
 
 @app.route('/robots.txt')
 def robots():
@@ -72,14 +316,143 @@ def sitemap():
 
 @app.route('/health')
 def health():
-    """Health check endpoint for monitoring"""
+    """Liveness check: the worker is up and answering (200 even while warming up)"""
     return jsonify({
         'status': 'healthy',
+        'ready': warmup.ready,
         'timestamp': datetime.now().isoformat(),
         'service': 'Product Playground',
         'version': '1.0.0'
     }), 200
 
+@app.route('/health/ready')
+def readiness():
+    """Readiness check: 200 once this worker has warmed up, 503 until then"""
+    status = dict(warmup.status(), profile=sizing['profile'])
+    return jsonify(status), 200 if status['ready'] else 503
+
+@app.route('/admin/usage')
+def admin_usage():
+    """Token usage and latency aggregates per endpoint and user (admin only)"""
+    if not os.getenv('ADMIN_TOKEN'):
+        return jsonify({'error': 'Endpoint not found'}), 404
+    if not is_admin_request():
+        return jsonify({'error': 'Forbidden'}), 403
+    
+    return jsonify(ledger.aggregates(request.args.get('day'))), 200
+
+@app.route('/admin/compression')
+def admin_compression():
+    """Compressed response counts and sizes per endpoint for this worker (admin only)"""
+    if not os.getenv('ADMIN_TOKEN'):
+        return jsonify({'error': 'Endpoint not found'}), 404
+    if not is_admin_request():
+        return jsonify({'error': 'Forbidden'}), 403
+    
+    return jsonify(compression_stats.stats()), 200
+
+def profiling_denied():
+    """Error response unless profiling is switched on (PROFILING=1) and the admin token is sent"""
+    if os.getenv('PROFILING', '0') != '1' or not os.getenv('ADMIN_TOKEN'):
+        return jsonify({'error': 'Endpoint not found'}), 404
+    if not is_admin_request():
+        return jsonify({'error': 'Forbidden'}), 403
+    return None
+
+def profiling_options():
+    """Options from the JSON body or the query string"""
+    options = dict(request.args.items())
+    options.update(request.get_json(silent=True) or {})
+    return options
+
+@app.route('/admin/profile/cpu', methods=['POST'])
+def admin_profile_cpu():
+    """Sample every thread of this worker for N seconds into a folded-stack file (admin only)"""
+    denied = profiling_denied()
+    if denied:
+        return denied
+
+    options = profiling_options()
+    try:
+        seconds = float(options.get('seconds', 10))
+        interval = float(options.get('interval_ms', 10)) / 1000
+        block = str(options.get('wait', '0')).lower() in ('1', 'true')
+        result = sampling_profiler.start(seconds, interval, block=block)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({'error': str(e)}), 409
+    return jsonify(result), 200 if block else 202
+
+@app.route('/admin/profile/slow', methods=['GET', 'POST'])
+def admin_profile_slow():
+    """Show or set the slow request threshold for this worker (threshold_ms, 0 = off) (admin only)"""
+    denied = profiling_denied()
+    if denied:
+        return denied
+
+    if request.method == 'POST':
+        try:
+            slow_request_profiler.threshold_ms = max(float(profiling_options().get('threshold_ms', 0)), 0)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+    return jsonify(dict(slow_request_profiler.status(), pid=os.getpid())), 200
+
+@app.route('/admin/profile/memory', methods=['GET', 'POST'])
+def admin_profile_memory():
+    """tracemalloc status, or action=start|snapshot|stop; a snapshot lists the top allocators (admin only)"""
+    denied = profiling_denied()
+    if denied:
+        return denied
+
+    if request.method == 'GET':
+        return jsonify(memory_profiler.status()), 200
+    options = profiling_options()
+    action = options.get('action', 'snapshot')
+    try:
+        if action == 'start':
+            return jsonify(memory_profiler.start(int(options.get('frames', 25)))), 200
+        if action == 'stop':
+            return jsonify(memory_profiler.stop()), 200
+        if action == 'snapshot':
+            return jsonify(memory_profiler.snapshot(int(options.get('top', 25)))), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({'error': str(e)}), 409
+    return jsonify({'error': f'Unknown action: {action}'}), 400
+
+@app.route('/admin/profiles')
+def admin_profiles():
+    """Profile files written by this instance, newest first (admin only)"""
+    denied = profiling_denied()
+    if denied:
+        return denied
+
+    return jsonify({'directory': profile_store.directory, 'profiles': profile_store.list()}), 200
+
+@app.route('/admin/profiles/<path:name>')
+def admin_profile_file(name):
+    """Download a profile (folded stacks: flamegraph.pl, inferno or speedscope) (admin only)"""
+    denied = profiling_denied()
+    if denied:
+        return denied
+
+    path = profile_store.path(name)
+    if path is None:
+        return jsonify({'error': 'Profile not found'}), 404
+    return send_file(path, mimetype='text/plain', as_attachment=True, download_name=name)
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus metrics, merged across gunicorn workers"""
+    denied = metrics_denied()
+    if denied:
+        return denied
+    
+    body, content_type = render_latest()
+    return body, 200, {'Content-Type': content_type}
+
 @app.route('/analyze', methods=['POST'])
 def analyze():
     """Handle product challenge analysis"""
@@ -96,7 +469,7 @@ def analyze():
         if not os.getenv('OPENAI_API_KEY'):
             return jsonify({'success': False, 'error': 'OpenAI API key not configured'}), 500
         
-        engine = ProductThinkingEngine()
+        engine = create_engine(data)
         response = engine.analyze(user_context)
         
         if not response or len(response.strip()) == 0:
@@ -105,8 +478,11 @@ def analyze():
         return jsonify({
             'success': True,
             'analysis': response,
+            'trimmed_inputs': engine.last_trim_report,
             'timestamp': datetime.now().strftime("%Y%m%d_%H%M%S")
         })
+    except BudgetExceededError as e:
+        return jsonify({'success': False, 'error': str(e)}), 429
     except Exception as e:
         print(f"Error in /analyze: {str(e)}")
         print(traceback.format_exc())
@@ -139,15 +515,18 @@ def analyze_kpi():
         if not os.getenv('OPENAI_API_KEY'):
             return jsonify({'error': 'OpenAI API key not configured. Please set OPENAI_API_KEY environment variable.'}), 500
         
-        engine = ProductThinkingEngine()
+        engine = create_engine(data)
         response = engine.analyze_kpis(kpi_data)
         
         return jsonify({
             'success': True,
             'analysis': response,
+            'trimmed_inputs': engine.last_trim_report,
             'kpi_data': kpi_data,
             'timestamp': datetime.now().strftime("%Y%m%d_%H%M%S")
         })
+    except BudgetExceededError as e:
+        return jsonify({'success': False, 'error': str(e)}), 429
     except Exception as e:
         print(f"Error in /analyze-kpi: {str(e)}")
         print(traceback.format_exc())
@@ -174,7 +553,7 @@ def analyze_website():
         if not os.getenv('OPENAI_API_KEY'):
             return jsonify({'success': False, 'error': 'OpenAI API key not configured. Please set OPENAI_API_KEY environment variable.'}), 500
         
-        engine = ProductThinkingEngine()
+        engine = create_engine(data)
         response = engine.analyze_website(website_url, additional_context)
         
         if not response or len(response.strip()) == 0:
@@ -183,9 +562,12 @@ def analyze_website():
         return jsonify({
             'success': True,
             'analysis': response,
+            'trimmed_inputs': engine.last_trim_report,
             'website_url': website_url,
             'timestamp': datetime.now().strftime("%Y%m%d_%H%M%S")
         })
+    except BudgetExceededError as e:
+        return jsonify({'success': False, 'error': str(e)}), 429
     except Exception as e:
         error_msg = str(e)
         print(f"Error in /analyze-website: {error_msg}")
@@ -210,14 +592,17 @@ def analyze_walkthrough():
         if not os.getenv('OPENAI_API_KEY'):
             return jsonify({'error': 'OpenAI API key not configured. Please set OPENAI_API_KEY environment variable.'}), 500
         
-        engine = ProductThinkingEngine()
+        engine = create_engine(data)
         response = engine.analyze_walkthrough(user_context, walkthrough_data)
         
         return jsonify({
             'success': True,
             'analysis': response,
+            'trimmed_inputs': engine.last_trim_report,
             'timestamp': datetime.now().strftime("%Y%m%d_%H%M%S")
         })
+    except BudgetExceededError as e:
+        return jsonify({'success': False, 'error': str(e)}), 429
     except Exception as e:
         print(f"Error in /analyze-walkthrough: {str(e)}")
         print(traceback.format_exc())
@@ -231,368 +616,96 @@ def download_pdf():
         analysis_text = data.get('analysis', '')
         context = data.get('context', '')
         timestamp = datetime.now()
-        
-        buffer = BytesIO()
-        
-        # Custom page template with header/footer
-        class NumberedCanvas(canvas.Canvas):
-            """Custom canvas for headers, footers, and page numbers"""
-            def __init__(self, *args, **kwargs):
-                canvas.Canvas.__init__(self, *args, **kwargs)
-                self.pages = []
-
-            def showPage(self):
-                """Save each page for later rendering"""
-                self.pages.append(dict(self.__dict__))
-                self._startPage()
-
-            def save(self):
-                """Render all pages with decorations"""
-                page_count = len(self.pages)
-                for page_num in range(page_count):
-                    self.__dict__.update(self.pages[page_num])
-                    self.draw_page_number(page_num + 1, page_count)
-                    canvas.Canvas.showPage(self)
-                canvas.Canvas.save(self)
-
-            def draw_page_number(self, page_num, page_count):
-                """Draw page number on each page"""
-                self.saveState()
-                self.setFont('Helvetica', 9)
-                self.setFillColor(colors.HexColor('#7f8c8d'))
-                
-                # Only add header/footer if not first page (cover) and not last page (thank you)
-                if page_num > 1 and page_num < page_count:
-                    # Header line
-                    self.setStrokeColor(colors.HexColor('#e1e8ed'))
-                    self.setLineWidth(1)
-                    self.line(0.75*inch, letter[1] - 0.6*inch, letter[0] - 0.75*inch, letter[1] - 0.6*inch)
-                    
-                    # Header text
-                    self.setFont('Helvetica-Bold', 10)
-                    self.setFillColor(colors.HexColor('#6366f1'))
-                    self.drawString(0.75*inch, letter[1] - 0.5*inch, "Product Playground")
-                    
-                    # Footer line
-                    self.setStrokeColor(colors.HexColor('#e1e8ed'))
-                    self.line(0.75*inch, 0.65*inch, letter[0] - 0.75*inch, 0.65*inch)
-                
-                # Page number on all pages except cover
-                if page_num > 1:
-                    self.setFont('Helvetica', 9)
-                    self.setFillColor(colors.HexColor('#7f8c8d'))
-                    page_text = f"Page {page_num - 1} of {page_count - 2}"  # Exclude cover and thank you page
-                    self.drawRightString(letter[0] - 0.75*inch, 0.5*inch, page_text)
-                
-                self.restoreState()
-
-        doc = SimpleDocTemplate(
-            buffer, 
-            pagesize=letter,
-            rightMargin=0.75*inch, 
-            leftMargin=0.75*inch,
-            topMargin=1*inch, 
-            bottomMargin=0.85*inch,
-            title="Product Analysis Report",
-            author="Product Playground"
-        )
-        
-        elements = []
-        
-        # Define custom styles
-        styles = getSampleStyleSheet()
-        
-        # Cover page title style
-        cover_title = ParagraphStyle(
-            'CoverTitle',
-            parent=styles['Heading1'],
-            fontSize=36,
-            textColor=colors.HexColor('#6366f1'),
-            spaceAfter=20,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold',
-            leading=42
-        )
-        
-        # Subtitle style
-        cover_subtitle = ParagraphStyle(
-            'CoverSubtitle',
-            parent=styles['Normal'],
-            fontSize=16,
-            textColor=colors.HexColor('#7f8c8d'),
-            spaceAfter=40,
-            alignment=TA_CENTER,
-            fontName='Helvetica',
-            leading=20
-        )
-        
-        # Section header (H2)
-        section_header = ParagraphStyle(
-            'SectionHeader',
-            parent=styles['Heading2'],
-            fontSize=18,
-            textColor=colors.HexColor('#6366f1'),
-            spaceBefore=24,
-            spaceAfter=12,
-            fontName='Helvetica-Bold',
-            borderWidth=0,
-            borderColor=colors.HexColor('#6366f1'),
-            borderPadding=8,
-            backColor=colors.HexColor('#f8f9fa'),
-            leftIndent=10,
-            leading=22
-        )
-        
-        # Subsection header (H3)
-        subsection_header = ParagraphStyle(
-            'SubsectionHeader',
-            parent=styles['Heading3'],
-            fontSize=14,
-            textColor=colors.HexColor('#8b5cf6'),
-            spaceBefore=16,
-            spaceAfter=8,
-            fontName='Helvetica-Bold',
-            leftIndent=5,
-            leading=18
-        )
-        
-        # Body text style
-        body_style = ParagraphStyle(
-            'CustomBody',
-            parent=styles['BodyText'],
-            fontSize=11,
-            textColor=colors.HexColor('#2c3e50'),
-            spaceAfter=10,
-            alignment=TA_JUSTIFY,
-            fontName='Helvetica',
-            leading=16,
-            leftIndent=0,
-            rightIndent=0
-        )
-        
-        # Bullet point style
-        bullet_style = ParagraphStyle(
-            'BulletPoint',
-            parent=body_style,
-            fontSize=10,
-            leftIndent=20,
-            bulletIndent=10,
-            spaceAfter=6,
-            leading=14
-        )
-        
-        # Highlight box style
-        highlight_style = ParagraphStyle(
-            'Highlight',
-            parent=body_style,
-            fontSize=11,
-            backColor=colors.HexColor('#f0f4ff'),
-            borderWidth=1,
-            borderColor=colors.HexColor('#6366f1'),
-            borderPadding=10,
-            borderRadius=5,
-            leftIndent=10,
-            rightIndent=10,
-            spaceBefore=10,
-            spaceAfter=10
-        )
-        
-        # Warning/Risk style
-        warning_style = ParagraphStyle(
-            'Warning',
-            parent=body_style,
-            fontSize=10,
-            backColor=colors.HexColor('#fff4e6'),
-            borderWidth=1,
-            borderColor=colors.HexColor('#f39c12'),
-            borderPadding=10,
-            leftIndent=10,
-            rightIndent=10,
-            spaceBefore=8,
-            spaceAfter=8
-        )
-        
-        # === COVER PAGE ===
-        elements.append(Spacer(1, 2*inch))
-        elements.append(Paragraph("🚀 Product Playground", cover_title))
-        elements.append(Paragraph("AI-Powered Strategic Analysis Report", cover_subtitle))
-        
-        # Info box on cover
-        cover_info_data = [
-            ['Report Type:', 'Product & Market Analysis'],
-            ['Generated:', timestamp.strftime('%B %d, %Y')],
-            ['Time:', timestamp.strftime('%I:%M %p')],
-            ['Powered by:', 'GPT-4o Advanced Analysis']
-        ]
-        
-        cover_table = Table(cover_info_data, colWidths=[2*inch, 3.5*inch])
-        cover_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#f8f9fa')),
-            ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#6366f1')),
-            ('TEXTCOLOR', (1, 0), (1, -1), colors.HexColor('#2c3e50')),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 11),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 12),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 12),
-            ('TOPPADDING', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
-            ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#e1e8ed')),
-        ]))
-        
-        elements.append(cover_table)
-        elements.append(Spacer(1, 1*inch))
-        
-        # Context box if provided
-        if context:
-            elements.append(Paragraph("📋 Analysis Context", subsection_header))
-            elements.append(Paragraph(context, highlight_style))
-        
-        elements.append(PageBreak())
-        
-        # === ANALYSIS CONTENT ===
-        # Parse the markdown analysis
-        lines = analysis_text.split('\n')
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                elements.append(Spacer(1, 0.1*inch))
-                continue
-            
-            # Handle headers
-            if line.startswith('## '):
-                # H2 - Major section
-                title = line.replace('## ', '').strip()
-                # Add emoji if not present
-                if not any(char in title for char in '🎯📊💡🔍⚠️🚀📈✅'):
-                    title = '▸ ' + title
-                elements.append(Spacer(1, 0.15*inch))
-                elements.append(Paragraph(title, section_header))
-                
-            elif line.startswith('### '):
-                # H3 - Subsection
-                title = line.replace('### ', '').strip()
-                elements.append(Paragraph(title, subsection_header))
-                
-            elif line.startswith('**') and line.endswith('**'):
-                # Bold standalone lines (labels)
-                text = line.replace('**', '')
-                label_style = ParagraphStyle(
-                    'Label',
-                    parent=body_style,
-                    fontSize=11,
-                    textColor=colors.HexColor('#6366f1'),
-                    fontName='Helvetica-Bold',
-                    spaceBefore=8,
-                    spaceAfter=4
-                )
-                elements.append(Paragraph(text, label_style))
-                
-            elif line.startswith('- ') or line.startswith('* '):
-                # Bullet points
-                text = line[2:].strip()
-                # Convert markdown bold
-                text = re.sub(r'\*\*(.+?)\*\*', r'<b>\1</b>', text)
-                elements.append(Paragraph(f'• {text}', bullet_style))
-                
-            elif line.startswith(('1. ', '2. ', '3. ', '4. ', '5. ', '6. ', '7. ', '8. ', '9. ')):
-                # Numbered lists
-                text = re.sub(r'^\d+\.\s+', '', line)
-                text = re.sub(r'\*\*(.+?)\*\*', r'<b>\1</b>', text)
-                number = line.split('.')[0]
-                elements.append(Paragraph(f'{number}. {text}', bullet_style))
-                
-            elif '**' in line:
-                # Inline bold text - convert to HTML
-                text = re.sub(r'\*\*(.+?)\*\*', r'<b>\1</b>', line)
-                
-                # Check if this is a risk/warning line
-                if any(word in text.lower() for word in ['risk', 'warning', 'concern', 'threat', 'danger']):
-                    elements.append(Paragraph(text, warning_style))
-                # Check if this is a key insight
-                elif any(word in line for word in ['Confidence:', 'Overall', 'Key:', 'Critical:']):
-                    elements.append(Paragraph(text, highlight_style))
-                else:
-                    elements.append(Paragraph(text, body_style))
-                    
-            else:
-                # Regular paragraph
-                text = re.sub(r'\*\*(.+?)\*\*', r'<b>\1</b>', line)
-                elements.append(Paragraph(text, body_style))
-        
-        # === FOOTER PAGE ===
-        elements.append(PageBreak())
-        elements.append(Spacer(1, 2*inch))
-        
-        footer_title = ParagraphStyle(
-            'FooterTitle',
-            parent=cover_title,
-            fontSize=24,
-            textColor=colors.HexColor('#6366f1'),
-            alignment=TA_CENTER
-        )
-        
-        elements.append(Paragraph("Thank you for using Product Playground", footer_title))
-        elements.append(Spacer(1, 0.3*inch))
-        
-        footer_text = ParagraphStyle(
-            'FooterText',
-            parent=body_style,
-            fontSize=11,
-            alignment=TA_CENTER,
-            textColor=colors.HexColor('#7f8c8d')
-        )
-        
-        elements.append(Paragraph(
-            "This analysis was generated using advanced AI to provide strategic product insights.<br/>"
-            "For best results, combine these insights with your domain expertise and market knowledge.",
-            footer_text
-        ))
-        
-        elements.append(Spacer(1, 1*inch))
-        
-        # Contact/info table
-        footer_info = [
-            ['🌐 Product Playground', 'AI-Powered PM Intelligence'],
-            ['💡 Features', 'Challenge Analysis • KPI Diagnostics • Product Teardown'],
-            ['🚀 Powered by', 'OpenAI GPT-4o'],
-        ]
-        
-        footer_table = Table(footer_info, colWidths=[2.5*inch, 3.5*inch])
-        footer_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#f8f9fa')),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#2c3e50')),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 12),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e1e8ed')),
-        ]))
-        
-        elements.append(footer_table)
-        
-        # Build PDF with custom canvas
-        doc.build(elements, canvasmaker=NumberedCanvas)
-        buffer.seek(0)
-        
-        return send_file(
-            buffer,
-            as_attachment=True,
-            download_name=f'ProductAnalysis_{timestamp.strftime("%Y%m%d_%H%M%S")}.pdf',
-            mimetype='application/pdf'
-        )
+        download_name = f'ProductAnalysis_{timestamp.strftime("%Y%m%d_%H%M%S")}.pdf'
+
+        # The ETag is the content hash, so a client holding it already has this PDF
+        if request.if_none_match.contains(pdf_cache_key(analysis_text, context)):
+            return '', 304
+
+        # Streamed from the on-disk cache; the file is closed when the response is
+        key, pdf_file, cached = get_pdf(analysis_text, context, timestamp)
+        return pdf_download(pdf_file, key, cached, download_name)
+    except (PDFQueueFullError, PDFTimeoutError) as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '5'}
     except Exception as e:
         print(f"Error generating PDF: {str(e)}")
         print(traceback.format_exc())
         return jsonify({'error': str(e)}), 500
 
+@app.route('/download-portfolio-pdf', methods=['POST'])
+def download_portfolio_pdf():
+    """Combine several analyses into one PDF report with a table of contents"""
+    try:
+        data = request.json
+        if not data:
+            return jsonify({'error': 'No JSON data provided'}), 400
+
+        analyses = data.get('analyses')
+        if not isinstance(analyses, list) or not analyses:
+            return jsonify({'error': 'Please provide a list of analyses'}), 400
+        if len(analyses) > MAX_PORTFOLIO_SECTIONS:
+            return jsonify({'error': f'A portfolio can combine at most {MAX_PORTFOLIO_SECTIONS} analyses'}), 400
+
+        sections = []
+        for item in analyses:
+            if not isinstance(item, dict) or not str(item.get('analysis', '')).strip():
+                return jsonify({'error': 'Each analysis needs non-empty "analysis" text'}), 400
+            title = section_title(item.get('type'), item.get('title'))[:120]
+            sections.append((title, str(item['analysis'])))
+
+        context = data.get('context', '')
+        timestamp = datetime.now()
+
+        if request.if_none_match.contains(portfolio_cache_key(sections, context)):
+            return '', 304
+
+        key, pdf_file, cached = get_portfolio_pdf(sections, context, timestamp)
+        return pdf_download(pdf_file, key, cached, f'ProductPortfolio_{timestamp.strftime("%Y%m%d_%H%M%S")}.pdf')
+    except (PDFQueueFullError, PDFTimeoutError) as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '5'}
+    except Exception as e:
+        print(f"Error generating portfolio PDF: {str(e)}")
+        print(traceback.format_exc())
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/download-<any(html, markdown):export_format>', methods=['POST'])
+def download_export(export_format):
+    """Download an analysis as a self-contained HTML page or as markdown (no PDF render)"""
+    try:
+        data = request.json
+        if not data:
+            return jsonify({'error': 'No JSON data provided'}), 400
+
+        analysis_text = data.get('analysis', '')
+        if not analysis_text.strip():
+            return jsonify({'error': 'No analysis to export'}), 400
+        context = data.get('context', '')
+        timestamp = datetime.now()
+        _, mimetype, extension = EXPORT_FORMATS[export_format]
+
+        # One ETag per content encoding, since the bytes differ; any of them means the client is current
+        encoding = request.accept_encodings.best_match(export_cache.encodings, default='identity')
+        key = export_cache_key(export_format, analysis_text, context)
+        if any(request.if_none_match.contains(etag) for etag in (key, f'{key}-{encoding}')):
+            return '', 304
+
+        key, body, encoding, cached = get_export(export_format, analysis_text, context, encoding, timestamp)
+        response = app.response_class(body, mimetype=mimetype)
+        response.headers['Content-Disposition'] = (
+            f'attachment; filename=ProductAnalysis_{timestamp.strftime("%Y%m%d_%H%M%S")}.{extension}'
+        )
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+        response.set_etag(key if encoding == 'identity' else f'{key}-{encoding}')
+        response.headers['Cache-Control'] = 'private, no-cache'
+        response.headers['Vary'] = 'Accept-Encoding'
+        response.headers['X-Export-Cache'] = 'hit' if cached else 'miss'
+        return response
+    except Exception as e:
+        print(f"Error exporting {export_format}: {str(e)}")
+        print(traceback.format_exc())
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/analyze-framing', methods=['POST'])
 def analyze_framing():
     """Handle decision framing analysis"""
@@ -608,14 +721,17 @@ def analyze_framing():
         if not os.getenv('OPENAI_API_KEY'):
             return jsonify({'error': 'OpenAI API key not configured'}), 500
         
-        engine = ProductThinkingEngine()
+        engine = create_engine(data)
         response = engine.analyze_decision_framing(data)
         
         return jsonify({
             'success': True,
             'analysis': response,
+            'trimmed_inputs': engine.last_trim_report,
             'timestamp': datetime.now().strftime("%Y%m%d_%H%M%S")
         })
+    except BudgetExceededError as e:
+        return jsonify({'success': False, 'error': str(e)}), 429
     except Exception as e:
         print(f"Error in /analyze-framing: {str(e)}")
         print(traceback.format_exc())
@@ -636,14 +752,17 @@ def analyze_dashboard():
         if not os.getenv('OPENAI_API_KEY'):
             return jsonify({'error': 'OpenAI API key not configured'}), 500
         
-        engine = ProductThinkingEngine()
+        engine = create_engine(data)
         response = engine.analyze_decision_dashboard(data)
         
         return jsonify({
             'success': True,
             'analysis': response,
+            'trimmed_inputs': engine.last_trim_report,
             'timestamp': datetime.now().strftime("%Y%m%d_%H%M%S")
         })
+    except BudgetExceededError as e:
+        return jsonify({'success': False, 'error': str(e)}), 429
     except Exception as e:
         print(f"Error in /analyze-dashboard: {str(e)}")
         print(traceback.format_exc())
@@ -664,14 +783,17 @@ def analyze_confidence():
         if not os.getenv('OPENAI_API_KEY'):
             return jsonify({'error': 'OpenAI API key not configured'}), 500
         
-        engine = ProductThinkingEngine()
+        engine = create_engine(data)
         response = engine.analyze_decision_confidence(data)
         
         return jsonify({
             'success': True,
             'analysis': response,
+            'trimmed_inputs': engine.last_trim_report,
             'timestamp': datetime.now().strftime("%Y%m%d_%H%M%S")
         })
+    except BudgetExceededError as e:
+        return jsonify({'success': False, 'error': str(e)}), 429
     except Exception as e:
         print(f"Error in /analyze-confidence: {str(e)}")
         print(traceback.format_exc())
@@ -692,14 +814,17 @@ def analyze_defense():
         if not os.getenv('OPENAI_API_KEY'):
             return jsonify({'error': 'OpenAI API key not configured'}), 500
         
-        engine = ProductThinkingEngine()
+        engine = create_engine(data)
         response = engine.generate_decision_defense(data)
         
         return jsonify({
             'success': True,
             'analysis': response,
+            'trimmed_inputs': engine.last_trim_report,
             'timestamp': datetime.now().strftime("%Y%m%d_%H%M%S")
         })
+    except BudgetExceededError as e:
+        return jsonify({'success': False, 'error': str(e)}), 429
     except Exception as e:
         print(f"Error in /analyze-defense: {str(e)}")
         print(traceback.format_exc())
@@ -720,18 +845,22 @@ def analyze_retrospective():
         if not os.getenv('OPENAI_API_KEY'):
             return jsonify({'error': 'OpenAI API key not configured'}), 500
         
-        engine = ProductThinkingEngine()
+        engine = create_engine(data)
         response = engine.analyze_retrospective(data)
         
         return jsonify({
             'success': True,
             'analysis': response,
+            'trimmed_inputs': engine.last_trim_report,
             'timestamp': datetime.now().strftime("%Y%m%d_%H%M%S")
         })
+    except BudgetExceededError as e:
+        return jsonify({'success': False, 'error': str(e)}), 429
     except Exception as e:
         print(f"Error in /analyze-retrospective: {str(e)}")
         print(traceback.format_exc())
         return jsonify({'error': str(e)}), 500
 
 if __name__ == '__main__':
+    assets.reload = True  # debug server: pick up edited CSS/JS and templates
     app.run(host='0.0.0.0', port=5000, debug=True)
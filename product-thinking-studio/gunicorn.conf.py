@@ -1,21 +1,48 @@
 """
-Gunicorn configuration for Render.com free tier
-Optimized for 512MB RAM limit
+Gunicorn configuration
+Worker count, threads and worker class come from the sizing profile in
+config.py (SIZING_PROFILE=small|standard|large, detected from CPUs and memory
+by default; "small" is the 512MB Render free tier setup).
 """
-import multiprocessing
+import glob
 import os
+import tempfile
+
+from dotenv import load_dotenv
+
+# Sessions are signed with SECRET_KEY and must verify on every worker. If it is
+# not set, derive one here in the master so all workers (including ones forked
+# later by max_requests recycling) inherit the same key instead of each making
+# up its own. Set SECRET_KEY to keep sessions valid across restarts.
+load_dotenv()
+if not os.getenv('SECRET_KEY'):
+    print("SECRET_KEY is not set; using a random key shared by the workers until the next restart")
+    os.environ['SECRET_KEY'] = os.urandom(24).hex()
+
+from config import apply_sizing
+
+# Also sets the profile's pool and cache sizes as environment defaults before the app is loaded
+sizing = apply_sizing()
+
+# Workers write their metrics to files here and /metrics merges them (see
+# app/metrics.py). Must be set before the app is imported. Files left by a
+# previous run are removed the first time this config is loaded (not on reload).
+if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+    metrics_dir = os.path.join("/dev/shm" if os.path.exists("/dev/shm") else tempfile.gettempdir(),
+                               f"product-playground-metrics-{os.getenv('PORT', '10000')}")
+    os.makedirs(metrics_dir, exist_ok=True)
+    for stale in glob.glob(os.path.join(metrics_dir, '*.db')):
+        os.remove(stale)
+    os.environ['PROMETHEUS_MULTIPROC_DIR'] = metrics_dir
 
 # Bind to port specified by environment or default to 10000
 bind = f"0.0.0.0:{os.getenv('PORT', '10000')}"
 
-# Workers: 1 worker for free tier to conserve memory
-workers = 1
-
-# Worker class - sync is more stable for free tier
-worker_class = "sync"
-
-# Threads per worker - helps handle concurrent requests with less memory
-threads = 2
+# Workers, worker class and threads per worker (WEB_CONCURRENCY, GUNICORN_WORKER_CLASS
+# and GUNICORN_THREADS override the profile)
+workers = sizing['workers']
+worker_class = sizing['worker_class']
+threads = sizing['threads']
 
 # Timeout settings - prevent workers from hanging
 timeout = 120
@@ -24,7 +51,8 @@ keepalive = 5
 # Graceful timeout for worker shutdown
 graceful_timeout = 30
 
-# Max requests before worker restart (helps with memory leaks)
+# Max requests before worker restart (helps with memory leaks; benchmarks/footprint.py
+# measures per-worker growth and whether this is needed under the memory cap)
 max_requests = 1000
 max_requests_jitter = 100
 
@@ -34,8 +62,9 @@ errorlog = "-"
 loglevel = "info"
 access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(r)s" %(s)s %(b)s "%(f)s" "%(a)s"'
 
-# Preload app to save memory
-preload_app = True
+# Preload app to save memory. Not with gevent/eventlet: they must patch the
+# standard library before the app imports it, which happens in each worker.
+preload_app = worker_class not in ('gevent', 'eventlet')
 
 # Worker tmp directory - use /tmp for free tier
 worker_tmp_dir = "/dev/shm" if os.path.exists("/dev/shm") else "/tmp"
@@ -45,7 +74,8 @@ worker_connections = 1000
 
 def on_starting(server):
     """Called just before the master process is initialized."""
-    print("Starting Gunicorn server...")
+    print(f"Starting Gunicorn server ({sizing['profile']} profile: {workers} workers x {threads} threads, "
+          f"{worker_class}; {sizing['cpus']} CPUs, {sizing['memory_mb']} MB)...")
 
 def on_reload(server):
     """Called to recycle workers during a reload via SIGHUP."""
@@ -55,6 +85,24 @@ def when_ready(server):
     """Called just after the server is started."""
     print("Gunicorn server is ready. Spawning workers...")
 
+def post_worker_init(worker):
+    """Called in each worker after the app is loaded: warm it up before (or while) it takes traffic.
+
+    Runs post-fork, so threads, connections and browsers belong to this worker.
+    With WARMUP_BLOCKING=1 the worker accepts no connections until warm-up is
+    done; otherwise it serves at once and /health/ready returns 503 until then.
+    """
+    from flask_app import warmup
+    warmup.start(block=os.getenv('WARMUP_BLOCKING', '0') == '1')
+
+def child_exit(server, worker):
+    """Called in the master when a worker exits: drop its live gauges from /metrics"""
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:  # optional; no metrics to clean up
+        return
+    multiprocess.mark_process_dead(worker.pid)
+
 def worker_int(worker):
     """Called when worker receives SIGINT or SIGQUIT signal"""
     print(f"Worker {worker.pid} interrupted")
@@ -0,0 +1,1184 @@
+let currentAnalysis = null;
+let walkthroughMode = false;
+let currentWalkthroughStep = 1;
+let walkthroughData = {};
+
+// Toast Notification System
+function showToast(message, type = 'info', duration = 5000) {
+    const toast = document.createElement('div');
+    toast.className = `toast ${type}`;
+
+    const icons = {
+        success: '✅',
+        error: '❌',
+        info: 'ℹ️',
+        warning: '⚠️'
+    };
+
+    toast.innerHTML = `
+        <span class="toast-icon">${icons[type] || icons.info}</span>
+        <div class="toast-message">${message}</div>
+        <button class="toast-close" onclick="this.parentElement.remove()">×</button>
+    `;
+
+    document.body.appendChild(toast);
+
+    setTimeout(() => {
+        toast.style.opacity = '0';
+        setTimeout(() => toast.remove(), 300);
+    }, duration);
+}
+
+// Character Counter
+function setupCharCounter(textareaId, minChars = 50, maxChars = 2000) {
+    const textarea = document.getElementById(textareaId);
+    if (!textarea) return;
+
+    const counter = document.createElement('div');
+    counter.className = 'char-counter';
+    counter.innerHTML = `<span id="${textareaId}-count">0</span> / ${maxChars} characters`;
+
+    textarea.parentElement.appendChild(counter);
+
+    textarea.addEventListener('input', function() {
+        const count = this.value.length;
+        const countSpan = document.getElementById(`${textareaId}-count`);
+        countSpan.textContent = count;
+
+        counter.classList.remove('warning', 'error');
+        if (count > maxChars) {
+            counter.classList.add('error');
+        } else if (count > maxChars * 0.9) {
+            counter.classList.add('warning');
+        }
+
+        if (count < minChars) {
+            countSpan.parentElement.innerHTML = `<span id="${textareaId}-count">${count}</span> / ${maxChars} (min: ${minChars})`;
+        } else {
+            countSpan.parentElement.innerHTML = `<span id="${textareaId}-count">${count}</span> / ${maxChars} ✓`;
+        }
+    });
+}
+
+// Initialize character counters when page loads
+document.addEventListener('DOMContentLoaded', function() {
+    setupCharCounter('challenge-input', 50, 2000);
+    setupCharCounter('cause-input', 50, 2000);
+    setupCharCounter('strategy-input', 50, 2000);
+    setupCharCounter('context-input', 50, 2000);
+    setupCharCounter('risk-input', 50, 2000);
+    setupCharCounter('stakeholder-input', 50, 2000);
+    setupCharCounter('url-input', 10, 500);
+    setupCharCounter('prd-input', 100, 3000);
+});
+
+// Get tab from URL parameter
+function getTabFromURL() {
+    const params = new URLSearchParams(window.location.search);
+    return params.get('tab') || 'challenge';
+}
+
+// Show the appropriate tab on page load
+function initializePage() {
+    const tab = getTabFromURL();
+    showTab(tab);
+}
+
+function showTab(tab) {
+    // Hide all tabs
+    document.querySelectorAll('.tab-content').forEach(t => t.classList.add('hidden'));
+
+    // Show selected tab
+    const tabElement = document.getElementById(`${tab}-tab`);
+    if (tabElement) {
+        tabElement.classList.remove('hidden');
+
+        // Initialize walkthrough on first load
+        if (tab === 'walkthrough' && currentWalkthroughStep === 1) {
+            // Ensure step 1 is visible
+            for (let i = 1; i <= 5; i++) {
+                const stepEl = document.getElementById(`wt-step-${i}`);
+                if (stepEl) {
+                    if (i === 1) {
+                        stepEl.classList.remove('hidden');
+                    } else {
+                        stepEl.classList.add('hidden');
+                    }
+                }
+            }
+            updateStepIndicators();
+        }
+
+        // Update page title based on tab
+        const titles = {
+            'challenge': {
+                title: '💡 Product Challenge Analysis',
+                subtitle: 'Navigate complex product decisions with AI-powered insights'
+            },
+            'kpi': {
+                title: '📊 Dashboard KPI Diagnostics',
+                subtitle: 'Deep dive into your product metrics and uncover insights'
+            },
+            'teardown': {
+                title: '🔍 Product Teardown',
+                subtitle: 'Comprehensive product & market analysis from any website'
+            },
+            'walkthrough': {
+                title: '🧭 Guided Product Thinking',
+                subtitle: 'A structured 5-step framework for better product decisions'
+            },
+            'framing': {
+                title: '🎯 Decision Framing Engine',
+                subtitle: 'Clarify what decision is actually being made before analysis begins'
+            },
+            'dashboard': {
+                title: '📊 Decision Dashboard',
+                subtitle: 'Understand where things appear to be going wrong and why it matters'
+            },
+            'confidence': {
+                title: '⚡ Confidence Meter',
+                subtitle: 'Assess whether there is enough signal to act with confidence'
+            },
+            'defense': {
+                title: '🛡️ Decision Defense Pack',
+                subtitle: 'Clearly communicate and defend decisions to stakeholders'
+            },
+            'retrospective': {
+                title: '🔄 Decision Retrospective',
+                subtitle: 'Capture learning after decisions to improve future judgment'
+            }
+        };
+
+        if (titles[tab]) {
+            document.getElementById('page-title').textContent = titles[tab].title;
+            document.getElementById('page-subtitle').textContent = titles[tab].subtitle;
+        }
+    }
+}
+
+// Walkthrough Mode Navigation Functions
+function goToStep1() {
+    navigateToStep(1);
+}
+
+function goToStep2() {
+    // Validate Step 1 fields
+    const targetUser = document.getElementById('wt-target-user').value.trim();
+    const decision = document.getElementById('wt-decision').value.trim();
+
+    if (!targetUser || !decision) {
+        const alertDiv = document.getElementById('walkthrough-alert');
+        showAlert(alertDiv, '⚠️ Please fill in Target User and Decision (required fields)', 'error');
+        return;
+    }
+
+    navigateToStep(2);
+}
+
+function goToStep3() {
+    navigateToStep(3);
+}
+
+function goToStep4() {
+    navigateToStep(4);
+}
+
+function goToStep5() {
+    navigateToStep(5);
+}
+
+function navigateToStep(stepNumber) {
+    // Hide all steps
+    for (let i = 1; i <= 5; i++) {
+        const stepEl = document.getElementById(`wt-step-${i}`);
+        if (stepEl) {
+            stepEl.classList.add('hidden');
+        }
+    }
+
+    // Show target step
+    currentWalkthroughStep = stepNumber;
+    const targetStep = document.getElementById(`wt-step-${stepNumber}`);
+    if (targetStep) {
+        targetStep.classList.remove('hidden');
+    }
+
+    // Update indicators
+    updateStepIndicators();
+
+    // Hide alert and loading
+    const alertDiv = document.getElementById('walkthrough-alert');
+    const loadingDiv = document.getElementById('walkthrough-loading');
+    if (alertDiv) alertDiv.className = 'hidden';
+    if (loadingDiv) loadingDiv.classList.add('hidden');
+
+    // Scroll to top
+    window.scrollTo({ top: 0, behavior: 'smooth' });
+}
+
+function updateStepIndicators() {
+    for (let i = 1; i <= 5; i++) {
+        const indicator = document.querySelector(`.step-indicator[data-step="${i}"]`);
+        if (!indicator) continue;
+
+        if (i < currentWalkthroughStep) {
+            indicator.classList.add('completed');
+            indicator.classList.remove('active');
+        } else if (i === currentWalkthroughStep) {
+            indicator.classList.add('active');
+            indicator.classList.remove('completed');
+        } else {
+            indicator.classList.remove('active', 'completed');
+        }
+    }
+}
+
+function startNewWalkthrough() {
+    // Clear all inputs
+    document.getElementById('wt-target-user').value = '';
+    document.getElementById('wt-decision').value = '';
+    document.getElementById('wt-constraints').value = '';
+    document.getElementById('wt-causes').value = '';
+    document.getElementById('wt-success').value = '';
+
+    // Clear analysis content
+    document.getElementById('wt-analysis-content').innerHTML = '';
+    document.getElementById('wt-tradeoffs-content').innerHTML = '';
+    document.getElementById('wt-nextsteps-content').innerHTML = '';
+
+    // Reset to step 1
+    currentAnalysis = null;
+    navigateToStep(1);
+}
+
+async function generateAnalysis() {
+    // Collect walkthrough data
+    const walkthroughData = {
+        targetUser: document.getElementById('wt-target-user').value.trim(),
+        decision: document.getElementById('wt-decision').value.trim(),
+        constraints: document.getElementById('wt-constraints').value.trim(),
+        causes: document.getElementById('wt-causes').value.trim(),
+        success: document.getElementById('wt-success').value.trim()
+    };
+
+    // Validate required fields
+    if (!walkthroughData.targetUser || !walkthroughData.decision) {
+        const alertDiv = document.getElementById('walkthrough-alert');
+        showAlert(alertDiv, '⚠️ Please fill in at least the Target User and Decision fields', 'error');
+        return;
+    }
+
+    // Build context for AI
+    const context = `
+Target User: ${walkthroughData.targetUser}
+
+Decision to Make: ${walkthroughData.decision}
+
+Constraints: ${walkthroughData.constraints}
+
+Hypotheses about Causes/Opportunities: ${walkthroughData.causes}
+
+Success Criteria: ${walkthroughData.success}
+`;
+
+    const alertDiv = document.getElementById('walkthrough-alert');
+    const loadingDiv = document.getElementById('walkthrough-loading');
+
+    // Hide Step 2
+    document.getElementById('wt-step-2').classList.add('hidden');
+
+    // Show loading
+    alertDiv.className = 'hidden';
+    loadingDiv.classList.remove('hidden');
+
+    try {
+        const response = await fetch('/analyze-walkthrough', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ 
+                context: context,
+                walkthrough_data: walkthroughData
+            })
+        });
+
+        loadingDiv.classList.add('hidden');
+
+        if (!response.ok) {
+            let errorMessage = 'Analysis failed';
+            try {
+                const errorData = await response.json();
+                errorMessage = errorData.error || errorMessage;
+            } catch {
+                errorMessage = `Server error (${response.status})`;
+            }
+            showAlert(alertDiv, `❌ ${errorMessage}`, 'error');
+            document.getElementById('wt-step-2').classList.remove('hidden');
+            return;
+        }
+
+        const data = await response.json();
+
+        if (data.success) {
+            currentAnalysis = {
+                analysis: data.analysis,
+                context: context,
+                timestamp: data.timestamp
+            };
+
+            // Parse and display the analysis in steps 3, 4, 5
+            displayWalkthroughAnalysis(data.analysis);
+
+            // Move to step 3
+            navigateToStep(3);
+        } else {
+            showAlert(alertDiv, `❌ ${data.error || 'Analysis failed'}`, 'error');
+            document.getElementById('wt-step-2').classList.remove('hidden');
+        }
+    } catch (error) {
+        loadingDiv.classList.add('hidden');
+        showAlert(alertDiv, `❌ Error: ${error.message}`, 'error');
+        document.getElementById('wt-step-2').classList.remove('hidden');
+    }
+}
+
+async function downloadWalkthroughPDF() {
+    if (!currentAnalysis) {
+        alert('No analysis available to download');
+        return;
+    }
+
+    try {
+        const response = await fetch('/download-pdf', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({
+                analysis: currentAnalysis.analysis,
+                context: currentAnalysis.context
+            })
+        });
+
+        if (!response.ok) {
+            throw new Error('Failed to generate PDF');
+        }
+
+        const blob = await response.blob();
+        const url = window.URL.createObjectURL(blob);
+        const a = document.createElement('a');
+        a.href = url;
+        const timestamp = new Date().toISOString().split('T')[0];
+        a.download = `ProductThinking_Walkthrough_${timestamp}.pdf`;
+        document.body.appendChild(a);
+        a.click();
+        window.URL.revokeObjectURL(url);
+        document.body.removeChild(a);
+    } catch (error) {
+        alert('Error downloading PDF: ' + error.message);
+    }
+}
+
+function displayWalkthroughAnalysis(analysis) {
+    // Convert markdown to HTML with better formatting
+    const html = analysis
+        .replace(/^### (.+)$/gm, '<h3 style="color: var(--secondary); margin-top: 1.5rem; margin-bottom: 1rem; font-size: 1.2rem;">$1</h3>')
+        .replace(/^## (.+)$/gm, '<h2 style="color: var(--primary); margin-top: 1.5rem; margin-bottom: 1rem; font-size: 1.4rem;">$1</h2>')
+        .replace(/\*\*(.+?)\*\*/g, '<strong style="color: var(--text);">$1</strong>')
+        .replace(/^- (.+)$/gm, '<li style="margin-bottom: 0.5rem;">$1</li>')
+        .replace(/\n\n/g, '</p><p style="margin: 1rem 0; line-height: 1.8; color: var(--text-muted);">');
+
+    // Get current walkthrough data for display
+    const targetUser = document.getElementById('wt-target-user').value.trim();
+    const decision = document.getElementById('wt-decision').value.trim();
+
+    // Try to intelligently split content by common section patterns
+    const sections = analysis.split(/##\s+/);
+
+    // Find risk/tradeoff section (look for keywords)
+    let riskSection = '';
+    let nextStepsSection = '';
+    let analysisSection = '';
+
+    sections.forEach(section => {
+        const lowerSection = section.toLowerCase();
+        if (lowerSection.includes('risk') || lowerSection.includes('tradeoff') || lowerSection.includes('trade-off') || lowerSection.includes('caution')) {
+            riskSection = section;
+        } else if (lowerSection.includes('next step') || lowerSection.includes('recommendation') || lowerSection.includes('suggested') || lowerSection.includes('action')) {
+            nextStepsSection = section;
+        } else if (!analysisSection && section.trim().length > 50) {
+            analysisSection = section;
+        }
+    });
+
+    // If no clear sections found, split analysis into thirds
+    if (!riskSection && !nextStepsSection) {
+        const parts = analysis.split('\n\n');
+        const third = Math.floor(parts.length / 3);
+        analysisSection = parts.slice(0, third * 2).join('\n\n');
+        riskSection = parts.slice(third * 2, third * 3).join('\n\n');
+        nextStepsSection = parts.slice(third * 3).join('\n\n');
+    }
+
+    // Format analysis content for Step 3
+    const step3Content = `
+        <div style="background: rgba(99, 102, 241, 0.05); padding: 1.5rem; border-radius: 12px; border: 1px solid var(--border); margin-bottom: 1.5rem;">
+            <p style="margin: 0; color: var(--text-muted); line-height: 1.7;">
+                <strong style="color: var(--primary);">Your Input Context:</strong><br>
+                <strong>Target User:</strong> ${targetUser}<br>
+                <strong>Decision:</strong> ${decision}
+            </p>
+        </div>
+        <div style="line-height: 1.8; color: var(--text-muted);">
+            <p style="margin: 1rem 0; line-height: 1.8; color: var(--text-muted);">${analysisSection || html}</p>
+        </div>
+    `;
+
+    // Format risk content for Step 4
+    const riskHtml = riskSection
+        .replace(/^### (.+)$/gm, '<h3 style="color: var(--warning); margin-top: 1.5rem; margin-bottom: 1rem;">$1</h3>')
+        .replace(/^## (.+)$/gm, '<h2 style="color: var(--warning); margin-top: 1rem; margin-bottom: 1rem;">$1</h2>')
+        .replace(/\*\*(.+?)\*\*/g, '<strong style="color: var(--text);">$1</strong>')
+        .replace(/^- (.+)$/gm, '<li style="margin-bottom: 0.75rem; line-height: 1.7;">$1</li>')
+        .replace(/\n\n/g, '</p><p style="margin: 1rem 0; line-height: 1.8; color: var(--text-muted);">');
+
+    const step4Content = `
+        <div style="line-height: 1.8;">
+            <h2 style="color: var(--warning); margin-bottom: 1rem; font-size: 1.4rem;">⚠️ Risk Management</h2>
+            <p style="margin: 1rem 0; line-height: 1.8; color: var(--text-muted);">${riskHtml || 'Analyzing potential risks and tradeoffs for this decision...'}</p>
+        </div>
+        <div style="padding: 1.5rem; background: rgba(239, 68, 68, 0.1); border: 1px solid rgba(239, 68, 68, 0.2); border-radius: 12px; margin-top: 1.5rem;">
+            <p style="margin: 0; color: var(--error); font-weight: 500; line-height: 1.7;">
+                ⚠️ Consider these risks carefully. No decision is without tradeoffs.
+            </p>
+        </div>
+    `;
+
+    // Format next steps content for Step 5
+    const nextStepsHtml = nextStepsSection
+        .replace(/^### (.+)$/gm, '<h3 style="color: var(--secondary); margin-top: 1.5rem; margin-bottom: 1rem;">$1</h3>')
+        .replace(/^## (.+)$/gm, '<h2 style="color: var(--secondary); margin-top: 1rem; margin-bottom: 1rem;">$1</h2>')
+        .replace(/\*\*(.+?)\*\*/g, '<strong style="color: var(--text);">$1</strong>')
+        .replace(/^- (.+)$/gm, '<li style="margin-bottom: 0.75rem; line-height: 1.7;">$1</li>')
+        .replace(/\n\n/g, '</p><p style="margin: 1rem 0; line-height: 1.8; color: var(--text-muted);">');
+
+    const step5Content = `
+        <div style="line-height: 1.8;">
+            <h2 style="color: var(--secondary); margin-bottom: 1rem; font-size: 1.4rem;">🎯 Recommended Next Steps</h2>
+            <p style="margin: 1rem 0; line-height: 1.8; color: var(--text-muted);">${nextStepsHtml || 'Based on the analysis, here are the recommended actions...'}</p>
+        </div>
+    `;
+
+    document.getElementById('wt-analysis-content').innerHTML = step3Content;
+    document.getElementById('wt-tradeoffs-content').innerHTML = step4Content;
+    document.getElementById('wt-nextsteps-content').innerHTML = step5Content;
+}
+
+function updateKPICards() {
+    const dau = parseFloat(document.getElementById('dau').value) || 0;
+    const mau = parseFloat(document.getElementById('mau').value) || 0;
+    const conversion = parseFloat(document.getElementById('conversion').value) || 0;
+    const retention = parseFloat(document.getElementById('retention').value) || 0;
+    const nps = parseFloat(document.getElementById('nps').value) || 0;
+
+    if (dau > 0 || mau > 0) {
+        const dauMauRatio = mau > 0 ? (dau / mau * 100).toFixed(1) : 0;
+
+        const container = document.getElementById('kpi-cards-container');
+        container.className = 'kpi-cards';
+        container.innerHTML = `
+            <div class="kpi-card">
+                <div class="kpi-title">DAU/MAU Ratio</div>
+                <div class="kpi-value">${dauMauRatio}%</div>
+                <div class="kpi-title">Stickiness</div>
+            </div>
+            <div class="kpi-card">
+                <div class="kpi-title">Conversion Rate</div>
+                <div class="kpi-value">${conversion.toFixed(1)}%</div>
+                <div class="kpi-title">Trial to Paid</div>
+            </div>
+            <div class="kpi-card">
+                <div class="kpi-title">Retention (7-Day)</div>
+                <div class="kpi-value">${retention.toFixed(0)}%</div>
+                <div class="kpi-title">User Return Rate</div>
+            </div>
+            <div class="kpi-card">
+                <div class="kpi-title">NPS Score</div>
+                <div class="kpi-value">${nps}</div>
+                <div class="kpi-title">Satisfaction</div>
+            </div>
+        `;
+    }
+}
+
+// Update KPI cards when values change
+['dau', 'mau', 'conversion', 'retention', 'nps'].forEach(id => {
+    document.getElementById(id)?.addEventListener('input', updateKPICards);
+});
+
+async function analyzeChallenge() {
+    const input = document.getElementById('challenge-input').value.trim();
+    const alertDiv = document.getElementById('challenge-alert');
+    const loadingDiv = document.getElementById('challenge-loading');
+    const resultDiv = document.getElementById('challenge-result');
+
+    if (!input) {
+        showAlert(alertDiv, '⚠️ Please describe your product challenge', 'warning');
+        showToast('Please enter a product challenge description', 'warning');
+        return;
+    }
+
+    if (input.length < 50) {
+        showToast('Please provide more details (minimum 50 characters)', 'warning');
+        return;
+    }
+
+    showToast('Analyzing your challenge...', 'info', 2000);
+    alertDiv.className = 'hidden';
+    resultDiv.className = 'hidden';
+    loadingDiv.classList.remove('hidden');
+
+    try {
+        const response = await fetch('/analyze', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ context: input })
+        });
+
+        loadingDiv.classList.add('hidden');
+
+        if (!response.ok) {
+            let errorMessage = 'Analysis failed';
+            try {
+                const errorData = await response.json();
+                errorMessage = errorData.error || errorMessage;
+            } catch {
+                errorMessage = `Server error (${response.status})`;
+            }
+            showAlert(alertDiv, `❌ ${errorMessage}`, 'error');
+            showToast(errorMessage, 'error');
+            return;
+        }
+
+        const data = await response.json();
+
+        if (data.success) {
+            currentAnalysis = {
+                analysis: data.analysis,
+                context: input,
+                timestamp: data.timestamp
+            };
+            displayResult(resultDiv, data.analysis, input);
+            showAlert(alertDiv, '✅ Analysis complete! Review the strategic insights below.', 'success');
+            showToast('Analysis complete! 🎉', 'success');
+        } else {
+            showAlert(alertDiv, `❌ ${data.error || 'Analysis failed'}`, 'error');
+            showToast(data.error || 'Analysis failed', 'error');
+        }
+    } catch (error) {
+        loadingDiv.classList.add('hidden');
+        showAlert(alertDiv, `❌ Error: ${error.message}`, 'error');
+        showToast(`Error: ${error.message}`, 'error');
+    }
+}
+
+async function analyzeKPI() {
+    const dau = parseFloat(document.getElementById('dau').value) || 0;
+    const mau = parseFloat(document.getElementById('mau').value) || 0;
+
+    const alertDiv = document.getElementById('kpi-alert');
+    const loadingDiv = document.getElementById('kpi-loading');
+    const resultDiv = document.getElementById('kpi-result');
+
+    if (dau === 0 && mau === 0) {
+        showAlert(alertDiv, '⚠️ Please enter at least some KPI data', 'warning');
+        return;
+    }
+
+    const kpiData = {
+        dau: dau,
+        mau: mau,
+        avg_session_time: parseFloat(document.getElementById('session-time').value) || 0,
+        conversion_rate: parseFloat(document.getElementById('conversion').value) || 0,
+        churn_rate: parseFloat(document.getElementById('churn').value) || 0,
+        retention_rate: parseFloat(document.getElementById('retention').value) || 0,
+        nps_score: parseInt(document.getElementById('nps').value) || 0,
+        revenue_per_user: parseFloat(document.getElementById('arpu').value) || 0,
+        recent_changes: document.getElementById('recent-changes').value.trim()
+    };
+
+    alertDiv.className = 'hidden';
+    resultDiv.className = 'hidden';
+    loadingDiv.classList.remove('hidden');
+
+    try {
+        const response = await fetch('/analyze-kpi', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(kpiData)
+        });
+
+        loadingDiv.classList.add('hidden');
+
+        if (!response.ok) {
+            let errorMessage = 'Analysis failed';
+            try {
+                const errorData = await response.json();
+                errorMessage = errorData.error || errorMessage;
+            } catch {
+                errorMessage = `Server error (${response.status})`;
+            }
+            showAlert(alertDiv, `❌ ${errorMessage}`, 'error');
+            return;
+        }
+
+        const data = await response.json();
+
+        if (data.success) {
+            currentAnalysis = {
+                analysis: data.analysis,
+                context: JSON.stringify(data.kpi_data),
+                timestamp: data.timestamp
+            };
+            displayResult(resultDiv, data.analysis, '');
+            showAlert(alertDiv, '✅ KPI analysis complete! Review the diagnostic insights below.', 'success');
+        } else {
+            showAlert(alertDiv, `❌ ${data.error || 'Analysis failed'}`, 'error');
+        }
+    } catch (error) {
+        loadingDiv.classList.add('hidden');
+        showAlert(alertDiv, `❌ Error: ${error.message}`, 'error');
+    }
+}
+
+async function analyzeTeardown() {
+    const websiteUrl = document.getElementById('website-url').value.trim();
+    const additionalContext = document.getElementById('teardown-context').value.trim();
+    const alertDiv = document.getElementById('teardown-alert');
+    const loadingDiv = document.getElementById('teardown-loading');
+    const resultDiv = document.getElementById('teardown-result');
+
+    if (!websiteUrl) {
+        showAlert(alertDiv, '⚠️ Please enter a website URL to analyze', 'warning');
+        return;
+    }
+
+    alertDiv.className = 'hidden';
+    resultDiv.className = 'hidden';
+    loadingDiv.classList.remove('hidden');
+
+    try {
+        const response = await fetch('/analyze-website', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ 
+                website_url: websiteUrl,
+                additional_context: additionalContext
+            })
+        });
+
+        loadingDiv.classList.add('hidden');
+
+        if (!response.ok) {
+            let errorMessage = 'Analysis failed';
+            try {
+                const errorData = await response.json();
+                errorMessage = errorData.error || errorMessage;
+            } catch {
+                errorMessage = `Server error (${response.status})`;
+            }
+            showAlert(alertDiv, `❌ ${errorMessage}`, 'error');
+            return;
+        }
+
+        const data = await response.json();
+
+        if (data.success) {
+            currentAnalysis = {
+                analysis: data.analysis,
+                context: `Product Teardown: ${data.website_url}`,
+                timestamp: data.timestamp
+            };
+            displayResult(resultDiv, data.analysis, data.website_url);
+            showAlert(alertDiv, '✅ Product teardown complete! Review the strategic insights below.', 'success');
+        } else {
+            showAlert(alertDiv, `❌ ${data.error || 'Analysis failed'}`, 'error');
+        }
+    } catch (error) {
+        loadingDiv.classList.add('hidden');
+        showAlert(alertDiv, `❌ Error: ${error.message}`, 'error');
+    }
+}
+
+function showAlert(div, message, type) {
+    div.className = `alert alert-${type}`;
+    div.textContent = message;
+}
+
+function displayResult(div, analysis, context) {
+    // Convert markdown to HTML (basic conversion)
+    const html = analysis
+        .replace(/^### (.+)$/gm, '<h3>$1</h3>')
+        .replace(/^## (.+)$/gm, '<h2>$1</h2>')
+        .replace(/\*\*(.+?)\*\*/g, '<strong>$1</strong>')
+        .replace(/^- (.+)$/gm, '<li>$1</li>')
+        .replace(/(<li>.*<\/li>)/s, '<ul>$1</ul>')
+        .replace(/\n\n/g, '<p></p>');
+
+    div.className = 'analysis-result';
+    div.innerHTML = `
+        <h2>🎯 Strategic Analysis</h2>
+        ${html}
+        <div style="margin-top: 2.5rem; text-align: center;">
+            <button class="btn btn-secondary" onclick="downloadPDF()">
+                <span>📥</span>
+                <span>Download as PDF</span>
+            </button>
+            <button class="btn btn-secondary" onclick="downloadExport('html')">
+                <span>🌐</span>
+                <span>Download as HTML</span>
+            </button>
+        </div>
+    `;
+}
+
+async function downloadPDF() {
+    if (!currentAnalysis) return;
+
+    try {
+        const response = await fetch('/download-pdf', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(currentAnalysis)
+        });
+
+        const blob = await response.blob();
+        const url = window.URL.createObjectURL(blob);
+        const a = document.createElement('a');
+        a.href = url;
+        a.download = `ProductAnalysis_${currentAnalysis.timestamp}.pdf`;
+        document.body.appendChild(a);
+        a.click();
+        window.URL.revokeObjectURL(url);
+        document.body.removeChild(a);
+    } catch (error) {
+        alert('Error downloading PDF: ' + error.message);
+    }
+}
+
+async function downloadExport(format) {
+    if (!currentAnalysis) return;
+
+    try {
+        const response = await fetch(`/download-${format}`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(currentAnalysis)
+        });
+
+        if (!response.ok) {
+            throw new Error(`Failed to export ${format}`);
+        }
+
+        const blob = await response.blob();
+        const url = window.URL.createObjectURL(blob);
+        const a = document.createElement('a');
+        a.href = url;
+        a.download = `ProductAnalysis_${currentAnalysis.timestamp}.${format === 'markdown' ? 'md' : format}`;
+        document.body.appendChild(a);
+        a.click();
+        window.URL.revokeObjectURL(url);
+        document.body.removeChild(a);
+    } catch (error) {
+        alert('Error exporting analysis: ' + error.message);
+    }
+}
+
+// Decision Framing Engine
+async function analyzeFraming() {
+    const framingData = {
+        decision: document.getElementById('framing-decision').value.trim(),
+        stakeholders: document.getElementById('framing-stakeholders').value.trim(),
+        options: document.getElementById('framing-options').value.trim(),
+        constraints: document.getElementById('framing-constraints').value.trim(),
+        success: document.getElementById('framing-success').value.trim(),
+        unknowns: document.getElementById('framing-unknowns').value.trim()
+    };
+
+    const alertDiv = document.getElementById('framing-alert');
+    const loadingDiv = document.getElementById('framing-loading');
+    const resultDiv = document.getElementById('framing-result');
+
+    if (!framingData.decision) {
+        showAlert(alertDiv, '⚠️ Please provide a decision statement', 'error');
+        return;
+    }
+
+    alertDiv.className = 'hidden';
+    resultDiv.className = 'hidden';
+    loadingDiv.classList.remove('hidden');
+
+    try {
+        const response = await fetch('/analyze-framing', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(framingData)
+        });
+
+        loadingDiv.classList.add('hidden');
+
+        if (!response.ok) {
+            let errorMessage = 'Analysis failed';
+            try {
+                const errorData = await response.json();
+                errorMessage = errorData.error || errorMessage;
+            } catch {
+                errorMessage = `Server error (${response.status})`;
+            }
+            showAlert(alertDiv, `❌ ${errorMessage}`, 'error');
+            return;
+        }
+
+        const data = await response.json();
+
+        if (data.success) {
+            currentAnalysis = {
+                analysis: data.analysis,
+                context: JSON.stringify(framingData),
+                timestamp: data.timestamp,
+                type: 'Decision Framing'
+            };
+            resultDiv.className = 'analysis-result';
+            resultDiv.innerHTML = formatAnalysisHTML(data.analysis) + `
+                <div style="margin-top: 2.5rem; text-align: center;">
+                    <button class="btn btn-secondary" onclick="downloadPDF()">
+                        <span>📥</span>
+                        <span>Download as PDF</span>
+                    </button>
+                    <button class="btn btn-secondary" onclick="downloadExport('html')">
+                        <span>🌐</span>
+                        <span>Download as HTML</span>
+                    </button>
+                </div>
+            `;
+        } else {
+            showAlert(alertDiv, `❌ ${data.error || 'Analysis failed'}`, 'error');
+        }
+    } catch (error) {
+        loadingDiv.classList.add('hidden');
+        showAlert(alertDiv, `❌ Error: ${error.message}`, 'error');
+    }
+}
+
+// Decision Dashboard
+async function analyzeDashboard() {
+    const dashboardData = {
+        problem: document.getElementById('dashboard-problem').value.trim(),
+        data: document.getElementById('dashboard-data').value.trim(),
+        context: document.getElementById('dashboard-context').value.trim()
+    };
+
+    const alertDiv = document.getElementById('dashboard-alert');
+    const loadingDiv = document.getElementById('dashboard-loading');
+    const resultDiv = document.getElementById('dashboard-result');
+
+    if (!dashboardData.problem) {
+        showAlert(alertDiv, '⚠️ Please describe what appears to be going wrong', 'error');
+        return;
+    }
+
+    alertDiv.className = 'hidden';
+    resultDiv.className = 'hidden';
+    loadingDiv.classList.remove('hidden');
+
+    try {
+        const response = await fetch('/analyze-dashboard', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(dashboardData)
+        });
+
+        loadingDiv.classList.add('hidden');
+
+        if (!response.ok) {
+            let errorMessage = 'Analysis failed';
+            try {
+                const errorData = await response.json();
+                errorMessage = errorData.error || errorMessage;
+            } catch {
+                errorMessage = `Server error (${response.status})`;
+            }
+            showAlert(alertDiv, `❌ ${errorMessage}`, 'error');
+            return;
+        }
+
+        const data = await response.json();
+
+        if (data.success) {
+            currentAnalysis = {
+                analysis: data.analysis,
+                context: JSON.stringify(dashboardData),
+                timestamp: data.timestamp,
+                type: 'Decision Dashboard'
+            };
+            resultDiv.className = 'analysis-result';
+            resultDiv.innerHTML = formatAnalysisHTML(data.analysis) + `
+                <div style="margin-top: 2.5rem; text-align: center;">
+                    <button class="btn btn-secondary" onclick="downloadPDF()">
+                        <span>📥</span>
+                        <span>Download as PDF</span>
+                    </button>
+                    <button class="btn btn-secondary" onclick="downloadExport('html')">
+                        <span>🌐</span>
+                        <span>Download as HTML</span>
+                    </button>
+                </div>
+            `;
+        } else {
+            showAlert(alertDiv, `❌ ${data.error || 'Analysis failed'}`, 'error');
+        }
+    } catch (error) {
+        loadingDiv.classList.add('hidden');
+        showAlert(alertDiv, `❌ Error: ${error.message}`, 'error');
+    }
+}
+
+// Decision Confidence Meter
+async function assessConfidence() {
+    const confidenceData = {
+        decision: document.getElementById('confidence-decision').value.trim(),
+        evidence: document.getElementById('confidence-evidence').value.trim(),
+        gaps: document.getElementById('confidence-gaps').value.trim(),
+        timeline: document.getElementById('confidence-timeline').value.trim()
+    };
+
+    const alertDiv = document.getElementById('confidence-alert');
+    const loadingDiv = document.getElementById('confidence-loading');
+    const resultDiv = document.getElementById('confidence-result');
+
+    if (!confidenceData.decision || !confidenceData.evidence) {
+        showAlert(alertDiv, '⚠️ Please provide decision and evidence fields', 'error');
+        return;
+    }
+
+    alertDiv.className = 'hidden';
+    resultDiv.className = 'hidden';
+    loadingDiv.classList.remove('hidden');
+
+    try {
+        const response = await fetch('/analyze-confidence', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(confidenceData)
+        });
+
+        loadingDiv.classList.add('hidden');
+
+        if (!response.ok) {
+            let errorMessage = 'Analysis failed';
+            try {
+                const errorData = await response.json();
+                errorMessage = errorData.error || errorMessage;
+            } catch {
+                errorMessage = `Server error (${response.status})`;
+            }
+            showAlert(alertDiv, `❌ ${errorMessage}`, 'error');
+            return;
+        }
+
+        const data = await response.json();
+
+        if (data.success) {
+            currentAnalysis = {
+                analysis: data.analysis,
+                context: JSON.stringify(confidenceData),
+                timestamp: data.timestamp,
+                type: 'Confidence Assessment'
+            };
+            resultDiv.className = 'analysis-result';
+            resultDiv.innerHTML = formatAnalysisHTML(data.analysis) + `
+                <div style="margin-top: 2.5rem; text-align: center;">
+                    <button class="btn btn-secondary" onclick="downloadPDF()">
+                        <span>📥</span>
+                        <span>Download as PDF</span>
+                    </button>
+                    <button class="btn btn-secondary" onclick="downloadExport('html')">
+                        <span>🌐</span>
+                        <span>Download as HTML</span>
+                    </button>
+                </div>
+            `;
+        } else {
+            showAlert(alertDiv, `❌ ${data.error || 'Analysis failed'}`, 'error');
+        }
+    } catch (error) {
+        loadingDiv.classList.add('hidden');
+        showAlert(alertDiv, `❌ Error: ${error.message}`, 'error');
+    }
+}
+
+// Decision Defense Pack
+async function generateDefense() {
+    const defenseData = {
+        decision: document.getElementById('defense-decision').value.trim(),
+        rationale: document.getElementById('defense-rationale').value.trim(),
+        tradeoffs: document.getElementById('defense-tradeoffs').value.trim(),
+        risks: document.getElementById('defense-risks').value.trim(),
+        audience: document.getElementById('defense-audience').value.trim()
+    };
+
+    const alertDiv = document.getElementById('defense-alert');
+    const loadingDiv = document.getElementById('defense-loading');
+    const resultDiv = document.getElementById('defense-result');
+
+    if (!defenseData.decision || !defenseData.rationale) {
+        showAlert(alertDiv, '⚠️ Please provide decision and rationale fields', 'error');
+        return;
+    }
+
+    alertDiv.className = 'hidden';
+    resultDiv.className = 'hidden';
+    loadingDiv.classList.remove('hidden');
+
+    try {
+        const response = await fetch('/analyze-defense', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(defenseData)
+        });
+
+        loadingDiv.classList.add('hidden');
+
+        if (!response.ok) {
+            let errorMessage = 'Analysis failed';
+            try {
+                const errorData = await response.json();
+                errorMessage = errorData.error || errorMessage;
+            } catch {
+                errorMessage = `Server error (${response.status})`;
+            }
+            showAlert(alertDiv, `❌ ${errorMessage}`, 'error');
+            return;
+        }
+
+        const data = await response.json();
+
+        if (data.success) {
+            currentAnalysis = {
+                analysis: data.analysis,
+                context: JSON.stringify(defenseData),
+                timestamp: data.timestamp,
+                type: 'Decision Defense Pack'
+            };
+            resultDiv.className = 'analysis-result';
+            resultDiv.innerHTML = formatAnalysisHTML(data.analysis) + `
+                <div style="margin-top: 2.5rem; text-align: center;">
+                    <button class="btn btn-secondary" onclick="downloadPDF()">
+                        <span>📥</span>
+                        <span>Download as PDF</span>
+                    </button>
+                    <button class="btn btn-secondary" onclick="downloadExport('html')">
+                        <span>🌐</span>
+                        <span>Download as HTML</span>
+                    </button>
+                </div>
+            `;
+        } else {
+            showAlert(alertDiv, `❌ ${data.error || 'Analysis failed'}`, 'error');
+        }
+    } catch (error) {
+        loadingDiv.classList.add('hidden');
+        showAlert(alertDiv, `❌ Error: ${error.message}`, 'error');
+    }
+}
+
+// Decision Retrospective
+async function generateRetrospective() {
+    const retroData = {
+        decision: document.getElementById('retro-decision').value.trim(),
+        expected: document.getElementById('retro-expected').value.trim(),
+        actual: document.getElementById('retro-actual').value.trim(),
+        assumptions: document.getElementById('retro-assumptions').value.trim(),
+        differently: document.getElementById('retro-differently').value.trim()
+    };
+
+    const alertDiv = document.getElementById('retrospective-alert');
+    const loadingDiv = document.getElementById('retrospective-loading');
+    const resultDiv = document.getElementById('retrospective-result');
+
+    if (!retroData.decision || !retroData.expected || !retroData.actual) {
+        showAlert(alertDiv, '⚠️ Please fill in decision, expected, and actual outcome fields', 'error');
+        return;
+    }
+
+    alertDiv.className = 'hidden';
+    resultDiv.className = 'hidden';
+    loadingDiv.classList.remove('hidden');
+
+    try {
+        const response = await fetch('/analyze-retrospective', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(retroData)
+        });
+
+        loadingDiv.classList.add('hidden');
+
+        if (!response.ok) {
+            let errorMessage = 'Analysis failed';
+            try {
+                const errorData = await response.json();
+                errorMessage = errorData.error || errorMessage;
+            } catch {
+                errorMessage = `Server error (${response.status})`;
+            }
+            showAlert(alertDiv, `❌ ${errorMessage}`, 'error');
+            return;
+        }
+
+        const data = await response.json();
+
+        if (data.success) {
+            currentAnalysis = {
+                analysis: data.analysis,
+                context: JSON.stringify(retroData),
+                timestamp: data.timestamp,
+                type: 'Decision Retrospective'
+            };
+            resultDiv.className = 'analysis-result';
+            resultDiv.innerHTML = formatAnalysisHTML(data.analysis) + `
+                <div style="margin-top: 2.5rem; text-align: center;">
+                    <button class="btn btn-secondary" onclick="downloadPDF()">
+                        <span>📥</span>
+                        <span>Download as PDF</span>
+                    </button>
+                    <button class="btn btn-secondary" onclick="downloadExport('html')">
+                        <span>🌐</span>
+                        <span>Download as HTML</span>
+                    </button>
+                </div>
+            `;
+        } else {
+            showAlert(alertDiv, `❌ ${data.error || 'Analysis failed'}`, 'error');
+        }
+    } catch (error) {
+        loadingDiv.classList.add('hidden');
+        showAlert(alertDiv, `❌ Error: ${error.message}`, 'error');
+    }
+}
+
+// Helper function to format analysis HTML consistently
+function formatAnalysisHTML(text) {
+    return text
+        .replace(/^### (.+)$/gm, '<h3 style="color: var(--primary); margin-top: 2rem; margin-bottom: 1rem; font-size: 1.3rem;">$1</h3>')
+        .replace(/^## (.+)$/gm, '<h2 style="color: var(--secondary); margin-top: 2.5rem; margin-bottom: 1.25rem; font-size: 1.5rem;">$1</h2>')
+        .replace(/\*\*(.+?)\*\*/g, '<strong style="color: var(--text);">$1</strong>')
+        .replace(/^- (.+)$/gm, '<li style="margin-bottom: 0.75rem; line-height: 1.7;">$1</li>')
+        .replace(/(<li>.*<\/li>)/s, '<ul style="margin: 1rem 0; padding-left: 1.5rem;">$1</ul>')
+        .replace(/\n\n/g, '</p><p style="margin: 1rem 0; line-height: 1.8;">')
+        .replace(/^(.+)$/gm, '<p style="margin: 1rem 0; line-height: 1.8;">$1</p>');
+}
+
+// Initialize page on load - wait for DOM to be ready
+if (document.readyState === 'loading') {
+    document.addEventListener('DOMContentLoaded', initializePage);
+} else {
+    initializePage();
+}
@@ -0,0 +1,78 @@
+"""
+Offline tests for response compression
+Run with: python -m pytest test_compression.py
+"""
+import gzip
+import os
+import sys
+import zlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+import pdf_service
+from compression import CompressionStats, compress_stream, is_compressible
+from pdf_service import PDFRenderPool
+
+
+ANALYSIS = "## Recommendation\n\nShip the **free tier** to self-serve teams first.\n\n" * 300
+
+
+class FakeEngine:
+    last_trim_report = []
+
+    def analyze(self, context):
+        return ANALYSIS
+
+
+def make_client(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("WARMUP_STEPS", "none")
+    monkeypatch.setattr(pdf_service, "render_pool", PDFRenderPool(workers=0))
+    import flask_app
+    monkeypatch.setattr(flask_app, "create_engine", lambda data: FakeEngine())
+    monkeypatch.setattr(flask_app, "compression_stats", CompressionStats())
+    return flask_app, flask_app.app.test_client()
+
+
+def test_stream_chunks_decode_as_they_arrive():
+    chunks = [f"data: chunk {index}\n\n".encode() for index in range(5)]
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    output = compress_stream(iter(chunks), "gzip")
+    for chunk in chunks:
+        # Each input chunk is decodable from the output produced for it, without the rest of the stream
+        assert decoder.decompress(next(output)) == chunk
+    assert decoder.decompress(b"".join(output)) == b"" and decoder.eof
+
+
+def test_only_text_formats_are_compressible():
+    assert is_compressible("application/json") and is_compressible("text/markdown")
+    assert not is_compressible("application/pdf") and not is_compressible("image/png")
+
+
+def test_analysis_json_is_compressed_and_counted(monkeypatch):
+    flask_app, client = make_client(monkeypatch)
+    response = client.post("/analyze", json={"context": "Should we add a free tier?"},
+                           headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200 and response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Vary"] == "Accept-Encoding"
+    body = gzip.decompress(response.get_data())
+    assert b"free tier" in body and int(response.headers["Content-Length"]) < len(body) / 5
+
+    plain = client.post("/analyze", json={"context": "Should we add a free tier?"})
+    assert "Content-Encoding" not in plain.headers and b"free tier" in plain.get_data()
+
+    small = client.post("/analyze", json={}, headers={"Accept-Encoding": "gzip"})
+    assert small.status_code == 400 and "Content-Encoding" not in small.headers
+
+    stats = flask_app.compression_stats.stats()
+    assert stats["endpoints"]["analyze"]["responses"] == 1
+    assert stats["endpoints"]["analyze"]["encodings"] == {"gzip": 1}
+    assert stats["endpoints"]["analyze"]["ratio"] < 0.2
+    assert stats["skipped"] == {"not_accepted": 1, "small": 1}
+
+
+def test_threshold_comes_from_env(monkeypatch):
+    _, client = make_client(monkeypatch)
+    monkeypatch.setenv("COMPRESS_MIN_BYTES", str(10 * len(ANALYSIS)))
+    response = client.post("/analyze", json={"context": "x"}, headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
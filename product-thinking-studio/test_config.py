@@ -0,0 +1,76 @@
+"""
+Offline tests for the Flask config and sizing profiles
+Run with: python -m pytest test_config.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+import config
+from config import apply_sizing, get_config, resolve_sizing
+
+SIZING_ENV = ("SIZING_PROFILE", "WEB_CONCURRENCY", "GUNICORN_WORKERS", "GUNICORN_THREADS", "GUNICORN_WORKER_CLASS")
+
+
+def clear_sizing_env(monkeypatch):
+    for name in SIZING_ENV:
+        monkeypatch.delenv(name, raising=False)
+
+
+def pin_profile_env(monkeypatch):
+    """Set the profile's variables through monkeypatch so apply_sizing() leaves os.environ alone"""
+    for key, value in resolve_sizing()["env"].items():
+        monkeypatch.setenv(key, os.environ.get(key, value))
+
+
+def test_profile_is_detected_from_cpus_and_memory(monkeypatch):
+    clear_sizing_env(monkeypatch)
+    small = resolve_sizing(cpus=1, memory_mb=512)
+    assert (small["profile"], small["workers"], small["threads"]) == ("small", 1, 2)
+    assert small["env"]["SCRAPER_BROWSER_POOL"] == "0"
+
+    assert resolve_sizing(cpus=2, memory_mb=2048)["profile"] == "standard"
+    assert resolve_sizing(cpus=2, memory_mb=16384)["profile"] == "standard"  # too few CPUs for large
+
+    large = resolve_sizing(cpus=8, memory_mb=16384)
+    assert (large["profile"], large["workers"], large["threads"]) == ("large", 16, 8)
+    # Memory caps the worker count
+    assert resolve_sizing(cpus=32, memory_mb=4096)["workers"] == (4096 - config.RESERVED_MB) // 450
+
+
+def test_env_overrides_profile(monkeypatch):
+    clear_sizing_env(monkeypatch)
+    monkeypatch.setenv("SIZING_PROFILE", "large")
+    monkeypatch.setenv("WEB_CONCURRENCY", "3")
+    monkeypatch.setenv("GUNICORN_THREADS", "1")
+    monkeypatch.setenv("GUNICORN_WORKER_CLASS", "sync")
+    sizing = resolve_sizing(cpus=1, memory_mb=512)
+    assert (sizing["profile"], sizing["workers"], sizing["threads"], sizing["worker_class"]) == ("large", 3, 1, "sync")
+
+    monkeypatch.setenv("GUNICORN_WORKER_CLASS", "eventlet")
+    monkeypatch.setitem(sys.modules, "eventlet", None)  # not importable
+    assert resolve_sizing(cpus=1, memory_mb=512)["worker_class"] == "gthread"
+
+
+def test_apply_sizing_keeps_variables_already_set(monkeypatch):
+    clear_sizing_env(monkeypatch)
+    monkeypatch.setenv("SIZING_PROFILE", "standard")
+    environ = {"PDF_CACHE_MAX_MB": "7"}
+    apply_sizing(resolve_sizing(cpus=2, memory_mb=2048), environ)
+    assert environ["PDF_CACHE_MAX_MB"] == "7"
+    assert environ["PDF_RENDER_QUEUE"] == "8"
+
+
+def test_app_uses_config_for_environment(monkeypatch):
+    monkeypatch.setenv("FLASK_ENV", "development")
+    assert get_config() is config.DevelopmentConfig
+    monkeypatch.delenv("FLASK_ENV")
+    assert get_config() is config.ProductionConfig
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("WARMUP_STEPS", "none")
+    pin_profile_env(monkeypatch)
+    import flask_app
+    assert flask_app.app.config["MAX_CONTENT_LENGTH"] == config.ProductionConfig.MAX_CONTENT_LENGTH
+    assert flask_app.app.config["SEND_FILE_MAX_AGE_DEFAULT"] == config.ProductionConfig.SEND_FILE_MAX_AGE_DEFAULT
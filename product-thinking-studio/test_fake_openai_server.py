@@ -0,0 +1,63 @@
+"""
+Offline tests for the fake OpenAI-compatible load-testing server
+Run with: python -m pytest test_fake_openai_server.py
+"""
+import json
+
+from fake_openai_server import FakeLLMConfig, create_app
+
+
+def make_client(**kwargs):
+    options = dict(ttft_ms=0, tokens_per_sec=0, seed=7)
+    options.update(kwargs)
+    return create_app(FakeLLMConfig(**options)).test_client()
+
+
+def test_completion_uses_requested_headings_and_reports_usage():
+    client = make_client()
+    response = client.post('/v1/chat/completions', json={
+        'model': 'gpt-4o',
+        'max_tokens': 4000,
+        'messages': [{'role': 'user', 'content': 'Write:\n\n## 🚨 Risks & Mitigation\n...\n\n## ✅ Success Metrics\n...'}]
+    })
+    body = response.get_json()
+
+    assert response.status_code == 200
+    content = body['choices'][0]['message']['content']
+    assert content.startswith('## 🚨 Risks & Mitigation')
+    assert '## ✅ Success Metrics' in content
+    assert body['choices'][0]['finish_reason'] == 'stop'
+    assert body['usage']['completion_tokens'] > 0
+
+
+def test_max_tokens_truncates_with_length_finish_reason():
+    client = make_client()
+    body = client.post('/v1/chat/completions', json={
+        'max_tokens': 10, 'messages': [{'role': 'user', 'content': 'hi'}]
+    }).get_json()
+    assert body['usage']['completion_tokens'] == 10
+    assert body['choices'][0]['finish_reason'] == 'length'
+
+
+def test_streaming_emits_sse_chunks_and_done():
+    client = make_client()
+    response = client.post('/v1/chat/completions', json={
+        'stream': True, 'max_tokens': 15, 'stream_options': {'include_usage': True},
+        'messages': [{'role': 'user', 'content': 'hi'}]
+    })
+    events = [line[6:] for line in response.get_data(as_text=True).split('\n\n') if line.startswith('data: ')]
+
+    assert response.mimetype == 'text/event-stream'
+    assert events[-1] == '[DONE]'
+    chunks = [json.loads(event) for event in events[:-1]]
+    text = ''.join(chunk['choices'][0]['delta'].get('content', '') for chunk in chunks if chunk['choices'])
+    assert text.startswith('## ')
+    assert chunks[-1]['usage']['completion_tokens'] == 15
+
+
+def test_rate_limit_injection():
+    client = make_client(rate_limit_rate=1.0)
+    response = client.post('/v1/chat/completions', json={'messages': [{'role': 'user', 'content': 'hi'}]})
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '1'
+    assert client.get('/stats').get_json()['rate_limited'] == 1
@@ -0,0 +1,94 @@
+"""
+Offline tests for the markdown to flowables compiler
+Run with: python -m pytest test_markdown_pdf.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import Paragraph, Preformatted, Table
+
+import pdf_fonts
+from markdown_pdf import MarkdownCompiler, PendingParagraph, PendingTable, inline_markup
+from pdf_fonts import SYMBOL_FONT, font_markup, plain_text
+
+
+SAMPLE = getSampleStyleSheet()
+STYLES = {
+    'h2': SAMPLE['Heading2'],
+    'h3': SAMPLE['Heading3'],
+    'body': SAMPLE['BodyText'],
+    'bullet': SAMPLE['Bullet'],
+    'warning': SAMPLE['Italic'],
+    'code': SAMPLE['Code'],
+}
+
+
+def texts(elements):
+    return [element.text for element in elements if isinstance(element, PendingParagraph)]
+
+
+def test_inline_markup_escapes_and_converts():
+    assert inline_markup("a < b & **c** *d* `e<f>`") == (
+        "a &lt; b &amp; <b>c</b> <i>d</i> <font face=\"Courier\">e&lt;f&gt;</font>"
+    )
+    assert inline_markup("2 * 3 * 4 and snake_case_name") == "2 * 3 * 4 and snake_case_name"
+    assert inline_markup("**bold with *italic* inside**") == "<b>bold with <i>italic</i> inside</b>"
+    assert inline_markup("[docs](https://example.com/a?b=1&c=2)") == (
+        '<a href="https://example.com/a?b=1&amp;c=2" color="blue">docs</a>'
+    )
+
+
+def test_nested_lists_get_deeper_styles():
+    compiler = MarkdownCompiler(STYLES, lazy=True)
+    elements = compiler.compile("- one\n  - two\n    - three\n12. twelfth")
+    assert texts(elements) == ["• one", "– two", "– three", "12. twelfth"]
+    indents = [element.style.leftIndent for element in elements]
+    assert indents[0] < indents[1] < indents[2] and indents[3] == indents[0]
+
+
+def test_blocks_headings_tables_code_and_callouts():
+    markdown = (
+        "## Summary\n### Detail\n\n\n"
+        "| A | B |\n|---|:---:|\n| 1 | **2** |\n| 3 |\n\n"
+        "```\nif x < 1:\n    pass\n```\n"
+        "**Risk:** churn\n**Label**\nplain"
+    )
+    compiler = MarkdownCompiler(STYLES, lazy=True, section_marker='▸ ', callouts={'warning': ('risk',)})
+    elements = compiler.compile(markdown)
+
+    assert texts(elements) == [font_markup("▸ ") + "Summary", "Detail", "<b>Risk:</b> churn", "Label", "plain"]
+    styles = {element.text: element.style.name for element in elements if isinstance(element, PendingParagraph)}
+    assert styles["<b>Risk:</b> churn"] == "Italic"
+    assert sum(1 for element in elements if element.__class__.__name__ == 'Spacer') == 3  # blank runs collapse
+
+    table = next(element for element in elements if isinstance(element, PendingTable))
+    assert table.rows == [["A", "B"], ["1", "<b>2</b>"], ["3"]]
+    built = table.build()
+    assert isinstance(built, Table) and len(built._cellvalues) == 3 and len(built._cellvalues[2]) == 2
+
+    code = next(element for element in elements if isinstance(element, Preformatted))
+    assert code.lines == ["if x < 1:", "    pass"]
+
+
+def test_eager_compiler_builds_flowables():
+    elements = MarkdownCompiler(STYLES).compile("## Title\n| a | b |\n|---|---|\n| c | d |")
+    assert any(isinstance(element, Paragraph) for element in elements)
+    assert any(isinstance(element, Table) for element in elements)
+    assert not any(isinstance(element, (PendingParagraph, PendingTable)) for element in elements)
+
+
+def test_characters_helvetica_lacks_use_the_symbol_font_or_are_dropped():
+    assert font_markup("plain ascii") == "plain ascii"
+    assert font_markup("Café • 50% – done") == "Café • 50% – done"
+    assert font_markup("🚀 Launch 👍🏽") == " Launch "
+    assert plain_text("🌐 Product Playground") == "Product Playground"
+    if pdf_fonts.get_symbol_font() is not None:
+        assert font_markup("⚠️ Risk ✓") == f'<font name="{SYMBOL_FONT}">⚠</font> Risk <font name="{SYMBOL_FONT}">✓</font>'
+    else:
+        assert font_markup("⚠️ Risk ✓") == " Risk "
+    # A heading whose leading emoji is dropped still gets the section marker
+    compiler = MarkdownCompiler(STYLES, lazy=True, section_marker='>> ')
+    assert texts(compiler.compile("## 🎯 Summary")) == [">> Summary"]
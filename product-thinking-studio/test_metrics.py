@@ -0,0 +1,99 @@
+"""
+Offline tests for Prometheus metrics and /metrics
+Run with: python -m pytest test_metrics.py
+"""
+import os
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from openai.types.chat import ChatCompletionChunk
+
+import pdf_service
+from pdf_service import PDFRenderPool
+from prompt import collect_stream
+
+
+def make_client(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("WARMUP_STEPS", "none")
+    monkeypatch.setattr(pdf_service, "render_pool", PDFRenderPool(workers=0))
+    import flask_app
+    return flask_app.app.test_client()
+
+
+def test_metrics_report_route_latency_and_pdf_renders(monkeypatch):
+    monkeypatch.delenv("METRICS_TOKEN", raising=False)
+    monkeypatch.setenv("METRICS_PUBLIC", "1")
+    client = make_client(monkeypatch)
+    assert client.get("/health").status_code == 200
+    client.get("/no-such-page")
+    pdf = client.post("/download-pdf", json={"analysis": f"## Metrics\n\n{os.getpid()} {id(client)}"})
+    assert pdf.status_code == 200
+
+    response = client.get("/metrics")
+    text = response.get_data(as_text=True)
+    assert response.status_code == 200 and response.mimetype == "text/plain"
+    assert 'playground_http_request_duration_seconds_count{method="GET",route="/health",status="200"}' in text
+    assert 'route="unmatched",status="404"' in text  # paths are not used as label values
+    assert 'playground_pdf_render_duration_seconds_count{kind="report"}' in text
+    assert 'playground_cache_requests_total{cache="pdf",result="miss"}' in text
+    assert "playground_pdf_render_queue_depth" in text
+
+
+def test_metrics_token(monkeypatch):
+    monkeypatch.delenv("METRICS_PUBLIC", raising=False)
+    monkeypatch.delenv("METRICS_TOKEN", raising=False)
+    monkeypatch.delenv("ADMIN_TOKEN", raising=False)
+    client = make_client(monkeypatch)
+    assert client.get("/metrics").status_code == 404  # fails closed with no token configured
+    monkeypatch.setenv("ADMIN_TOKEN", "admin")
+    assert client.get("/metrics").status_code == 403
+    assert client.get("/metrics", headers={"X-Admin-Token": "admin"}).status_code == 200
+
+    monkeypatch.setenv("METRICS_TOKEN", "scrape-me")
+    assert client.get("/metrics").status_code == 403
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 403
+    assert client.get("/metrics", headers={"Authorization": "Bearer scrape-me"}).status_code == 200
+    assert client.get("/metrics", headers={"X-Admin-Token": "admin"}).status_code == 200
+
+
+WORKER_SNIPPET = (
+    "import sys; sys.path.insert(0, 'app'); import metrics; "
+    "metrics.LLM_TOKENS.labels('defense', 'gpt-4o', 'prompt').inc({tokens}); "
+    "metrics.HTTP_IN_FLIGHT.inc()"
+)
+
+SCRAPE_SNIPPET = "import sys; sys.path.insert(0, 'app'); import metrics; print(metrics.render_latest()[0].decode())"
+
+
+def test_workers_are_merged_through_the_multiprocess_directory(tmp_path):
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(tmp_path))
+    root = os.path.dirname(os.path.abspath(__file__))
+    for tokens in (100, 250):
+        subprocess.run([sys.executable, "-c", WORKER_SNIPPET.format(tokens=tokens)], cwd=root, env=env, check=True)
+
+    scraped = subprocess.run([sys.executable, "-c", SCRAPE_SNIPPET], cwd=root, env=env,
+                             capture_output=True, text=True, check=True).stdout
+    assert 'playground_llm_tokens_total{endpoint="defense",kind="prompt",model="gpt-4o"} 350.0' in scraped
+    # livesum: the two finished workers' gauges are still counted until mark_process_dead()
+    assert "playground_http_requests_in_flight 2.0" in scraped
+
+
+def test_streamed_completion_is_reassembled():
+    def chunk(content=None, finish_reason=None, usage=None):
+        choices = [] if usage else [{"index": 0, "delta": {"content": content}, "finish_reason": finish_reason}]
+        return ChatCompletionChunk(id="chatcmpl-1", object="chat.completion.chunk", created=1, model="gpt-4o-mini",
+                                   choices=choices, usage=usage)
+
+    first_tokens = []
+    response = collect_stream([
+        chunk(""), chunk("## Risks"), chunk("\n\n- churn"), chunk(finish_reason="length"),
+        chunk(usage={"prompt_tokens": 12, "completion_tokens": 3, "total_tokens": 15}),
+    ], on_first_token=lambda: first_tokens.append(True))
+
+    assert first_tokens == [True]
+    assert response.choices[0].message.content == "## Risks\n\n- churn"
+    assert response.choices[0].finish_reason == "length"
+    assert response.usage.completion_tokens == 3 and response.model == "gpt-4o-mini"
@@ -0,0 +1,146 @@
+"""
+Offline tests for model routing and fallback
+Run with: python -m pytest test_model_router.py
+"""
+import os
+import sys
+from types import SimpleNamespace
+
+import httpx
+from openai import APITimeoutError
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from model_router import ModelRouter
+
+
+def make_router(**kwargs):
+    options = dict(default_model="gpt-4o", fast_model="gpt-4o-mini", enabled=True, fast_max_input_tokens=500)
+    options.update(kwargs)
+    return ModelRouter(**options)
+
+
+def test_disabled_router_always_uses_default_model():
+    router = make_router(enabled=False)
+    decision = router.route("kpi", 10)
+    assert decision.model == "gpt-4o"
+    assert decision.fallback_model is None  # no silent downgrade unless configured
+
+
+def test_auto_policy_routes_by_input_size():
+    router = make_router()
+    assert router.route("kpi", 200).model == "gpt-4o-mini"
+    assert router.route("kpi", 2000).model == "gpt-4o"
+
+
+def test_endpoint_policy_depth_and_premium_tier():
+    router = make_router(policies={"kpi": "fast"}, premium_users={"vip"})
+    assert router.route("defense", 10).model == "gpt-4o"
+    assert router.route("kpi", 5000).model == "gpt-4o-mini"
+    assert router.route("defense", 10, depth="quick").model == "gpt-4o-mini"
+    assert router.route("kpi", 10, depth="deep").model == "gpt-4o"
+    assert router.route("kpi", 10, user_id="vip").model == "gpt-4o"
+
+
+def test_explicit_fallback_model():
+    router = make_router(fallback_model="backup-model")
+    assert router.route("defense", 10).fallback_model == "backup-model"
+    assert make_router().route("defense", 10).fallback_model == "gpt-4o-mini"
+    assert make_router(enabled=False, fallback_model="backup-model").route("kpi", 10).fallback_model == "backup-model"
+
+
+def test_engine_falls_back_on_timeout(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    import prompt
+    from token_accounting import ledger
+
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs["model"])
+        if kwargs["model"] == "gpt-4o":
+            raise APITimeoutError(request=httpx.Request("POST", "https://api.test/v1/chat/completions"))
+        usage = SimpleNamespace(prompt_tokens=5, completion_tokens=5, prompt_tokens_details=None)
+        message = SimpleNamespace(content="## Fallback answer")
+        return SimpleNamespace(usage=usage, choices=[SimpleNamespace(message=message, finish_reason="stop")])
+
+    ledger.reset()
+    engine = prompt.ProductThinkingEngine(user_id="tester")
+    engine.router = make_router(enabled=False, fallback_model="gpt-4o-mini")
+    engine.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    assert engine.analyze_decision_framing({'decision': 'Build AI search?'}) == "## Fallback answer"
+    assert calls == ["gpt-4o", "gpt-4o-mini"]
+    stats = ledger.aggregates()
+    assert "gpt-4o-mini" in stats["models"]
+    assert stats["recent_calls"][-1]["fallback_used"] is True
+
+
+def test_kpi_routes_on_user_input_not_template(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    import prompt
+
+    models = []
+
+    def create(**kwargs):
+        models.append(kwargs["model"])
+        message = SimpleNamespace(content="## KPI answer")
+        return SimpleNamespace(usage=None, choices=[SimpleNamespace(message=message, finish_reason="stop")])
+
+    engine = prompt.ProductThinkingEngine()
+    engine.router = make_router()
+    engine.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    kpi_data = {
+        'dau': 10, 'mau': 100, 'avg_session_time': 3.5, 'conversion_rate': 2.0,
+        'churn_rate': 5.0, 'retention_rate': 40.0, 'nps_score': 30,
+        'revenue_per_user': 1.5, 'recent_changes': 'Shipped new onboarding'
+    }
+    engine.analyze_kpis(kpi_data)
+    assert models == ["gpt-4o-mini"]
+
+
+def test_premium_tier_cannot_be_claimed_with_a_forwarded_header(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("WARMUP_STEPS", "none")
+    monkeypatch.setenv("MODEL_ROUTING", "on")
+    monkeypatch.setenv("PREMIUM_USERS", "203.0.113.7")
+    import pdf_service
+    from pdf_service import PDFRenderPool
+    monkeypatch.setattr(pdf_service, "render_pool", PDFRenderPool(workers=0))
+    import flask_app
+    import prompt
+
+    models = []
+
+    def create(**kwargs):
+        models.append(kwargs["model"])
+        message = SimpleNamespace(content="## Framing answer")
+        return SimpleNamespace(usage=None, choices=[SimpleNamespace(message=message, finish_reason="stop")])
+
+    fake_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr(prompt, "create_client", lambda timeout: fake_client)
+    client = flask_app.app.test_client()
+
+    def framing(forwarded_for):
+        response = client.post("/analyze-framing", json={"decision": "Build AI search?"},
+                               headers={"X-Forwarded-For": forwarded_for})
+        assert response.status_code == 200
+        return models[-1]
+
+    assert framing("203.0.113.7, 198.51.100.7") == "gpt-4o-mini"  # premium id prepended by the client
+    assert framing("203.0.113.7") == "gpt-4o"  # appended by the trusted proxy
+
+
+def test_website_routing_counts_the_scraped_page(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    import prompt
+
+    engine = prompt.ProductThinkingEngine()
+    engine.router = make_router(policies={"website": "auto"})
+    engine.build_website_teardown_prompt("https://example.com", "Pricing page", None)
+    assert engine.router.route("website", engine.user_input_tokens).model == "gpt-4o-mini"
+
+    scraped = {"title": "Example", "main_content": "Features, pricing and customer stories. " * 400}
+    engine.build_website_teardown_prompt("https://example.com", "Pricing page", scraped)
+    assert engine.user_input_tokens > 500
+    assert engine.router.route("website", engine.user_input_tokens).model == "gpt-4o"
@@ -0,0 +1,145 @@
+"""
+Offline tests for the combined portfolio PDF
+Run with: python -m pytest test_pdf_portfolio.py
+"""
+import os
+import sys
+import time
+from concurrent.futures import Future
+from io import BytesIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from pypdf import PdfReader
+
+import pdf_service
+from pdf_service import section_title
+from pdf_service import PDFCache, PDFRenderPool, pdf_cache_key, portfolio_cache_key, section_cache_key
+
+
+def make_section(index: int) -> str:
+    return "\n".join(f"## Part {index}.{part}\n\nBody text with **bold** words.\n- item" for part in range(30))
+
+
+def test_section_titles():
+    assert section_title("kpi") == "KPI Diagnostics"
+    assert section_title("pricing_review") == "Pricing Review"
+    assert section_title("kpi", "  Custom  ") == "Custom"
+
+
+def test_portfolio_key_depends_on_sections_order_and_context():
+    sections = [("A", "one"), ("B", "two")]
+    key = portfolio_cache_key(sections, "ctx")
+    assert key == portfolio_cache_key(list(sections), "ctx")
+    assert key != portfolio_cache_key(sections[::-1], "ctx")
+    assert key != portfolio_cache_key(sections, "other")
+    assert key != portfolio_cache_key([("A", "one"), ("B", "two!")], "ctx")
+
+
+def test_reports_sections_and_portfolios_never_share_a_key():
+    assert section_cache_key("A", "one") != pdf_cache_key("one", "section\nA")
+    assert section_cache_key("A", "one") != pdf_cache_key("one", "A")
+    section_keys = section_cache_key("A", "one")
+    assert portfolio_cache_key([("A", "one")], "ctx") != pdf_cache_key(section_keys, "portfolio\nctx")
+    assert portfolio_cache_key([("A", "one")], "ctx") != pdf_cache_key(section_keys, "ctx")
+
+
+def test_portfolio_merges_sections_with_contents_and_page_numbers(monkeypatch, tmp_path):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("WARMUP_STEPS", "none")
+    monkeypatch.setattr(pdf_service, "render_pool", PDFRenderPool(workers=0))
+    monkeypatch.setattr(pdf_service, "pdf_cache", PDFCache(str(tmp_path)))
+    import flask_app
+    client = flask_app.app.test_client()
+    payload = {
+        "analyses": [{"type": "kpi", "analysis": make_section(1)},
+                     {"type": "framing", "title": "Launch Decision", "analysis": make_section(2)}],
+        "context": "Q3 <plan>",
+    }
+
+    first = client.post("/download-portfolio-pdf", json=payload)
+    assert first.status_code == 200 and first.headers["X-PDF-Cache"] == "miss"
+    reader = PdfReader(BytesIO(first.get_data()))
+    assert [item.title for item in reader.outline] == ["KPI Diagnostics", "Launch Decision"]
+
+    # Cover, contents, the two sections and the closing page
+    section_pages = reader.pages[2:-1]
+    total = len(section_pages)
+    assert total >= 4
+    assert "Contents" in reader.pages[1].extract_text() and "Q3 <plan>" in reader.pages[1].extract_text()
+    assert f"Page 1 of {total}" in section_pages[0].extract_text()
+    assert f"Page {total} of {total}" in section_pages[-1].extract_text()
+    assert "Page" not in reader.pages[-1].extract_text()
+
+    second = client.post("/download-portfolio-pdf", json=payload)
+    assert second.headers["X-PDF-Cache"] == "hit" and second.get_data() == first.get_data()
+    not_modified = client.post("/download-portfolio-pdf", json=payload,
+                               headers={"If-None-Match": first.headers["ETag"]})
+    assert not_modified.status_code == 304
+
+    # Changing one section re-renders only that section
+    payload["analyses"][1]["analysis"] += "\n\nOne more line"
+    assert client.post("/download-portfolio-pdf", json=payload).status_code == 200
+    cached = [name for name in os.listdir(tmp_path) if name.endswith(".pdf")]
+    assert len(cached) == 2 + 1 + 2  # three section renders, two portfolios
+
+
+def test_portfolio_survives_eviction_before_the_merge(monkeypatch, tmp_path):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("WARMUP_STEPS", "none")
+    monkeypatch.setattr(pdf_service, "render_pool", PDFRenderPool(workers=0))
+    cache = PDFCache(str(tmp_path))
+    monkeypatch.setattr(pdf_service, "pdf_cache", cache)
+    import flask_app
+    import pdf_portfolio
+    merge = pdf_portfolio.merge_portfolio
+
+    def merge_after_eviction(*args, **kwargs):
+        cache.clear()  # another request or worker evicts every cached section
+        return merge(*args, **kwargs)
+
+    monkeypatch.setattr(pdf_portfolio, "merge_portfolio", merge_after_eviction)
+    client = flask_app.app.test_client()
+    payload = {"analyses": [{"type": "kpi", "analysis": make_section(1)},
+                            {"type": "framing", "analysis": make_section(2)}]}
+
+    assert client.post("/download-portfolio-pdf", json=payload).status_code == 200
+    # One section read from the cache, one rendered; both evicted before the merge
+    cache.open(pdf_service.section_cache_key("KPI Diagnostics", make_section(1)))
+    payload["analyses"][1]["analysis"] += "\n\nOne more line"
+    response = client.post("/download-portfolio-pdf", json=payload)
+    assert response.status_code == 200
+    assert [item.title for item in PdfReader(BytesIO(response.get_data())).outline] == [
+        "KPI Diagnostics", "Decision Framing"]
+
+
+class StalledPool(PDFRenderPool):
+    """A pool whose renders never finish"""
+
+    def submit(self, key, function, *args, block=False, timeout=None):
+        return Future()
+
+
+def test_slow_portfolio_returns_503_before_the_worker_timeout(monkeypatch, tmp_path):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("WARMUP_STEPS", "none")
+    monkeypatch.setattr(pdf_service, "render_pool", StalledPool(workers=0))
+    monkeypatch.setattr(pdf_service, "pdf_cache", PDFCache(str(tmp_path)))
+    monkeypatch.setattr(pdf_service, "PORTFOLIO_TIMEOUT", 0.3)
+    import flask_app
+    client = flask_app.app.test_client()
+
+    started = time.perf_counter()
+    response = client.post("/download-portfolio-pdf", json={"analyses": [{"type": "kpi", "analysis": "## A"}]})
+    assert response.status_code == 503 and "longer than 0.3 seconds" in response.get_json()["error"]
+    assert time.perf_counter() - started < 2
+
+
+def test_portfolio_rejects_invalid_payloads(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("WARMUP_STEPS", "none")
+    import flask_app
+    client = flask_app.app.test_client()
+    for payload in ({"analyses": []}, {"analyses": "text"}, {"analyses": [{"type": "kpi", "analysis": " "}]},
+                    {"analyses": [{"analysis": "x"}] * 13}):
+        assert client.post("/download-portfolio-pdf", json=payload).status_code == 400
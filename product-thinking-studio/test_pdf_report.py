@@ -0,0 +1,52 @@
+"""
+Offline tests for the PDF report renderer
+Run with: python -m pytest test_pdf_report.py
+"""
+import os
+import re
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+import pdf_report
+from markdown_pdf import PendingParagraph
+from pdf_fonts import font_markup
+from pdf_report import NumberedCanvas, build_analysis, render_analysis_pdf
+
+
+PAGE_PATTERN = re.compile(rb'/Type /Page\b(?!s)')
+
+ANALYSIS = "\n".join(
+    f"## Section {index}\n\nSome body text with **bold** words.\n\n- **Point:** detail\n1. First step\n"
+    for index in range(40)
+)
+
+
+def test_content_pages_are_numbered_without_cover_and_closing(monkeypatch):
+    canvases = []
+
+    class RecordingCanvas(NumberedCanvas):
+        def __init__(self, *args, **kwargs):
+            NumberedCanvas.__init__(self, *args, **kwargs)
+            canvases.append(self)
+
+    monkeypatch.setattr(pdf_report, "NumberedCanvas", RecordingCanvas)
+    pdf_bytes = render_analysis_pdf(ANALYSIS, "Context")
+
+    pages = len(PAGE_PATTERN.findall(pdf_bytes))
+    assert pages > 3
+    assert canvases[0].numbered_pages == pages - 2
+
+
+def test_analysis_paragraphs_are_parsed_lazily():
+    elements = build_analysis("## Heading\n\nBody with **bold**\n- item")
+    pending = [element for element in elements if isinstance(element, PendingParagraph)]
+    assert [element.text for element in pending] == [font_markup("▸ ") + "Heading", "Body with <b>bold</b>", "• item"]
+
+
+def test_render_to_file_object():
+    with tempfile.TemporaryFile() as output:
+        assert render_analysis_pdf(ANALYSIS, output=output) is None
+        output.seek(0)
+        assert output.read(5) == b"%PDF-"
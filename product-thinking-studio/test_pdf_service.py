@@ -0,0 +1,144 @@
+"""
+Offline tests for the PDF render pool and cache
+Run with: python -m pytest test_pdf_service.py
+"""
+import os
+import subprocess
+import sys
+from concurrent.futures import Future
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+import pytest
+
+import pdf_service
+from pdf_service import PDFCache, PDFQueueFullError, PDFRenderPool, pdf_cache_key
+
+
+def test_cache_key_depends_on_content_context_and_template(monkeypatch):
+    key = pdf_cache_key("## Report", "ctx")
+    assert key == pdf_cache_key("## Report", "ctx")
+    assert key != pdf_cache_key("## Report", "other")
+    assert pdf_cache_key("ab", "c") != pdf_cache_key("a", "bc")
+
+    monkeypatch.setattr(pdf_service, "TEMPLATE_VERSION", "next")
+    assert key != pdf_cache_key("## Report", "ctx")
+
+
+def test_cache_evicts_least_recently_used_by_size(tmp_path):
+    cache = PDFCache(str(tmp_path), max_bytes=10)
+    for age, key in enumerate(("a", "b")):
+        with open(cache.path(key), "wb") as pdf_file:
+            pdf_file.write(b"1234")
+        os.utime(cache.path(key), (1000 + age, 1000 + age))
+    cache.open("a").close()  # a is now most recent
+    with open(cache.path("c"), "wb") as pdf_file:
+        pdf_file.write(b"1234")
+    cache.evict(keep="c")
+
+    assert cache.open("b") is None
+    assert cache.open("a").read() == b"1234"
+    stats = cache.stats()
+    assert stats["entries"] == 2 and stats["size_bytes"] == 8 and stats["evictions"] == 1
+
+    cache.max_bytes = 0
+    cache.evict(keep="c")
+    assert os.listdir(tmp_path) == ["c.pdf"]
+    assert cache.open("c") is None  # a zero budget never reuses files
+
+
+def test_pool_rejects_when_queue_is_full(tmp_path):
+    pool = PDFRenderPool(workers=1, max_queue=0)
+    assert pool._slots.acquire(blocking=False)
+    with pytest.raises(PDFQueueFullError):
+        pool.render("key", str(tmp_path / "key.pdf"), "## Report", "", datetime.now())
+
+
+def test_pool_renders_to_file_in_a_separate_process(tmp_path):
+    pool = PDFRenderPool(workers=1, max_queue=1, timeout=120)
+    try:
+        pdf = pool.render("key", str(tmp_path / "key.pdf"), "## Report\n\nBody text", "ctx", datetime.now())
+    finally:
+        pool.shutdown()
+    with open(tmp_path / "key.pdf", "rb") as pdf_file:
+        assert pdf.startswith(b"%PDF-") and pdf_file.read() == pdf
+    assert os.listdir(tmp_path) == ["key.pdf"]
+    assert pool.queue_depth() == 0
+
+
+class StalledPool(PDFRenderPool):
+    """A pool whose renders never finish"""
+
+    def submit(self, key, function, *args, block=False, timeout=None):
+        return Future()
+
+
+def test_slow_render_returns_503(monkeypatch, tmp_path):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("WARMUP_STEPS", "none")
+    monkeypatch.setattr(pdf_service, "render_pool", StalledPool(workers=0, timeout=0.2))
+    monkeypatch.setattr(pdf_service, "pdf_cache", PDFCache(str(tmp_path)))
+    import flask_app
+    response = flask_app.app.test_client().post("/download-pdf", json={"analysis": "## Slow report"})
+    assert response.status_code == 503 and response.headers["Retry-After"] == "5"
+    assert "longer than 0.2 seconds" in response.get_json()["error"]
+
+
+class EvictingPool(PDFRenderPool):
+    """Inline pool after which another worker evicts every cached PDF"""
+
+    def submit(self, key, function, *args, block=False, timeout=None):
+        future = super().submit(key, function, *args, block=block, timeout=timeout)
+        pdf_service.pdf_cache.clear()
+        return future
+
+
+def test_fresh_renders_survive_eviction_by_another_worker(monkeypatch, tmp_path):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("WARMUP_STEPS", "none")
+    monkeypatch.setattr(pdf_service, "render_pool", EvictingPool(workers=0))
+    monkeypatch.setattr(pdf_service, "pdf_cache", PDFCache(str(tmp_path)))
+    import flask_app
+    client = flask_app.app.test_client()
+
+    report = client.post("/download-pdf", json={"analysis": "## Evicted report"})
+    assert report.status_code == 200 and report.get_data().startswith(b"%PDF-")
+    assert int(report.headers["Content-Length"]) == len(report.get_data())
+    portfolio = client.post("/download-portfolio-pdf", json={"analyses": [{"type": "kpi", "analysis": "## A"}]})
+    assert portfolio.status_code == 200 and portfolio.get_data().startswith(b"%PDF-")
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".pdf")]
+
+
+def test_download_pdf_serves_repeats_from_cache_with_etag(monkeypatch, tmp_path):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("WARMUP_STEPS", "none")
+    monkeypatch.setattr(pdf_service, "render_pool", PDFRenderPool(workers=0))
+    monkeypatch.setattr(pdf_service, "pdf_cache", PDFCache(str(tmp_path)))
+    import flask_app
+    client = flask_app.app.test_client()
+    payload = {"analysis": "## Summary\n\nSome text", "context": "ctx"}
+
+    first = client.post("/download-pdf", json=payload)
+    second = client.post("/download-pdf", json=payload)
+    assert first.status_code == 200 and second.status_code == 200
+    assert first.headers["X-PDF-Cache"] == "miss" and second.headers["X-PDF-Cache"] == "hit"
+    assert first.get_data() == second.get_data()
+    assert first.content_length == len(first.get_data()) > 0
+
+    etag = first.headers["ETag"]
+    assert etag.strip('"') == pdf_cache_key(payload["analysis"], payload["context"])
+    not_modified = client.post("/download-pdf", json=payload, headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+
+
+def test_importing_the_app_defers_heavy_modules():
+    # A fresh interpreter: this test process has already imported most of them
+    script = (
+        "import sys; sys.path.insert(0, '.'); import flask_app; "
+        "print('loaded:' + ','.join(m for m in ('openai', 'reportlab', 'pypdf', 'markdown2', 'prompt') if m in sys.modules))"
+    )
+    env = dict(os.environ, OPENAI_API_KEY="test-key")
+    completed = subprocess.run([sys.executable, "-c", script], cwd=os.path.dirname(os.path.abspath(__file__)),
+                               env=env, capture_output=True, text=True, check=True)
+    assert completed.stdout.strip().splitlines()[-1] == "loaded:"
@@ -0,0 +1,129 @@
+"""
+Offline tests for the sampling profiler, slow request capture and memory snapshots
+Run with: python -m pytest test_profiling.py
+"""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+import pdf_service
+from pdf_service import PDFRenderPool
+from profiling import MemoryProfiler, ProfileStore, SamplingProfiler, SlowRequestProfiler
+
+
+def busy_loop(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def read_folded(store, name):
+    with open(store.path(name), encoding="utf-8") as profile_file:
+        return [line.rsplit(" ", 1) for line in profile_file.read().splitlines()]
+
+
+def test_sampling_profile_is_written_as_folded_stacks(tmp_path):
+    store = ProfileStore(str(tmp_path))
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_loop, args=(stop,), name="busy-worker")
+    worker.start()
+    try:
+        result = SamplingProfiler(store).start(seconds=0.3, interval=0.005, block=True)
+    finally:
+        stop.set()
+        worker.join()
+
+    rows = read_folded(store, result["file"])
+    busy = [stack for stack, _ in rows if "busy_loop (" in stack and "test_profiling.py:" in stack]
+    assert busy and all(stack.startswith("busy-worker;") for stack in busy)
+    assert all(count.isdigit() for _, count in rows)
+    assert result["samples"] > 10
+
+
+def test_only_requests_over_the_threshold_are_kept(tmp_path):
+    store = ProfileStore(str(tmp_path))
+    profiler = SlowRequestProfiler(store, threshold_ms=100, interval=0.002)
+
+    def handle(seconds):
+        token = profiler.begin()
+        started = time.perf_counter()
+        time.sleep(seconds)
+        return profiler.end(token, (time.perf_counter() - started) * 1000, "POST /analyze", "abc123")
+
+    assert handle(0.01) is None
+    name = handle(0.15)
+    assert name.startswith("slow-") and "POST_analyze" in name and name.endswith("ms-abc123.folded")
+    assert any("handle (" in stack for stack, _ in read_folded(store, name))
+    assert [entry["name"] for entry in store.list()] == [name]
+    assert profiler.status()["captured"] == 1 and profiler.status()["in_flight"] == 0
+
+    profiler.threshold_ms = 0
+    assert profiler.begin() is None
+
+
+def allocate_blocks():
+    return [bytearray(4096) for _ in range(500)]
+
+
+def test_memory_snapshot_lists_top_allocators(tmp_path):
+    store = ProfileStore(str(tmp_path))
+    profiler = MemoryProfiler(store)
+    profiler.start(frames=10)
+    try:
+        first = profiler.snapshot()
+        blocks = allocate_blocks()
+        second = profiler.snapshot(top=5)
+    finally:
+        profiler.stop()
+
+    allocation_line = f"test_profiling.py:{allocate_blocks.__code__.co_firstlineno + 1}"
+    assert "growth" not in first and len(second["top"]) <= 5
+    assert second["top"][0]["location"].endswith(allocation_line) and second["top"][0]["size_kb"] >= 2000
+    assert second["growth"][0]["size_diff_kb"] >= 2000
+    assert any(allocation_line in stack for stack, _ in read_folded(store, second["file"]))
+    assert len(blocks) == 500 and not profiler.status()["tracing"]
+
+
+class SlowEngine:
+    last_trim_report = []
+
+    def analyze(self, context):
+        time.sleep(0.1)
+        return "## Analysis\n\nDone."
+
+
+def test_profiling_endpoints_are_admin_only_and_opt_in(monkeypatch, tmp_path):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("WARMUP_STEPS", "none")
+    monkeypatch.setattr(pdf_service, "render_pool", PDFRenderPool(workers=0))
+    import flask_app
+    store = ProfileStore(str(tmp_path))
+    monkeypatch.setattr(flask_app, "profile_store", store)
+    monkeypatch.setattr(flask_app, "sampling_profiler", SamplingProfiler(store))
+    monkeypatch.setattr(flask_app, "slow_request_profiler", SlowRequestProfiler(store, interval=0.002))
+    monkeypatch.setattr(flask_app, "create_engine", lambda data: SlowEngine())
+    client = flask_app.app.test_client()
+    admin = {"X-Admin-Token": "admin"}
+
+    monkeypatch.setenv("ADMIN_TOKEN", "admin")
+    monkeypatch.delenv("PROFILING", raising=False)
+    assert client.get("/admin/profiles", headers=admin).status_code == 404
+    monkeypatch.setenv("PROFILING", "1")
+    assert client.get("/admin/profiles").status_code == 403
+
+    profile = client.post("/admin/profile/cpu", json={"seconds": 0.2, "interval_ms": 5, "wait": True}, headers=admin)
+    assert profile.status_code == 200 and profile.get_json()["samples"] > 0
+
+    assert client.post("/admin/profile/slow", json={"threshold_ms": 50}, headers=admin).get_json()["threshold_ms"] == 50
+    client.get("/health")
+    assert client.post("/analyze", json={"context": "Activation dropped"}).status_code == 200
+    names = [entry["name"] for entry in client.get("/admin/profiles", headers=admin).get_json()["profiles"]]
+    slow = [name for name in names if name.startswith("slow-")]
+    assert len(slow) == 1 and "POST_analyze" in slow[0]  # /health was under the threshold
+
+    download = client.get(f"/admin/profiles/{profile.get_json()['file']}", headers=admin)
+    assert download.status_code == 200 and download.mimetype == "text/plain"
+    assert client.get("/admin/profiles/..%2Fsecrets.folded", headers=admin).status_code == 404
+    assert client.post("/admin/profile/memory", json={"action": "snapshot"}, headers=admin).status_code == 409
@@ -0,0 +1,141 @@
+"""
+Offline tests for prompt token budgeting and trimming
+Run with: python -m pytest test_prompt_budget.py
+"""
+import hashlib
+import os
+import sys
+import types
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+import prompt_budget
+from prompt_budget import TokenCounter, PromptSection, fit_sections, TRIM_MARKER
+
+
+counter = TokenCounter()
+
+
+def test_heuristic_count_is_deterministic():
+    text = "Our DAU dropped 15% after launching the new onboarding flow."
+    assert counter.count(text) == counter.count(text)
+    assert counter.count("") == 0
+    assert counter.count("word") == 1
+    assert counter.count("onboarding") == 3
+    assert counter.count("a, b.") == 4
+
+
+def test_truncate_respects_budget_and_marks_cut():
+    text = " ".join(f"item{i}" for i in range(500))
+    trimmed = counter.truncate(text, 50)
+    assert trimmed.endswith(TRIM_MARKER)
+    assert counter.count(trimmed) <= 50
+    assert text.startswith(trimmed[:-len(TRIM_MARKER)])
+
+    assert counter.truncate("short text", 50) == "short text"
+    assert counter.truncate(text, 2) == ""
+
+
+def test_fit_sections_trims_lowest_priority_first():
+    sections = [
+        PromptSection("decision", "Should we deprecate the tablet app? " * 20, priority=5, min_tokens=50),
+        PromptSection("context", "Background detail about the market. " * 200, priority=1),
+    ]
+    texts, report = fit_sections(sections, 300, counter)
+
+    assert texts["decision"] == sections[0].text
+    assert [entry["section"] for entry in report] == ["context"]
+    assert sum(counter.count(text) for text in texts.values()) <= 300
+
+
+def test_fit_sections_honours_min_tokens():
+    sections = [
+        PromptSection("a", "alpha " * 400, priority=2, min_tokens=100),
+        PromptSection("b", "beta " * 400, priority=1, min_tokens=100),
+    ]
+    texts, report = fit_sections(sections, 150, counter)
+
+    assert counter.count(texts["a"]) >= 90
+    assert counter.count(texts["b"]) <= 100
+    assert {entry["section"] for entry in report} == {"a", "b"}
+    assert not any(entry["dropped"] for entry in report)
+
+
+def test_fit_sections_no_trim_under_budget():
+    sections = [PromptSection("only", "fits easily", priority=1)]
+    texts, report = fit_sections(sections, 1000, counter)
+    assert texts == {"only": "fits easily"}
+    assert report == []
+
+
+def test_engine_trims_oversized_decision_inputs(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("PROMPT_INPUT_TOKEN_BUDGET", "400")
+    import prompt_budget
+    monkeypatch.setattr(prompt_budget, "_default_counter", counter)
+    import prompt
+
+    engine = prompt.ProductThinkingEngine()
+    fitted = engine._fit_inputs(
+        "defense",
+        {"decision": "Deprecate the Android tablet app", "rationale": "Long rationale. " * 1000, "audience": "Execs"},
+        {"decision": 5, "rationale": 4, "audience": 1}
+    )
+
+    assert fitted["decision"] == "Deprecate the Android tablet app"
+    assert fitted["audience"] == "Execs"
+    assert fitted["rationale"].endswith(TRIM_MARKER)
+    assert [entry["section"] for entry in engine.last_trim_report] == ["rationale"]
+
+
+def test_scraped_main_content_trimmed_before_headings(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("SCRAPED_CONTENT_TOKEN_BUDGET", "300")
+    import prompt_budget
+    monkeypatch.setattr(prompt_budget, "_default_counter", counter)
+    import prompt
+
+    engine = prompt.ProductThinkingEngine()
+    scraped = {
+        'title': 'Acme Analytics',
+        'headings': {'h1': ['Analytics for everyone'], 'h2': ['Pricing', 'Integrations']},
+        'main_content': 'Lorem ipsum dolor sit amet. ' * 2000,
+    }
+    prompt_text = engine.build_website_teardown_prompt("https://acme.test", "", scraped)
+
+    assert "Acme Analytics" in prompt_text
+    assert "H1: Analytics for everyone" in prompt_text
+    assert TRIM_MARKER in prompt_text
+    assert any(entry["section"] == "main_content" for entry in engine.last_trim_report)
+
+
+class FakeEncoding:
+    """Stand-in for a tiktoken encoding: one token per character"""
+    name = "o200k_base"
+
+    def encode(self, text):
+        return [ord(char) for char in text]
+
+    def decode(self, tokens):
+        return "".join(chr(token) for token in tokens)
+
+
+def test_auto_tokenizer_uses_tiktoken_only_when_cached(monkeypatch, tmp_path):
+    requested = []
+    fake_tiktoken = types.SimpleNamespace(get_encoding=lambda name: requested.append(name) or FakeEncoding())
+    monkeypatch.setitem(sys.modules, "tiktoken", fake_tiktoken)
+    monkeypatch.setenv("PROMPT_TOKENIZER", "auto")
+    monkeypatch.setenv("TIKTOKEN_CACHE_DIR", str(tmp_path))
+
+    # Not cached: tiktoken would download the encoding, so the estimate is used instead
+    assert prompt_budget._load_default_counter().name == "heuristic" and requested == []
+
+    url = "https://openaipublic.blob.core.windows.net/encodings/o200k_base.tiktoken"
+    (tmp_path / hashlib.sha1(url.encode()).hexdigest()).write_bytes(b"cached")
+    cached = prompt_budget._load_default_counter()
+    assert cached.name == "o200k_base" and requested == ["o200k_base"]
+    assert cached.count("onboarding") == 10
+    assert cached.truncate("x" * 100, 20) == "x" * (20 - len(TRIM_MARKER)) + TRIM_MARKER
+
+    monkeypatch.setenv("TIKTOKEN_CACHE_DIR", "")  # caching disabled in tiktoken
+    assert prompt_budget._load_default_counter().name == "heuristic"
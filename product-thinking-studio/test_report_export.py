@@ -0,0 +1,101 @@
+"""
+Offline tests for the HTML and markdown report export
+Run with: python -m pytest test_report_export.py
+"""
+import gzip
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+import report_export
+from report_export import ExportCache, export_cache_key, render_html, render_markdown
+
+
+ANALYSIS = "## Summary\n\nSome **bold** text.\n\n| Metric | Value |\n|---|---|\n| DAU | 10k |\n\n<script>x()</script>\n"
+
+
+def test_html_is_self_contained_and_escaped():
+    page = render_html(ANALYSIS, "Q3 <plan> & risks", datetime(2026, 1, 2, 15, 30))
+    assert page.startswith("<!DOCTYPE html>")
+    assert "<strong>bold</strong>" in page and "<table>" in page
+    assert "<script>" not in page and "&lt;script&gt;" in page
+    assert "Q3 &lt;plan&gt; &amp; risks" in page
+    assert "January 02, 2026 at 03:30 PM" in page
+    assert "<link" not in page and "src=" not in page
+
+
+def test_markdown_quotes_context_and_keeps_analysis():
+    document = render_markdown(ANALYSIS, "line one\n\nline two", datetime(2026, 1, 2))
+    assert document.startswith("# Product Analysis Report\n")
+    assert "> line one\n>\n> line two" in document
+    assert document.rstrip().endswith("<script>x()</script>")
+
+
+def test_cache_key_depends_on_format_and_content():
+    key = export_cache_key("html", "text", "ctx")
+    assert key == export_cache_key("html", "text", "ctx")
+    assert key != export_cache_key("markdown", "text", "ctx")
+    assert key != export_cache_key("html", "text", "other")
+
+
+def test_cache_compresses_each_encoding_once_and_evicts_by_size():
+    renders = []
+
+    def render():
+        renders.append(1)
+        return "x" * 4000
+
+    cache = ExportCache(max_bytes=5000)
+    body, encoding, cached = cache.get("a", render, "gzip")
+    assert encoding == "gzip" and not cached and gzip.decompress(body) == b"x" * 4000
+    assert cache.get("a", render, "gzip") == (body, "gzip", True)
+    assert cache.get("a", render, "identity")[0] == b"x" * 4000
+    assert cache.get("a", render, "compress")[1] == "identity"
+    assert len(renders) == 1
+
+    cache.get("b", lambda: "short", "gzip")  # too small to compress
+    assert cache.get("b", render, "gzip")[1:] == ("identity", True)
+    cache.get("c", render, "identity")
+    stats = cache.stats()
+    assert stats["evictions"] == 1 and stats["size_bytes"] <= 5000
+    assert cache.get("a", render, "identity")[2] is False
+
+
+def test_cache_uses_the_shared_compression_threshold(monkeypatch):
+    monkeypatch.setenv("COMPRESS_MIN_BYTES", "5000")
+    cache = ExportCache(max_bytes=0)
+    assert cache.get("a", lambda: "x" * 4000, "gzip")[1] == "identity"
+    monkeypatch.setenv("COMPRESS_MIN_BYTES", "100")
+    assert cache.get("b", lambda: "x" * 200, "gzip")[1] == "gzip"
+
+
+def test_download_routes_negotiate_encoding_and_etag(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("WARMUP_STEPS", "none")
+    monkeypatch.setattr(report_export, "export_cache", ExportCache())
+    import flask_app
+    monkeypatch.setattr(flask_app, "export_cache", report_export.export_cache)
+    client = flask_app.app.test_client()
+    payload = {"analysis": ANALYSIS * 20, "context": "ctx"}
+
+    first = client.post("/download-html", json=payload, headers={"Accept-Encoding": "gzip"})
+    assert first.status_code == 200 and first.headers["Content-Encoding"] == "gzip"
+    assert first.headers["X-Export-Cache"] == "miss" and first.headers["Vary"] == "Accept-Encoding"
+    assert first.mimetype == "text/html"
+    assert gzip.decompress(first.get_data()).startswith(b"<!DOCTYPE html>")
+    assert first.headers["Content-Disposition"].endswith(".html")
+
+    plain = client.post("/download-html", json=payload)
+    assert "Content-Encoding" not in plain.headers and plain.headers["X-Export-Cache"] == "hit"
+    assert plain.get_data() == gzip.decompress(first.get_data())
+    assert plain.headers["ETag"] != first.headers["ETag"]
+
+    not_modified = client.post("/download-html", json=payload,
+                               headers={"Accept-Encoding": "gzip", "If-None-Match": first.headers["ETag"]})
+    assert not_modified.status_code == 304
+
+    markdown = client.post("/download-markdown", json=payload)
+    assert markdown.mimetype == "text/markdown" and markdown.headers["Content-Disposition"].endswith(".md")
+    assert client.post("/download-markdown", json={"analysis": " "}).status_code == 400
@@ -0,0 +1,95 @@
+"""
+Offline tests for parallel sectioned report generation
+Run with: python -m pytest test_sectioned_generation.py
+"""
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from sectioned_generation import SECTION_GROUPS, split_prompt, section_max_tokens
+
+
+def fake_response(content, finish_reason="stop"):
+    usage = SimpleNamespace(prompt_tokens=10, completion_tokens=20, prompt_tokens_details=None)
+    message = SimpleNamespace(content=content)
+    return SimpleNamespace(usage=usage, choices=[SimpleNamespace(message=message, finish_reason=finish_reason)])
+
+
+def make_engine(monkeypatch, create):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("SECTIONED_ENDPOINTS", "defense")
+    import prompt
+    engine = prompt.ProductThinkingEngine(user_id="tester")
+    engine.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    return engine
+
+
+def test_split_prompt_keeps_context_and_order():
+    prompt_text = (
+        "Inputs: ## 📋 Executive Summary is mentioned by the user\n\n---\n\nIntro\n\n"
+        "## 📋 Executive Summary\nA\n\n## 🎯 Decision Statement\nB\n\n## 💡 Why This Decision\nC\n\n"
+        "## ⚖️ Tradeoffs Evaluated\nD\n\n## 🚨 Risks & Mitigation\nE\n\n## ✅ Success Metrics\nF\n\n"
+        "## 🛡️ Addressing Likely Objections\nG\n\n## 📅 Next Steps & Timeline\nH\n\n"
+        "## 💬 Talking Points (for Q&A)\nI\n\n---\n\n**Tone:** Confident."
+    )
+    parts = split_prompt(prompt_text, SECTION_GROUPS["defense"])
+
+    assert len(parts) == 4
+    for part in parts:
+        assert part.startswith("Inputs: ## 📋 Executive Summary is mentioned by the user")
+        assert part.endswith("**Tone:** Confident.")
+    assert "## 🎯 Decision Statement\nB" in parts[0]
+    assert "## 🚨 Risks & Mitigation\nE" in parts[1] and "Decision Statement" not in parts[1]
+    assert "## 💬 Talking Points (for Q&A)\nI" in parts[3]
+
+    assert split_prompt("no headings here", SECTION_GROUPS["defense"]) is None
+
+
+def test_section_max_tokens():
+    assert section_max_tokens(7000, 4) == 2625
+    assert section_max_tokens(7000, 1) == 7000
+
+
+def test_defense_sections_run_concurrently_and_assemble_in_order(monkeypatch):
+    active = []
+    peak = [0]
+    lock = threading.Lock()
+
+    def create(**kwargs):
+        content = kwargs["messages"][-1]["content"]
+        with lock:
+            active.append(1)
+            peak[0] = max(peak[0], len(active))
+        # Later parts finish first to prove ordering is by part, not completion time
+        part = int(content.split("You are writing PART ")[1].split(" ")[0])
+        time.sleep(0.05 * (5 - part))
+        with lock:
+            active.pop()
+        return fake_response(f"## Part {part}\nbody")
+
+    engine = make_engine(monkeypatch, create)
+    started = time.perf_counter()
+    report = engine.generate_decision_defense({'decision': 'Deprecate tablet app', 'rationale': 'Low usage'})
+    elapsed = time.perf_counter() - started
+
+    assert report == "\n\n".join(f"## Part {part}\nbody" for part in range(1, 5))
+    assert peak[0] > 1
+    assert elapsed < 0.4
+
+
+def test_unsectioned_endpoint_makes_single_call(monkeypatch):
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        return fake_response("## Whole report")
+
+    engine = make_engine(monkeypatch, create)
+    engine.sectioned_endpoints = set()
+    assert engine.generate_decision_defense({'decision': 'Ship it'}) == "## Whole report"
+    assert len(calls) == 1
+    assert calls[0]["max_tokens"] == 7000
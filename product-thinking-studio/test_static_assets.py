@@ -0,0 +1,69 @@
+"""
+Offline tests for fingerprinted static assets and cached pages
+Run with: python -m pytest test_static_assets.py
+"""
+import gzip
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+import pytest
+
+import pdf_service
+from pdf_service import PDFRenderPool
+from static_assets import IMMUTABLE, AssetStore
+
+
+def test_fingerprint_follows_content(tmp_path):
+    (tmp_path / "css").mkdir()
+    stylesheet = tmp_path / "css" / "site.css"
+    stylesheet.write_text("body { color: red; }\n" * 100)
+    store = AssetStore(str(tmp_path), reload=True)
+
+    url = store.url("css/site.css")
+    assert re.fullmatch(r"/assets/css/site\.[0-9a-f]{16}\.css", url)
+    asset, current = store.lookup(url[len("/assets/"):])
+    assert current and asset.mimetype == "text/css"
+    assert gzip.decompress(asset.encoded("gzip")[0]) == asset.body
+
+    stylesheet.write_text("body { color: blue; }\n" * 100)
+    os.utime(stylesheet, (1, 1))
+    assert store.url("css/site.css") != url
+    assert store.lookup(url[len("/assets/"):]) == (store.get("css/site.css"), False)
+
+
+def test_only_asset_files_inside_the_folder_are_served(tmp_path):
+    (tmp_path / "robots.txt").write_text("User-agent: *\n")
+    store = AssetStore(str(tmp_path))
+    assert store.lookup("robots.0123456789abcdef.txt") == (None, False)
+    assert store.lookup("../secret.0123456789abcdef.js") == (None, False)
+    assert store.lookup("app.css") == (None, False)
+    with pytest.raises(FileNotFoundError):
+        store.url("missing.js")
+
+
+def test_pages_link_fingerprinted_assets_and_revalidate(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("WARMUP_STEPS", "none")
+    monkeypatch.setattr(pdf_service, "render_pool", PDFRenderPool(workers=0))
+    import flask_app
+    client = flask_app.app.test_client()
+
+    page = client.get("/app", headers={"Accept-Encoding": "gzip"})
+    assert page.status_code == 200 and page.headers["Content-Encoding"] == "gzip"
+    assert page.headers["Cache-Control"] == "no-cache" and page.headers["Vary"] == "Accept-Encoding"
+    html = gzip.decompress(page.get_data()).decode()
+    urls = re.findall(r'(?:href|src)="(/assets/[^"]+)"', html)
+    assert len(urls) == 2 and "<style>" not in html
+
+    repeat = client.get("/app", headers={"Accept-Encoding": "gzip", "If-None-Match": page.headers["ETag"]})
+    assert repeat.status_code == 304 and repeat.get_data() == b""
+
+    for url in urls:
+        asset = client.get(url)
+        assert asset.status_code == 200 and asset.headers["Cache-Control"] == IMMUTABLE
+        assert client.get(url, headers={"If-None-Match": asset.headers["ETag"]}).status_code == 304
+    assert client.get("/assets/js/app.0000000000000000.js").headers["Cache-Control"] == "no-cache"
+    assert client.get("/assets/js/missing.0000000000000000.js").status_code == 404
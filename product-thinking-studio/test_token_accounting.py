@@ -0,0 +1,156 @@
+"""
+Offline tests for token accounting and daily budgets
+Run with: python -m pytest test_token_accounting.py
+"""
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+from token_accounting import TokenLedger, BudgetExceededError
+
+
+def fake_response(prompt_tokens, completion_tokens, cached_tokens=0):
+    """Build an object shaped like an OpenAI chat completion response"""
+    usage = SimpleNamespace(
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        prompt_tokens_details=SimpleNamespace(cached_tokens=cached_tokens)
+    )
+    message = SimpleNamespace(content="## Result\nOK")
+    return SimpleNamespace(usage=usage, choices=[SimpleNamespace(message=message, finish_reason="stop")])
+
+
+def test_record_response_aggregates_by_endpoint_and_user():
+    ledger = TokenLedger()
+    ledger.record_response("defense", "alice", "gpt-4o", fake_response(100, 400, 20), 1200.0)
+    ledger.record_response("defense", "bob", "gpt-4o", fake_response(50, 150), 800.0)
+    ledger.record_response("kpi", "alice", "gpt-4o", fake_response(10, 90), 300.0)
+
+    stats = ledger.aggregates()
+    defense = stats["endpoints"]["defense"]
+    assert defense["calls"] == 2
+    assert defense["total_tokens"] == 700
+    assert defense["cached_tokens"] == 20
+    assert defense["latency_ms_avg"] == 1000.0
+    assert defense["latency_ms_max"] == 1200.0
+    assert stats["users"]["alice"]["total_tokens"] == 600
+    assert stats["totals"]["calls"] == 3
+
+
+def test_user_budget_is_enforced():
+    ledger = TokenLedger(user_daily_budget=500)
+    ledger.check_budget("kpi", "alice")
+    ledger.record("kpi", "alice", "gpt-4o", prompt_tokens=200, completion_tokens=300)
+
+    try:
+        ledger.check_budget("defense", "alice")
+        assert False, "expected BudgetExceededError"
+    except BudgetExceededError as e:
+        assert e.scope == "user"
+        assert e.used == 500
+
+    # Other users are unaffected
+    ledger.check_budget("defense", "bob")
+
+
+def test_endpoint_budget_override():
+    ledger = TokenLedger(endpoint_daily_budget=10000, endpoint_budgets={"defense": 100})
+    ledger.record("defense", "alice", "gpt-4o", prompt_tokens=60, completion_tokens=40)
+    ledger.record("kpi", "alice", "gpt-4o", prompt_tokens=60, completion_tokens=40)
+
+    ledger.check_budget("kpi", "bob")
+    try:
+        ledger.check_budget("defense", "bob")
+        assert False, "expected BudgetExceededError"
+    except BudgetExceededError as e:
+        assert e.scope == "endpoint"
+        assert e.key == "defense"
+
+
+def test_workers_sharing_a_ledger_file_share_one_budget(tmp_path):
+    path = str(tmp_path / "tokens.sqlite3")
+    worker_a = TokenLedger(user_daily_budget=500, path=path)
+    worker_b = TokenLedger(user_daily_budget=500, path=path)
+    worker_a.record("kpi", "alice", "gpt-4o", prompt_tokens=200, completion_tokens=300)
+
+    try:
+        worker_b.check_budget("defense", "alice")
+        assert False, "expected BudgetExceededError"
+    except BudgetExceededError as e:
+        assert e.used == 500
+    assert worker_b.aggregates()["users"]["alice"]["total_tokens"] == 500
+
+
+def test_reservations_block_parallel_calls_until_recorded():
+    ledger = TokenLedger(user_daily_budget=1000)
+    first = ledger.check_budget("defense", "alice", estimated_tokens=1000)
+
+    # A second section starting before the first finishes sees the reservation
+    try:
+        ledger.check_budget("defense", "alice", estimated_tokens=1000)
+        assert False, "expected BudgetExceededError"
+    except BudgetExceededError as e:
+        assert e.used == 1000
+
+    # The actual usage replaces the reservation
+    ledger.record("defense", "alice", "gpt-4o", prompt_tokens=100, completion_tokens=200,
+                  reservation=first)
+    second = ledger.check_budget("defense", "alice", estimated_tokens=1000)
+    ledger.release(second)
+    ledger.check_budget("defense", "alice")
+    assert ledger.aggregates()["users"]["alice"]["total_tokens"] == 300
+
+
+def test_engine_records_usage_without_network(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    import prompt
+    from token_accounting import ledger
+
+    ledger.reset()
+    engine = prompt.ProductThinkingEngine(user_id="tester")
+    engine.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(
+        create=lambda **kwargs: fake_response(30, 70)
+    )))
+
+    kpi_data = {
+        'dau': 10, 'mau': 100, 'avg_session_time': 3.5, 'conversion_rate': 2.0,
+        'churn_rate': 5.0, 'retention_rate': 40.0, 'nps_score': 30,
+        'revenue_per_user': 1.5, 'recent_changes': ''
+    }
+    assert engine.analyze_kpis(kpi_data).startswith("## Result")
+    stats = ledger.aggregates()
+    assert stats["endpoints"]["kpi"]["total_tokens"] == 100
+    assert stats["users"]["tester"]["calls"] == 1
+
+
+def test_spoofed_forwarded_for_does_not_reset_the_budget(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("WARMUP_STEPS", "none")
+    import pdf_service
+    from pdf_service import PDFRenderPool
+    monkeypatch.setattr(pdf_service, "render_pool", PDFRenderPool(workers=0))
+    import flask_app
+    import prompt
+    from token_accounting import ledger
+
+    fake_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(
+        create=lambda **kwargs: fake_response(30, 70)
+    )))
+    monkeypatch.setattr(prompt, "create_client", lambda timeout: fake_client)
+    monkeypatch.setattr(ledger, "user_daily_budget", 100)
+    ledger.reset()
+    client = flask_app.app.test_client()
+
+    def analyze(forwarded_for):
+        # The proxy appends the address it saw; anything before it came from the client
+        return client.post("/analyze", json={"context": "Activation dropped"},
+                           headers={"X-Forwarded-For": forwarded_for}).status_code
+
+    assert analyze("198.51.100.7") == 200
+    assert analyze("10.0.0.1, 198.51.100.7") == 429
+    assert analyze("10.0.0.2, 198.51.100.7") == 429
+    assert analyze("198.51.100.8") == 200
+    assert set(ledger.aggregates()["users"]) == {"198.51.100.7", "198.51.100.8"}
+    ledger.reset()
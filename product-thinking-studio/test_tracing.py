@@ -0,0 +1,123 @@
+"""
+Offline tests for request tracing and the local trace collector
+Run with: python -m pytest test_tracing.py
+"""
+import json
+import os
+import sys
+import threading
+from werkzeug.serving import make_server
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+import pdf_service
+from pdf_service import PDFRenderPool
+from sectioned_generation import run_parallel
+from trace_collector import create_app, spans_from_otlp, waterfall
+from tracing import JsonLinesExporter, OTLPExporter, Tracer, span
+
+
+def read_spans(path):
+    with open(path, encoding="utf-8") as trace_file:
+        return [json.loads(line) for line in trace_file]
+
+
+def test_spans_nest_and_follow_parallel_sections(tmp_path):
+    tracer = Tracer(JsonLinesExporter(str(tmp_path / "traces.jsonl")))
+    root = tracer.start("POST /analyze", **{"http.route": "/analyze"})
+    with span("prompt.build", endpoint="challenge") as build:
+        build.set(prompt_chars=1200)
+
+    def section(name):
+        with span("llm.call", section=name):
+            return name
+
+    assert run_parallel([lambda: section("a"), lambda: section("b")]) == ["a", "b"]
+    try:
+        with span("response.serialize"):
+            raise ValueError("bad payload")
+    except ValueError:
+        pass
+    tracer.finish(root)
+    with span("after.finish"):  # no active trace: not recorded
+        pass
+
+    spans = {record["name"]: record for record in read_spans(tmp_path / "traces.jsonl")}
+    root_id = spans["POST /analyze"]["span_id"]
+    assert {record["trace_id"] for record in spans.values()} == {root.trace_id}
+    assert spans["prompt.build"]["parent_span_id"] == root_id
+    assert spans["prompt.build"]["attributes"] == {"endpoint": "challenge", "prompt_chars": 1200}
+    assert spans["response.serialize"]["error"] == "ValueError: bad payload"
+    assert "after.finish" not in spans
+    records = read_spans(tmp_path / "traces.jsonl")
+    assert sorted(record["attributes"].get("section") for record in records if record["name"] == "llm.call") == ["a", "b"]
+    assert sum(record["name"] == "queue.wait" for record in records) == 2
+
+
+class FakeEngine:
+    last_trim_report = []
+
+    def analyze(self, context):
+        with span("llm.call", endpoint="challenge"):
+            return "## Analysis\n\n" + "Findings. " * 10
+
+
+def test_requests_return_their_trace_id(monkeypatch, tmp_path):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("WARMUP_STEPS", "none")
+    monkeypatch.setattr(pdf_service, "render_pool", PDFRenderPool(workers=0))
+    import flask_app
+    monkeypatch.setattr(flask_app, "tracer", Tracer(JsonLinesExporter(str(tmp_path / "traces.jsonl"))))
+    monkeypatch.setattr(flask_app, "create_engine", lambda data: FakeEngine())
+    client = flask_app.app.test_client()
+
+    caller_trace = "4bf92f3577b34da6a3ce929d0e0e4736"
+    response = client.post("/analyze", json={"context": "Activation dropped"},
+                           headers={"traceparent": f"00-{caller_trace}-00f067aa0ba902b7-01"})
+    assert response.status_code == 200 and response.headers["X-Trace-Id"] == caller_trace
+
+    spans = {record["name"]: record for record in read_spans(tmp_path / "traces.jsonl")}
+    assert set(spans) >= {"POST /analyze", "request.parse", "llm.call", "response.serialize"}
+    assert spans["POST /analyze"]["parent_span_id"] == "00f067aa0ba902b7"
+    assert spans["POST /analyze"]["attributes"]["http.status_code"] == 200
+
+    other = client.get("/health").headers["X-Trace-Id"]
+    assert other != caller_trace and len(other) == 32
+
+
+def test_otlp_export_reaches_the_collector():
+    collector = create_app(echo=False)
+    server = make_server("127.0.0.1", 0, collector, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        exporter = OTLPExporter(f"http://127.0.0.1:{server.server_port}/v1/traces")
+        tracer = Tracer(exporter)
+        root = tracer.start("POST /analyze-website")
+        with span("scrape", url="https://example.com"):
+            with span("scrape.navigate"):
+                pass
+        tracer.finish(root)
+        exporter.send(root.trace.spans)  # synchronously, rather than waiting for the export thread
+
+        client = collector.test_client()
+        assert client.get("/traces").get_json()[0]["trace_id"] == root.trace_id
+        text = client.get(f"/traces/{root.trace_id}").get_data(as_text=True)
+        lines = text.splitlines()
+        assert "POST /analyze-website" in lines[1] and "    scrape.navigate" in lines[3]
+    finally:
+        server.shutdown()
+
+
+def test_collector_reads_what_the_exporter_sends():
+    tracer = Tracer(JsonLinesExporter(os.devnull))
+    root = tracer.start("GET /health")
+    with span("response.serialize", bytes=120, cached=False, ratio=0.5):
+        pass
+    tracer.finish(root)
+    payload = {"resourceSpans": [{"scopeSpans": [{"spans": [item.to_otlp() for item in root.trace.spans]}]}]}
+
+    spans = spans_from_otlp(json.loads(json.dumps(payload)))
+    assert [item["attributes"] for item in spans if item["name"] == "response.serialize"] == [
+        {"bytes": 120, "cached": False, "ratio": 0.5}
+    ]
+    assert waterfall(spans).splitlines()[1].endswith("GET /health")
@@ -0,0 +1,91 @@
+"""
+Offline tests for worker warm-up and the readiness check
+Run with: python -m pytest test_warmup.py
+"""
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
+
+import pdf_service
+from pdf_service import PDFRenderPool
+from warmup import SKIPPED, Warmup
+
+
+def test_steps_run_in_order_and_failures_do_not_block_readiness():
+    calls = []
+    warmup = Warmup(enabled="first,broken,skipped")
+
+    @warmup.step("first")
+    def first():
+        calls.append("first")
+
+    @warmup.step("broken")
+    def broken():
+        raise RuntimeError("no network")
+
+    @warmup.step("skipped")
+    def skipped():
+        return SKIPPED
+
+    @warmup.step("disabled")
+    def disabled():
+        calls.append("disabled")
+
+    assert warmup.status()["state"] == "pending" and not warmup.ready
+    assert warmup.status()["steps"]["first"] == {"status": "pending"}
+    assert warmup.start(block=True)
+    assert not warmup.start(block=True)  # once per process
+
+    status = warmup.status()
+    assert calls == ["first"] and warmup.ready and status["state"] == "ready"
+    assert status["steps"]["first"]["status"] == "ok"
+    assert status["steps"]["broken"]["status"] == "failed"
+    assert status["steps"]["broken"]["error"] == "RuntimeError: no network"
+    assert status["steps"]["skipped"]["status"] == SKIPPED
+    assert "disabled" not in status["steps"]
+
+
+def test_none_disables_every_step():
+    warmup = Warmup(enabled="none")
+    warmup.step("imports")(lambda: None)
+    warmup.start(block=True)
+    assert warmup.ready and warmup.status()["steps"] == {}
+
+
+def test_readiness_is_separate_from_liveness(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("WARMUP_STEPS", "none")
+    monkeypatch.setattr(pdf_service, "render_pool", PDFRenderPool(workers=0))
+    import flask_app
+    release = threading.Event()
+    warmup = Warmup(enabled="gate,templates,pdf")
+    warmup.step("gate")(lambda: release.wait(timeout=30))
+    warmup.step("templates")(flask_app.warm_templates)
+    warmup.step("pdf")(flask_app.warm_pdf_renderers)
+    monkeypatch.setattr(flask_app, "warmup", warmup)
+    client = flask_app.app.test_client()
+
+    warming = client.get("/health/ready")  # before_request starts warm-up in the background
+    assert warming.status_code == 503 and warming.get_json()["state"] == "warming"
+    assert client.get("/health").status_code == 200
+    release.set()
+    assert warmup.wait(timeout=30)
+
+    health = client.get("/health")
+    assert health.status_code == 200 and health.get_json()["ready"] is True
+    ready = client.get("/health/ready")
+    assert ready.status_code == 200
+    assert {name: step["status"] for name, step in ready.get_json()["steps"].items()} == {
+        "gate": "ok", "templates": "ok", "pdf": "ok"
+    }
+    assert "pdf_portfolio" in sys.modules
+
+
+def test_engines_share_one_connection_pool(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    import prompt
+    first = prompt.ProductThinkingEngine()
+    second = prompt.ProductThinkingEngine()
+    assert first.client._client is second.client._client is prompt.get_http_client()
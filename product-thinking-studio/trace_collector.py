@@ -0,0 +1,167 @@
+"""
+Local trace collector for development
+Accepts OTLP/HTTP JSON at /v1/traces (what TRACE_EXPORT=otlp sends), keeps
+recent traces in memory, optionally appends their spans to a JSON lines file
+and prints a waterfall of each trace. Also prints waterfalls from a JSON
+lines file written with TRACE_EXPORT=jsonl.
+
+Usage:
+    python trace_collector.py --port 4318 --output traces.jsonl
+    TRACE_EXPORT=otlp TRACE_OTLP_ENDPOINT=http://127.0.0.1:4318/v1/traces gunicorn flask_app:app
+    python trace_collector.py --summarize traces.jsonl
+"""
+import argparse
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from flask import Flask, Response, jsonify, request
+
+
+def _attribute_value(value: Dict):
+    for key in ("stringValue", "boolValue", "doubleValue"):
+        if key in value:
+            return value[key]
+    if "intValue" in value:
+        return int(value["intValue"])
+    return None
+
+
+def spans_from_otlp(payload: Dict) -> List[Dict]:
+    """OTLP/JSON export request -> span records in the JSON lines format"""
+    spans = []
+    for resource_spans in payload.get("resourceSpans", []):
+        for scope_spans in resource_spans.get("scopeSpans", []):
+            for span in scope_spans.get("spans", []):
+                start, end = int(span["startTimeUnixNano"]), int(span["endTimeUnixNano"])
+                status = span.get("status", {})
+                record = {
+                    "trace_id": span["traceId"],
+                    "span_id": span["spanId"],
+                    "parent_span_id": span.get("parentSpanId") or None,
+                    "name": span["name"],
+                    "start_time_unix_nano": start,
+                    "end_time_unix_nano": end,
+                    "duration_ms": round((end - start) / 1e6, 3),
+                    "attributes": {item["key"]: _attribute_value(item["value"])
+                                   for item in span.get("attributes", [])},
+                    "status": "error" if status.get("code") == 2 else "ok",
+                }
+                if status.get("message"):
+                    record["error"] = status["message"]
+                spans.append(record)
+    return spans
+
+
+def group_traces(spans: List[Dict]) -> "OrderedDict[str, List[Dict]]":
+    traces: "OrderedDict[str, List[Dict]]" = OrderedDict()
+    for span in spans:
+        traces.setdefault(span["trace_id"], []).append(span)
+    return traces
+
+
+def waterfall(spans: List[Dict]) -> str:
+    """
+    Text timeline of one trace: offset from the start, duration and name, nested by parent
+
+    e.g.
+        +    0.0 ms  2140.3 ms  POST /analyze-website  http.status_code=200
+        +    1.2 ms   910.8 ms    scrape  url=https://example.com
+    """
+    span_ids = {span["span_id"] for span in spans}
+    children: Dict[Optional[str], List[Dict]] = {}
+    for span in spans:
+        parent = span["parent_span_id"] if span["parent_span_id"] in span_ids else None
+        children.setdefault(parent, []).append(span)
+    start = min(span["start_time_unix_nano"] for span in spans)
+
+    lines = [f"trace {spans[0]['trace_id']}"]
+
+    def visit(parent: Optional[str], depth: int):
+        for span in sorted(children.get(parent, []), key=lambda item: item["start_time_unix_nano"]):
+            offset = (span["start_time_unix_nano"] - start) / 1e6
+            attributes = " ".join(f"{key}={value}" for key, value in span["attributes"].items())
+            error = f"  ERROR {span['error']}" if span.get("error") else ""
+            lines.append(f"  +{offset:>9.1f} ms {span['duration_ms']:>9.1f} ms  "
+                         f"{'  ' * depth}{span['name']}  {attributes}{error}".rstrip())
+            visit(span["span_id"], depth + 1)
+
+    visit(None, 0)
+    return "\n".join(lines)
+
+
+def create_app(output: Optional[str] = None, max_traces: int = 200, echo: bool = True) -> Flask:
+    """
+    Build the collector application
+
+    Args:
+        output: JSON lines file to append received spans to
+        max_traces: Traces kept in memory for /traces
+        echo: Print a waterfall for each trace received
+    """
+    collector = Flask(__name__)
+    traces: "OrderedDict[str, List[Dict]]" = OrderedDict()
+    lock = threading.Lock()
+
+    @collector.route('/v1/traces', methods=['POST'])
+    def receive():
+        spans = spans_from_otlp(request.get_json(force=True, silent=True) or {})
+        received = group_traces(spans)
+        with lock:
+            for trace_id, trace_spans in received.items():
+                traces.setdefault(trace_id, []).extend(trace_spans)
+                traces.move_to_end(trace_id)
+            while len(traces) > max_traces:
+                traces.popitem(last=False)
+            if output:
+                with open(output, "a", encoding="utf-8") as trace_file:
+                    trace_file.write("".join(json.dumps(span) + "\n" for span in spans))
+        if echo:
+            for trace_spans in received.values():
+                print(waterfall(trace_spans), flush=True)
+        return jsonify({"partialSuccess": {}})
+
+    @collector.route('/traces')
+    def list_traces():
+        with lock:
+            summaries = []
+            for trace_id, trace_spans in reversed(traces.items()):
+                root = min(trace_spans, key=lambda span: span["start_time_unix_nano"])
+                summaries.append({"trace_id": trace_id, "name": root["name"],
+                                  "duration_ms": root["duration_ms"], "spans": len(trace_spans)})
+        return jsonify(summaries)
+
+    @collector.route('/traces/<trace_id>')
+    def show_trace(trace_id):
+        with lock:
+            trace_spans = list(traces.get(trace_id, []))
+        if not trace_spans:
+            return jsonify({"error": "Trace not found"}), 404
+        return Response(waterfall(trace_spans) + "\n", mimetype="text/plain")
+
+    return collector
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local OTLP/HTTP JSON trace collector")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=4318)
+    parser.add_argument('--output', help='append received spans to this JSON lines file')
+    parser.add_argument('--quiet', action='store_true', help='do not print each trace')
+    parser.add_argument('--summarize', metavar='FILE', help='print waterfalls from a JSON lines file and exit')
+    args = parser.parse_args()
+
+    if args.summarize:
+        with open(args.summarize, encoding="utf-8") as trace_file:
+            spans = [json.loads(line) for line in trace_file if line.strip()]
+        for trace_spans in group_traces(spans).values():
+            print(waterfall(trace_spans) + "\n")
+        return
+
+    print(f"Trace collector on http://{args.host}:{args.port}/v1/traces")
+    create_app(args.output, echo=not args.quiet).run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == '__main__':
+    main()